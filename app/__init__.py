@@ -1,5 +1,6 @@
 import os
 import logging
+import threading
 from flask import Flask, g, request
 from app.extensions import db
 
@@ -43,6 +44,24 @@ def create_app(config=None):
     os.makedirs(tmp_path, exist_ok=True)
     app.config["TEMP_FOLDER"] = tmp_path
     
+    # Mezun sınıfların taşındığı arşiv veritabanlarının klasörü
+    app.config["ARCHIVE_FOLDER"] = os.path.join(os.getcwd(), 'instance', 'arsiv')
+    
+    # MEBBİS aktarım ayarları (yerel test için: flask gorusme_defteri mebbis-sunucu)
+    app.config["MEBBIS_URL"] = os.environ.get("MEBBIS_URL")
+    app.config["MEBBIS_TOKEN"] = os.environ.get("MEBBIS_TOKEN")
+    app.config["MEBBIS_BATCH_SIZE"] = int(os.environ.get("MEBBIS_BATCH_SIZE", 200))
+    
+    # Yapay zeka model önbelleği: tutulacak model sayısı ve süreç başında aktif modellerin yüklenmesi
+    app.config["MODEL_ONBELLEK_BOYUTU"] = int(os.environ.get("MODEL_ONBELLEK_BOYUTU", 8))
+    app.config["MODEL_ISITMA"] = os.environ.get("MODEL_ISITMA", "1") == "1"
+    # Gelişmiş veri analizi sonuçlarının süreç içi önbellek ömrü (saniye)
+    app.config["ANALIZ_ONBELLEK_SURESI"] = int(os.environ.get("ANALIZ_ONBELLEK_SURESI", 300))
+    # Ana sayfa istatistik görüntüsünün en uzun ömrü (saniye); yazmalar görüntüyü daha önce geçersiz kılar
+    app.config["PANO_ONBELLEK_SURESI"] = int(os.environ.get("PANO_ONBELLEK_SURESI", 60))
+    # Süreç içi ders/konu kataloğunun paylaşılan sürümle karşılaştırılma aralığı (saniye)
+    app.config["KATALOG_KONTROL_ARALIGI"] = float(os.environ.get("KATALOG_KONTROL_ARALIGI", 5))
+    
     # Initialize extensions
     db.init_app(app)
     
@@ -54,17 +73,17 @@ def create_app(config=None):
         # Import route modules BEFORE registering blueprints
         # to ensure routes are registered with the blueprint
         from app.blueprints.ana_sayfa import routes, ana_sayfa_bp
-        from app.blueprints.ogrenci_yonetimi import routes, ogrenci_yonetimi_bp
+        from app.blueprints.ogrenci_yonetimi import routes, commands, ogrenci_yonetimi_bp
         from app.blueprints.ders_konu_yonetimi import routes, ders_konu_yonetimi_bp
         from app.blueprints.deneme_sinavlari import routes, deneme_sinavlari_bp
         from app.blueprints.rapor_yonetimi import routes, rapor_yonetimi_bp
         from app.blueprints.calisma_programi import routes, routes_api, calisma_programi_bp
         from app.blueprints.parametre_yonetimi import routes, parametre_yonetimi_bp
         from app.blueprints.ilk_kayit_formu import routes, ilk_kayit_formu_bp
-        from app.blueprints.gorusme_defteri import routes, gorusme_defteri_bp
+        from app.blueprints.gorusme_defteri import routes, commands, gorusme_defteri_bp
         from app.blueprints.etkinlik_kayit import routes, etkinlik_kayit_bp
         from app.blueprints.anket_yonetimi import routes, anket_yonetimi_bp
-        from app.blueprints.yapay_zeka_asistan import routes, yapay_zeka_asistan_bp
+        from app.blueprints.yapay_zeka_asistan import routes, commands, yapay_zeka_asistan_bp
         from app.api import routes, api_bp
         
         # Register blueprints
@@ -84,18 +103,47 @@ def create_app(config=None):
         
         # Import models for database table creation
         from app.extensions import Base
+        from app.blueprints.ana_sayfa.models import PanoOzeti
         from app.blueprints.ogrenci_yonetimi.models import Ogrenci
-        from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+        from app.blueprints.ders_konu_yonetimi.models import Ders, Konu, KonuZorlukOzeti, KatalogSurumu
         from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
-        from app.blueprints.deneme_sinavlari.models import DenemeSonuc
+        from app.blueprints.deneme_sinavlari.models import DenemeSonuc, DenemeSurumu
         from app.blueprints.parametre_yonetimi.models import OkulBilgi, DersSaati, GorusmeKonusu
-        from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+        from app.blueprints.gorusme_defteri.models import GorusmeKaydi, MebbisAktarim
         from app.blueprints.rapor_yonetimi.models import FaaliyetRaporu, RaporSablonu, IstatistikRaporu, RaporlananOlay
         from app.blueprints.etkinlik_kayit.models import Etkinlik
-        from app.blueprints.anket_yonetimi.models import AnketTuru, CevapTuru, Anket, AnketSoru, OgrenciAnket, AnketCevap, SinifAnketSonuc
-        from app.blueprints.yapay_zeka_asistan.models import YapayZekaModel, YapayZekaAnaliz, OgrenciAnaliz, OgrenciOneri, DuyguAnalizi
+        from app.blueprints.anket_yonetimi.models import AnketTuru, CevapTuru, Anket, AnketSoru, OgrenciAnket, AnketCevap, SinifAnketSonuc, AnketCevapDagilimi, AnketOlcek, AnketOlcekMaddesi, OgrenciOlcekPuani, AnketPaketSemasi, PaketliCevap
+        from app.blueprints.yapay_zeka_asistan.models import YapayZekaModel, YapayZekaAnaliz, OgrenciAnaliz, OgrenciOneri, DuyguAnalizi, ModelEgitimIsi, OgrenciSegmenti, ModelAyarAramasi, KonuOnerisi
         
         # Create all database tables
         db.create_all()
+        
+        # create_all mevcut tablolara sonradan eklenen indeksleri oluşturmaz
+        # (ör. benzerlik damgaları için ix_deneme_sonuclari_ogrenci_tarih)
+        for tablo in db.metadata.sorted_tables:
+            for indeks in tablo.indexes:
+                indeks.create(db.engine, checkfirst=True)
+    
+    if app.config["MODEL_ISITMA"]:
+        # Isıtma ilk istekte başlatılır; flask CLI komutları (init-db, konu-onerileri vb.)
+        # model yükleme maliyetini ödemez ve aynı veritabanı dosyası için yarışmaz
+        isitma_kilidi = threading.Lock()
+        isitma = {'basladi': False}
+        
+        @app.before_request
+        def modelleri_isit():
+            if isitma['basladi']:
+                return
+            with isitma_kilidi:
+                if isitma['basladi']:
+                    return
+                isitma['basladi'] = True
+            
+            from app.blueprints.yapay_zeka_asistan.model_onbellegi import ModelOnbellegi
+            ModelOnbellegi.arka_planda_isit(app)
+            
+            # Benzer öğrenci indeksini süreç başında veritabanıyla eşitle
+            from app.blueprints.yapay_zeka_asistan.benzerlik import BenzerOgrenciService
+            BenzerOgrenciService.arka_planda_guncelle(app)
     
     return app
\ No newline at end of file
@@ -0,0 +1,23 @@
+from datetime import datetime
+import json
+
+from app.extensions import db
+
+class PanoOzeti(db.Model):
+    """Ana sayfa istatistiklerinin tüm süreçlerce paylaşılan anlık görüntüsünü temsil eden model sınıfı"""
+    __tablename__ = 'pano_ozetleri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)  # İzlenen tablolara her yazmada artar
+    hesaplanan_surum = db.Column(db.Integer)  # Görüntü hesaplanırken okunan sürüm
+    veri = db.Column(db.Text)  # JSON: ana sayfa istatistikleri
+    olusturma_zamani = db.Column(db.DateTime, default=datetime.now)
+    
+    @property
+    def veri_dict(self):
+        """JSON'dan dict'e dönüştür"""
+        return json.loads(self.veri) if self.veri else {}
+    
+    def __repr__(self):
+        return f"<PanoOzeti Sürüm: {self.surum} - {self.olusturma_zamani}>"
@@ -0,0 +1,200 @@
+"""
+Ana sayfa pano modülü
+Ana sayfa istatistiklerini (öğrenci, ders, konu sayıları, ortalama ilerleme,
+riskli öğrenci sayısı, yaklaşan etkinlikler ve bu haftaki görüşmeler) SQL
+toplamlarıyla hesaplar ve PanoOzeti tablosunda tek satırlık bir anlık görüntü
+olarak saklar. Görüntü veritabanında durduğu için tüm gunicorn süreçleri aynı
+sonucu paylaşır; ana sayfa yalnızca birincil anahtarla tek satır okur.
+
+Görüntü PANO_ONBELLEK_SURESI dolduğunda veya izlenen tablolara yazan bir işlem
+commit edildiğinde (satırdaki sürüm sayacı artırılarak) yeniden hesaplanır.
+Hesaplama sürerken yazma olduysa hesaplanan görüntü kaydedilmez.
+"""
+
+import json
+import logging
+from datetime import date, datetime, timedelta
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.blueprints.ana_sayfa.models import PanoOzeti
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+from app.blueprints.calisma_programi.models import DersIlerleme
+from app.blueprints.etkinlik_kayit.models import Etkinlik
+from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+from app.blueprints.yapay_zeka_asistan.models import OgrenciAnaliz
+
+VARSAYILAN_SURE = 60
+OZET_ID = 1
+# Son analizdeki risk seviyesi bu değer ve üzerindeyse öğrenci riskli sayılır
+RISK_ESIGI = 0.5
+YAKLASAN_ETKINLIK_SAYISI = 5
+
+# Görüntüyü geçersiz kılan tablolar
+IZLENEN_MODELLER = (Ogrenci, Ders, Konu, DersIlerleme, Etkinlik, GorusmeKaydi, OgrenciAnaliz)
+
+_tablo = PanoOzeti.__table__
+
+
+def _sure():
+    if has_app_context():
+        return current_app.config.get('PANO_ONBELLEK_SURESI', VARSAYILAN_SURE)
+    return VARSAYILAN_SURE
+
+
+def _izlenen_mi(nesneler):
+    return any(isinstance(nesne, IZLENEN_MODELLER) for nesne in nesneler)
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    if _izlenen_mi(session.new) or _izlenen_mi(session.dirty) or _izlenen_mi(session.deleted):
+        session.info['pano_degisti'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # insert(Model) / update() / delete() ifadeleri flush olaylarını tetiklemez
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, IZLENEN_MODELLER):
+        orm_execute_state.session.info['pano_degisti'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _commit_sonrasi(session):
+    if session.info.pop('pano_degisti', False):
+        try:
+            with session.get_bind().begin() as baglanti:
+                PanoService.gecersiz_kil(baglanti)
+        except Exception as e:
+            # Görüntü en geç süre dolunca yenilenir
+            logging.warning(f"Pano görüntüsü geçersiz kılınamadı: {str(e)}")
+
+
+@event.listens_for(Session, 'after_rollback')
+def _rollback_sonrasi(session):
+    session.info.pop('pano_degisti', None)
+
+
+class PanoService:
+    """Ana sayfa istatistik görüntüsünü hesaplayan ve sunan servis sınıfı"""
+
+    @staticmethod
+    def gecersiz_kil(baglanti=None):
+        """
+        Görüntünün sürümünü artırarak bir sonraki okumada yeniden hesaplanmasını sağla
+
+        Args:
+            baglanti: Kullanılacak Connection; verilmezse ayrı bir işlem açılır
+        """
+        ifade = update(_tablo).where(_tablo.c.id == OZET_ID).values(surum=_tablo.c.surum + 1)
+        if baglanti is not None:
+            baglanti.execute(ifade)
+        else:
+            with db.engine.begin() as baglanti:
+                baglanti.execute(ifade)
+
+    @staticmethod
+    def hesapla(bugun=None):
+        """
+        Ana sayfa istatistiklerini SQL toplamlarıyla hesapla
+
+        Args:
+            bugun: Haftanın ve yaklaşan etkinliklerin hesaplandığı gün (varsayılan: bugün)
+
+        Returns:
+            Dict: İstatistikler
+        """
+        bugun = bugun or date.today()
+        hafta_basi = bugun - timedelta(days=bugun.weekday())
+        hafta_sonu = hafta_basi + timedelta(days=6)
+
+        son_analizler = select(func.max(OgrenciAnaliz.id)).group_by(OgrenciAnaliz.ogrenci_id)
+        sayilar = db.session.execute(select(
+            select(func.count(Ogrenci.id)).scalar_subquery().label('ogrenci_sayisi'),
+            select(func.count(Ders.id)).scalar_subquery().label('ders_sayisi'),
+            select(func.count(Konu.id)).scalar_subquery().label('konu_sayisi'),
+            select(func.avg(DersIlerleme.tamamlama_yuzdesi)).scalar_subquery().label('ortalama_ilerleme'),
+            select(func.count(OgrenciAnaliz.id))
+                .where(OgrenciAnaliz.id.in_(son_analizler), OgrenciAnaliz.risk_seviyesi >= RISK_ESIGI)
+                .scalar_subquery().label('riskli_ogrenci_sayisi'),
+            select(func.count(GorusmeKaydi.id))
+                .where(GorusmeKaydi.tarih.between(hafta_basi, hafta_sonu))
+                .scalar_subquery().label('haftalik_gorusme_sayisi'),
+        )).one()
+
+        etkinlikler = db.session.execute(
+            select(Etkinlik.id, Etkinlik.etkinlik_tarihi, Etkinlik.faaliyet_turu, Etkinlik.hedef_turu)
+            .where(Etkinlik.etkinlik_tarihi >= bugun)
+            .order_by(Etkinlik.etkinlik_tarihi, Etkinlik.id)
+            .limit(YAKLASAN_ETKINLIK_SAYISI)
+        ).all()
+
+        return {
+            'ogrenci_sayisi': sayilar.ogrenci_sayisi,
+            'ders_sayisi': sayilar.ders_sayisi,
+            'konu_sayisi': sayilar.konu_sayisi,
+            'ortalama_ilerleme': float(sayilar.ortalama_ilerleme or 0),
+            'riskli_ogrenci_sayisi': sayilar.riskli_ogrenci_sayisi,
+            'haftalik_gorusme_sayisi': sayilar.haftalik_gorusme_sayisi,
+            'yaklasan_etkinlikler': [
+                {
+                    'id': e.id,
+                    'tarih': e.etkinlik_tarihi.strftime('%d.%m.%Y'),
+                    'faaliyet_turu': e.faaliyet_turu,
+                    'hedef_turu': e.hedef_turu,
+                }
+                for e in etkinlikler
+            ],
+        }
+
+    @staticmethod
+    def get_ozet():
+        """
+        Ana sayfa istatistiklerini getir; görüntü güncelse yeniden hesaplanmaz
+
+        Returns:
+            Dict: İstatistikler
+        """
+        veri = None
+        try:
+            kayit = db.session.execute(
+                select(_tablo.c.surum, _tablo.c.hesaplanan_surum, _tablo.c.veri, _tablo.c.olusturma_zamani)
+                .where(_tablo.c.id == OZET_ID)
+            ).first()
+            if (kayit and kayit.veri and kayit.hesaplanan_surum == kayit.surum
+                    and datetime.now() - kayit.olusturma_zamani < timedelta(seconds=_sure())):
+                return json.loads(kayit.veri)
+
+            surum = kayit.surum if kayit else 0
+            veri = PanoService.hesapla()
+            degerler = {
+                'hesaplanan_surum': surum,
+                'veri': json.dumps(veri, ensure_ascii=False),
+                'olusturma_zamani': datetime.now(),
+            }
+            # İstek oturumunu etkilememek için görüntü ayrı bir işlemde yazılır
+            with db.engine.begin() as baglanti:
+                if kayit:
+                    baglanti.execute(
+                        update(_tablo)
+                        .where(_tablo.c.id == OZET_ID, _tablo.c.surum == surum)
+                        .values(**degerler)
+                    )
+                else:
+                    baglanti.execute(insert(_tablo).values(id=OZET_ID, surum=surum, **degerler))
+            return veri
+
+        except IntegrityError:
+            # Görüntü satırı başka bir süreç tarafından aynı anda oluşturuldu
+            return veri
+        except Exception as e:
+            logging.error(f"Pano görüntüsü okunamadı veya yazılamadı: {str(e)}")
+            return veri if veri is not None else PanoService.hesapla()
@@ -0,0 +1,519 @@
+"""
+Anket cevap deposu
+Anket cevaplarının iki depolama biçimini tek bir okuma/yazma katmanı
+arkasında toplar:
+
+- satır: her öğrenci-soru cevabı için bir AnketCevap satırı (varsayılan)
+- paket: her öğrenci anketi için tek bir PaketliCevap satırı; cevaplar
+  AnketPaketSemasi'ndaki kod tablosuna göre uint8 seçenek kodları olarak tutulur
+
+Sonuç, çapraz tablo ve puanlama kodu cevapları bu modül üzerinden okur ve
+anketin hangi biçimde saklandığını bilmek zorunda kalmaz.
+"""
+
+import json
+
+import numpy as np
+from sqlalchemy import func, select, insert, update, delete
+
+from app.extensions import db
+from app.blueprints.anket_yonetimi.models import (
+    AnketSoru, OgrenciAnket, AnketCevap, AnketPaketSemasi, PaketliCevap
+)
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+
+# uint8 kodlarda 0 boş cevaba ayrıldığından soru başına en fazla 255 farklı cevap
+AZAMI_SECENEK = 255
+
+
+class KodTablosu:
+    """Paketli anketin sütun sırasını ve soru başına seçenek kodlarını tutan yardımcı sınıf"""
+
+    def __init__(self, sema):
+        self.sema = sema
+        self.soru_idleri = json.loads(sema.soru_idleri)
+        self.tablolar = {int(soru_id): secenekler for soru_id, secenekler in json.loads(sema.kod_tablolari).items()}
+        self.sutunlar = {soru_id: sira for sira, soru_id in enumerate(self.soru_idleri)}
+        self.kodlar = {
+            soru_id: {secenek: kod for kod, secenek in enumerate(secenekler, start=1)}
+            for soru_id, secenekler in self.tablolar.items()
+        }
+        self.degisti = False
+
+    def sutun(self, soru_id):
+        """Sorunun paketteki sütununu döndür; pakete sonradan eklenen sorular sona yerleşir"""
+        sira = self.sutunlar.get(soru_id)
+        if sira is None:
+            sira = len(self.soru_idleri)
+            self.soru_idleri.append(soru_id)
+            self.sutunlar[soru_id] = sira
+            self.tablolar.setdefault(soru_id, [])
+            self.kodlar.setdefault(soru_id, {})
+            self.degisti = True
+        return sira
+
+    def kod(self, soru_id, cevap):
+        """Cevabın kodunu döndür; kod tablosunda bulunmayan cevaplar tabloya eklenir"""
+        if cevap is None or cevap == '':
+            return 0
+
+        cevap = str(cevap)
+        kodlar = self.kodlar.setdefault(soru_id, {})
+        kod = kodlar.get(cevap)
+        if kod is None:
+            secenekler = self.tablolar.setdefault(soru_id, [])
+            if len(secenekler) >= AZAMI_SECENEK:
+                raise ValueError(f"Soru {soru_id} için paketli depolamada en fazla {AZAMI_SECENEK} farklı cevap tutulabilir.")
+            secenekler.append(cevap)
+            kod = kodlar[cevap] = len(secenekler)
+            self.degisti = True
+        return kod
+
+    def cevap(self, soru_id, kod):
+        """Kodun karşılığı olan cevap metnini döndür (0 için None)"""
+        return self.tablolar[soru_id][kod - 1] if kod else None
+
+    def kaydet(self):
+        """Kod tablosunda değişiklik varsa şema satırına yaz"""
+        if self.degisti:
+            self.sema.soru_idleri = json.dumps(self.soru_idleri)
+            self.sema.kod_tablolari = json.dumps(
+                {str(soru_id): secenekler for soru_id, secenekler in self.tablolar.items()}, ensure_ascii=False
+            )
+            self.degisti = False
+
+
+class CevapDeposu:
+    """Anket cevaplarının satır veya paket biçiminde okunup yazılmasını yöneten servis sınıfı"""
+
+    @staticmethod
+    def kod_tablosu(anket_id):
+        """
+        Anketin paket kod tablosunu getir
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            KodTablosu: Anket paketli değilse None
+        """
+        sema = AnketPaketSemasi.query.filter_by(anket_id=anket_id).first()
+        return KodTablosu(sema) if sema else None
+
+    @staticmethod
+    def paketli_mi(anket_id):
+        """Anket cevaplarının paket biçiminde saklanıp saklanmadığını döndür"""
+        return db.session.query(AnketPaketSemasi.id).filter_by(anket_id=anket_id).first() is not None
+
+    @staticmethod
+    def _atamalar(anket_id):
+        """Anketin (ogrenci_anket_id, ogrenci_id) çiftlerini ID sırasıyla dizi olarak getir"""
+        return np.array(db.session.query(OgrenciAnket.id, OgrenciAnket.ogrenci_id).filter(
+            OgrenciAnket.anket_id == anket_id
+        ).order_by(OgrenciAnket.id).all(), dtype=np.int64).reshape(-1, 2)
+
+    @staticmethod
+    def _paket_matrisi(anket_id, tablo, atamalar):
+        """Paketli cevapları (öğrenci x paket sütunu) uint8 matrisine aç"""
+        paket = np.zeros((len(atamalar), len(tablo.soru_idleri)), dtype=np.uint8)
+        satirlar = db.session.query(PaketliCevap.ogrenci_anket_id, PaketliCevap.kodlar).join(
+            OgrenciAnket, PaketliCevap.ogrenci_anket_id == OgrenciAnket.id
+        ).filter(OgrenciAnket.anket_id == anket_id).all()
+
+        if satirlar:
+            indeksler = np.searchsorted(atamalar[:, 0], [ogrenci_anket_id for ogrenci_anket_id, _ in satirlar])
+            for satir, (_, kodlar) in zip(indeksler, satirlar):
+                dizi = np.frombuffer(kodlar, dtype=np.uint8)
+                paket[satir, :len(dizi)] = dizi
+        return paket
+
+    @staticmethod
+    def imza(anket_id):
+        """
+        Anket cevaplarında değişiklik olup olmadığını anlamak için tek satırlık özet
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            Tuple: Cevaplar değiştiğinde değişen değerler
+        """
+        if CevapDeposu.paketli_mi(anket_id):
+            sorgu = db.session.query(
+                func.count(PaketliCevap.id), func.max(PaketliCevap.id), func.max(PaketliCevap.guncelleme_tarihi)
+            ).join(OgrenciAnket, PaketliCevap.ogrenci_anket_id == OgrenciAnket.id)
+            return ('paket',) + tuple(sorgu.filter(OgrenciAnket.anket_id == anket_id).one())
+
+        sorgu = db.session.query(
+            func.count(AnketCevap.id), func.max(AnketCevap.id), func.max(OgrenciAnket.son_guncelleme)
+        ).join(OgrenciAnket, AnketCevap.ogrenci_anket_id == OgrenciAnket.id)
+        return ('satir',) + tuple(sorgu.filter(OgrenciAnket.anket_id == anket_id).one())
+
+    @staticmethod
+    def cevap_matrisi(anket_id, soru_idleri):
+        """
+        Anketin cevaplarını (öğrenci x soru) kod matrisine dönüştür
+
+        Her farklı cevap metni sözlükte bir koda karşılık gelir; cevaplanmamış
+        hücreler -1 ile gösterilir. Satır sırası ogrenci_anket_id sırasıdır.
+
+        Args:
+            anket_id: Anket ID
+            soru_idleri: Matrisin sütunlarını oluşturan, artan sırada soru ID'leri
+
+        Returns:
+            Tuple: (ogrenci_anket_idleri, ogrenci_idleri, sozluk, kodlar)
+        """
+        atamalar = CevapDeposu._atamalar(anket_id)
+        kodlar = np.full((len(atamalar), len(soru_idleri)), -1, dtype=np.int32)
+
+        tablo = CevapDeposu.kod_tablosu(anket_id)
+        if tablo:
+            paket = CevapDeposu._paket_matrisi(anket_id, tablo, atamalar)
+            sozluk = np.unique(np.asarray(
+                [secenek for soru_id in soru_idleri for secenek in tablo.tablolar.get(soru_id, [])], dtype=str
+            ))
+
+            for sira, soru_id in enumerate(soru_idleri):
+                sutun = tablo.sutunlar.get(soru_id)
+                if sutun is None:
+                    continue
+                # Sorunun yerel kodlarını (0 = boş) sözlük kodlarına çeviren arama tablosu
+                secenekler = np.asarray(tablo.tablolar[soru_id], dtype=str)
+                arama = np.concatenate(([-1], np.searchsorted(sozluk, secenekler))).astype(np.int32)
+                kodlar[:, sira] = arama[paket[:, sutun]]
+
+            return atamalar[:, 0], atamalar[:, 1], sozluk, kodlar
+
+        satirlar = db.session.execute(select(
+            AnketCevap.ogrenci_anket_id, AnketCevap.soru_id, AnketCevap.cevap
+        ).join(
+            OgrenciAnket, AnketCevap.ogrenci_anket_id == OgrenciAnket.id
+        ).where(
+            OgrenciAnket.anket_id == anket_id,
+            AnketCevap.soru_id.in_(list(soru_idleri)),
+            AnketCevap.cevap.isnot(None),
+            AnketCevap.cevap != ''
+        )).all()
+
+        if not satirlar:
+            return atamalar[:, 0], atamalar[:, 1], np.array([], dtype=str), kodlar
+
+        atama_idleri, soru_sutunlari, cevaplar = zip(*satirlar)
+
+        satir_indeksleri = np.searchsorted(atamalar[:, 0], np.array(atama_idleri, dtype=np.int64))
+        sutun_indeksleri = np.searchsorted(np.asarray(soru_idleri), np.array(soru_sutunlari, dtype=np.int64))
+        sozluk, cevap_kodlari = np.unique(np.asarray(cevaplar, dtype=str), return_inverse=True)
+
+        kodlar[satir_indeksleri, sutun_indeksleri] = cevap_kodlari
+        return atamalar[:, 0], atamalar[:, 1], sozluk, kodlar
+
+    @staticmethod
+    def soru_cevaplari(anket_id, soru_id, kirilim=None):
+        """
+        Bir sorunun boş olmayan cevaplarını getir
+
+        Args:
+            anket_id: Anket ID
+            soru_id: Soru ID
+            kirilim: Eklenecek öğrenci sütunu, örn. Ogrenci.sinif (isteğe bağlı)
+
+        Returns:
+            List: (ogrenci_id, cevap) veya (ogrenci_id, cevap, kirilim_degeri) demetleri
+        """
+        if not CevapDeposu.paketli_mi(anket_id):
+            sutunlar = [OgrenciAnket.ogrenci_id, AnketCevap.cevap]
+            if kirilim is not None:
+                sutunlar.append(kirilim)
+
+            query = db.session.query(*sutunlar).join(
+                OgrenciAnket, AnketCevap.ogrenci_anket_id == OgrenciAnket.id
+            )
+            if kirilim is not None:
+                query = query.join(Ogrenci, OgrenciAnket.ogrenci_id == Ogrenci.id)
+
+            return query.filter(
+                AnketCevap.soru_id == soru_id,
+                AnketCevap.cevap.isnot(None),
+                AnketCevap.cevap != ''
+            ).all()
+
+        _, ogrenci_idleri, sozluk, kodlar = CevapDeposu.cevap_matrisi(anket_id, [soru_id])
+        dolu = kodlar[:, 0] >= 0
+        cevaplar = list(zip(ogrenci_idleri[dolu].tolist(), sozluk[kodlar[dolu, 0]].tolist()))
+
+        if kirilim is None:
+            return cevaplar
+
+        degerler = dict(db.session.query(Ogrenci.id, kirilim).filter(
+            Ogrenci.id.in_([ogrenci_id for ogrenci_id, _ in cevaplar])
+        ).all())
+        return [(ogrenci_id, cevap, degerler.get(ogrenci_id)) for ogrenci_id, cevap in cevaplar]
+
+    @staticmethod
+    def dagilim_satirlari(anket_id):
+        """
+        Cevapları soru, sınıf, cinsiyet ve cevap bazında say
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            List: (soru_id, sinif, cinsiyet, cevap, sayi) demetleri
+        """
+        tablo = CevapDeposu.kod_tablosu(anket_id)
+        if not tablo:
+            return db.session.query(
+                AnketCevap.soru_id, Ogrenci.sinif, Ogrenci.cinsiyet, AnketCevap.cevap, func.count(AnketCevap.id)
+            ).join(
+                OgrenciAnket, AnketCevap.ogrenci_anket_id == OgrenciAnket.id
+            ).join(
+                Ogrenci, OgrenciAnket.ogrenci_id == Ogrenci.id
+            ).filter(
+                OgrenciAnket.anket_id == anket_id,
+                AnketCevap.cevap.isnot(None),
+                AnketCevap.cevap != ''
+            ).group_by(
+                AnketCevap.soru_id, Ogrenci.sinif, Ogrenci.cinsiyet, AnketCevap.cevap
+            ).all()
+
+        atamalar = CevapDeposu._atamalar(anket_id)
+        if not len(atamalar):
+            return []
+
+        paket = CevapDeposu._paket_matrisi(anket_id, tablo, atamalar)
+        ogrenciler = dict(
+            (ogrenci_id, (sinif, cinsiyet)) for ogrenci_id, sinif, cinsiyet in db.session.query(
+                Ogrenci.id, Ogrenci.sinif, Ogrenci.cinsiyet
+            ).filter(Ogrenci.id.in_(atamalar[:, 1].tolist())).all()
+        )
+        gruplar = sorted(set(ogrenciler.values()))
+        grup_sirasi = {grup: sira for sira, grup in enumerate(gruplar)}
+        grup_indeksleri = np.array([grup_sirasi[ogrenciler[ogrenci_id]] for ogrenci_id in atamalar[:, 1].tolist()])
+
+        # Her sütun için (grup, kod) çiftleri tek bincount ile sayılır
+        satirlar = []
+        kod_sayisi = AZAMI_SECENEK + 1
+        for soru_id, sutun in tablo.sutunlar.items():
+            sayilar = np.bincount(
+                grup_indeksleri * kod_sayisi + paket[:, sutun], minlength=len(gruplar) * kod_sayisi
+            ).reshape(len(gruplar), kod_sayisi)
+            for grup, kod in zip(*np.nonzero(sayilar[:, 1:])):
+                sinif, cinsiyet = gruplar[grup]
+                satirlar.append((soru_id, sinif, cinsiyet, tablo.cevap(soru_id, kod + 1), int(sayilar[grup, kod + 1])))
+        return satirlar
+
+    @staticmethod
+    def cevaplari_yaz(anket_id, atamalar, ogrenci_cevaplari):
+        """
+        Öğrenci cevaplarını anketin depolama biçimine göre yaz (commit çağıran tarafa aittir)
+
+        Args:
+            anket_id: Anket ID
+            atamalar: {ogrenci_id: ogrenci_anket_id} eşlemesi
+            ogrenci_cevaplari: {ogrenci_id: {soru_id: cevap}} sözlüğü
+
+        Returns:
+            List: Dağılım özetleri için (ogrenci_id, soru_id, cevap, fark) değişiklikleri
+        """
+        tablo = CevapDeposu.kod_tablosu(anket_id)
+        if tablo:
+            return CevapDeposu._paket_yaz(tablo, atamalar, ogrenci_cevaplari)
+        return CevapDeposu._satir_yaz(atamalar, ogrenci_cevaplari)
+
+    @staticmethod
+    def _satir_yaz(atamalar, ogrenci_cevaplari):
+        """Cevapları AnketCevap satırları olarak ekle veya güncelle"""
+        # Bu atamalara ait mevcut cevaplar tek sorguda okunur
+        mevcut_cevaplar = {
+            (ogrenci_anket_id, soru_id): (cevap_id, eski_cevap)
+            for cevap_id, ogrenci_anket_id, soru_id, eski_cevap in db.session.query(
+                AnketCevap.id, AnketCevap.ogrenci_anket_id, AnketCevap.soru_id, AnketCevap.cevap
+            ).filter(AnketCevap.ogrenci_anket_id.in_(list(atamalar.values()))).all()
+        }
+
+        yeni_cevaplar = []
+        guncellenen_cevaplar = []
+        degisiklikler = []
+        for ogrenci_id, cevaplar in ogrenci_cevaplari.items():
+            ogrenci_anket_id = atamalar[ogrenci_id]
+            for soru_id, cevap in cevaplar.items():
+                mevcut = mevcut_cevaplar.get((ogrenci_anket_id, soru_id))
+                if mevcut:
+                    cevap_id, eski_cevap = mevcut
+                    if eski_cevap == cevap:
+                        continue
+                    guncellenen_cevaplar.append({'id': cevap_id, 'cevap': cevap})
+                    degisiklikler.append((ogrenci_id, soru_id, eski_cevap, -1))
+                else:
+                    yeni_cevaplar.append({'ogrenci_anket_id': ogrenci_anket_id, 'soru_id': soru_id, 'cevap': cevap})
+                degisiklikler.append((ogrenci_id, soru_id, cevap, 1))
+
+        if yeni_cevaplar:
+            db.session.execute(insert(AnketCevap), yeni_cevaplar)
+        if guncellenen_cevaplar:
+            db.session.execute(update(AnketCevap), guncellenen_cevaplar)
+
+        return degisiklikler
+
+    @staticmethod
+    def _paket_yaz(tablo, atamalar, ogrenci_cevaplari):
+        """Cevapları öğrenci başına tek PaketliCevap satırında birleştir"""
+        mevcut_paketler = {
+            ogrenci_anket_id: (paket_id, kodlar)
+            for paket_id, ogrenci_anket_id, kodlar in db.session.query(
+                PaketliCevap.id, PaketliCevap.ogrenci_anket_id, PaketliCevap.kodlar
+            ).filter(PaketliCevap.ogrenci_anket_id.in_(list(atamalar.values()))).all()
+        }
+
+        yeni_paketler = []
+        guncellenen_paketler = []
+        degisiklikler = []
+        for ogrenci_id, cevaplar in ogrenci_cevaplari.items():
+            ogrenci_anket_id = atamalar[ogrenci_id]
+            sutunlar = {soru_id: tablo.sutun(soru_id) for soru_id in cevaplar}
+
+            dizi = np.zeros(len(tablo.soru_idleri), dtype=np.uint8)
+            mevcut = mevcut_paketler.get(ogrenci_anket_id)
+            if mevcut:
+                eski = np.frombuffer(mevcut[1], dtype=np.uint8)
+                dizi[:len(eski)] = eski
+
+            degisti = False
+            for soru_id, cevap in cevaplar.items():
+                sutun = sutunlar[soru_id]
+                eski_kod, yeni_kod = int(dizi[sutun]), tablo.kod(soru_id, cevap)
+                if eski_kod == yeni_kod:
+                    continue
+                if eski_kod:
+                    degisiklikler.append((ogrenci_id, soru_id, tablo.cevap(soru_id, eski_kod), -1))
+                if yeni_kod:
+                    degisiklikler.append((ogrenci_id, soru_id, tablo.cevap(soru_id, yeni_kod), 1))
+                dizi[sutun] = yeni_kod
+                degisti = True
+
+            if mevcut is None:
+                yeni_paketler.append({'ogrenci_anket_id': ogrenci_anket_id, 'kodlar': dizi.tobytes()})
+            elif degisti:
+                guncellenen_paketler.append({'id': mevcut[0], 'kodlar': dizi.tobytes()})
+
+        tablo.kaydet()
+        if yeni_paketler:
+            db.session.execute(insert(PaketliCevap), yeni_paketler)
+        if guncellenen_paketler:
+            db.session.execute(update(PaketliCevap), guncellenen_paketler)
+
+        return degisiklikler
+
+    @staticmethod
+    def paketle(anket_id):
+        """
+        Anketi paketli depolama moduna geçir ve mevcut cevapları dönüştür
+
+        Kod tablosu soruların seçeneklerinden oluşturulur; seçeneklerde
+        bulunmayan mevcut cevaplar da tabloya eklenir.
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        if CevapDeposu.paketli_mi(anket_id):
+            return {"success": False, "message": "Anket zaten paketli depolama modunda."}
+
+        sorular = AnketSoru.query.filter_by(anket_id=anket_id).order_by(AnketSoru.soru_sirasi, AnketSoru.id).all()
+        if not sorular:
+            return {"success": False, "message": "Anketin hiç sorusu bulunamadı."}
+
+        try:
+            sema = AnketPaketSemasi(
+                anket_id=anket_id,
+                soru_idleri=json.dumps([soru.id for soru in sorular]),
+                kod_tablolari=json.dumps(
+                    {str(soru.id): [str(s) for s in soru.secenekler_listesi][:AZAMI_SECENEK] for soru in sorular},
+                    ensure_ascii=False
+                )
+            )
+            db.session.add(sema)
+            tablo = KodTablosu(sema)
+
+            ogrenci_anket_idleri = select(OgrenciAnket.id).where(OgrenciAnket.anket_id == anket_id)
+            satirlar = db.session.query(AnketCevap.ogrenci_anket_id, AnketCevap.soru_id, AnketCevap.cevap).filter(
+                AnketCevap.ogrenci_anket_id.in_(ogrenci_anket_idleri)
+            ).all()
+
+            paketler = {}
+            for ogrenci_anket_id, soru_id, cevap in satirlar:
+                sutun = tablo.sutun(soru_id)
+                paketler.setdefault(ogrenci_anket_id, {})[sutun] = tablo.kod(soru_id, cevap)
+
+            sutun_sayisi = len(tablo.soru_idleri)
+            yeni_paketler = []
+            for ogrenci_anket_id, kodlar in paketler.items():
+                dizi = np.zeros(sutun_sayisi, dtype=np.uint8)
+                dizi[list(kodlar)] = list(kodlar.values())
+                yeni_paketler.append({'ogrenci_anket_id': ogrenci_anket_id, 'kodlar': dizi.tobytes()})
+
+            tablo.kaydet()
+            if yeni_paketler:
+                db.session.execute(insert(PaketliCevap), yeni_paketler)
+            db.session.execute(delete(AnketCevap).where(AnketCevap.ogrenci_anket_id.in_(ogrenci_anket_idleri)))
+            db.session.commit()
+
+            return {
+                "success": True,
+                "message": f"{len(satirlar)} cevap satırı {len(yeni_paketler)} paketli kayda dönüştürüldü."
+            }
+        except ValueError as e:
+            db.session.rollback()
+            return {"success": False, "message": str(e)}
+        except Exception as e:
+            db.session.rollback()
+            return {"success": False, "message": f"Cevaplar paketlenirken bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def paketi_ac(anket_id):
+        """
+        Anketi satır bazlı depolamaya geri döndür
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        tablo = CevapDeposu.kod_tablosu(anket_id)
+        if not tablo:
+            return {"success": False, "message": "Anket paketli depolama modunda değil."}
+
+        try:
+            atamalar = CevapDeposu._atamalar(anket_id)
+            paket = CevapDeposu._paket_matrisi(anket_id, tablo, atamalar)
+
+            satirlar, sutunlar = np.nonzero(paket)
+            yeni_cevaplar = [
+                {
+                    'ogrenci_anket_id': int(atamalar[satir, 0]),
+                    'soru_id': tablo.soru_idleri[sutun],
+                    'cevap': tablo.cevap(tablo.soru_idleri[sutun], int(paket[satir, sutun]))
+                }
+                for satir, sutun in zip(satirlar.tolist(), sutunlar.tolist())
+            ]
+
+            # Silinmiş sorulara ait sütunlar geri yazılmaz
+            mevcut_sorular = {soru_id for (soru_id,) in db.session.query(AnketSoru.id).filter_by(anket_id=anket_id).all()}
+            yeni_cevaplar = [cevap for cevap in yeni_cevaplar if cevap['soru_id'] in mevcut_sorular]
+
+            if yeni_cevaplar:
+                db.session.execute(insert(AnketCevap), yeni_cevaplar)
+            db.session.execute(delete(PaketliCevap).where(
+                PaketliCevap.ogrenci_anket_id.in_(select(OgrenciAnket.id).where(OgrenciAnket.anket_id == anket_id))
+            ))
+            db.session.execute(delete(AnketPaketSemasi).where(AnketPaketSemasi.anket_id == anket_id))
+            db.session.commit()
+
+            return {"success": True, "message": f"{len(yeni_cevaplar)} cevap satır bazlı depolamaya geri yazıldı."}
+        except Exception as e:
+            db.session.rollback()
+            return {"success": False, "message": f"Paketli cevaplar açılırken bir hata oluştu: {str(e)}"}
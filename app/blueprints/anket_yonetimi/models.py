@@ -6,7 +6,7 @@ gerekli veritabanı modellerini içerir.
 
 from datetime import datetime
 from app.extensions import db, relationship
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, LargeBinary
 
 class AnketTuru(db.Model):
     """Anket türlerini tanımlayan model (psikolojik test, akademik anket, vb.)"""
@@ -95,10 +95,13 @@ class AnketSoru(db.Model):
 class OgrenciAnket(db.Model):
     """Öğrencilere atanan anketleri tanımlayan model"""
     __tablename__ = 'ogrenci_anketleri'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_ogrenci_anketleri_anket_ogrenci', 'anket_id', 'ogrenci_id'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id'), nullable=False)
     atanma_tarihi = db.Column(db.DateTime, default=datetime.now)
     son_guncelleme = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
@@ -108,7 +111,7 @@ class OgrenciAnket(db.Model):
     # İlişkiler
     ogrenci = relationship("Ogrenci", back_populates="anketleri")
     anket = relationship("Anket", back_populates="ogrenci_anketleri")
-    cevaplar = relationship("AnketCevap", back_populates="ogrenci_anket", cascade="all, delete-orphan")
+    cevaplar = relationship("AnketCevap", back_populates="ogrenci_anket", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<OgrenciAnket {self.ogrenci_id}-{self.anket_id}>"
@@ -119,7 +122,7 @@ class AnketCevap(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_anket_id = db.Column(db.Integer, db.ForeignKey('ogrenci_anketleri.id'), nullable=False)
+    ogrenci_anket_id = db.Column(db.Integer, db.ForeignKey('ogrenci_anketleri.id', ondelete='CASCADE'), nullable=False)
     soru_id = db.Column(db.Integer, db.ForeignKey('anket_sorulari.id'), nullable=False)
     cevap = db.Column(db.Text, nullable=True)  # Metin, sayı veya çoktan seçmeli değerler
     
@@ -136,7 +139,7 @@ class SinifAnketSonuc(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id'), nullable=False)
+    anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id', ondelete='CASCADE'), nullable=False)
     sinif = db.Column(db.String(20), nullable=False)  # "9A", "10B" gibi
     cevaplayan_sayisi = db.Column(db.Integer, default=0)
     sonuc_ozeti = db.Column(db.Text, nullable=True)  # JSON formatında özet bilgiler
@@ -146,4 +149,116 @@ class SinifAnketSonuc(db.Model):
     anket = relationship("Anket")
     
     def __repr__(self):
-        return f"<SinifAnketSonuc {self.anket_id}-{self.sinif}>"
\ No newline at end of file
+        return f"<SinifAnketSonuc {self.anket_id}-{self.sinif}>"
+
+class AnketPaketSemasi(db.Model):
+    """Paketli cevap depolama modundaki anketlerin kod tablosu (sütun sırası ve seçenek kodları)"""
+    __tablename__ = 'anket_paket_semalari'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id', ondelete='CASCADE'), nullable=False, unique=True)
+    soru_idleri = db.Column(db.Text, nullable=False)  # JSON: paketteki sütun sırasıyla soru ID'leri
+    kod_tablolari = db.Column(db.Text, nullable=False)  # JSON: {"soru_id": ["seçenek1", ...]}; kod = sıra + 1, 0 = boş
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.now)
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    def __repr__(self):
+        return f"<AnketPaketSemasi {self.anket_id}>"
+
+class PaketliCevap(db.Model):
+    """Bir öğrencinin anket cevaplarını tek satırda uint8 seçenek kodları olarak tutan model"""
+    __tablename__ = 'paketli_cevaplar'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ogrenci_anket_id = db.Column(db.Integer, db.ForeignKey('ogrenci_anketleri.id', ondelete='CASCADE'), nullable=False, unique=True)
+    kodlar = db.Column(db.LargeBinary, nullable=False)
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    def __repr__(self):
+        return f"<PaketliCevap {self.ogrenci_anket_id}>"
+
+class AnketCevapDagilimi(db.Model):
+    """Soru, seçenek, sınıf ve cinsiyet bazında önceden hesaplanmış cevap sayıları (sonuç sayfası için)"""
+    __tablename__ = 'anket_cevap_dagilimlari'
+    __table_args__ = (
+        db.UniqueConstraint('soru_id', 'sinif', 'cinsiyet', 'secenek', name='uq_anket_cevap_dagilimi'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id', ondelete='CASCADE'), nullable=False, index=True)
+    soru_id = db.Column(db.Integer, db.ForeignKey('anket_sorulari.id', ondelete='CASCADE'), nullable=False)
+    sinif = db.Column(db.String(20), nullable=False)
+    cinsiyet = db.Column(db.String(10), nullable=False)
+    secenek = db.Column(db.Text, nullable=False)  # Verilen cevap (seçenek metni)
+    sayi = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<AnketCevapDagilimi {self.soru_id}-{self.sinif}-{self.cinsiyet}: {self.secenek}={self.sayi}>"
+
+class AnketOlcek(db.Model):
+    """Bir anketin alt ölçeklerini tanımlayan model (psikometrik puanlama için)"""
+    __tablename__ = 'anket_olcekleri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    anket_id = db.Column(db.Integer, db.ForeignKey('anketler.id', ondelete='CASCADE'), nullable=False, index=True)
+    ad = db.Column(db.String(100), nullable=False)
+    aciklama = db.Column(db.Text, nullable=True)
+    puanlama_yontemi = db.Column(db.String(20), default='toplam')  # toplam, ortalama
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.now)
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    # İlişkiler
+    anket = relationship("Anket")
+    maddeler = relationship("AnketOlcekMaddesi", back_populates="olcek", cascade="all, delete-orphan", passive_deletes=True)
+    puanlar = relationship("OgrenciOlcekPuani", back_populates="olcek", cascade="all, delete-orphan", passive_deletes=True)
+    
+    def __repr__(self):
+        return f"<AnketOlcek {self.anket_id}-{self.ad}>"
+
+class AnketOlcekMaddesi(db.Model):
+    """Bir alt ölçeğe giren soruları ve puanlama anahtarlarını tanımlayan model"""
+    __tablename__ = 'anket_olcek_maddeleri'
+    __table_args__ = (
+        db.UniqueConstraint('olcek_id', 'soru_id', name='uq_anket_olcek_maddesi'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    olcek_id = db.Column(db.Integer, db.ForeignKey('anket_olcekleri.id', ondelete='CASCADE'), nullable=False)
+    soru_id = db.Column(db.Integer, db.ForeignKey('anket_sorulari.id', ondelete='CASCADE'), nullable=False)
+    ters_puanlama = db.Column(db.Boolean, default=False)
+    agirlik = db.Column(db.Float, default=1.0)
+    puan_anahtari = db.Column(db.Text, nullable=True)  # JSON: {"seçenek": puan}; boşsa seçenek sırası (1..n) kullanılır
+    
+    # İlişkiler
+    olcek = relationship("AnketOlcek", back_populates="maddeler")
+    soru = relationship("AnketSoru")
+    
+    def __repr__(self):
+        return f"<AnketOlcekMaddesi {self.olcek_id}-{self.soru_id}>"
+
+class OgrenciOlcekPuani(db.Model):
+    """Öğrencilerin alt ölçek puanlarını tutan model (puanlama motoru tarafından yazılır)"""
+    __tablename__ = 'ogrenci_olcek_puanlari'
+    __table_args__ = (
+        db.UniqueConstraint('olcek_id', 'ogrenci_anket_id', name='uq_ogrenci_olcek_puani'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    olcek_id = db.Column(db.Integer, db.ForeignKey('anket_olcekleri.id', ondelete='CASCADE'), nullable=False)
+    ogrenci_anket_id = db.Column(db.Integer, db.ForeignKey('ogrenci_anketleri.id', ondelete='CASCADE'), nullable=False, index=True)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False, index=True)
+    puan = db.Column(db.Float, nullable=True)
+    cevaplanan_madde = db.Column(db.Integer, default=0)
+    hesaplama_tarihi = db.Column(db.DateTime, default=datetime.now)
+    
+    # İlişkiler
+    olcek = relationship("AnketOlcek", back_populates="puanlar")
+    
+    def __repr__(self):
+        return f"<OgrenciOlcekPuani {self.olcek_id}-{self.ogrenci_id}: {self.puan}>"
@@ -0,0 +1,362 @@
+"""
+Psikometrik puanlama motoru
+Anketlerin alt ölçeklerini (AnketOlcek), ölçek maddelerini ve ters puanlanan
+maddeleri kullanarak anketi cevaplayan tüm öğrencileri tek seferde puanlar.
+Cevaplar (öğrenci x soru) boyutunda bir NumPy kod matrisine, puan anahtarları
+ise madde başına küçük arama tablolarına dönüştürülür; ölçek puanları tek
+matris çarpımıyla hesaplanıp OgrenciOlcekPuani tablosuna yazılır.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import insert, delete
+from sqlalchemy.orm import selectinload
+
+from app.extensions import db
+from app.blueprints.anket_yonetimi.models import AnketSoru, AnketOlcek, AnketOlcekMaddesi, OgrenciOlcekPuani
+from app.blueprints.anket_yonetimi.cevap_deposu import CevapDeposu
+
+PUANLAMA_YONTEMLERI = ('toplam', 'ortalama')
+
+# (anket_id, soru_idleri) -> (cevap imzası, cevap matrisi)
+_matris_onbellegi = {}
+
+
+def _sayi(deger):
+    """Metni sayıya çevir, çevrilemiyorsa NaN döndür"""
+    try:
+        return float(str(deger).replace(',', '.'))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _puan_anahtari(madde, soru):
+    """
+    Bir madde için seçenek -> puan eşlemesini döndür
+
+    Öncelik maddeye özel anahtardadır; yoksa sorunun seçenekleri sırasıyla
+    1..n puan alır. Seçeneksiz sorularda cevabın kendisi sayı olarak okunur.
+    """
+    if madde.puan_anahtari:
+        try:
+            return {str(secenek): float(puan) for secenek, puan in json.loads(madde.puan_anahtari).items()}
+        except (ValueError, TypeError, AttributeError):
+            pass
+
+    return {str(secenek): float(sira) for sira, secenek in enumerate(soru.secenekler_listesi, start=1)}
+
+
+class PuanlamaService:
+    """Anket alt ölçeklerini ve öğrenci ölçek puanlarını yöneten servis sınıfı"""
+
+    @staticmethod
+    def get_olcekler(anket_id):
+        """
+        Anketin alt ölçeklerini maddeleriyle birlikte getir
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            List: AnketOlcek nesneleri listesi
+        """
+        return AnketOlcek.query.options(
+            selectinload(AnketOlcek.maddeler)
+        ).filter_by(anket_id=anket_id).order_by(AnketOlcek.id).all()
+
+    @staticmethod
+    def olcek_kaydet(anket_id, ad, maddeler, puanlama_yontemi='toplam', aciklama=None, olcek_id=None):
+        """
+        Alt ölçek oluştur veya güncelle ve anketi yeniden puanla
+
+        Args:
+            anket_id: Anket ID
+            ad: Ölçek adı
+            maddeler: [{soru_id, ters_puanlama, agirlik, puan_anahtari}] listesi
+            puanlama_yontemi: 'toplam' veya 'ortalama'
+            aciklama: Ölçek açıklaması
+            olcek_id: Güncellenecek ölçek ID (yeni ölçek için None)
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        if not ad:
+            return {"success": False, "message": "Ölçek adı zorunludur."}
+        if puanlama_yontemi not in PUANLAMA_YONTEMLERI:
+            return {"success": False, "message": "Geçersiz puanlama yöntemi."}
+        if not maddeler:
+            return {"success": False, "message": "Ölçeğe en az bir madde eklenmelidir."}
+
+        gecerli_sorular = dict(
+            db.session.query(AnketSoru.id, AnketSoru.ters_puanlama).filter_by(anket_id=anket_id).all()
+        )
+        if any(int(madde['soru_id']) not in gecerli_sorular for madde in maddeler):
+            return {"success": False, "message": "Ölçek maddeleri ankete ait sorulardan seçilmelidir."}
+
+        try:
+            if olcek_id:
+                olcek = AnketOlcek.query.filter_by(id=olcek_id, anket_id=anket_id).first()
+                if not olcek:
+                    return {"success": False, "message": "Ölçek bulunamadı."}
+                olcek.maddeler = []
+                db.session.flush()
+            else:
+                olcek = AnketOlcek(anket_id=anket_id)
+                db.session.add(olcek)
+
+            olcek.ad = ad
+            olcek.aciklama = aciklama
+            olcek.puanlama_yontemi = puanlama_yontemi
+
+            for madde in maddeler:
+                soru_id = int(madde['soru_id'])
+                # Belirtilmemişse sorunun kendi ters puanlama ayarı kullanılır
+                ters_puanlama = madde.get('ters_puanlama')
+                if ters_puanlama is None:
+                    ters_puanlama = gecerli_sorular[soru_id]
+                puan_anahtari = madde.get('puan_anahtari')
+                if isinstance(puan_anahtari, dict):
+                    puan_anahtari = json.dumps(puan_anahtari, ensure_ascii=False)
+                olcek.maddeler.append(AnketOlcekMaddesi(
+                    soru_id=soru_id,
+                    ters_puanlama=bool(ters_puanlama),
+                    agirlik=float(madde.get('agirlik') or 1.0),
+                    puan_anahtari=puan_anahtari or None
+                ))
+
+            db.session.flush()
+            puanlanan = PuanlamaService.puanlari_hesapla(anket_id)
+            db.session.commit()
+
+            return {
+                "success": True,
+                "message": f"'{ad}' ölçeği kaydedildi, {puanlanan} öğrenci puanlandı.",
+                "olcek_id": olcek.id
+            }
+        except Exception as e:
+            db.session.rollback()
+            return {"success": False, "message": f"Ölçek kaydedilirken bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def olcek_sil(olcek_id):
+        """
+        Alt ölçeği ve öğrenci puanlarını sil
+
+        Args:
+            olcek_id: Ölçek ID
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        olcek = AnketOlcek.query.get(olcek_id)
+        if not olcek:
+            return {"success": False, "message": "Ölçek bulunamadı."}
+
+        try:
+            db.session.execute(delete(OgrenciOlcekPuani).where(OgrenciOlcekPuani.olcek_id == olcek_id))
+            db.session.execute(delete(AnketOlcekMaddesi).where(AnketOlcekMaddesi.olcek_id == olcek_id))
+            db.session.execute(delete(AnketOlcek).where(AnketOlcek.id == olcek_id))
+            db.session.commit()
+            return {"success": True, "message": "Ölçek silindi.", "anket_id": olcek.anket_id}
+        except Exception as e:
+            db.session.rollback()
+            return {"success": False, "message": f"Ölçek silinirken bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def cevap_matrisi(anket_id, soru_idleri):
+        """
+        Anketin cevaplarını (öğrenci x soru) kod matrisine dönüştür
+
+        Her farklı cevap metni sözlükte bir koda karşılık gelir; cevaplanmamış
+        hücreler -1 ile gösterilir. Matris, cevaplar değişmediği sürece bellekte
+        tutulur; böylece puan anahtarı değişikliklerinde cevaplar yeniden okunmaz.
+
+        Args:
+            anket_id: Anket ID
+            soru_idleri: Matrisin sütunlarını oluşturan, artan sırada soru ID'leri
+
+        Returns:
+            Tuple: (ogrenci_anket_idleri, ogrenci_idleri, sozluk, kodlar)
+        """
+        anahtar = (anket_id, tuple(soru_idleri))
+        imza = CevapDeposu.imza(anket_id)
+
+        kayit = _matris_onbellegi.get(anahtar)
+        if kayit and kayit[0] == imza:
+            return kayit[1]
+
+        matris = CevapDeposu.cevap_matrisi(anket_id, soru_idleri)
+        # Her anket için yalnızca son kullanılan soru kümesinin matrisi tutulur
+        for eski in [k for k in _matris_onbellegi if k[0] == anket_id]:
+            _matris_onbellegi.pop(eski, None)
+        _matris_onbellegi[anahtar] = (imza, matris)
+        return matris
+
+    @staticmethod
+    def puanlari_hesapla(anket_id):
+        """
+        Anketi cevaplayan tüm öğrencilerin alt ölçek puanlarını hesapla ve kaydet
+
+        Mevcut puanlar tek DELETE ile silinir, yenileri tek toplu INSERT ile
+        yazılır. Commit çağıran tarafa aittir.
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            int: Puanlanan öğrenci sayısı
+        """
+        olcekler = PuanlamaService.get_olcekler(anket_id)
+        olcekler = [olcek for olcek in olcekler if olcek.maddeler]
+        if not olcekler:
+            return 0
+
+        maddeler = [(o_sira, madde) for o_sira, olcek in enumerate(olcekler) for madde in olcek.maddeler]
+        soru_idleri = sorted({madde.soru_id for _, madde in maddeler})
+        sorular = {
+            soru.id: soru for soru in AnketSoru.query.filter(AnketSoru.id.in_(soru_idleri)).all()
+        }
+
+        ogrenci_anket_idleri, ogrenci_idleri, sozluk, kodlar = PuanlamaService.cevap_matrisi(anket_id, soru_idleri)
+
+        # Her madde için sözlük kodu -> puan arama tablosu; son hücre (-1 kodu) NaN
+        sozluk_sayilari = np.array([_sayi(cevap) for cevap in sozluk], dtype=float)
+        arama = np.full((len(maddeler), len(sozluk) + 1), np.nan)
+        agirliklar = np.zeros((len(maddeler), len(olcekler)))
+        sutunlar = np.empty(len(maddeler), dtype=np.int64)
+        sutun_sirasi = {soru_id: sira for sira, soru_id in enumerate(soru_idleri)}
+
+        for m_sira, (o_sira, madde) in enumerate(maddeler):
+            sutunlar[m_sira] = sutun_sirasi[madde.soru_id]
+            anahtar = _puan_anahtari(madde, sorular[madde.soru_id])
+            if anahtar:
+                degerler = np.array([anahtar.get(cevap, np.nan) for cevap in sozluk], dtype=float)
+                alt, ust = min(anahtar.values()), max(anahtar.values())
+            else:
+                # Seçeneksiz sayısal sorularda ters puanlama gözlenen aralığa göre yapılır
+                degerler = sozluk_sayilari.copy()
+                sutun = kodlar[:, sutunlar[m_sira]]
+                gozlenen = degerler[np.unique(sutun[sutun >= 0])]
+                gozlenen = gozlenen[~np.isnan(gozlenen)]
+                alt, ust = (gozlenen.min(), gozlenen.max()) if len(gozlenen) else (0.0, 0.0)
+
+            if madde.ters_puanlama:
+                degerler = alt + ust - degerler
+
+            arama[m_sira, :len(sozluk)] = degerler
+            agirliklar[m_sira, o_sira] = madde.agirlik if madde.agirlik is not None else 1.0
+
+        # (öğrenci x madde) puan matrisi tek indeksleme işlemiyle oluşturulur
+        madde_puanlari = arama[np.arange(len(maddeler))[None, :], kodlar[:, sutunlar]]
+        cevaplandi = ~np.isnan(madde_puanlari)
+
+        toplamlar = np.nan_to_num(madde_puanlari) @ agirliklar
+        cevaplanan = cevaplandi.astype(np.int64) @ (agirliklar != 0)
+        agirlik_toplami = cevaplandi.astype(float) @ agirliklar
+
+        ortalama = np.divide(toplamlar, agirlik_toplami, out=np.full_like(toplamlar, np.nan), where=agirlik_toplami != 0)
+        ortalama_mi = np.array([olcek.puanlama_yontemi == 'ortalama' for olcek in olcekler])
+        puanlar = np.where(ortalama_mi[None, :], ortalama, toplamlar)
+        puanlar = np.where(cevaplanan > 0, np.round(puanlar, 4), np.nan)
+
+        olcek_idleri = [olcek.id for olcek in olcekler]
+        db.session.execute(delete(OgrenciOlcekPuani).where(OgrenciOlcekPuani.olcek_id.in_(olcek_idleri)))
+
+        # Hiç cevabı olmayan öğrenciler puanlanmaz
+        puanlanacak = np.flatnonzero(cevaplandi.any(axis=1))
+        if len(puanlanacak) == 0:
+            return 0
+
+        simdi = datetime.now()
+        db.session.execute(insert(OgrenciOlcekPuani), [
+            {
+                'olcek_id': olcek_id,
+                'ogrenci_anket_id': int(ogrenci_anket_idleri[satir]),
+                'ogrenci_id': int(ogrenci_idleri[satir]),
+                'puan': None if np.isnan(puanlar[satir, o_sira]) else float(puanlar[satir, o_sira]),
+                'cevaplanan_madde': int(cevaplanan[satir, o_sira]),
+                'hesaplama_tarihi': simdi
+            }
+            for satir in puanlanacak
+            for o_sira, olcek_id in enumerate(olcek_idleri)
+        ])
+
+        return len(puanlanacak)
+
+    @staticmethod
+    def anket_puanla(anket_id):
+        """
+        Anketi yeniden puanla
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        try:
+            puanlanan = PuanlamaService.puanlari_hesapla(anket_id)
+            db.session.commit()
+            return {"success": True, "message": f"{puanlanan} öğrencinin ölçek puanları hesaplandı."}
+        except Exception as e:
+            db.session.rollback()
+            return {"success": False, "message": f"Puanlama sırasında bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def get_olcek_puanlari(anket_id):
+        """
+        Anketin öğrenci bazlı ölçek puanlarını ve ölçek özetlerini getir
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            Dict: {olcekler: [{id, ad, ortalama, standart_sapma, n}], ogrenciler: [{ogrenci, puanlar}]}
+        """
+        from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+
+        olcekler = AnketOlcek.query.filter_by(anket_id=anket_id).order_by(AnketOlcek.id).all()
+        if not olcekler:
+            return {"olcekler": [], "ogrenciler": []}
+
+        olcek_sirasi = {olcek.id: sira for sira, olcek in enumerate(olcekler)}
+        satirlar = db.session.query(
+            OgrenciOlcekPuani.ogrenci_id, OgrenciOlcekPuani.olcek_id, OgrenciOlcekPuani.puan,
+            Ogrenci.numara, Ogrenci.ad, Ogrenci.soyad, Ogrenci.sinif
+        ).join(
+            Ogrenci, OgrenciOlcekPuani.ogrenci_id == Ogrenci.id
+        ).filter(
+            OgrenciOlcekPuani.olcek_id.in_(list(olcek_sirasi))
+        ).order_by(Ogrenci.sinif, Ogrenci.numara).all()
+
+        ogrenciler = {}
+        for ogrenci_id, olcek_id, puan, numara, ad, soyad, sinif in satirlar:
+            kayit = ogrenciler.setdefault(ogrenci_id, {
+                "ogrenci_id": ogrenci_id, "numara": numara, "ad_soyad": f"{ad} {soyad}",
+                "sinif": sinif, "puanlar": [None] * len(olcekler)
+            })
+            kayit["puanlar"][olcek_sirasi[olcek_id]] = puan
+
+        matris = np.array(
+            [[np.nan if p is None else p for p in kayit["puanlar"]] for kayit in ogrenciler.values()],
+            dtype=float
+        ).reshape(-1, len(olcekler))
+        gecerli = ~np.isnan(matris)
+        n = gecerli.sum(axis=0)
+
+        ozetler = []
+        for sira, olcek in enumerate(olcekler):
+            sutun = matris[gecerli[:, sira], sira]
+            ozetler.append({
+                "id": olcek.id,
+                "ad": olcek.ad,
+                "puanlama_yontemi": olcek.puanlama_yontemi,
+                "madde_sayisi": len(olcek.maddeler),
+                "n": int(n[sira]),
+                "ortalama": round(float(sutun.mean()), 2) if len(sutun) else None,
+                "standart_sapma": round(float(sutun.std(ddof=1)), 2) if len(sutun) > 1 else None
+            })
+
+        return {"olcekler": ozetler, "ogrenciler": list(ogrenciler.values())}
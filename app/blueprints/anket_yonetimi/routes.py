@@ -5,6 +5,9 @@ Anket Yönetimi blueprint'i için route tanımlamaları.
 from flask import render_template, request, redirect, url_for, flash, jsonify, send_file
 from app.blueprints.anket_yonetimi import anket_yonetimi_bp
 from app.blueprints.anket_yonetimi.services import AnketService
+from app.blueprints.anket_yonetimi.sonuc_motoru import AnketSonucService
+from app.blueprints.anket_yonetimi.puanlama import PuanlamaService
+from app.blueprints.anket_yonetimi.cevap_deposu import CevapDeposu
 from app.blueprints.anket_yonetimi.models import Anket, AnketSoru, AnketTuru, CevapTuru
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
 from app.utils.auth import admin_required
@@ -106,7 +109,8 @@ def anket_detay(anket_id):
     # Anket sorularını sıralı şekilde al
     sorular = AnketSoru.query.filter_by(anket_id=anket_id).order_by(AnketSoru.soru_sirasi).all()
     
-    return render_template('anket_yonetimi/anket_detay.html', anket=anket, sorular=sorular)
+    return render_template('anket_yonetimi/anket_detay.html', anket=anket, sorular=sorular,
+                         paketli=CevapDeposu.paketli_mi(anket_id))
 
 @anket_yonetimi_bp.route('/anket/<int:anket_id>/duzenle', methods=['GET', 'POST'])
 @admin_required
@@ -327,12 +331,13 @@ def ogrencilere_ata(anket_id):
     
     if request.method == 'POST':
         ogrenci_listesi = request.form.getlist('ogrenci_id')
+        siniflar = request.form.getlist('sinif')
         
-        if not ogrenci_listesi:
-            flash('En az bir öğrenci seçmelisiniz!', 'danger')
+        if not ogrenci_listesi and not siniflar:
+            flash('En az bir öğrenci veya sınıf seçmelisiniz!', 'danger')
             return redirect(url_for('anket_yonetimi.ogrencilere_ata', anket_id=anket_id))
         
-        sonuc = AnketService.ogrencilere_anket_ata(anket_id, ogrenci_listesi)
+        sonuc = AnketService.ogrencilere_anket_ata(anket_id, ogrenci_listesi, siniflar)
         
         if sonuc['success']:
             flash(sonuc['message'], 'success')
@@ -341,19 +346,17 @@ def ogrencilere_ata(anket_id):
             flash(sonuc['message'], 'danger')
             return redirect(url_for('anket_yonetimi.ogrencilere_ata', anket_id=anket_id))
     
-    # Tüm öğrencileri sinif ve şubeye göre gruplayıp getir
-    ogrenciler = Ogrenci.query.order_by(Ogrenci.sinif, Ogrenci.sube, Ogrenci.ad, Ogrenci.soyad).all()
+    # Tüm öğrencileri sınıfa göre gruplayıp getir
+    ogrenciler = Ogrenci.query.order_by(Ogrenci.sinif, Ogrenci.ad, Ogrenci.soyad).all()
     
-    # Sınıf-şube gruplarını belirle
     siniflar = {}
     for ogrenci in ogrenciler:
-        sinif_key = f"{ogrenci.sinif}-{ogrenci.sube}"
-        if sinif_key not in siniflar:
-            siniflar[sinif_key] = {
-                "ad": f"{ogrenci.sinif}-{ogrenci.sube}",
+        if ogrenci.sinif not in siniflar:
+            siniflar[ogrenci.sinif] = {
+                "ad": ogrenci.sinif,
                 "ogrenciler": []
             }
-        siniflar[sinif_key]["ogrenciler"].append(ogrenci)
+        siniflar[ogrenci.sinif]["ogrenciler"].append(ogrenci)
     
     return render_template('anket_yonetimi/ogrencilere_ata.html', 
                          anket=anket, 
@@ -525,4 +528,83 @@ def anket_sonuclari(anket_id):
     
     return render_template('anket_yonetimi/anket_sonuclari.html', 
                          anket=anket,
-                         sonuclar=sonuclar)
\ No newline at end of file
+                         sonuclar=sonuclar)
+
+@anket_yonetimi_bp.route('/api/anket/<int:anket_id>/capraz-tablo', methods=['GET'])
+@admin_required
+def api_capraz_tablo(anket_id):
+    """Bir sorunun cevaplarını sınıf, cinsiyet veya başka bir soruya göre çapraz tablolar"""
+    soru_id = request.args.get('soru_id', type=int)
+    if not soru_id:
+        return jsonify({"success": False, "message": "soru_id parametresi zorunludur."}), 400
+
+    sonuc = AnketSonucService.capraz_tablo(anket_id, soru_id, request.args.get('grup', 'sinif'))
+    return jsonify(sonuc), (200 if sonuc['success'] else 404)
+
+@anket_yonetimi_bp.route('/anket/<int:anket_id>/olcekler', methods=['GET', 'POST'])
+@admin_required
+def olcekler(anket_id):
+    """Anket alt ölçekleri ve öğrenci ölçek puanları sayfası"""
+    anket = AnketService.get_anket(anket_id)
+    
+    if not anket:
+        flash('Anket bulunamadı!', 'danger')
+        return redirect(url_for('anket_yonetimi.index'))
+    
+    if request.method == 'POST':
+        ters_maddeler = set(request.form.getlist('ters_maddeler'))
+        maddeler = [
+            {'soru_id': soru_id, 'ters_puanlama': soru_id in ters_maddeler}
+            for soru_id in request.form.getlist('maddeler')
+        ]
+        
+        sonuc = PuanlamaService.olcek_kaydet(
+            anket_id,
+            request.form.get('ad', '').strip(),
+            maddeler,
+            request.form.get('puanlama_yontemi', 'toplam'),
+            request.form.get('aciklama', '').strip() or None,
+            request.form.get('olcek_id', type=int)
+        )
+        
+        flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+        return redirect(url_for('anket_yonetimi.olcekler', anket_id=anket_id))
+    
+    sorular = AnketSoru.query.filter_by(anket_id=anket_id).order_by(AnketSoru.soru_sirasi).all()
+    
+    return render_template('anket_yonetimi/olcekler.html',
+                         anket=anket,
+                         sorular=sorular,
+                         olcekler=PuanlamaService.get_olcekler(anket_id),
+                         puanlar=PuanlamaService.get_olcek_puanlari(anket_id))
+
+@anket_yonetimi_bp.route('/anket/olcek/<int:olcek_id>/sil', methods=['POST'])
+@admin_required
+def olcek_sil(olcek_id):
+    """Alt ölçeği silme"""
+    sonuc = PuanlamaService.olcek_sil(olcek_id)
+    flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+    
+    if not sonuc['success']:
+        return redirect(url_for('anket_yonetimi.index'))
+    return redirect(url_for('anket_yonetimi.olcekler', anket_id=sonuc['anket_id']))
+
+@anket_yonetimi_bp.route('/anket/<int:anket_id>/puanla', methods=['POST'])
+@admin_required
+def anket_puanla(anket_id):
+    """Anketi tüm öğrenciler için yeniden puanlama"""
+    sonuc = PuanlamaService.anket_puanla(anket_id)
+    flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+    return redirect(url_for('anket_yonetimi.olcekler', anket_id=anket_id))
+
+@anket_yonetimi_bp.route('/anket/<int:anket_id>/cevap-depolama', methods=['POST'])
+@admin_required
+def cevap_depolama(anket_id):
+    """Anket cevaplarının depolama biçimini (satır/paket) değiştirme"""
+    if request.form.get('mod') == 'paket':
+        sonuc = CevapDeposu.paketle(anket_id)
+    else:
+        sonuc = CevapDeposu.paketi_ac(anket_id)
+    
+    flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+    return redirect(url_for('anket_yonetimi.anket_detay', anket_id=anket_id))
@@ -12,8 +12,11 @@ from app.blueprints.anket_yonetimi.models import (
     AnketTuru, CevapTuru, Anket, AnketSoru, 
     OgrenciAnket, AnketCevap, SinifAnketSonuc
 )
+from app.blueprints.anket_yonetimi.sonuc_motoru import AnketSonucService
+from app.blueprints.anket_yonetimi.puanlama import PuanlamaService
+from app.blueprints.anket_yonetimi.cevap_deposu import CevapDeposu
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
-from sqlalchemy import or_, and_, func
+from sqlalchemy import or_, and_, func, insert, update, select, exists, literal
 
 class AnketService:
     """Anket işlemlerini yöneten servis sınıfı"""
@@ -426,16 +429,20 @@ class AnketService:
             }
     
     @staticmethod
-    def ogrencilere_anket_ata(anket_id, ogrenci_listesi):
+    def ogrencilere_anket_ata(anket_id, ogrenci_listesi=None, siniflar=None):
         """
-        Belirtilen öğrencilere anketi ata
+        Belirtilen öğrencilere ve/veya sınıflara anketi ata
+        
+        Atanmamış (öğrenci, anket) çiftleri tek bir anti-join ile bulunur ve
+        tek INSERT ... SELECT ile eklenir; öğrenciler belleğe yüklenmez.
         
         Args:
             anket_id: Anket ID
-            ogrenci_listesi: Öğrenci ID listesi
+            ogrenci_listesi: Öğrenci ID listesi (isteğe bağlı)
+            siniflar: Sınıf adı veya sınıf listesi, örn. ["9A", "10B"] (isteğe bağlı)
             
         Returns:
-            Dict: İşlem sonucunu içeren sözlük
+            Dict: İşlem sonucunu, yeni ve mevcut atama sayılarını içeren sözlük
         """
         try:
             anket = Anket.query.get(anket_id)
@@ -452,36 +459,40 @@ class AnketService:
                     "message": "Pasif bir anket öğrencilere atanamaz."
                 }
             
-            # Öğrencilere anketi ata
-            eklenen_sayisi = 0
-            zaten_var_sayisi = 0
+            if isinstance(siniflar, str):
+                siniflar = [siniflar]
             
-            for ogrenci_id in ogrenci_listesi:
-                # Öğrenci var mı kontrol et
-                ogrenci = Ogrenci.query.get(ogrenci_id)
-                if not ogrenci:
-                    continue
-                
-                # Bu anket zaten öğrenciye atanmış mı kontrol et
-                mevcut = OgrenciAnket.query.filter_by(
-                    ogrenci_id=ogrenci_id,
-                    anket_id=anket_id
-                ).first()
-                
-                if mevcut:
-                    zaten_var_sayisi += 1
-                    continue
-                
-                # Yeni atama oluştur
-                yeni_atama = OgrenciAnket(
-                    ogrenci_id=ogrenci_id,
-                    anket_id=anket_id
-                )
-                db.session.add(yeni_atama)
-                eklenen_sayisi += 1
+            kosullar = []
+            if ogrenci_listesi:
+                kosullar.append(Ogrenci.id.in_([int(ogrenci_id) for ogrenci_id in ogrenci_listesi]))
+            if siniflar:
+                kosullar.append(Ogrenci.sinif.in_(list(siniflar)))
+            
+            if not kosullar:
+                return {
+                    "success": False,
+                    "message": "Anketin atanacağı öğrenci veya sınıf seçilmedi."
+                }
             
+            hedef = or_(*kosullar)
+            toplam = db.session.query(func.count(Ogrenci.id)).filter(hedef).scalar()
+            
+            # Anketi henüz almamış öğrenciler (anti-join)
+            atanmamis = select(Ogrenci.id, literal(anket_id)).where(
+                hedef,
+                ~exists().where(
+                    OgrenciAnket.ogrenci_id == Ogrenci.id,
+                    OgrenciAnket.anket_id == anket_id
+                )
+            )
+            sonuc = db.session.execute(
+                insert(OgrenciAnket).from_select(['ogrenci_id', 'anket_id'], atanmamis)
+            )
             db.session.commit()
             
+            eklenen_sayisi = sonuc.rowcount
+            zaten_var_sayisi = toplam - eklenen_sayisi
+            
             message = f"{eklenen_sayisi} öğrenciye anket başarıyla atandı."
             if zaten_var_sayisi > 0:
                 message += f" {zaten_var_sayisi} öğrenciye daha önce atandığı için yeniden atanmadı."
@@ -499,6 +510,58 @@ class AnketService:
                 "message": f"Anket atanırken bir hata oluştu: {str(e)}"
             }
     
+    @staticmethod
+    def cevaplari_toplu_kaydet(anket_id, ogrenci_cevaplari):
+        """
+        Öğrenci cevaplarını küme tabanlı olarak kaydet (commit çağıran tarafa aittir)
+        
+        Mevcut atamalar tek sorguyla okunur; eksik atamalar tek bir toplu INSERT
+        ile oluşturulur. Cevaplar anketin depolama biçimine göre (satır veya paket)
+        CevapDeposu üzerinden toplu yazılır. Atamalar tamamlandı olarak işaretlenir.
+        
+        Args:
+            anket_id: Anket ID
+            ogrenci_cevaplari: {ogrenci_id: {soru_id: cevap}} sözlüğü
+            
+        Returns:
+            Dict: {ogrenci_id: ogrenci_anket_id} eşlemesi
+        """
+        if not ogrenci_cevaplari:
+            return {}
+        
+        ogrenci_idleri = list(ogrenci_cevaplari)
+        
+        def mevcut_atamalar():
+            return dict(db.session.query(OgrenciAnket.ogrenci_id, OgrenciAnket.id).filter(
+                OgrenciAnket.anket_id == anket_id,
+                OgrenciAnket.ogrenci_id.in_(ogrenci_idleri)
+            ).all())
+        
+        atamalar = mevcut_atamalar()
+        eksik = [ogrenci_id for ogrenci_id in ogrenci_idleri if ogrenci_id not in atamalar]
+        if eksik:
+            simdi = datetime.now()
+            db.session.execute(insert(OgrenciAnket), [
+                {'ogrenci_id': ogrenci_id, 'anket_id': anket_id, 'atanma_tarihi': simdi, 'son_guncelleme': simdi}
+                for ogrenci_id in eksik
+            ])
+            atamalar = mevcut_atamalar()
+        
+        # Cevaplar anketin depolama biçimine (satır/paket) göre yazılır
+        degisiklikler = CevapDeposu.cevaplari_yaz(anket_id, atamalar, ogrenci_cevaplari)
+        
+        AnketSonucService.dagilimi_guncelle(anket_id, degisiklikler)
+        
+        # Anketleri tamamlanmış olarak işaretle
+        db.session.execute(
+            update(OgrenciAnket).where(OgrenciAnket.id.in_(list(atamalar.values()))).values(
+                tamamlandi=True,
+                tamamlanma_tarihi=datetime.now()
+            ).execution_options(synchronize_session=False)
+        )
+        
+        return atamalar
+    
     @staticmethod
     def toplu_cevap_yukle(anket_id, file_content, sinif=None, dosya_turu='csv'):
         """
@@ -613,70 +676,40 @@ class AnketService:
             basarisiz_ogrenci = 0
             bulunamayan_ogrenci = 0
             
+            # Dosyadaki tüm öğrenci numaraları tek sorguyla ID'lere çevrilir
+            numaralar = {str(row[0]).strip() for row in rows if len(row) >= 2}
+            ogrenci_idleri = dict(
+                db.session.query(Ogrenci.numara, Ogrenci.id).filter(Ogrenci.numara.in_(numaralar)).all()
+            ) if numaralar else {}
+            
+            # {ogrenci_id: {soru_id: cevap}} - aynı öğrenci birden fazla satırda varsa son satır geçerlidir
+            ogrenci_cevaplari = {}
+            
             # Her satırı işle (her satır bir öğrenci)
             for row in rows:
                 if len(row) < 2:  # Satır geçersiz, atla
                     basarisiz_ogrenci += 1
                     continue
                 
-                ogrenci_no = str(row[0]).strip()
-                
-                # Öğrenci numarasına göre öğrenciyi bul
-                ogrenci = Ogrenci.query.filter_by(numara=ogrenci_no).first()
+                ogrenci_id = ogrenci_idleri.get(str(row[0]).strip())
                 
-                if not ogrenci:
+                if not ogrenci_id:
                     bulunamayan_ogrenci += 1
                     continue
                 
-                # Öğrenci için anket atama var mı kontrol et
-                ogrenci_anket = OgrenciAnket.query.filter_by(
-                    ogrenci_id=ogrenci.id,
-                    anket_id=anket_id
-                ).first()
-                
-                # Yoksa yeni bir atama oluştur
-                if not ogrenci_anket:
-                    ogrenci_anket = OgrenciAnket(
-                        ogrenci_id=ogrenci.id,
-                        anket_id=anket_id
-                    )
-                    db.session.add(ogrenci_anket)
-                    db.session.flush()  # ID ataması için flush
+                # Cevapları ekle, soru sayısı kadar (satırda olmayan hücreler atlanır)
+                cevaplar = ogrenci_cevaplari.setdefault(ogrenci_id, {})
+                for i, soru in enumerate(sorular):
+                    if i + 1 >= len(row):  # Satırda yeterli veri yoksa
+                        break
+                    cevaplar[soru.id] = str(row[i + 1]).strip()
                 
-                try:
-                    # Cevapları ekle, soru sayısı kadar (en fazla sütun sayısı - 1)
-                    for i, soru in enumerate(sorular):
-                        if i + 1 >= len(row):  # Satırda yeterli veri yoksa
-                            continue
-                            
-                        cevap_metni = row[i + 1].strip()
-                        
-                        # Cevap zaten var mı kontrol et
-                        mevcut_cevap = AnketCevap.query.filter_by(
-                            ogrenci_anket_id=ogrenci_anket.id,
-                            soru_id=soru.id
-                        ).first()
-                        
-                        if mevcut_cevap:
-                            # Mevcut cevabı güncelle
-                            mevcut_cevap.cevap = cevap_metni
-                        else:
-                            # Yeni cevap ekle
-                            yeni_cevap = AnketCevap(
-                                ogrenci_anket_id=ogrenci_anket.id,
-                                soru_id=soru.id,
-                                cevap=cevap_metni
-                            )
-                            db.session.add(yeni_cevap)
-                    
-                    # Anketi tamamlanmış olarak işaretle
-                    ogrenci_anket.tamamlandi = True
-                    ogrenci_anket.tamamlanma_tarihi = datetime.now()
-                    
-                    basarili_ogrenci += 1
-                except Exception as e:
-                    basarisiz_ogrenci += 1
-                    continue
+                basarili_ogrenci += 1
+            
+            AnketService.cevaplari_toplu_kaydet(anket_id, ogrenci_cevaplari)
+            
+            # Anketin alt ölçekleri varsa tüm öğrencilerin puanları yeniden hesaplanır
+            PuanlamaService.puanlari_hesapla(anket_id)
             
             # Sınıf bazlı sonuç kaydı
             if sinif and basarili_ogrenci > 0:
@@ -756,6 +789,14 @@ class AnketService:
                     "cevaplayan_sayisi": ss.cevaplayan_sayisi
                 })
             
+            # Soru başına seçenek dağılımları özet tablodan okunur; özet henüz
+            # oluşturulmamış eski anketlerde bir kez yeniden hesaplanır
+            soru_dagilimlari = AnketSonucService.get_soru_dagilimlari(anket_id)
+            if tamamlanan and not any(soru['toplam'] for soru in soru_dagilimlari):
+                if AnketSonucService.dagilimi_yeniden_hesapla(anket_id):
+                    db.session.commit()
+                    soru_dagilimlari = AnketSonucService.get_soru_dagilimlari(anket_id)
+            
             return {
                 "success": True,
                 "anket": {
@@ -768,7 +809,8 @@ class AnketService:
                     "tamamlanan": tamamlanan,
                     "tamamlanma_orani": tamamlanma_orani
                 },
-                "siniflar": siniflar
+                "siniflar": siniflar,
+                "soru_dagilimlari": soru_dagilimlari
             }
         except Exception as e:
             return {
@@ -0,0 +1,274 @@
+"""
+Anket sonuç motoru
+Soru başına seçenek dağılımlarını sınıf ve cinsiyet kırılımında özet
+satırlarda (AnketCevapDagilimi) tutar ve cevaplar yüklendikçe artımlı
+olarak günceller. Özet satırlarda bulunmayan kırılımlar için NumPy
+bincount ile çapraz tablo üretir.
+
+Özet satırlar cevabın yazıldığı andaki sınıf ve cinsiyetle anahtarlanır.
+Öğrencinin sınıfı veya cinsiyeti değiştiğinde cevapladığı anketlerin özet
+satırları aynı işlem içinde silinir; özetler bir sonraki sonuç görüntülemede
+ya da cevap yüklemede cevaplardan yeniden hesaplanır.
+"""
+
+from collections import Counter, defaultdict
+
+import numpy as np
+from sqlalchemy import delete, event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.blueprints.anket_yonetimi.models import AnketSoru, AnketCevapDagilimi, OgrenciAnket
+from app.blueprints.anket_yonetimi.cevap_deposu import CevapDeposu
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+
+# Çapraz tabloda kullanılabilecek öğrenci kırılımları
+OGRENCI_KIRILIMLARI = {
+    'sinif': Ogrenci.sinif,
+    'cinsiyet': Ogrenci.cinsiyet,
+}
+
+
+def _ozetleri_sil(baglanti, ogrenci_idleri=None):
+    """Öğrencilerin (None ise tüm öğrencilerin) cevapladığı anketlerin özet satırlarını sil"""
+    sorgu = delete(AnketCevapDagilimi)
+    if ogrenci_idleri is not None:
+        sorgu = sorgu.where(AnketCevapDagilimi.anket_id.in_(
+            select(OgrenciAnket.anket_id).where(OgrenciAnket.ogrenci_id.in_(ogrenci_idleri)).distinct()
+        ))
+    baglanti.execute(sorgu)
+
+
+def _kirilimi_degisti(ogrenci):
+    durum = inspect(ogrenci)
+    return durum.attrs.sinif.history.has_changes() or durum.attrs.cinsiyet.history.has_changes()
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    ogrenci_idleri = [
+        nesne.id for nesne in session.dirty
+        if isinstance(nesne, Ogrenci) and _kirilimi_degisti(nesne)
+    ]
+    if ogrenci_idleri:
+        _ozetleri_sil(session.connection(), ogrenci_idleri)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # update(Ogrenci) ifadelerinde değişen öğrenciler bilinmediğinden tüm özetler silinir
+    if not orm_execute_state.is_update:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, Ogrenci):
+        _ozetleri_sil(orm_execute_state.session.connection())
+
+
+class AnketSonucService:
+    """Anket cevap dağılımlarını yöneten servis sınıfı"""
+
+    @staticmethod
+    def dagilimi_guncelle(anket_id, degisiklikler):
+        """
+        Cevap değişikliklerini özet satırlara uygula (commit çağıran tarafa aittir)
+
+        Args:
+            anket_id: Anket ID
+            degisiklikler: (ogrenci_id, soru_id, cevap, fark) dörtlüleri; fark +1 veya -1
+        """
+        if not degisiklikler:
+            return
+
+        ogrenci_idleri = {ogrenci_id for ogrenci_id, _, _, _ in degisiklikler}
+        ogrenciler = {
+            ogrenci_id: (sinif, cinsiyet)
+            for ogrenci_id, sinif, cinsiyet in db.session.query(
+                Ogrenci.id, Ogrenci.sinif, Ogrenci.cinsiyet
+            ).filter(Ogrenci.id.in_(ogrenci_idleri)).all()
+        }
+
+        farklar = Counter()
+        for ogrenci_id, soru_id, cevap, fark in degisiklikler:
+            if cevap in (None, '') or ogrenci_id not in ogrenciler:
+                continue
+            sinif, cinsiyet = ogrenciler[ogrenci_id]
+            farklar[(soru_id, sinif, cinsiyet, cevap)] += fark
+
+        farklar = {anahtar: fark for anahtar, fark in farklar.items() if fark}
+        if not farklar:
+            return
+
+        mevcut = {
+            (satir.soru_id, satir.sinif, satir.cinsiyet, satir.secenek): (satir.id, satir.sayi)
+            for satir in db.session.query(
+                AnketCevapDagilimi.id, AnketCevapDagilimi.soru_id, AnketCevapDagilimi.sinif,
+                AnketCevapDagilimi.cinsiyet, AnketCevapDagilimi.secenek, AnketCevapDagilimi.sayi
+            ).filter(AnketCevapDagilimi.anket_id == anket_id).all()
+        }
+
+        # Özet hiç yoksa (yeni anket ya da sınıf değişikliği/öğrenci silme sonrası silinmiş)
+        # farklar eksik bir özet üretir; cevaplar yazılmış olduğundan özet baştan kurulur
+        if not mevcut:
+            AnketSonucService.dagilimi_yeniden_hesapla(anket_id)
+            return
+
+        yeni_satirlar = []
+        guncellenen_satirlar = []
+        for (soru_id, sinif, cinsiyet, secenek), fark in farklar.items():
+            kayit = mevcut.get((soru_id, sinif, cinsiyet, secenek))
+            if kayit:
+                guncellenen_satirlar.append({'id': kayit[0], 'sayi': max(kayit[1] + fark, 0)})
+            elif fark > 0:
+                yeni_satirlar.append({
+                    'anket_id': anket_id, 'soru_id': soru_id, 'sinif': sinif,
+                    'cinsiyet': cinsiyet, 'secenek': secenek, 'sayi': fark
+                })
+
+        if yeni_satirlar:
+            db.session.execute(insert(AnketCevapDagilimi), yeni_satirlar)
+        if guncellenen_satirlar:
+            db.session.execute(update(AnketCevapDagilimi), guncellenen_satirlar)
+
+    @staticmethod
+    def dagilimi_yeniden_hesapla(anket_id):
+        """
+        Bir anketin özet satırlarını cevaplardan yeniden oluştur
+
+        Öğrenci silme/arşivleme gibi cevapları toplu silen işlemlerden sonra
+        kullanılır. Commit çağıran tarafa aittir.
+
+        Args:
+            anket_id: Anket ID
+
+        Returns:
+            int: Oluşturulan özet satırı sayısı
+        """
+        db.session.query(AnketCevapDagilimi).filter(
+            AnketCevapDagilimi.anket_id == anket_id
+        ).delete(synchronize_session=False)
+
+        satirlar = CevapDeposu.dagilim_satirlari(anket_id)
+
+        if satirlar:
+            db.session.execute(insert(AnketCevapDagilimi), [
+                {'anket_id': anket_id, 'soru_id': soru_id, 'sinif': sinif,
+                 'cinsiyet': cinsiyet, 'secenek': cevap, 'sayi': sayi}
+                for soru_id, sinif, cinsiyet, cevap, sayi in satirlar
+            ])
+
+        return len(satirlar)
+
+    @staticmethod
+    def get_soru_dagilimlari(anket_id, sinif=None, cinsiyet=None):
+        """
+        Soru başına seçenek dağılımlarını özet satırlardan getir
+
+        Args:
+            anket_id: Anket ID
+            sinif: Sınıf filtresi (isteğe bağlı)
+            cinsiyet: Cinsiyet filtresi (isteğe bağlı)
+
+        Returns:
+            List: Soru sırasına göre {soru_id, soru_metni, toplam, secenekler: [{secenek, sayi, yuzde}]}
+        """
+        query = db.session.query(
+            AnketCevapDagilimi.soru_id, AnketCevapDagilimi.secenek, func.sum(AnketCevapDagilimi.sayi)
+        ).filter(AnketCevapDagilimi.anket_id == anket_id)
+
+        if sinif:
+            query = query.filter(AnketCevapDagilimi.sinif == sinif)
+        if cinsiyet:
+            query = query.filter(AnketCevapDagilimi.cinsiyet == cinsiyet)
+
+        sayilar = defaultdict(dict)
+        for soru_id, secenek, sayi in query.group_by(AnketCevapDagilimi.soru_id, AnketCevapDagilimi.secenek):
+            if sayi:
+                sayilar[soru_id][secenek] = int(sayi)
+
+        sorular = AnketSoru.query.filter_by(anket_id=anket_id).order_by(AnketSoru.soru_sirasi).all()
+
+        sonuc = []
+        for soru in sorular:
+            soru_sayilari = sayilar.get(soru.id, {})
+            toplam = sum(soru_sayilari.values())
+
+            # Tanımlı seçenekler kendi sırasıyla, tanımsız cevaplar sonda listelenir
+            secenek_sirasi = [s for s in soru.secenekler_listesi if s in soru_sayilari]
+            secenek_sirasi += sorted(s for s in soru_sayilari if s not in secenek_sirasi)
+
+            sonuc.append({
+                'soru_id': soru.id,
+                'soru_metni': soru.soru_metni,
+                'toplam': toplam,
+                'secenekler': [
+                    {
+                        'secenek': secenek,
+                        'sayi': soru_sayilari[secenek],
+                        'yuzde': round(soru_sayilari[secenek] * 100 / toplam, 1) if toplam else 0
+                    }
+                    for secenek in secenek_sirasi
+                ]
+            })
+
+        return sonuc
+
+    @staticmethod
+    def capraz_tablo(anket_id, soru_id, grup='sinif'):
+        """
+        Bir sorunun cevaplarını başka bir değişkene göre çapraz tablola
+
+        Args:
+            anket_id: Anket ID
+            soru_id: Satırlarda gösterilecek soru
+            grup: 'sinif', 'cinsiyet' ya da sütunlarda gösterilecek başka bir sorunun ID'si
+
+        Returns:
+            Dict: {satirlar: [...], sutunlar: [...], tablo: [[...]]} veya hata sözlüğü
+        """
+        soru = AnketSoru.query.filter_by(id=soru_id, anket_id=anket_id).first()
+        if not soru:
+            return {"success": False, "message": "Soru bulunamadı."}
+
+        if grup in OGRENCI_KIRILIMLARI:
+            satirlar = CevapDeposu.soru_cevaplari(anket_id, soru_id, OGRENCI_KIRILIMLARI[grup])
+            cevaplar = [cevap for _, cevap, _ in satirlar]
+            gruplar = [deger for _, _, deger in satirlar]
+        else:
+            try:
+                grup_soru_id = int(grup)
+            except (TypeError, ValueError):
+                return {"success": False, "message": "Geçersiz kırılım."}
+
+            if not AnketSoru.query.filter_by(id=grup_soru_id, anket_id=anket_id).first():
+                return {"success": False, "message": "Kırılım sorusu bulunamadı."}
+
+            # İki sorunun cevapları öğrenci üzerinden eşleştirilir
+            grup_cevaplari = dict(
+                (ogrenci_id, cevap) for ogrenci_id, cevap in CevapDeposu.soru_cevaplari(anket_id, grup_soru_id)
+            )
+            eslesen = [
+                (cevap, grup_cevaplari[ogrenci_id])
+                for ogrenci_id, cevap in CevapDeposu.soru_cevaplari(anket_id, soru_id)
+                if ogrenci_id in grup_cevaplari
+            ]
+            cevaplar = [cevap for cevap, _ in eslesen]
+            gruplar = [deger for _, deger in eslesen]
+
+        if not cevaplar:
+            return {"success": True, "satirlar": [], "sutunlar": [], "tablo": []}
+
+        satir_etiketleri, satir_kodlari = np.unique(np.asarray(cevaplar, dtype=object).astype(str), return_inverse=True)
+        sutun_etiketleri, sutun_kodlari = np.unique(np.asarray(gruplar, dtype=object).astype(str), return_inverse=True)
+
+        # (satır, sütun) çiftleri tek boyutlu indekse çevrilip tek bincount ile sayılır
+        tablo = np.bincount(
+            satir_kodlari * len(sutun_etiketleri) + sutun_kodlari,
+            minlength=len(satir_etiketleri) * len(sutun_etiketleri)
+        ).reshape(len(satir_etiketleri), len(sutun_etiketleri))
+
+        return {
+            "success": True,
+            "satirlar": satir_etiketleri.tolist(),
+            "sutunlar": sutun_etiketleri.tolist(),
+            "tablo": tablo.tolist()
+        }
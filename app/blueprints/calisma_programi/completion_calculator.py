@@ -4,7 +4,7 @@ Ders tamamlanma tarihini hesaplama işlemleri
 from datetime import datetime, timedelta
 from app.extensions import db
 from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
-from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
 
 def calculate_ders_completion_date(ogrenci_id, ders_id):
     """
@@ -19,7 +19,7 @@ def calculate_ders_completion_date(ogrenci_id, ders_id):
     """
     try:
         # Dersin konularını al
-        konular = Konu.query.filter_by(ders_id=ders_id).all()
+        konular = KatalogOnbellegi.konular(ders_id)
         toplam_konu_sayisi = len(konular)
         
         if toplam_konu_sayisi == 0:
@@ -117,7 +117,7 @@ def calculate_all_ders_completion_dates(ogrenci_id):
     
     ders_bilgileri = {}
     for ders_id in ders_ids:
-        ders = Ders.query.get(ders_id)
+        ders = KatalogOnbellegi.ders(ders_id)
         if ders:
             ders_bilgileri[ders_id] = {
                 'ders': ders,
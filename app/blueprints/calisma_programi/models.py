@@ -7,7 +7,7 @@ class DersProgrami(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     ders_id = db.Column(db.Integer, db.ForeignKey('dersler.id'), nullable=False)
     gun = db.Column(db.Integer, nullable=False)  # 0: Pazartesi, 1: Salı, ..., 6: Pazar
     baslangic_saat = db.Column(db.Time, nullable=False)
@@ -37,7 +37,7 @@ class DersIlerleme(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     ders_id = db.Column(db.Integer, db.ForeignKey('dersler.id'), nullable=False)
     tamamlama_yuzdesi = db.Column(db.Float, default=0)
     tahmini_bitis_tarihi = db.Column(db.Date, nullable=True)
@@ -55,7 +55,7 @@ class KonuTakip(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     konu_id = db.Column(db.Integer, db.ForeignKey('konular.id'), nullable=False)
     tamamlandi = db.Column(db.Boolean, default=False)
     calisilan_sure = db.Column(db.Integer, default=0)  # Dakika cinsinden
@@ -8,6 +8,7 @@ from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
 from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
 from app.utils.program import generate_weekly_schedule, calculate_topic_schedule
 from app.blueprints.calisma_programi.services import ProgramService
+from app.blueprints.yapay_zeka_asistan.konu_onerici import KonuOneriService
 from app.utils.auth import session_required, log_activity
 from app.blueprints.calisma_programi import calisma_programi_bp
 
@@ -343,6 +344,9 @@ def konu_takip(ogrenci_id):
             'takip': takip
         })
     
+    # Gece hesaplanan konu önerileri (yalnızca öğrencinin programındaki dersler)
+    konu_onerileri = KonuOneriService.get_ogrenci_onerileri(ogrenci_id, ogrenci_ders_ids)
+    
     return render_template('calisma_programi/konu_takip_fixed.html', 
                           ogrenci=ogrenci, 
                           ders_konulari=ders_konulari,
@@ -353,7 +357,8 @@ def konu_takip(ogrenci_id):
                           toplam_konular=toplam_konular,
                           tamamlanan_konular=tamamlanan_konular,
                           cozulen_sorular=cozulen_sorular,
-                          dogru_sorular=dogru_sorular)
+                          dogru_sorular=dogru_sorular,
+                          konu_onerileri=konu_onerileri)
 
 
 # API endpointleri program/routes_api.py dosyasına taşınmıştır
\ No newline at end of file
@@ -8,6 +8,7 @@ from sqlalchemy import func
 from app.extensions import db
 from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
 from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
 
 class CalismaService:
@@ -182,13 +183,12 @@ class ProgramService:
             List: Takvim etkinlikleri listesi
         """
         from app.blueprints.calisma_programi.models import DersProgrami
-        from app.blueprints.ders_konu_yonetimi.models import Ders
         
         # Öğrencinin ders programını al
         programlar = DersProgrami.query.filter_by(ogrenci_id=ogrenci_id).all()
         
-        # Ders adlarını sözlüğe yükle
-        ders_adlari = {d.id: d.ad for d in Ders.query.all()}
+        # Ders adlarını katalog önbelleğinden al
+        ders_adlari = KatalogOnbellegi.ders_adlari()
         
         # Gün isimlerini tanımla
         gunler = ['Pazartesi', 'Salı', 'Çarşamba', 'Perşembe', 'Cuma', 'Cumartesi', 'Pazar']
@@ -1295,7 +1295,7 @@ class ProgramService:
             # Bu güne ait dersleri bul
             for program in programlar:
                 if program.gun == i:
-                    ders = Ders.query.get(program.ders_id)
+                    ders = KatalogOnbellegi.ders(program.ders_id)
                     ders_bilgi = {
                         'id': program.id,
                         'ders_id': ders.id,
@@ -1313,7 +1313,7 @@ class ProgramService:
         ders_ilerleme = {}
         
         for ilerleme in ilerlemeler:
-            ders = Ders.query.get(ilerleme.ders_id)
+            ders = KatalogOnbellegi.ders(ilerleme.ders_id)
             ders_ilerleme[ilerleme.ders_id] = {
                 'id': ilerleme.id,
                 'ders_id': ilerleme.ders_id,
@@ -2,4 +2,7 @@ from flask import Blueprint
 
 deneme_sinavlari_bp = Blueprint('deneme_sinavlari', __name__, template_folder='templates', url_prefix='/deneme-sinavlari')
 
-from app.blueprints.deneme_sinavlari import routes
\ No newline at end of file
+from app.blueprints.deneme_sinavlari import routes
+
+# Deneme sonucu yazan işlemlerde öğrenci sürümlerini artıran olay dinleyicileri
+from app.blueprints.deneme_sinavlari import surum
\ No newline at end of file
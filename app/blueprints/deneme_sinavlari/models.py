@@ -3,10 +3,14 @@ from sqlalchemy.orm import relationship
 
 class DenemeSonuc(db.Model):
     __tablename__ = 'deneme_sonuclari'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Öğrenci bazlı deneme geçmişi ve damga sorguları için
+        db.Index('ix_deneme_sonuclari_ogrenci_tarih', 'ogrenci_id', 'tarih'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     deneme_adi = db.Column(db.String(100), nullable=False)
     tarih = db.Column(db.Date, nullable=False)
     net_tyt_turkce = db.Column(db.Float, default=0)
@@ -39,4 +43,15 @@ class DenemeSonuc(db.Model):
     def ayt_toplam_net(self):
         """AYT toplam netini hesapla"""
         return (self.net_ayt_matematik + self.net_ayt_fizik + self.net_ayt_kimya + self.net_ayt_biyoloji +
-                self.net_ayt_edebiyat + self.net_ayt_tarih + self.net_ayt_cografya + self.net_ayt_felsefe)
\ No newline at end of file
+                self.net_ayt_edebiyat + self.net_ayt_tarih + self.net_ayt_cografya + self.net_ayt_felsefe)
+
+class DenemeSurumu(db.Model):
+    """Öğrencinin deneme sonuçlarına her yazmada artan sürüm sayacını temsil eden model sınıfı"""
+    __tablename__ = 'deneme_surumleri'
+    __table_args__ = {'extend_existing': True}
+    
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<DenemeSurumu {self.ogrenci_id} - {self.surum}>"
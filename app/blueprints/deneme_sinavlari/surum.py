@@ -0,0 +1,75 @@
+"""
+Deneme sonucu sürümleri
+Deneme sonuçlarından türetilen önbellekler (risk özellik matrisi, benzerlik
+indeksi, segmentler) öğrenci başına damgalarla güncelliği denetler. Kayıt
+sayısı, son kayıt ve net toplamı gibi özetler; netlerin dersler arasında
+yer değiştirdiği ya da yalnızca tarihin değiştiği düzenlemeleri göremez.
+
+Bu modül DenemeSonuc'a yazan her işlemde (ORM nesneleri veya update/delete
+ifadeleri) etkilenen öğrencilerin DenemeSurumu sayacını aynı işlem içinde
+artırır. Sayaç veritabanında tutulduğundan tüm süreçlerce görülür ve işlem
+geri alınırsa artış da geri alınır.
+"""
+
+from itertools import chain
+
+from sqlalchemy import event, insert, inspect, literal, select, update
+from sqlalchemy.orm import Session
+
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc, DenemeSurumu
+
+_sayac = DenemeSurumu.__table__
+
+# IN (...) filtrelerinde tek seferde işlenen öğrenci sayısı
+PARCA_BOYUTU = 5000
+
+
+def surumleri_artir(baglanti, ogrenci_idleri):
+    """Verilen öğrencilerin deneme sürümünü yazan işlemin içinde artır"""
+    idler = sorted(set(ogrenci_idleri))
+    for i in range(0, len(idler), PARCA_BOYUTU):
+        parca = idler[i:i + PARCA_BOYUTU]
+        baglanti.execute(
+            update(_sayac).where(_sayac.c.ogrenci_id.in_(parca)).values(surum=_sayac.c.surum + 1)
+        )
+        mevcut = set(baglanti.scalars(select(_sayac.c.ogrenci_id).where(_sayac.c.ogrenci_id.in_(parca))))
+        eksik = [ogrenci_id for ogrenci_id in parca if ogrenci_id not in mevcut]
+        if eksik:
+            # Aynı işlemde silinmiş öğrenciler için sayaç satırı açılmaz
+            baglanti.execute(insert(_sayac).from_select(
+                ['ogrenci_id', 'surum'], select(Ogrenci.id, literal(1)).where(Ogrenci.id.in_(eksik))
+            ))
+
+
+def etkilenen_ogrenciler(session):
+    """Flush edilen değişikliklerde deneme sonucu eklenen, düzenlenen veya silinen öğrenciler"""
+    idler = set()
+    for nesne in chain(session.new, session.dirty, session.deleted):
+        if not isinstance(nesne, DenemeSonuc):
+            continue
+        if nesne in session.dirty and not session.is_modified(nesne):
+            continue
+        # Sonuç başka öğrenciye taşındıysa eski ve yeni öğrencinin ikisi de etkilenir
+        gecmis = inspect(nesne).attrs.ogrenci_id.history
+        idler.update(i for i in chain(gecmis.added, gecmis.unchanged, gecmis.deleted) if i is not None)
+    return idler
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    idler = etkilenen_ogrenciler(session)
+    if idler:
+        surumleri_artir(session.connection(), idler)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # update() / delete() ifadeleri flush olaylarını tetiklemez; etkilenen öğrenciler
+    # bilinmediğinden sonucu olan tüm öğrencilerin sürümü artırılır
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, DenemeSonuc):
+        baglanti = orm_execute_state.session.connection()
+        surumleri_artir(baglanti, baglanti.scalars(select(DenemeSonuc.ogrenci_id).distinct()).all())
@@ -0,0 +1,229 @@
+"""
+Ders/konu kataloğu önbelleği
+Ders ve konu tabloları yılda birkaç kez değişir ancak program, takvim, plan ve
+PDF işlemlerinin neredeyse hepsinde okunur. Bu modül kataloğun değişmez bir
+anlık görüntüsünü (dersler ve sıralı konuları) süreç içinde tutar ve id ile
+erişim sağlar.
+
+Ders veya Konu tablosuna yazan her işlem (ORM nesneleri veya insert/update/
+delete ifadeleri) KatalogSurumu tablosundaki paylaşılan sayacı aynı işlem
+içinde artırır. Her süreç sayacı en fazla KATALOG_KONTROL_ARALIGI saniyede bir
+okur ve değiştiyse kataloğu yeniden yükler; yazan süreç kendi kopyasını commit
+sonrasında hemen bırakır. Katalog yalnızca commit edilmiş veriyi görmek için
+ayrı bir bağlantıyla okunur.
+"""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.blueprints.ders_konu_yonetimi.models import Ders, Konu, KatalogSurumu
+
+VARSAYILAN_ARALIK = 5.0
+SAYAC_ID = 1
+
+IZLENEN_MODELLER = (Ders, Konu)
+
+_sayac = KatalogSurumu.__table__
+_kilit = threading.Lock()
+# Güncel katalog ve paylaşılan sürümün son kontrol zamanı
+_durum = {'katalog': None, 'kontrol': 0.0}
+
+
+@dataclass(frozen=True)
+class KonuKaydi:
+    """Konunun değişmez kopyası"""
+    id: int
+    ders_id: int
+    ad: str
+    tahmini_sure: int
+    sira: int
+
+
+@dataclass(frozen=True)
+class DersKaydi:
+    """Dersin ve sıralı konularının değişmez kopyası"""
+    id: int
+    ad: str
+    aciklama: str
+    konular: tuple
+
+    def toplam_sure(self):
+        """Dersin tüm konularının toplam tahmini süresi (dakika)"""
+        return sum(konu.tahmini_sure for konu in self.konular)
+
+    def konu_sayisi(self):
+        """Dersin toplam konu sayısı"""
+        return len(self.konular)
+
+
+@dataclass(frozen=True)
+class _Katalog:
+    surum: int
+    dersler: MappingProxyType
+    sirali_dersler: tuple
+    konular: MappingProxyType
+
+
+def _aralik():
+    if has_app_context():
+        return current_app.config.get('KATALOG_KONTROL_ARALIGI', VARSAYILAN_ARALIK)
+    return VARSAYILAN_ARALIK
+
+
+def _surumu_artir(connection):
+    """Paylaşılan sayacı yazan işlemin içinde artır"""
+    sonuc = connection.execute(
+        update(_sayac).where(_sayac.c.id == SAYAC_ID).values(surum=_sayac.c.surum + 1)
+    )
+    if sonuc.rowcount == 0:
+        connection.execute(insert(_sayac).values(id=SAYAC_ID, surum=1))
+
+
+def _izlenen_mi(nesneler):
+    return any(isinstance(nesne, IZLENEN_MODELLER) for nesne in nesneler)
+
+
+def _degisti(session):
+    # Sayaç işlem başına bir kez artırılır; toplu işlemler tek geçersiz kılma üretir
+    if not session.info.get('katalog_degisti'):
+        _surumu_artir(session.connection())
+        session.info['katalog_degisti'] = True
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    if _izlenen_mi(session.new) or _izlenen_mi(session.dirty) or _izlenen_mi(session.deleted):
+        _degisti(session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # insert(Model) / update() / delete() ifadeleri flush olaylarını tetiklemez
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, IZLENEN_MODELLER):
+        _degisti(orm_execute_state.session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _commit_sonrasi(session):
+    if session.info.pop('katalog_degisti', False):
+        KatalogOnbellegi.temizle()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _rollback_sonrasi(session):
+    session.info.pop('katalog_degisti', None)
+
+
+def _paylasilan_surum(baglanti):
+    surum = baglanti.execute(select(_sayac.c.surum).where(_sayac.c.id == SAYAC_ID)).scalar()
+    if surum is None:
+        try:
+            baglanti.execute(insert(_sayac).values(id=SAYAC_ID, surum=0))
+            baglanti.commit()
+            surum = 0
+        except IntegrityError:
+            # Sayaç satırı başka bir süreç tarafından aynı anda oluşturuldu
+            baglanti.rollback()
+            surum = baglanti.execute(select(_sayac.c.surum).where(_sayac.c.id == SAYAC_ID)).scalar()
+    return surum
+
+
+def _yukle(baglanti, surum):
+    konu_satirlari = baglanti.execute(
+        select(Konu.id, Konu.ders_id, Konu.ad, Konu.tahmini_sure, Konu.sira)
+        .order_by(Konu.ders_id, Konu.sira, Konu.id)
+    ).all()
+    konular = {}
+    ders_konulari = {}
+    for satir in konu_satirlari:
+        konu = KonuKaydi(*satir)
+        konular[konu.id] = konu
+        ders_konulari.setdefault(konu.ders_id, []).append(konu)
+
+    dersler = {}
+    for ders_id, ad, aciklama in baglanti.execute(select(Ders.id, Ders.ad, Ders.aciklama).order_by(Ders.ad)):
+        dersler[ders_id] = DersKaydi(ders_id, ad, aciklama, tuple(ders_konulari.get(ders_id, ())))
+
+    return _Katalog(
+        surum=surum,
+        dersler=MappingProxyType(dersler),
+        sirali_dersler=tuple(dersler.values()),
+        konular=MappingProxyType(konular),
+    )
+
+
+def _katalog():
+    katalog = _durum['katalog']
+    if katalog is not None and time.monotonic() - _durum['kontrol'] < _aralik():
+        return katalog
+
+    with _kilit:
+        katalog = _durum['katalog']
+        if katalog is not None and time.monotonic() - _durum['kontrol'] < _aralik():
+            return katalog
+
+        # İstek oturumundaki commit edilmemiş yazmalar önbelleğe girmesin diye ayrı bağlantı
+        with db.engine.connect() as baglanti:
+            surum = _paylasilan_surum(baglanti)
+            if katalog is None or katalog.surum != surum:
+                katalog = _yukle(baglanti, surum)
+                logging.debug(f"Ders/konu kataloğu yüklendi (sürüm {surum}): "
+                              f"{len(katalog.dersler)} ders, {len(katalog.konular)} konu")
+            baglanti.commit()
+
+        _durum['katalog'] = katalog
+        _durum['kontrol'] = time.monotonic()
+        return katalog
+
+
+class KatalogOnbellegi:
+    """Ders ve konu referans verisini süreç içinde tutan önbellek sınıfı"""
+
+    @staticmethod
+    def dersler():
+        """Tüm dersler (ada göre sıralı)"""
+        return _katalog().sirali_dersler
+
+    @staticmethod
+    def ders(ders_id):
+        """ID'ye göre ders; yoksa None"""
+        return _katalog().dersler.get(ders_id)
+
+    @staticmethod
+    def ders_adlari():
+        """Ders ID -> ders adı sözlüğü"""
+        return {ders.id: ders.ad for ders in _katalog().sirali_dersler}
+
+    @staticmethod
+    def konu(konu_id):
+        """ID'ye göre konu; yoksa None"""
+        return _katalog().konular.get(konu_id)
+
+    @staticmethod
+    def konular(ders_id):
+        """Dersin sıra numarasına göre sıralı konuları"""
+        ders = _katalog().dersler.get(ders_id)
+        return ders.konular if ders else ()
+
+    @staticmethod
+    def surum():
+        """Süreçteki kataloğun paylaşılan sürüm numarası"""
+        return _katalog().surum
+
+    @staticmethod
+    def temizle():
+        """Süreçteki kataloğu bırak; bir sonraki erişimde yeniden yüklenir"""
+        with _kilit:
+            _durum['katalog'] = None
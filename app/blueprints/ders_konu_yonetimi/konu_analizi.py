@@ -0,0 +1,239 @@
+"""
+Konu zorluk analizi modülü
+Konu takip kayıtlarından konu ve sınıf bazında doğru oranı, tamamlama oranı ve
+ortalama çalışma süresini gruplu SQL sorgularıyla hesaplar ve KonuZorlukOzeti
+tablosunda saklar. Konu kataloğu bu özet tablodan okunur; takip tablosu her
+sayfa açılışında taranmaz.
+
+Özetler artımlı güncellenir: KonuTakip yazıldığında (ORM nesneleri veya
+insert/update/delete ifadeleri) etkilenen konuların özet satırları aynı
+işlem içinde silinir. Okuma sırasında okul geneli özeti olmayan konular
+(yeni, hiç hesaplanmamış veya değişmiş konular) tek gruplu sorguyla yeniden
+hesaplanır.
+"""
+
+import logging
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import case, delete, event, func, insert, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, contains_eager
+
+from app.extensions import db
+from app.blueprints.ders_konu_yonetimi.models import Ders, Konu, KonuZorlukOzeti
+from app.blueprints.calisma_programi.models import KonuTakip
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+
+# Okul geneli özet satırlarının sınıf değeri
+OKUL_GENELI = ''
+# IN (...) filtrelerinde tek seferde işlenen konu sayısı
+PARCA_BOYUTU = 900
+
+SIRALAMALAR = {
+    'zorluk': (KonuZorlukOzeti.dogru_orani.is_(None), KonuZorlukOzeti.dogru_orani, Konu.sira),
+    'tamamlama': (KonuZorlukOzeti.tamamlama_orani.is_(None), KonuZorlukOzeti.tamamlama_orani, Konu.sira),
+    'sure': (KonuZorlukOzeti.ortalama_sure.is_(None), KonuZorlukOzeti.ortalama_sure.desc(), Konu.sira),
+    'sira': (Ders.ad, Konu.sira),
+}
+
+_ozet_tablosu = KonuZorlukOzeti.__table__
+
+
+def _parcalar(dizi, boyut=PARCA_BOYUTU):
+    for i in range(0, len(dizi), boyut):
+        yield dizi[i:i + boyut]
+
+
+def _ozetleri_gecersiz_kil(connection, konu_ids=None, kosul=None):
+    """
+    Etkilenen konuların özet satırlarını sil; bir sonraki okumada yeniden hesaplanırlar
+
+    Args:
+        connection: Session veya Connection nesnesi
+        konu_ids: Konu ID listesi veya SELECT ifadesi; None ve kosul yoksa tüm özetler
+        kosul: Etkilenen takip satırlarını seçen koşul (konu ID'leri bu satırlardan alınır)
+    """
+    if kosul is not None:
+        konu_ids = select(KonuTakip.konu_id).where(kosul).distinct()
+    if konu_ids is None:
+        connection.execute(delete(_ozet_tablosu))
+    elif isinstance(konu_ids, (list, set, tuple)):
+        for parca in _parcalar(list(konu_ids)):
+            connection.execute(delete(_ozet_tablosu).where(_ozet_tablosu.c.konu_id.in_(parca)))
+    else:
+        connection.execute(delete(_ozet_tablosu).where(_ozet_tablosu.c.konu_id.in_(konu_ids)))
+
+
+@event.listens_for(Session, 'before_flush')
+def _flush_oncesi(session, flush_context, instances):
+    # Sınıfı değişen veya silinen öğrencilerin takip satırları flush sonrasında okunamaz
+    ogrenci_ids = {
+        nesne.id for nesne in session.deleted
+        if isinstance(nesne, Ogrenci) and nesne.id is not None
+    } | {
+        nesne.id for nesne in session.dirty
+        if isinstance(nesne, Ogrenci) and nesne.id is not None and inspect(nesne).attrs.sinif.history.has_changes()
+    }
+    if ogrenci_ids:
+        _ozetleri_gecersiz_kil(session.connection(), kosul=KonuTakip.ogrenci_id.in_(ogrenci_ids))
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    konu_ids = set()
+    for nesne in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(nesne, KonuTakip):
+            gecmis = inspect(nesne).attrs.konu_id.history
+            konu_ids.update(k for k in (nesne.konu_id, *gecmis.deleted) if k is not None)
+    if konu_ids:
+        _ozetleri_gecersiz_kil(session.connection(), konu_ids)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # insert(KonuTakip) / update() / delete() ifadeleri flush olaylarını tetiklemez
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, KonuTakip):
+        return
+
+    connection = orm_execute_state.session.connection()
+    ifade = orm_execute_state.statement
+    if orm_execute_state.is_insert:
+        parametreler = orm_execute_state.parameters
+        if isinstance(parametreler, dict):
+            parametreler = [parametreler]
+        konu_ids = {p.get('konu_id') for p in parametreler or []}
+        if konu_ids and None not in konu_ids:
+            _ozetleri_gecersiz_kil(connection, konu_ids)
+        else:
+            _ozetleri_gecersiz_kil(connection)
+    elif ifade.whereclause is None or (orm_execute_state.is_update and 'konu_id' in ifade.compile().params):
+        # Koşulsuz ifadelerde veya takiplerin konusu değiştiğinde hangi konuların etkilendiği bilinemez
+        _ozetleri_gecersiz_kil(connection)
+    else:
+        _ozetleri_gecersiz_kil(connection, kosul=ifade.whereclause)
+
+
+class KonuAnalizService:
+    """Konu zorluk özetlerini hesaplayan ve sunan servis sınıfı"""
+
+    @staticmethod
+    def _hesapla(konu_ids):
+        """Verilen konuların sınıf ve okul geneli özet satırlarını gruplu SQL ile hesapla"""
+        sorgu = (
+            select(
+                KonuTakip.konu_id,
+                Ogrenci.sinif,
+                func.count(KonuTakip.id).label('takip_sayisi'),
+                func.sum(case((KonuTakip.tamamlandi.is_(True), 1), else_=0)).label('tamamlanan_sayisi'),
+                func.sum(func.coalesce(KonuTakip.cozulen_soru, 0)).label('cozulen_soru'),
+                func.sum(func.coalesce(KonuTakip.dogru_soru, 0)).label('dogru_soru'),
+                func.sum(func.coalesce(KonuTakip.calisilan_sure, 0)).label('toplam_sure'),
+            )
+            .join(Ogrenci, Ogrenci.id == KonuTakip.ogrenci_id)
+            .group_by(KonuTakip.konu_id, Ogrenci.sinif)
+        )
+        baglanti = db.session.connection()
+        siniflar = pd.concat(
+            [pd.read_sql(sorgu.where(KonuTakip.konu_id.in_(parca)), baglanti) for parca in _parcalar(konu_ids)],
+            ignore_index=True
+        )
+
+        # Okul geneli satırları sınıf toplamlarından türetilir; takibi olmayan konular sıfır satır alır
+        sayilar = ['takip_sayisi', 'tamamlanan_sayisi', 'cozulen_soru', 'dogru_soru', 'toplam_sure']
+        okul = (siniflar.groupby('konu_id')[sayilar].sum()
+                .reindex(pd.Index(konu_ids, name='konu_id'), fill_value=0)
+                .reset_index()
+                .assign(sinif=OKUL_GENELI))
+        ozet = pd.concat([okul, siniflar], ignore_index=True)
+        ozet[sayilar] = ozet[sayilar].fillna(0).astype(int)
+
+        takip = ozet['takip_sayisi'].where(ozet['takip_sayisi'] > 0)
+        cozulen = ozet['cozulen_soru'].where(ozet['cozulen_soru'] > 0)
+        ozet['dogru_orani'] = (ozet['dogru_soru'] / cozulen).round(4)
+        ozet['tamamlama_orani'] = (ozet['tamamlanan_sayisi'] / takip).round(4)
+        ozet['ortalama_sure'] = (ozet['toplam_sure'] / takip).round(2)
+        ozet['guncelleme_tarihi'] = datetime.now()
+        return ozet.astype(object).where(ozet.notna(), None).to_dict('records')
+
+    @staticmethod
+    def ozetleri_guncelle(tam=False):
+        """
+        Özeti eksik konuları yeniden hesapla
+
+        Args:
+            tam: True ise tüm konuların özetleri baştan hesaplanır
+
+        Returns:
+            Dict: İşlem sonucu ve güncellenen konu sayısı
+        """
+        try:
+            if tam:
+                db.session.execute(delete(KonuZorlukOzeti))
+
+            okul_ozeti = select(KonuZorlukOzeti.konu_id).where(KonuZorlukOzeti.sinif == OKUL_GENELI)
+            konu_ids = db.session.execute(select(Konu.id).where(Konu.id.not_in(okul_ozeti))).scalars().all()
+            if not konu_ids:
+                if tam:
+                    db.session.commit()
+                return {'success': True, 'message': 'Konu özetleri güncel.', 'guncellenen': 0}
+
+            satirlar = KonuAnalizService._hesapla(konu_ids)
+            # Eksik sınıf satırları da temizlenir (ör. sınıfı değişen öğrenciler)
+            _ozetleri_gecersiz_kil(db.session, konu_ids)
+            for parca in _parcalar(satirlar, 5000):
+                db.session.execute(insert(KonuZorlukOzeti), parca)
+            db.session.commit()
+            return {'success': True, 'message': f'{len(konu_ids)} konunun özeti güncellendi.', 'guncellenen': len(konu_ids)}
+
+        except IntegrityError:
+            # Aynı konular başka bir işlem tarafından eş zamanlı hesaplandı
+            db.session.rollback()
+            return {'success': True, 'message': 'Konu özetleri başka bir işlem tarafından güncellendi.', 'guncellenen': 0}
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Konu özetleri güncellenirken hata: {str(e)}")
+            return {'success': False, 'message': f'Konu özetleri güncellenirken hata oluştu: {str(e)}'}
+
+    @staticmethod
+    def get_konu_zorluklari(ders_id=None, sinif=None, sirala='zorluk', limit=None):
+        """
+        Konuları özet metrikleriyle birlikte getir
+
+        Args:
+            ders_id: Yalnızca bu dersin konuları
+            sinif: Sınıf filtresi (boşsa okul geneli)
+            sirala: 'zorluk', 'tamamlama', 'sure' veya 'sira'
+            limit: En fazla döndürülecek konu sayısı
+
+        Returns:
+            List: (Konu, KonuZorlukOzeti veya None) ikilileri
+        """
+        KonuAnalizService.ozetleri_guncelle()
+
+        sorgu = (
+            db.session.query(Konu, KonuZorlukOzeti)
+            .join(Ders, Ders.id == Konu.ders_id)
+            .outerjoin(KonuZorlukOzeti, (KonuZorlukOzeti.konu_id == Konu.id)
+                       & (KonuZorlukOzeti.sinif == (sinif or OKUL_GENELI)))
+            .options(contains_eager(Konu.ders))
+        )
+        if ders_id:
+            sorgu = sorgu.filter(Konu.ders_id == ders_id)
+        sorgu = sorgu.order_by(*SIRALAMALAR.get(sirala, SIRALAMALAR['zorluk']))
+        if limit:
+            sorgu = sorgu.limit(limit)
+        return sorgu.all()
+
+    @staticmethod
+    def get_siniflar():
+        """Özet tablosunda yer alan sınıfları getir"""
+        return db.session.execute(
+            select(KonuZorlukOzeti.sinif)
+            .where(KonuZorlukOzeti.sinif != OKUL_GENELI)
+            .distinct()
+            .order_by(KonuZorlukOzeti.sinif)
+        ).scalars().all()
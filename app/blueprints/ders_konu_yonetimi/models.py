@@ -1,5 +1,7 @@
+from datetime import datetime
 from app.extensions import db
-from sqlalchemy.orm import relationship
+from sqlalchemy import func, select
+from sqlalchemy.orm import relationship, column_property
 
 class Ders(db.Model):
     __tablename__ = 'dersler'
@@ -18,21 +20,21 @@ class Ders(db.Model):
         return f"<Ders {self.ad}>"
     
     def toplam_sure(self):
-        """Dersin tüm konularının toplam tahmini süresini hesapla (dakika)"""
-        # İlişki kurduğumuz için direkt konular ilişkisini kullanabiliriz
-        return sum(konu.tahmini_sure for konu in self.konular)
+        """Dersin tüm konularının toplam tahmini süresini döndür (dakika)"""
+        # Ders ile birlikte tek sorguda SQL'de hesaplanır; konular yüklenmez
+        return self.konu_toplam_sure or 0
     
     def konu_sayisi(self):
         """Dersin toplam konu sayısını döndür"""
-        # İlişki kurduğumuz için direkt konular ilişkisini kullanabiliriz
-        return len(self.konular)
+        # Ders ile birlikte tek sorguda SQL'de hesaplanır; konular yüklenmez
+        return self.konu_adedi or 0
 
 class Konu(db.Model):
     __tablename__ = 'konular'
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ders_id = db.Column(db.Integer, db.ForeignKey('dersler.id'), nullable=False)
+    ders_id = db.Column(db.Integer, db.ForeignKey('dersler.id'), nullable=False, index=True)
     ad = db.Column(db.String(200), nullable=False)
     tahmini_sure = db.Column(db.Integer, nullable=False)  # Dakika cinsinden
     sira = db.Column(db.Integer, nullable=False, default=0)
@@ -42,4 +44,58 @@ class Konu(db.Model):
     konu_takipleri = relationship("KonuTakip", back_populates="konu", cascade="all, delete-orphan")
     
     def __repr__(self):
-        return f"<Konu {self.ad}>"
\ No newline at end of file
+        return f"<Konu {self.ad}>"
+
+# Ders toplamları: ders satırıyla aynı SELECT içinde ilişkili alt sorgu olarak hesaplanır
+Ders.konu_adedi = column_property(
+    select(func.count(Konu.id))
+    .where(Konu.ders_id == Ders.id)
+    .correlate_except(Konu)
+    .scalar_subquery()
+)
+Ders.konu_toplam_sure = column_property(
+    select(func.coalesce(func.sum(Konu.tahmini_sure), 0))
+    .where(Konu.ders_id == Ders.id)
+    .correlate_except(Konu)
+    .scalar_subquery()
+)
+
+class KonuZorlukOzeti(db.Model):
+    """Konu takip kayıtlarının konu ve sınıf bazında önceden hesaplanmış özetini (zorluk analizi) temsil eden model sınıfı"""
+    __tablename__ = 'konu_zorluk_ozetleri'
+    __table_args__ = (
+        db.UniqueConstraint('konu_id', 'sinif', name='uq_konu_zorluk_ozetleri_konu_sinif'),
+        db.Index('ix_konu_zorluk_ozetleri_sinif_dogru_orani', 'sinif', 'dogru_orani'),
+        {'extend_existing': True}
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    konu_id = db.Column(db.Integer, db.ForeignKey('konular.id', ondelete='CASCADE'), nullable=False)
+    sinif = db.Column(db.String(20), nullable=False, default='')  # '' okul geneli
+    takip_sayisi = db.Column(db.Integer, default=0)
+    tamamlanan_sayisi = db.Column(db.Integer, default=0)
+    cozulen_soru = db.Column(db.Integer, default=0)
+    dogru_soru = db.Column(db.Integer, default=0)
+    toplam_sure = db.Column(db.Integer, default=0)  # Dakika cinsinden
+    dogru_orani = db.Column(db.Float)  # Soru çözülmemişse boş
+    tamamlama_orani = db.Column(db.Float)
+    ortalama_sure = db.Column(db.Float)
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now)
+    
+    # Relationships
+    konu = relationship("Konu")
+    
+    def __repr__(self):
+        return f"<KonuZorlukOzeti Konu: {self.konu_id} - Sınıf: {self.sinif or 'Okul'} - Doğru: {self.dogru_orani}>"
+
+class KatalogSurumu(db.Model):
+    """Ders/konu kataloğunun tüm süreçlerce paylaşılan sürüm sayacını temsil eden model sınıfı"""
+    __tablename__ = 'katalog_surumleri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    surum = db.Column(db.Integer, nullable=False, default=0)  # Ders veya konu tablosuna her yazmada artar
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    def __repr__(self):
+        return f"<KatalogSurumu {self.surum}>"
@@ -3,6 +3,9 @@ import pandas as pd
 from app.blueprints.ders_konu_yonetimi import ders_konu_yonetimi_bp
 from app.extensions import db
 from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+from app.blueprints.ders_konu_yonetimi.konu_analizi import KonuAnalizService, SIRALAMALAR
+from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
+from app.blueprints.ders_konu_yonetimi.services import DersService
 
 @ders_konu_yonetimi_bp.route('/')
 def lista():
@@ -180,11 +183,43 @@ def ekle():
 def detay(ders_id):
     """Ders detay sayfası ve konuların listesi"""
     ders = Ders.query.get_or_404(ders_id)
+    sirala = request.args.get('sirala', 'sira')
+    if sirala not in SIRALAMALAR:
+        sirala = 'sira'
     
-    # Konuları sıra numarasına göre getir
-    konular = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira).all()
+    # Konuları özet tablosundaki zorluk metrikleriyle birlikte getir (varsayılan: sıra numarası)
+    konu_ozetleri = KonuAnalizService.get_konu_zorluklari(ders_id=ders_id, sirala=sirala)
+    konular = [konu for konu, _ in konu_ozetleri]
+    ozetler = {konu.id: ozet for konu, ozet in konu_ozetleri}
     
-    return render_template('ders_konu_yonetimi/ders_detay.html', ders=ders, konular=konular)
+    return render_template('ders_konu_yonetimi/ders_detay.html', ders=ders, konular=konular,
+                           ozetler=ozetler, sirala=sirala)
+
+@ders_konu_yonetimi_bp.route('/konu-zorluk')
+def konu_zorluk():
+    """Okul geneli veya sınıf bazında konuların zorluk sıralaması"""
+    ders_id = request.args.get('ders_id', type=int)
+    sinif = request.args.get('sinif', '')
+    sirala = request.args.get('sirala', 'zorluk')
+    if sirala not in SIRALAMALAR:
+        sirala = 'zorluk'
+    limit = request.args.get('limit', 100, type=int)
+    
+    konu_ozetleri = KonuAnalizService.get_konu_zorluklari(ders_id=ders_id, sinif=sinif, sirala=sirala, limit=limit)
+    
+    return render_template('ders_konu_yonetimi/konu_zorluk.html',
+                           konu_ozetleri=konu_ozetleri,
+                           dersler=KatalogOnbellegi.dersler(),
+                           siniflar=KonuAnalizService.get_siniflar(),
+                           secili_ders_id=ders_id, secili_sinif=sinif,
+                           sirala=sirala, limit=limit)
+
+@ders_konu_yonetimi_bp.route('/konu-zorluk/yenile', methods=['POST'])
+def konu_zorluk_yenile():
+    """Tüm konu zorluk özetlerini baştan hesapla"""
+    sonuc = KonuAnalizService.ozetleri_guncelle(tam=True)
+    flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+    return redirect(url_for('ders_konu_yonetimi.konu_zorluk'))
 
 @ders_konu_yonetimi_bp.route('/<int:ders_id>/duzenle', methods=['GET', 'POST'])
 def duzenle(ders_id):
@@ -322,16 +357,12 @@ def konu_sil(konu_id):
     konu = Konu.query.get_or_404(konu_id)
     ders_id = konu.ders_id
     
-    # Konuyu sil
+    # Konuyu sil; kalan konuların sıra numaraları aynı işlemde tek ifadeyle güncellenir
     db.session.delete(konu)
-    
-    # Sıra numaralarını güncelle
-    kalan_konular = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira).all()
-    for i, k in enumerate(kalan_konular, 1):
-        k.sira = i
-    
-    # Veritabanına kaydet
-    db.session.commit()
+    sonuc = DersService.reorder_konular(ders_id)
+    if not sonuc['success']:
+        flash(sonuc['message'], 'danger')
+        return redirect(url_for('ders_konu_yonetimi.detay', ders_id=ders_id))
     
     flash(f'"{konu.ad}" konusu sistemden silindi!', 'success')
     return redirect(url_for('ders_konu_yonetimi.detay', ders_id=ders_id))
@@ -343,77 +374,65 @@ def konular_toplu_ekle(ders_id):
     
     if request.method == 'POST':
         # Form verisini al
-        konular_metin = request.form.get('konular_metin')
+        konular_metin = request.form.get('konu_listesi') or request.form.get('konular_metin')
         
         # Validasyon
-        if not konular_metin:
+        if not konular_metin or not konular_metin.strip():
             flash('Lütfen konular listesini girin!', 'danger')
             return redirect(url_for('ders_konu_yonetimi.konular_toplu_ekle', ders_id=ders_id))
         
-        # Metni satırlara böl
-        konular_satir = konular_metin.strip().split('\n')
-        
-        # Sıra numarası (bu dersteki son konudan sonra gelecek)
-        son_konu = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira.desc()).first()
-        sira = 1
-        if son_konu:
-            sira = son_konu.sira + 1
-        
-        # Satırları işle
-        eklenen = 0
-        hatali = 0
-        
-        for satir in konular_satir:
-            satir = satir.strip()
-            if not satir:
-                continue
-            
-            # Konu adı ve süreyi ayır
-            parcalar = satir.split(',')
-            
-            if len(parcalar) >= 2:
-                konu_adi = parcalar[0].strip()
-                sure_str = parcalar[1].strip()
-                
-                if konu_adi and sure_str:
-                    try:
-                        # Süreyi sayıya çevir
-                        tahmini_sure = int(float(sure_str))
-                        if tahmini_sure <= 0:
-                            raise ValueError()
-                        
-                        # Yeni konuyu ekle
-                        yeni_konu = Konu(
-                            ders_id=ders_id,
-                            ad=konu_adi,
-                            tahmini_sure=tahmini_sure,
-                            sira=sira
-                        )
-                        
-                        db.session.add(yeni_konu)
-                        sira += 1
-                        eklenen += 1
-                        
-                    except:
-                        hatali += 1
-                else:
-                    hatali += 1
-            else:
-                hatali += 1
-        
-        # Veritabanına kaydet
-        db.session.commit()
+        # Konular tek INSERT ifadesiyle eklenir
+        sonuc = DersService.import_konular_from_text(ders_id, konular_metin)
         
         # Bildirimleri oluştur
-        if eklenen > 0:
-            flash(f'{eklenen} konu başarıyla eklendi!', 'success')
-        
-        if hatali > 0:
-            flash(f'{hatali} konu ekleme sırasında hata oluştu! Geçersiz veya eksik veriler.', 'warning')
-        
-        if eklenen == 0:
-            flash('Hiçbir konu eklenemedi!', 'danger')
+        if not sonuc['success'] or not sonuc.get('eklenen'):
+            flash(sonuc['message'] if not sonuc['success'] else 'Hiçbir konu eklenemedi!', 'danger')
+        elif sonuc.get('errors'):
+            flash(sonuc['message'], 'warning')
+        else:
+            flash(sonuc['message'], 'success')
         
         return redirect(url_for('ders_konu_yonetimi.detay', ders_id=ders_id))
     
-    return render_template('ders_konu_yonetimi/konular_toplu_ekle.html', ders=ders)
\ No newline at end of file
+    return render_template('ders_konu_yonetimi/konular_toplu_ekle.html', ders=ders)
+
+@ders_konu_yonetimi_bp.route('/<int:ders_id>/konular-toplu-duzenle', methods=['GET', 'POST'])
+def konular_toplu_duzenle(ders_id):
+    """Dersin tüm konularının sıra ve sürelerini tek işlemde düzenleme sayfası ve işlemi"""
+    ders = Ders.query.get_or_404(ders_id)
+    
+    if request.method == 'POST':
+        # Formdaki konular mevcut sırayla gelir; yeni sıra girilen numaralara göre belirlenir
+        konu_ids = request.form.getlist('konu_id', type=int)
+        try:
+            siralar = {konu_id: int(request.form[f'sira_{konu_id}']) for konu_id in konu_ids}
+            sureler = {konu_id: int(request.form[f'sure_{konu_id}']) for konu_id in konu_ids}
+        except (KeyError, ValueError):
+            flash('Lütfen sıra ve süre alanlarına geçerli sayılar girin!', 'danger')
+            return redirect(url_for('ders_konu_yonetimi.konular_toplu_duzenle', ders_id=ders_id))
+        
+        yeni_sira = sorted(konu_ids, key=lambda konu_id: siralar[konu_id])
+        sonuc = DersService.update_konular_bulk(ders_id, konu_ids=yeni_sira, sureler=sureler)
+        flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+        if not sonuc['success']:
+            return redirect(url_for('ders_konu_yonetimi.konular_toplu_duzenle', ders_id=ders_id))
+        return redirect(url_for('ders_konu_yonetimi.detay', ders_id=ders_id))
+    
+    konular = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira, Konu.id).all()
+    return render_template('ders_konu_yonetimi/konular_toplu_duzenle.html', ders=ders, konular=konular)
+
+@ders_konu_yonetimi_bp.route('/<int:ders_id>/konu-sureleri-olcekle', methods=['POST'])
+def konu_sureleri_olcekle(ders_id):
+    """Dersin tüm konularının tahmini sürelerini bir kurala göre tek ifadeyle güncelleme işlemi"""
+    Ders.query.get_or_404(ders_id)
+    
+    try:
+        carpan = float((request.form.get('carpan') or '1').replace(',', '.'))
+        eklenecek = int(request.form.get('eklenecek') or 0)
+    except ValueError:
+        flash('Lütfen çarpan ve eklenecek süre için geçerli sayılar girin!', 'danger')
+        return redirect(url_for('ders_konu_yonetimi.konular_toplu_duzenle', ders_id=ders_id))
+    
+    sonuc = DersService.scale_konu_sureleri(ders_id, carpan=carpan, eklenecek=eklenecek)
+    flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+    return redirect(url_for('ders_konu_yonetimi.detay', ders_id=ders_id))
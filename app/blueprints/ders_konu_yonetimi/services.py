@@ -4,10 +4,15 @@ Bu modül, ders ve konu işlemleri ile ilgili iş mantığı işlemlerini gerçe
 """
 import re
 import pandas as pd
-from sqlalchemy import func
+from sqlalchemy import Integer, case, cast, func, insert, select, update
 
 from app.extensions import db
-from app.blueprints.ders.models import Ders, Konu
+from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+
+# Süresi belirtilmeyen konular için varsayılan süre (dakika)
+VARSAYILAN_KONU_SURESI = 45
+# "Konu adı - 45", "Konu adı, 45", "Konu adı<tab>45" veya "Konu adı  45" (2+ boşluk)
+KONU_SATIRI = re.compile(r'^(.+?)(?:\s+-\s*|\s*,\s*|\t+|\s{2,})(\d+(?:[.,]\d+)?)$')
 
 class DersService:
     """Ders işlemlerini yöneten servis sınıfı"""
@@ -319,11 +324,157 @@ class DersService:
                 'message': f'Hata oluştu: {str(e)}'
             }
     
+    @staticmethod
+    def _sira_ifadesi(konu_ids):
+        """Konu ID listesindeki konumları sıra numarasına çeviren CASE ifadesi"""
+        return case({konu_id: sira for sira, konu_id in enumerate(konu_ids, 1)}, value=Konu.id)
+    
+    @staticmethod
+    def _ders_konu_idleri(ders_id):
+        """Dersin konu ID'lerini mevcut sıralarına göre getir"""
+        return db.session.execute(
+            select(Konu.id).where(Konu.ders_id == ders_id).order_by(Konu.sira, Konu.id)
+        ).scalars().all()
+    
+    @staticmethod
+    def reorder_konular(ders_id, konu_ids=None):
+        """
+        Dersin konularını tek UPDATE ... CASE ifadesiyle yeniden sırala
+        
+        Args:
+            ders_id: Ders ID
+            konu_ids: Dersin tüm konu ID'leri, yeni sıralarıyla; verilmezse
+                mevcut sıra 1'den başlayarak boşluksuz yeniden numaralanır
+            
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        return DersService.update_konular_bulk(ders_id, konu_ids=konu_ids or DersService._ders_konu_idleri(ders_id))
+    
+    @staticmethod
+    def update_konular_bulk(ders_id, konu_ids=None, sureler=None):
+        """
+        Dersin konularının sıralarını ve/veya tahmini sürelerini tek işlemde güncelle
+        
+        Her alan için tek bir UPDATE ... CASE ifadesi çalıştırılır ve tek commit
+        yapılır; bağımlı önbellekler (katalog, pano) bir kez geçersiz kılınır.
+        
+        Args:
+            ders_id: Ders ID
+            konu_ids: Dersin tüm konu ID'leri, yeni sıralarıyla (opsiyonel)
+            sureler: Konu ID -> tahmini süre (dakika) sözlüğü (opsiyonel)
+            
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        ders = Ders.query.get(ders_id)
+        if not ders:
+            return {
+                'success': False,
+                'message': 'Ders bulunamadı.'
+            }
+        
+        mevcut = set(DersService._ders_konu_idleri(ders_id))
+        if konu_ids is not None and (len(konu_ids) != len(set(konu_ids)) or set(konu_ids) != mevcut):
+            return {
+                'success': False,
+                'message': 'Sıralama listesi dersin tüm konularını birer kez içermelidir.'
+            }
+        if sureler:
+            if not set(sureler) <= mevcut:
+                return {
+                    'success': False,
+                    'message': 'Süre listesinde bu derse ait olmayan konular var.'
+                }
+            if any(not isinstance(sure, int) or sure <= 0 for sure in sureler.values()):
+                return {
+                    'success': False,
+                    'message': 'Tahmini süreler pozitif tam sayı olmalıdır.'
+                }
+        
+        try:
+            if konu_ids:
+                db.session.execute(
+                    update(Konu)
+                    .where(Konu.ders_id == ders_id)
+                    .values(sira=DersService._sira_ifadesi(konu_ids))
+                    .execution_options(synchronize_session=False)
+                )
+            if sureler:
+                db.session.execute(
+                    update(Konu)
+                    .where(Konu.id.in_(list(sureler)))
+                    .values(tahmini_sure=case(sureler, value=Konu.id))
+                    .execution_options(synchronize_session=False)
+                )
+            db.session.commit()
+            return {
+                'success': True,
+                'message': f'{len(mevcut)} konunun bilgileri başarıyla güncellendi.'
+            }
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Hata oluştu: {str(e)}'
+            }
+    
+    @staticmethod
+    def scale_konu_sureleri(ders_id, carpan=1.0, eklenecek=0):
+        """
+        Dersin tüm konularının tahmini sürelerini tek UPDATE ifadesiyle ölçekle
+        
+        Yeni süre = yuvarla(süre × carpan + eklenecek), en az 1 dakika
+        
+        Args:
+            ders_id: Ders ID
+            carpan: Süre çarpanı (ör. 1.2 ile %20 artış)
+            eklenecek: Her konuya eklenecek dakika (negatif olabilir)
+            
+        Returns:
+            Dict: İşlem sonucunu ve güncellenen konu sayısını içeren sözlük
+        """
+        ders = Ders.query.get(ders_id)
+        if not ders:
+            return {
+                'success': False,
+                'message': 'Ders bulunamadı.'
+            }
+        if carpan <= 0:
+            return {
+                'success': False,
+                'message': 'Çarpan sıfırdan büyük olmalıdır.'
+            }
+        
+        yeni_sure = cast(func.round(Konu.tahmini_sure * carpan + eklenecek), Integer)
+        try:
+            sonuc = db.session.execute(
+                update(Konu)
+                .where(Konu.ders_id == ders_id)
+                .values(tahmini_sure=case((yeni_sure < 1, 1), else_=yeni_sure))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            return {
+                'success': True,
+                'message': f'{sonuc.rowcount} konunun tahmini süresi güncellendi.',
+                'guncellenen': sonuc.rowcount
+            }
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'Hata oluştu: {str(e)}'
+            }
+    
     @staticmethod
     def import_konular_from_text(ders_id, konular_text):
         """
         Metin alanından konuları toplu olarak içe aktar
         
+        Satırlar önce ayrıştırılır, geçerli konular tek INSERT ifadesiyle ve tek
+        işlemde eklenir.
+        
         Args:
             ders_id: Ders ID
             konular_text: Konuların bulunduğu metin
@@ -342,66 +493,56 @@ class DersService:
         # Satırları ayrıştır ve boş satırları temizle
         lines = [line.strip() for line in konular_text.split('\n') if line.strip()]
         
-        # İçe aktarma istatistikleri
-        stats = {
-            'success': 0,
-            'error': 0,
-            'total': len(lines),
-            'errors': []
-        }
-        
         # Son sıra numarasını bul
         max_sira = db.session.query(func.max(Konu.sira)).filter_by(ders_id=ders_id).scalar() or 0
-        current_sira = max_sira + 1
         
-        # Konuları ekle
+        kayitlar = []
+        errors = []
         for line in lines:
-            # Konu adı ve tahmini süre formatı: "Konu adı - 45" (dakika)
-            match = re.match(r'(.+?)\s*-\s*(\d+)$', line)
-            
+            # Konu adı ve tahmini süre; format uyumsuzsa varsayılan süre kullanılır
+            match = KONU_SATIRI.match(line)
             if match:
                 konu_adi = match.group(1).strip()
-                tahmini_sure = int(match.group(2))
-                
-                # Yeni konu oluştur
-                result = DersService.create_konu(
-                    ders_id, konu_adi, tahmini_sure, current_sira
-                )
-                
-                if result['success']:
-                    stats['success'] += 1
-                    current_sira += 1
-                else:
-                    stats['error'] += 1
-                    stats['errors'].append(f"Satır: {line} - {result['message']}")
+                tahmini_sure = int(float(match.group(2).replace(',', '.')))
             else:
-                # Format uyumsuzsa, varsayılan süreyi 45 dakika olarak ayarla
-                konu_adi = line.strip()
-                tahmini_sure = 45
-                
-                # Yeni konu oluştur
-                result = DersService.create_konu(
-                    ders_id, konu_adi, tahmini_sure, current_sira
-                )
-                
-                if result['success']:
-                    stats['success'] += 1
-                    current_sira += 1
-                else:
-                    stats['error'] += 1
-                    stats['errors'].append(f"Satır: {line} - {result['message']}")
+                konu_adi = line
+                tahmini_sure = VARSAYILAN_KONU_SURESI
+            
+            if not konu_adi or tahmini_sure <= 0:
+                errors.append(f"Satır: {line} - Geçersiz konu adı veya süre.")
+                continue
+            
+            kayitlar.append({
+                'ders_id': ders_id,
+                'ad': konu_adi[:200],
+                'tahmini_sure': tahmini_sure,
+                'sira': max_sira + len(kayitlar) + 1
+            })
+        
+        if kayitlar:
+            try:
+                db.session.execute(insert(Konu), kayitlar)
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'message': f'Hata oluştu: {str(e)}'
+                }
         
         # Sonucu döndür
-        if stats['error'] == 0:
+        if not errors:
             return {
                 'success': True,
-                'message': f"Toplam {stats['success']} konu başarıyla içe aktarıldı."
+                'message': f"Toplam {len(kayitlar)} konu başarıyla içe aktarıldı.",
+                'eklenen': len(kayitlar)
             }
         else:
             return {
                 'success': True,
-                'message': f"Toplam {stats['success']} konu içe aktarıldı, {stats['error']} hata oluştu.",
-                'errors': stats['errors']
+                'message': f"Toplam {len(kayitlar)} konu içe aktarıldı, {len(errors)} hata oluştu.",
+                'eklenen': len(kayitlar),
+                'errors': errors
             }
     
     @staticmethod
@@ -0,0 +1,40 @@
+"""
+Görüşme defteri için komut satırı işlemleri
+Örnek: flask gorusme_defteri mebbis-aktar
+"""
+
+import click
+
+from app.blueprints.gorusme_defteri import gorusme_defteri_bp
+from app.blueprints.gorusme_defteri.mebbis import MebbisAktarimService
+from app.blueprints.gorusme_defteri.mebbis_sunucu import MebbisTestSunucusu
+
+@gorusme_defteri_bp.cli.command('mebbis-aktar')
+@click.option('--paket-boyutu', type=int, default=None, help='Paket başına kayıt sayısı')
+def mebbis_aktar(paket_boyutu):
+    """Bekleyen görüşme kayıtlarını MEBBİS'e aktar (yarıda kalan aktarımı sürdürür)"""
+    aktarim, yeni = MebbisAktarimService.aktarim_hazirla()
+    if not yeni:
+        click.echo(f"Aktarım {aktarim.id} zaten devam ediyor.")
+        return
+    
+    sonuc = MebbisAktarimService.calistir(aktarim.id, paket_boyutu=paket_boyutu)
+    click.echo(f"Aktarım {sonuc['aktarim_id']}: {sonuc['durum']} - "
+               f"{sonuc['aktarilan_kayit']}/{sonuc['toplam_kayit']} kayıt, {sonuc['gonderilen_paket']} paket")
+    if sonuc['hata_mesaji']:
+        click.echo(f"Hata: {sonuc['hata_mesaji']}")
+
+@gorusme_defteri_bp.cli.command('mebbis-sunucu')
+@click.option('--host', default='127.0.0.1', help='Dinlenecek adres')
+@click.option('--port', type=int, default=5055, help='Dinlenecek port')
+@click.option('--hata-orani', type=float, default=0.0, help='Rastgele 503 döndürülecek isteklerin oranı (0-1)')
+def mebbis_sunucu(host, port, hata_orani):
+    """Test için yerel MEBBİS sunucusunu çalıştır"""
+    sunucu = MebbisTestSunucusu((host, port), hata_orani=hata_orani)
+    click.echo(f"MEBBİS test sunucusu {sunucu.adres} adresinde çalışıyor (MEBBIS_URL={sunucu.adres})")
+    try:
+        sunucu.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sunucu.server_close()
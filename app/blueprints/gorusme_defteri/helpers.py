@@ -2,128 +2,169 @@
 Görüşme defteri modülü için yardımcı işlevler
 """
 
+import threading
+
+GELISIMSEL = "Ö - Gelişimsel ve Önleyici Hizmetler"
+IYILESTIRICI = "İ - İyileştirici Hizmetler"
+DESTEK = "D - Destek Hizmetler"
+
+# Görüşme konusu kod önekleri -> (hizmet türü, çalışma kategorisi, çalışma alanı)
+# Çalışma alanı None ise görüşme konusunun kendisi çalışma alanı olarak kullanılır.
+KATEGORI_KURALLARI = {
+    "ÖOVEb": (GELISIMSEL, "ÖOV - Bilgi Verme Çalışmaları", "ÖOVE - Akademik Gelişim"),
+    "ÖOVMb": (GELISIMSEL, "ÖOV - Bilgi Verme Çalışmaları", "ÖOVM - Kariyer Gelişimi"),
+    "ÖOVKb": (GELISIMSEL, "ÖOV - Bilgi Verme Çalışmaları", "ÖOVK - Sosyal Duygusal Gelişim"),
+    "B.K": (GELISIMSEL, "ÖOB - Bireyi Tanıma Çalışmaları", None),
+    "ÖOB": (GELISIMSEL, "ÖOB - Bireyi Tanıma Çalışmaları", None),
+    "RAM": (GELISIMSEL, "ÖOB - Bireyi Tanıma Çalışmaları", None),
+    "ÖOYb": (GELISIMSEL, "ÖOY - Yöneltme Ve İzleme", None),
+    "İB": (IYILESTIRICI, "İB - Bireysel Psikolojik Danışma", None),
+    "İPbB": (IYILESTIRICI, "İP - Psikososyal Müdahale", "İPbB - Bildirim Yükümlülüğü"),
+    "İPbİ": (IYILESTIRICI, "İP - Psikososyal Müdahale", "İPbİ - İntihar"),
+    "İPbT": (IYILESTIRICI, "İP - Psikososyal Müdahale", "İPbT - Koruyucu ve Destekleyici Tedbir"),
+    "İS": (IYILESTIRICI, "İS - Sevk (Yönlendirme)", None),
+    "DMÖG": (DESTEK, "DM - Müşavirlik", "DMÖ - Öğretmene Yönelik"),
+    "DMVG": (DESTEK, "DM - Müşavirlik", "DMV - Veliye Yönelik"),
+}
+
+# Görüşme konusu kod önekleri -> görüşülen kişinin rolü
+ROL_KURALLARI = {
+    "DMV": "Veli",
+    "DMÖ": "Öğretmen",
+}
+
+VARSAYILAN_ROL = "Öğrenci"
+
+
+class KonuSiniflandirici:
+    """
+    Görüşme konusu kodlarını en uzun önek eşleşmesiyle kategorilere ayıran sınıflandırıcı
+
+    Kurallar bir kez önek ağacına (trie) derlenir; parametre tablosundaki bilinen
+    konu başlıklarının sonuçları ayrıca önceden hesaplanıp sözlükte tutulur.
+    """
+
+    def __init__(self, kategori_kurallari, rol_kurallari, konular=()):
+        self._kategori_agaci = self._agac_olustur(kategori_kurallari)
+        self._rol_agaci = self._agac_olustur(rol_kurallari)
+        self._bilinen = {konu: self._hesapla(konu) for konu in konular if konu}
+
+    @staticmethod
+    def _agac_olustur(kurallar):
+        """Önek -> değer eşlemesinden karakter bazlı önek ağacı oluştur"""
+        kok = {}
+        for onek, deger in kurallar.items():
+            dugum = kok
+            for karakter in onek:
+                dugum = dugum.setdefault(karakter, {})
+            # None anahtarı, bu düğümde biten önekin değerini tutar
+            dugum[None] = deger
+        return kok
+
+    @staticmethod
+    def _en_uzun_onek(agac, metin):
+        """Metnin başıyla eşleşen en uzun önekin değerini döndür"""
+        dugum = agac
+        bulunan = None
+        for karakter in metin:
+            dugum = dugum.get(karakter)
+            if dugum is None:
+                break
+            bulunan = dugum.get(None, bulunan)
+        return bulunan
+
+    def _hesapla(self, konu):
+        """Bir konu için (hizmet türü, çalışma kategorisi, çalışma alanı, kişi rolü) dörtlüsünü hesapla"""
+        kural = self._en_uzun_onek(self._kategori_agaci, konu)
+        rol = self._en_uzun_onek(self._rol_agaci, konu) or VARSAYILAN_ROL
+
+        if kural is None:
+            return ("", "", "", rol)
+
+        hizmet_turu, calisma_kategorisi, calisma_alani = kural
+        return (hizmet_turu, calisma_kategorisi, calisma_alani or konu, rol)
+
+    def siniflandir(self, konu):
+        """
+        Görüşme konusunu sınıflandır
+
+        Args:
+            konu: Görüşme konusu başlığı
+
+        Returns:
+            Tuple: (hizmet türü, çalışma kategorisi, çalışma alanı, kişi rolü)
+        """
+        sonuc = self._bilinen.get(konu)
+        if sonuc is None:
+            sonuc = self._hesapla(konu)
+        return sonuc
+
+
+_siniflandirici = None
+_siniflandirici_kilidi = threading.Lock()
+
+
+def _yukle_konu_basliklari():
+    """Parametre tablosundaki görüşme konusu başlıklarını getir"""
+    from app.extensions import db
+    from app.blueprints.parametre_yonetimi.models import GorusmeKonusu
+
+    return [baslik for (baslik,) in db.session.query(GorusmeKonusu.baslik).all()]
+
+
+def get_siniflandirici():
+    """
+    Derlenmiş görüşme konusu sınıflandırıcısını getir (gerekirse oluştur)
+
+    Returns:
+        KonuSiniflandirici: İşlem genelinde paylaşılan sınıflandırıcı
+    """
+    global _siniflandirici
+
+    siniflandirici = _siniflandirici
+    if siniflandirici is None:
+        with _siniflandirici_kilidi:
+            if _siniflandirici is None:
+                _siniflandirici = KonuSiniflandirici(
+                    KATEGORI_KURALLARI, ROL_KURALLARI, _yukle_konu_basliklari()
+                )
+            siniflandirici = _siniflandirici
+    return siniflandirici
+
+
+def invalidate_categories():
+    """Görüşme konuları değiştiğinde sınıflandırıcının bir sonraki kullanımda yeniden derlenmesini sağla"""
+    global _siniflandirici
+    _siniflandirici = None
+
+
 def get_categories(meeting_topic: str, meeting_type: str = "") -> dict:
     """
     Görüşme konusuna göre kategorileri belirler
-    
+
     Args:
         meeting_topic: Görüşme konusu
         meeting_type: Görüşme şekli (Yüzyüze, Telefon, vb.)
-        
+
     Returns:
         Dict: Kategori bilgilerini içeren sözlük
     """
-    categories = {
-        "hizmet_turu": "",
-        "calisma_kategorisi": "",
-        "calisma_alani": "",
-        "kisi_rolu": "Öğrenci",  # Varsayılan rol
+    if not meeting_topic:
+        return {
+            "hizmet_turu": "",
+            "calisma_kategorisi": "",
+            "calisma_alani": "",
+            "kisi_rolu": VARSAYILAN_ROL,
+            "calisma_yontemi": meeting_type
+        }
+
+    hizmet_turu, calisma_kategorisi, calisma_alani, kisi_rolu = get_siniflandirici().siniflandir(meeting_topic)
+
+    return {
+        "hizmet_turu": hizmet_turu,
+        "calisma_kategorisi": calisma_kategorisi,
+        "calisma_alani": calisma_alani,
+        "kisi_rolu": kisi_rolu,
         "calisma_yontemi": meeting_type  # Görüşme şekli
     }
 
-    if not meeting_topic:
-        return categories
-        
-    # Kişi rolü belirleme
-    if meeting_topic.startswith(("DMV", "DMVG")):
-        categories["kisi_rolu"] = "Veli"
-    elif meeting_topic.startswith(("DMÖ", "DMÖG")):
-        categories["kisi_rolu"] = "Öğretmen"
-
-    # ÖOVE - Akademik Gelişim kategorisi
-    if meeting_topic.startswith("ÖOVEb"):
-        categories.update({
-            "hizmet_turu": "Ö - Gelişimsel ve Önleyici Hizmetler",
-            "calisma_kategorisi": "ÖOV - Bilgi Verme Çalışmaları",
-            "calisma_alani": "ÖOVE - Akademik Gelişim"
-        })
-        
-    # ÖOVM - Kariyer Gelişimi kategorisi    
-    elif meeting_topic.startswith("ÖOVMb"):
-        categories.update({
-            "hizmet_turu": "Ö - Gelişimsel ve Önleyici Hizmetler",
-            "calisma_kategorisi": "ÖOV - Bilgi Verme Çalışmaları", 
-            "calisma_alani": "ÖOVM - Kariyer Gelişimi"
-        })
-        
-    # ÖOVK - Sosyal Duygusal Gelişim kategorisi
-    elif meeting_topic.startswith("ÖOVKb"):
-        categories.update({
-            "hizmet_turu": "Ö - Gelişimsel ve Önleyici Hizmetler",
-            "calisma_kategorisi": "ÖOV - Bilgi Verme Çalışmaları",
-            "calisma_alani": "ÖOVK - Sosyal Duygusal Gelişim"
-        })
-        
-    # ÖOB - Bireyi Tanıma Çalışmaları kategorisi
-    elif meeting_topic.startswith(("B.K", "ÖOB", "RAM")):
-        categories.update({
-            "hizmet_turu": "Ö - Gelişimsel ve Önleyici Hizmetler",
-            "calisma_kategorisi": "ÖOB - Bireyi Tanıma Çalışmaları",
-            "calisma_alani": meeting_topic
-        })
-        
-    # ÖOY - Yöneltme Ve İzleme kategorisi
-    elif meeting_topic.startswith("ÖOYb"):
-        categories.update({
-            "hizmet_turu": "Ö - Gelişimsel ve Önleyici Hizmetler",
-            "calisma_kategorisi": "ÖOY - Yöneltme Ve İzleme",
-            "calisma_alani": meeting_topic
-        })
-        
-    # İB - Bireysel Psikolojik Danışma kategorisi
-    elif meeting_topic.startswith("İB"):
-        categories.update({
-            "hizmet_turu": "İ - İyileştirici Hizmetler",
-            "calisma_kategorisi": "İB - Bireysel Psikolojik Danışma",
-            "calisma_alani": meeting_topic
-        })
-        
-    # İPbB - Bildirim Yükümlülüğü kategorisi
-    elif meeting_topic.startswith("İPbB"):
-        categories.update({
-            "hizmet_turu": "İ - İyileştirici Hizmetler",
-            "calisma_kategorisi": "İP - Psikososyal Müdahale",
-            "calisma_alani": "İPbB - Bildirim Yükümlülüğü"
-        })
-        
-    # İPbİ - İntihar kategorisi
-    elif meeting_topic.startswith("İPbİ"):
-        categories.update({
-            "hizmet_turu": "İ - İyileştirici Hizmetler",
-            "calisma_kategorisi": "İP - Psikososyal Müdahale",
-            "calisma_alani": "İPbİ - İntihar"
-        })
-        
-    # İPbT - Koruyucu ve Destekleyici Tedbir kategorisi
-    elif meeting_topic.startswith("İPbT"):
-        categories.update({
-            "hizmet_turu": "İ - İyileştirici Hizmetler",
-            "calisma_kategorisi": "İP - Psikososyal Müdahale",
-            "calisma_alani": "İPbT - Koruyucu ve Destekleyici Tedbir"
-        })
-        
-    # İS - Sevk (Yönlendirme) kategorisi
-    elif meeting_topic.startswith("İS"):
-        categories.update({
-            "hizmet_turu": "İ - İyileştirici Hizmetler",
-            "calisma_kategorisi": "İS - Sevk (Yönlendirme)",
-            "calisma_alani": meeting_topic
-        })
-        
-    # DMÖG - Öğretmene Yönelik kategorisi
-    elif meeting_topic.startswith("DMÖG"):
-        categories.update({
-            "hizmet_turu": "D - Destek Hizmetler",
-            "calisma_kategorisi": "DM - Müşavirlik",
-            "calisma_alani": "DMÖ - Öğretmene Yönelik"
-        })
-        
-    # DMVG - Veliye Yönelik kategorisi
-    elif meeting_topic.startswith("DMVG"):
-        categories.update({
-            "hizmet_turu": "D - Destek Hizmetler",
-            "calisma_kategorisi": "DM - Müşavirlik",
-            "calisma_alani": "DMV - Veliye Yönelik"
-        })
-
-    return categories
\ No newline at end of file
@@ -0,0 +1,332 @@
+"""
+MEBBİS aktarım modülü
+Aktarılmamış görüşme kayıtlarını paketler halinde MEBBİS'e gönderir. Her paket
+kalıcı (keep-alive) bir HTTP bağlantısı üzerinden, tekrar denemeli ve
+idempotency anahtarıyla gönderilir; başarılı paketler tek bir UPDATE ile
+işaretlenir ve aktarım kaldığı yerden devam edebilir.
+"""
+
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from flask import current_app
+from sqlalchemy import func, or_, select, update
+
+from app.extensions import db
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.gorusme_defteri.models import GorusmeKaydi, MebbisAktarim
+
+logger = logging.getLogger(__name__)
+
+# Bu süre boyunca ilerleme kaydetmeyen "calisiyor" durumundaki aktarımlar yarıda kalmış sayılır
+ASILI_AKTARIM_SURESI = timedelta(minutes=5)
+
+
+class MebbisHatasi(Exception):
+    """MEBBİS'e gönderim başarısız olduğunda fırlatılır"""
+
+
+class MebbisIstemcisi:
+    """MEBBİS toplu görüşme servisine kalıcı bağlantı üzerinden istek gönderen istemci"""
+
+    def __init__(self, adres, anahtar=None, zaman_asimi=30, deneme_sayisi=3, bekleme_suresi=1.0):
+        parcalar = urlsplit(adres)
+        self._https = parcalar.scheme == 'https'
+        self._sunucu = parcalar.netloc
+        self._yol = (parcalar.path.rstrip('/') or '') + '/api/gorusmeler/toplu'
+        self._anahtar = anahtar
+        self._zaman_asimi = zaman_asimi
+        self._deneme_sayisi = deneme_sayisi
+        self._bekleme_suresi = bekleme_suresi
+        self._baglanti = None
+
+    def _baglan(self):
+        if self._https:
+            return http.client.HTTPSConnection(self._sunucu, timeout=self._zaman_asimi)
+        return http.client.HTTPConnection(self._sunucu, timeout=self._zaman_asimi)
+
+    def kapat(self):
+        """Açık bağlantıyı kapat"""
+        if self._baglanti is not None:
+            self._baglanti.close()
+            self._baglanti = None
+
+    def gonder(self, kayitlar, idempotency_anahtari):
+        """
+        Bir paket görüşme kaydını gönder
+
+        Ağ hatalarında, 429 ve 5xx yanıtlarında artan beklemeyle tekrar dener.
+        Aynı paket aynı anahtarla tekrar gönderildiğinde sunucu onu yinelenen
+        istek olarak tanır.
+
+        Args:
+            kayitlar: Serileştirilmiş görüşme kayıtları
+            idempotency_anahtari: Pakete özgü, deterministik anahtar
+
+        Returns:
+            Dict: Sunucu yanıtı
+        """
+        govde = json.dumps({'kayitlar': kayitlar}, ensure_ascii=False).encode('utf-8')
+        basliklar = {
+            'Content-Type': 'application/json; charset=utf-8',
+            'Idempotency-Key': idempotency_anahtari,
+        }
+        if self._anahtar:
+            basliklar['Authorization'] = f'Bearer {self._anahtar}'
+
+        son_hata = None
+        for deneme in range(1, self._deneme_sayisi + 1):
+            try:
+                if self._baglanti is None:
+                    self._baglanti = self._baglan()
+                self._baglanti.request('POST', self._yol, body=govde, headers=basliklar)
+                yanit = self._baglanti.getresponse()
+                icerik = yanit.read()
+
+                if yanit.status < 300:
+                    return json.loads(icerik) if icerik else {}
+                if yanit.status != 429 and yanit.status < 500:
+                    # İstemci hataları tekrar denemeyle düzelmez
+                    raise MebbisHatasi(f"MEBBİS isteği reddetti ({yanit.status}): {icerik[:200].decode('utf-8', 'replace')}")
+                son_hata = f"MEBBİS geçici hata döndürdü ({yanit.status})"
+            except (OSError, http.client.HTTPException) as e:
+                self.kapat()
+                son_hata = f"MEBBİS bağlantı hatası: {str(e)}"
+
+            if deneme < self._deneme_sayisi:
+                time.sleep(self._bekleme_suresi * 2 ** (deneme - 1))
+
+        raise MebbisHatasi(f"{son_hata} ({self._deneme_sayisi} deneme)")
+
+
+def _bekleyen_kosulu():
+    """MEBBİS'e aktarılmamış kayıtlar için filtre koşulu"""
+    return or_(GorusmeKaydi.mebbis_aktarildi == False, GorusmeKaydi.mebbis_aktarildi.is_(None))  # noqa: E712
+
+
+def _paket_anahtari(kayit_idleri):
+    """Aynı kayıt kümesi için her zaman aynı olan idempotency anahtarını üret"""
+    ozet = hashlib.sha256(','.join(str(kayit_id) for kayit_id in kayit_idleri).encode('ascii'))
+    return f"gorusme-{kayit_idleri[0]}-{kayit_idleri[-1]}-{ozet.hexdigest()[:16]}"
+
+
+def _serilestir(satir):
+    """Görüşme kaydı satırını MEBBİS paket formatına çevir"""
+    return {
+        'kayit_id': satir['id'],
+        'ogrenci_numarasi': satir['numara'],
+        'tarih': satir['tarih'].isoformat(),
+        'baslangic_saati': satir['baslangic_saati'].strftime('%H:%M') if satir['baslangic_saati'] else None,
+        'bitis_saati': satir['bitis_saati'].strftime('%H:%M') if satir['bitis_saati'] else None,
+        'gorusme_sayisi': satir['gorusme_sayisi'],
+        'gorusulen_kisi': satir['gorusulen_kisi'],
+        'kisi_rolu': satir['kisi_rolu'],
+        'yakinlik_derecesi': satir['yakinlik_derecesi'],
+        'gorusme_konusu': satir['gorusme_konusu'],
+        'calisma_alani': satir['calisma_alani'],
+        'calisma_kategorisi': satir['calisma_kategorisi'],
+        'hizmet_turu': satir['hizmet_turu'],
+        'kurum_isbirligi': satir['kurum_isbirligi'],
+        'gorusme_yeri': satir['gorusme_yeri'],
+        'disiplin_gorusmesi': bool(satir['disiplin_gorusmesi']),
+        'adli_sevk': bool(satir['adli_sevk']),
+        'calisma_yontemi': satir['calisma_yontemi'],
+        # Görüşme özeti (ozet) gizlilik gereği MEBBİS'e gönderilmez
+    }
+
+
+class MebbisAktarimService:
+    """MEBBİS aktarım işlerini yöneten servis sınıfı"""
+
+    # Kilit ve iş parçacığı kaydı süreç içidir: uygulama tek süreçte (tek worker)
+    # çalıştığı varsayılır. Birden fazla worker'da süreçler arası tek koruma,
+    # aktarim_hazirla'daki "calisiyor" kontrolüdür ve bu kontrol atomik değildir.
+    _is_parcaciklari = {}
+    _kilit = threading.Lock()
+
+    @staticmethod
+    def aktarim_durumu(aktarim):
+        """Aktarım kaydını API yanıtı için sözlüğe çevir"""
+        return {
+            'aktarim_id': aktarim.id,
+            'durum': aktarim.durum,
+            'toplam_kayit': aktarim.toplam_kayit,
+            'aktarilan_kayit': aktarim.aktarilan_kayit,
+            'gonderilen_paket': aktarim.gonderilen_paket,
+            'son_kayit_id': aktarim.son_kayit_id,
+            'hata_mesaji': aktarim.hata_mesaji,
+            'baslangic_zamani': aktarim.baslangic_zamani.isoformat() if aktarim.baslangic_zamani else None,
+            'bitis_zamani': aktarim.bitis_zamani.isoformat() if aktarim.bitis_zamani else None,
+        }
+
+    @staticmethod
+    def get_aktarim(aktarim_id):
+        """ID'ye göre aktarım kaydını getir"""
+        return MebbisAktarim.query.get(aktarim_id)
+
+    @staticmethod
+    def istemci_olustur():
+        """Uygulama ayarlarından MEBBİS istemcisini oluştur (adres tanımlı değilse None)"""
+        adres = current_app.config.get("MEBBIS_URL")
+        if not adres:
+            return None
+        return MebbisIstemcisi(adres, anahtar=current_app.config.get("MEBBIS_TOKEN"))
+
+    @staticmethod
+    def aktarim_hazirla():
+        """
+        Yeni bir aktarım başlat ya da yarıda kalan son aktarımı kaldığı yerden sürdür
+
+        Returns:
+            Tuple: (MebbisAktarim, yeni_mi) - zaten çalışan bir aktarım varsa (aktarim, False)
+        """
+        son = MebbisAktarim.query.order_by(MebbisAktarim.id.desc()).first()
+
+        if son and son.durum == 'calisiyor':
+            if son.son_guncelleme and datetime.now() - son.son_guncelleme < ASILI_AKTARIM_SURESI:
+                return son, False
+            # İşlem yarıda kesilmiş (ör. worker yeniden başlamış), kaldığı yerden devam edilir
+            return son, True
+
+        if son and son.durum == 'hata':
+            son.durum = 'bekliyor'
+            son.hata_mesaji = None
+            db.session.commit()
+            return son, True
+
+        aktarim = MebbisAktarim(durum='bekliyor')
+        db.session.add(aktarim)
+        db.session.commit()
+        return aktarim, True
+
+    @staticmethod
+    def arka_planda_baslat():
+        """
+        Aktarımı web isteğini bekletmeden arka plan iş parçacığında başlat
+
+        Zaten çalışan bir aktarım varsa success False döner; yanıt yine de
+        izlenebilmesi için çalışan aktarımın durumunu içerir.
+
+        Returns:
+            Dict: İşlem sonucunu ve aktarım durumunu içeren sözlük
+        """
+        if not current_app.config.get("MEBBIS_URL"):
+            return {
+                "success": False,
+                "message": "MEBBİS adresi (MEBBIS_URL) tanımlı değil."
+            }
+
+        with MebbisAktarimService._kilit:
+            aktarim, yeni = MebbisAktarimService.aktarim_hazirla()
+            calisan = MebbisAktarimService._is_parcaciklari.get(aktarim.id)
+
+            zaten_calisiyor = not yeni or (calisan and calisan.is_alive())
+            if not zaten_calisiyor:
+                app = current_app._get_current_object()
+                is_parcacigi = threading.Thread(
+                    target=MebbisAktarimService._arka_plan_calistir,
+                    args=(app, aktarim.id),
+                    name=f"mebbis-aktarim-{aktarim.id}",
+                    daemon=True
+                )
+                MebbisAktarimService._is_parcaciklari[aktarim.id] = is_parcacigi
+                is_parcacigi.start()
+                mesaj = "MEBBİS aktarımı arka planda başlatıldı."
+            else:
+                mesaj = "MEBBİS aktarımı zaten devam ediyor."
+
+        return {
+            "success": not zaten_calisiyor,
+            "message": mesaj,
+            **MebbisAktarimService.aktarim_durumu(aktarim)
+        }
+
+    @staticmethod
+    def _arka_plan_calistir(app, aktarim_id):
+        with app.app_context():
+            try:
+                MebbisAktarimService.calistir(aktarim_id)
+            finally:
+                db.session.remove()
+                MebbisAktarimService._is_parcaciklari.pop(aktarim_id, None)
+
+    @staticmethod
+    def calistir(aktarim_id, istemci=None, paket_boyutu=None):
+        """
+        Bekleyen görüşme kayıtlarını paketler halinde gönder
+
+        Kayıtlar ID sırasıyla, kaldığı yerin (son_kayit_id) ötesinden okunur.
+        Her başarılı paketten sonra kayıtlar tek UPDATE ile işaretlenir ve
+        kaldığı yer aynı transaction içinde ilerletilir.
+
+        Args:
+            aktarim_id: MebbisAktarim ID
+            istemci: MebbisIstemcisi (None ise ayarlardan oluşturulur)
+            paket_boyutu: Paket başına kayıt sayısı (None ise MEBBIS_BATCH_SIZE)
+
+        Returns:
+            Dict: Aktarım durumu
+        """
+        aktarim = MebbisAktarim.query.get(aktarim_id)
+        istemci = istemci or MebbisAktarimService.istemci_olustur()
+        paket_boyutu = paket_boyutu or current_app.config.get("MEBBIS_BATCH_SIZE", 200)
+
+        if istemci is None:
+            aktarim.durum = 'hata'
+            aktarim.hata_mesaji = "MEBBİS adresi (MEBBIS_URL) tanımlı değil."
+            db.session.commit()
+            return MebbisAktarimService.aktarim_durumu(aktarim)
+
+        aktarim.durum = 'calisiyor'
+        aktarim.toplam_kayit = (aktarim.aktarilan_kayit or 0) + db.session.query(func.count(GorusmeKaydi.id)).filter(
+            _bekleyen_kosulu(), GorusmeKaydi.id > aktarim.son_kayit_id
+        ).scalar()
+        db.session.commit()
+
+        sorgu = select(
+            GorusmeKaydi.__table__, Ogrenci.numara
+        ).select_from(GorusmeKaydi).outerjoin(
+            Ogrenci, GorusmeKaydi.ogrenci_id == Ogrenci.id
+        ).where(_bekleyen_kosulu()).order_by(GorusmeKaydi.id).limit(paket_boyutu)
+
+        try:
+            while True:
+                satirlar = db.session.execute(
+                    sorgu.where(GorusmeKaydi.id > aktarim.son_kayit_id)
+                ).mappings().all()
+                if not satirlar:
+                    break
+
+                kayit_idleri = [satir['id'] for satir in satirlar]
+                istemci.gonder([_serilestir(satir) for satir in satirlar], _paket_anahtari(kayit_idleri))
+
+                db.session.execute(
+                    update(GorusmeKaydi).where(GorusmeKaydi.id.in_(kayit_idleri)).values(
+                        mebbis_aktarildi=True,
+                        mebbis_aktarim_tarihi=datetime.now()
+                    ).execution_options(synchronize_session=False)
+                )
+                aktarim.son_kayit_id = kayit_idleri[-1]
+                aktarim.aktarilan_kayit = (aktarim.aktarilan_kayit or 0) + len(kayit_idleri)
+                aktarim.gonderilen_paket = (aktarim.gonderilen_paket or 0) + 1
+                db.session.commit()
+
+            aktarim.durum = 'tamamlandi'
+            aktarim.bitis_zamani = datetime.now()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"MEBBİS aktarım hatası (aktarım {aktarim_id}, kaldığı yer {aktarim.son_kayit_id}): {str(e)}")
+            aktarim.durum = 'hata'
+            aktarim.hata_mesaji = str(e)
+            db.session.commit()
+        finally:
+            istemci.kapat()
+
+        return MebbisAktarimService.aktarim_durumu(aktarim)
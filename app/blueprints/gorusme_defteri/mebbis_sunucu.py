@@ -0,0 +1,90 @@
+"""
+Yerel MEBBİS test sunucusu
+Gerçek MEBBİS yerine geliştirme ve test ortamında kullanılan, toplu görüşme
+paketlerini kabul eden basit bir HTTP sunucusu. Aynı idempotency anahtarıyla
+gelen tekrar istekleri yinelenen kayıt oluşturmadan yanıtlar; isteğe bağlı
+olarak rastgele geçici hatalar üretebilir.
+
+Örnek: flask gorusme_defteri mebbis-sunucu --port 5055 --hata-orani 0.2
+"""
+
+import json
+import logging
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+TOPLU_GORUSME_YOLU = '/api/gorusmeler/toplu'
+
+
+class _MebbisIstekIsleyici(BaseHTTPRequestHandler):
+    # Keep-alive bağlantıların desteklenmesi için
+    protocol_version = 'HTTP/1.1'
+
+    def _yanitla(self, durum, veri):
+        icerik = json.dumps(veri, ensure_ascii=False).encode('utf-8')
+        self.send_response(durum)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(icerik)))
+        self.end_headers()
+        self.wfile.write(icerik)
+
+    def do_POST(self):
+        uzunluk = int(self.headers.get('Content-Length', 0))
+        govde = self.rfile.read(uzunluk)
+
+        if self.path.rstrip('/') != TOPLU_GORUSME_YOLU:
+            return self._yanitla(404, {'hata': 'Bulunamadı'})
+
+        anahtar = self.headers.get('Idempotency-Key')
+        if not anahtar:
+            return self._yanitla(400, {'hata': 'Idempotency-Key başlığı zorunludur'})
+
+        try:
+            kayitlar = json.loads(govde)['kayitlar']
+        except (ValueError, KeyError):
+            return self._yanitla(400, {'hata': 'Geçersiz paket'})
+
+        sunucu = self.server
+        with sunucu.kilit:
+            if anahtar in sunucu.paketler:
+                return self._yanitla(200, dict(sunucu.paketler[anahtar], tekrar=True))
+
+            if random.random() < sunucu.hata_orani:
+                return self._yanitla(503, {'hata': 'Servis geçici olarak kullanılamıyor'})
+
+            yanit = {'paket_no': len(sunucu.paketler) + 1, 'kabul_edilen': len(kayitlar)}
+            sunucu.paketler[anahtar] = yanit
+            sunucu.kayitlar.extend(kayitlar)
+
+        return self._yanitla(200, yanit)
+
+    def log_message(self, format, *args):
+        logger.debug("MEBBİS test sunucusu: " + format, *args)
+
+
+class MebbisTestSunucusu(ThreadingHTTPServer):
+    """Toplu görüşme paketlerini bellekte tutan yerel MEBBİS yerine geçen sunucu"""
+
+    daemon_threads = True
+
+    def __init__(self, adres=('127.0.0.1', 5055), hata_orani=0.0):
+        super().__init__(adres, _MebbisIstekIsleyici)
+        self.hata_orani = hata_orani
+        self.kilit = threading.Lock()
+        self.paketler = {}
+        self.kayitlar = []
+
+    @property
+    def adres(self):
+        """İstemcinin kullanacağı temel adres"""
+        sunucu, port = self.server_address[:2]
+        return f"http://{sunucu}:{port}"
+
+    def arka_planda_baslat(self):
+        """Sunucuyu ayrı bir iş parçacığında çalıştır (testler için)"""
+        is_parcacigi = threading.Thread(target=self.serve_forever, name='mebbis-test-sunucusu', daemon=True)
+        is_parcacigi.start()
+        return is_parcacigi
@@ -9,13 +9,17 @@ from sqlalchemy.orm import relationship
 class GorusmeKaydi(db.Model):
     """Rehberlik görüşme kayıtları."""
     __tablename__ = 'gorusme_kayitlari'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Öğrenci bazlı görüşme sıra numaralarının artımlı güncellenmesi için
+        db.Index('ix_gorusme_kayitlari_ogrenci_tarih', 'ogrenci_id', 'tarih', 'id'),
+        {'extend_existing': True}
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=True)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=True)
     
     # Görüşme bilgileri
-    tarih = db.Column(db.Date, nullable=False, default=datetime.now().date)
+    tarih = db.Column(db.Date, nullable=False, default=datetime.now().date, index=True)
     baslangic_saati = db.Column(db.Time, nullable=False)
     bitis_saati = db.Column(db.Time, nullable=False)
     gorusme_sayisi = db.Column(db.Integer, default=1)
@@ -48,4 +52,25 @@ class GorusmeKaydi(db.Model):
     # İlişkiler - Öğrenci model ilişkisini burada tanımlayacağız
     
     def __repr__(self):
-        return f"<GorusmeKaydi id={self.id} tarih={self.tarih} ogrenci_id={self.ogrenci_id}>"
\ No newline at end of file
+        return f"<GorusmeKaydi id={self.id} tarih={self.tarih} ogrenci_id={self.ogrenci_id}>"
+
+class MebbisAktarim(db.Model):
+    """MEBBİS'e toplu görüşme aktarım işleri ve kaldığı yer bilgisi."""
+    __tablename__ = 'mebbis_aktarimlari'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    durum = db.Column(db.String(20), nullable=False, default='bekliyor')  # bekliyor, calisiyor, tamamlandi, hata
+    baslangic_zamani = db.Column(db.DateTime, default=datetime.now)
+    son_guncelleme = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    bitis_zamani = db.Column(db.DateTime)
+    
+    # Kaldığı yer: başarıyla gönderilen son görüşme kaydının ID'si
+    son_kayit_id = db.Column(db.Integer, nullable=False, default=0)
+    toplam_kayit = db.Column(db.Integer, default=0)
+    aktarilan_kayit = db.Column(db.Integer, default=0)
+    gonderilen_paket = db.Column(db.Integer, default=0)
+    hata_mesaji = db.Column(db.Text)
+    
+    def __repr__(self):
+        return f"<MebbisAktarim id={self.id} durum={self.durum} son_kayit_id={self.son_kayit_id}>"
@@ -2,7 +2,7 @@
 Görüşme Defteri blueprint'i için route tanımlamaları.
 """
 
-from flask import render_template, request, redirect, url_for, flash, jsonify
+from flask import render_template, request, redirect, url_for, flash, jsonify, current_app
 from datetime import datetime
 from app.blueprints.gorusme_defteri import gorusme_defteri_bp
 from app.blueprints.gorusme_defteri.services import GorusmeService
@@ -11,6 +11,9 @@ from app.blueprints.ogrenci_yonetimi.models import Ogrenci
 from app.blueprints.parametre_yonetimi.models import GorusmeKonusu
 from app.utils.auth import admin_required
 
+VARSAYILAN_SAYFA_BOYUTU = 50
+EN_BUYUK_SAYFA_BOYUTU = 500
+
 @gorusme_defteri_bp.route('/')
 def index():
     """Görüşme Defteri ana sayfası"""
@@ -31,8 +34,29 @@ def get_gorusme_kayitlari():
             ay = int(ay)
         except ValueError:
             return jsonify({"error": "Geçersiz ay değeri"}), 400
+        if not 1 <= ay <= 12:
+            return jsonify({"error": "Geçersiz ay değeri"}), 400
     
-    kayitlar = GorusmeService.get_all_gorusme_kayitlari(ay=ay)
+    yil = request.args.get('yil')
+    if yil:
+        try:
+            yil = int(yil)
+        except ValueError:
+            return jsonify({"error": "Geçersiz yıl değeri"}), 400
+        # Yıl aralığı sonraki yılın başına kadar hesaplandığından 9998 üst sınırdır
+        if not 1 <= yil <= 9998:
+            return jsonify({"error": "Geçersiz yıl değeri"}), 400
+    else:
+        yil = None
+    
+    # Sayfalama parametreleri verilmezse tüm kayıtlar liste olarak döndürülür
+    sayfa = request.args.get('sayfa', type=int)
+    sayfa_boyutu = request.args.get('sayfa_boyutu', type=int)
+    if sayfa is not None:
+        sayfa = max(sayfa, 1)
+        sayfa_boyutu = min(max(sayfa_boyutu or VARSAYILAN_SAYFA_BOYUTU, 1), EN_BUYUK_SAYFA_BOYUTU)
+    
+    kayitlar = GorusmeService.get_all_gorusme_kayitlari(ay=ay, yil=yil, sayfa=sayfa, sayfa_boyutu=sayfa_boyutu)
     
     # API yanıtı için görüşme verilerini serialize et
     kayitlar_json = []
@@ -64,13 +88,61 @@ def get_gorusme_kayitlari():
             "mebbisStatus": "Aktarıldı" if kayit.mebbis_aktarildi else "Bekliyor"
         })
     
-    return jsonify(kayitlar_json)
+    if sayfa is None:
+        return jsonify(kayitlar_json)
+    
+    # Sayfalı yanıtta istemcinin ne zaman duracağını bilmesi için toplam sayı da döndürülür
+    toplam = GorusmeService.count_gorusme_kayitlari(ay=ay, yil=yil)
+    return jsonify({
+        "kayitlar": kayitlar_json,
+        "sayfa": sayfa,
+        "sayfaBoyutu": sayfa_boyutu,
+        "toplam": toplam,
+        "hasMore": sayfa * sayfa_boyutu < toplam
+    })
+
+@gorusme_defteri_bp.route('/api/meeting-heatmap')
+def get_gorusme_isi_haritasi():
+    """Bir yıl için günlük görüşme sayılarını getir - takvim ısı haritası API endpointi"""
+    yil = request.args.get('yil')
+    if yil:
+        try:
+            yil = int(yil)
+        except ValueError:
+            return jsonify({"error": "Geçersiz yıl değeri"}), 400
+        if not 1 <= yil <= 9998:
+            return jsonify({"error": "Geçersiz yıl değeri"}), 400
+    else:
+        yil = datetime.now().year
+    
+    gunler = GorusmeService.get_gunluk_gorusme_sayilari(yil)
+    
+    return jsonify({
+        "yil": yil,
+        "toplam": sum(gunler.values()),
+        "gunler": gunler
+    })
 
 @gorusme_defteri_bp.route('/api/sync-mebbis', methods=['POST'])
 def sync_mebbis():
     """MEBBİS senkronizasyon endpoint'i"""
     result = GorusmeService.sync_mebbis()
-    return jsonify(result)
+    if result.get('success'):
+        return jsonify(result), 202
+    if result.get('aktarim_id'):
+        # Zaten çalışan bir aktarım var; istemci onun durumunu izleyebilir
+        return jsonify(result), 409
+    if not current_app.config.get("MEBBIS_URL"):
+        return jsonify(result), 503
+    return jsonify(result), 500
+
+@gorusme_defteri_bp.route('/api/sync-mebbis/<int:aktarim_id>')
+def sync_mebbis_durum(aktarim_id):
+    """MEBBİS aktarım durumu endpoint'i"""
+    durum = GorusmeService.get_mebbis_aktarim_durumu(aktarim_id)
+    if durum is None:
+        return jsonify({"success": False, "message": "Aktarım bulunamadı."}), 404
+    return jsonify({"success": True, **durum})
 
 @gorusme_defteri_bp.route('/api/delete/<int:kayit_id>', methods=['DELETE'])
 def delete_gorusme(kayit_id):
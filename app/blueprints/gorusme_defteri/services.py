@@ -3,8 +3,10 @@ Görüşme Defteri işlemleri için servis modülü
 Bu modül, görüşme kayıtları ile ilgili iş mantığı işlemlerini gerçekleştirir.
 """
 
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from flask import current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
 from app.blueprints.gorusme_defteri.models import GorusmeKaydi
@@ -12,6 +14,27 @@ from app.blueprints.gorusme_defteri.models import GorusmeKaydi
 class GorusmeService:
     """Görüşme kayıtları işlemlerini yöneten servis sınıfı"""
     
+    @staticmethod
+    def _gun(tarih):
+        """datetime değerlerini date'e çevir (tarih sütunu Date tipindedir)"""
+        return tarih.date() if isinstance(tarih, datetime) else tarih
+    
+    @staticmethod
+    def ay_araligi(yil, ay):
+        """
+        Bir ayı kapsayan yarı açık tarih aralığını döndür
+        
+        Args:
+            yil: Yıl
+            ay: Ay numarası (1-12)
+            
+        Returns:
+            Tuple: (ayın ilk günü, sonraki ayın ilk günü)
+        """
+        baslangic = date(yil, ay, 1)
+        bitis = date(yil + 1, 1, 1) if ay == 12 else date(yil, ay + 1, 1)
+        return baslangic, bitis
+    
     @staticmethod
     def get_gorusme_sayisi(baslangic_tarihi, bitis_tarihi):
         """
@@ -19,15 +42,16 @@ class GorusmeService:
         
         Args:
             baslangic_tarihi: Başlangıç tarihi
-            bitis_tarihi: Bitiş tarihi
+            bitis_tarihi: Bitiş tarihi (dahil)
             
         Returns:
             int: Görüşme sayısı
         """
-        return GorusmeKaydi.query.filter(
-            GorusmeKaydi.tarih >= baslangic_tarihi,
-            GorusmeKaydi.tarih <= bitis_tarihi
-        ).count()
+        # Bitiş günü dahil olacak şekilde [başlangıç, bitiş + 1 gün) aralığı indeksli tarih sütununda taranır
+        return db.session.query(func.count(GorusmeKaydi.id)).filter(
+            GorusmeKaydi.tarih >= GorusmeService._gun(baslangic_tarihi),
+            GorusmeKaydi.tarih < GorusmeService._gun(bitis_tarihi) + timedelta(days=1)
+        ).scalar()
     
     @staticmethod
     def get_gorusmeler_by_date(tarih):
@@ -40,10 +64,31 @@ class GorusmeService:
         Returns:
             List: Görüşme kayıtlarının listesi
         """
-        return GorusmeKaydi.query.filter(
-            GorusmeKaydi.tarih == tarih
+        return GorusmeKaydi.query.options(joinedload(GorusmeKaydi.ogrenci)).filter(
+            GorusmeKaydi.tarih == GorusmeService._gun(tarih)
         ).order_by(GorusmeKaydi.baslangic_saati).all()
     
+    @staticmethod
+    def get_gunluk_gorusme_sayilari(yil):
+        """
+        Bir yıl içindeki günlük görüşme sayılarını tek bir gruplanmış sorgu ile getir
+        (Takvim ısı haritası için)
+        
+        Args:
+            yil: Yıl
+            
+        Returns:
+            Dict: {'YYYY-MM-DD': görüşme sayısı} şeklinde sözlük (görüşme olmayan günler yer almaz)
+        """
+        sonuclar = db.session.query(
+            GorusmeKaydi.tarih, func.count(GorusmeKaydi.id)
+        ).filter(
+            GorusmeKaydi.tarih >= date(yil, 1, 1),
+            GorusmeKaydi.tarih < date(yil + 1, 1, 1)
+        ).group_by(GorusmeKaydi.tarih).all()
+        
+        return {tarih.isoformat(): sayi for tarih, sayi in sonuclar}
+    
     @staticmethod
     def calculate_meeting_counts():
         """
@@ -52,19 +97,14 @@ class GorusmeService:
         Returns:
             Dict: {ogrenci_id: görüşme_sayısı} şeklinde sözlük
         """
-        # Öğrenci ID'lere göre kayıt sayılarını hesapla
-        ogrenci_gorusme_sayilari = {}
+        # Sayım veritabanında tek bir GROUP BY sorgusu ile yapılır
+        sonuclar = db.session.query(
+            GorusmeKaydi.ogrenci_id, func.count(GorusmeKaydi.id)
+        ).filter(
+            GorusmeKaydi.ogrenci_id.isnot(None)
+        ).group_by(GorusmeKaydi.ogrenci_id).all()
         
-        # None olmayan (bir öğrenciye ait olan) tüm görüşme kayıtlarını al
-        gorusme_kayitlari = GorusmeKaydi.query.filter(GorusmeKaydi.ogrenci_id.isnot(None)).all()
-        
-        # Her bir kaydı döngü ile kontrol et ve öğrenci bazında say
-        for kayit in gorusme_kayitlari:
-            if kayit.ogrenci_id not in ogrenci_gorusme_sayilari:
-                ogrenci_gorusme_sayilari[kayit.ogrenci_id] = 0
-            ogrenci_gorusme_sayilari[kayit.ogrenci_id] += 1
-            
-        return ogrenci_gorusme_sayilari
+        return {ogrenci_id: sayi for ogrenci_id, sayi in sonuclar}
     
     @staticmethod
     def get_meeting_count_for_student(ogrenci_id, tarih=None):
@@ -90,41 +130,128 @@ class GorusmeService:
         return query.count()
     
     @staticmethod
-    def get_all_gorusme_kayitlari(ay=None):
+    def renumber_student_meetings(ogrenci_id, baslangic_tarihi=None):
         """
-        Tüm görüşme kayıtlarını getir, isteğe bağlı ay filtresi ile
+        Bir öğrencinin görüşme sıra numaralarını verilen tarihten itibaren yeniden hesapla
+        
+        Sıra, (tarih, id) düzenine göre belirlenir. Tarihten önceki kayıtlar
+        değişmediği için yalnızca sayılır; sonrasındaki kayıtlardan numarası
+        değişenler tek bir toplu UPDATE ile güncellenir. Commit çağıran tarafa aittir.
         
         Args:
-            ay: Ay numarası (1-12), belirtilirse o aya ait görüşmeler getirilir
+            ogrenci_id: Öğrenci ID
+            baslangic_tarihi: Değişikliğin olduğu tarih (None ise tüm kayıtlar)
             
         Returns:
-            Görüşme kayıtlarının listesi
+            int: Numarası değişen kayıt sayısı
         """
-        query = GorusmeKaydi.query
+        if not ogrenci_id:
+            return 0
         
-        if ay:
-            # Belirli aya ait kayıtları filtrele
-            query = query.filter(db.extract('month', GorusmeKaydi.tarih) == ay)
+        db.session.flush()
         
-        # Tüm kayıtları tarih ve ID'ye göre sırala (aynı tarihli kayıtlar için ID sıralama ekledik)
-        kayitlar = query.order_by(GorusmeKaydi.tarih, GorusmeKaydi.id).all()
+        onceki_sayi = 0
+        query = db.session.query(GorusmeKaydi.id, GorusmeKaydi.gorusme_sayisi).filter(
+            GorusmeKaydi.ogrenci_id == ogrenci_id
+        )
         
-        # Her bir kayıt için öğrencinin kaçıncı görüşmesi olduğunu hesapla
-        ogrenci_gorusme_sayilari = {}
+        if baslangic_tarihi is not None:
+            onceki_sayi = GorusmeKaydi.query.filter(
+                GorusmeKaydi.ogrenci_id == ogrenci_id,
+                GorusmeKaydi.tarih < baslangic_tarihi
+            ).count()
+            query = query.filter(GorusmeKaydi.tarih >= baslangic_tarihi)
         
-        for kayit in kayitlar:
-            if kayit.ogrenci_id:
-                if kayit.ogrenci_id not in ogrenci_gorusme_sayilari:
-                    ogrenci_gorusme_sayilari[kayit.ogrenci_id] = 0
-                ogrenci_gorusme_sayilari[kayit.ogrenci_id] += 1
-                # Bu öğrencinin bu kayıtta kaçıncı görüşmesi olduğunu kaydet
-                kayit.gorusme_sayisi = ogrenci_gorusme_sayilari[kayit.ogrenci_id]
+        degisenler = []
+        for sira, (kayit_id, gorusme_sayisi) in enumerate(
+                query.order_by(GorusmeKaydi.tarih, GorusmeKaydi.id), start=onceki_sayi + 1):
+            if gorusme_sayisi != sira:
+                degisenler.append({'id': kayit_id, 'gorusme_sayisi': sira})
         
-        # Veritabanı değişikliklerini kaydet
-        db.session.commit()
+        if degisenler:
+            db.session.execute(update(GorusmeKaydi), degisenler)
         
-        # Kayıtları tarih sırasına göre döndür (en son tarih en üstte)
-        return sorted(kayitlar, key=lambda x: x.tarih, reverse=True)
+        return len(degisenler)
+    
+    @staticmethod
+    def get_meeting_sequence_audit():
+        """
+        Saklanan görüşme sıra numaralarını pencere fonksiyonuyla hesaplanan değerlerle karşılaştır
+        
+        Returns:
+            List: Numarası tutarsız kayıtlar için {id, ogrenci_id, kayitli, hesaplanan} sözlükleri
+        """
+        hesaplanan = select(
+            GorusmeKaydi.id,
+            GorusmeKaydi.ogrenci_id,
+            GorusmeKaydi.gorusme_sayisi.label('kayitli'),
+            func.row_number().over(
+                partition_by=GorusmeKaydi.ogrenci_id,
+                order_by=(GorusmeKaydi.tarih, GorusmeKaydi.id)
+            ).label('hesaplanan')
+        ).where(GorusmeKaydi.ogrenci_id.isnot(None)).subquery()
+        
+        sonuclar = db.session.execute(
+            select(hesaplanan).where(
+                (hesaplanan.c.kayitli.is_(None)) | (hesaplanan.c.kayitli != hesaplanan.c.hesaplanan)
+            )
+        ).mappings().all()
+        
+        return [dict(satir) for satir in sonuclar]
+    
+    @staticmethod
+    def get_all_gorusme_kayitlari(ay=None, yil=None, sayfa=None, sayfa_boyutu=None):
+        """
+        Tüm görüşme kayıtlarını getir, isteğe bağlı ay filtresi ve sayfalama ile
+        
+        Görüşme sıra numaraları (gorusme_sayisi) yazma işlemlerinde güncel
+        tutulduğundan bu metot veritabanına hiçbir şey yazmaz.
+        
+        Args:
+            ay: Ay numarası (1-12), belirtilirse o aya ait görüşmeler getirilir
+            yil: Ay filtresinin yılı (None ise ay tüm yıllarda eşleştirilir)
+            sayfa: Sayfa numarası (1'den başlar, None ise tüm kayıtlar)
+            sayfa_boyutu: Sayfa başına kayıt sayısı
+            
+        Returns:
+            Görüşme kayıtlarının listesi (en son tarih en üstte)
+        """
+        query = GorusmeService._ay_filtresi(
+            GorusmeKaydi.query.options(joinedload(GorusmeKaydi.ogrenci)), ay, yil
+        )
+        
+        query = query.order_by(GorusmeKaydi.tarih.desc(), GorusmeKaydi.id.desc())
+        
+        if sayfa and sayfa_boyutu:
+            query = query.offset((sayfa - 1) * sayfa_boyutu).limit(sayfa_boyutu)
+        
+        return query.all()
+    
+    @staticmethod
+    def _ay_filtresi(query, ay, yil):
+        """Sorguyu verilen aya ait kayıtlarla sınırla"""
+        if ay and yil:
+            # Belirli aya ait kayıtları indeksli tarih sütununda yarı açık aralıkla filtrele
+            baslangic, bitis = GorusmeService.ay_araligi(yil, ay)
+            query = query.filter(GorusmeKaydi.tarih >= baslangic, GorusmeKaydi.tarih < bitis)
+        elif ay:
+            # Yıl verilmezse ay tüm yıllarda eşleştirilir
+            query = query.filter(func.extract('month', GorusmeKaydi.tarih) == ay)
+        return query
+    
+    @staticmethod
+    def count_gorusme_kayitlari(ay=None, yil=None):
+        """
+        Filtreye uyan toplam görüşme kaydı sayısını getir (sayfalama için)
+        
+        Args:
+            ay: Ay numarası (1-12)
+            yil: Ay filtresinin yılı
+            
+        Returns:
+            int: Kayıt sayısı
+        """
+        return GorusmeService._ay_filtresi(GorusmeKaydi.query, ay, yil).count()
     
     @staticmethod
     def get_gorusme_kaydi_by_id(kayit_id):
@@ -154,7 +281,7 @@ class GorusmeService:
             tarih: Görüşme tarihi (None ise bugün)
             baslangic_saati: Görüşme başlangıç saati
             bitis_saati: Görüşme bitiş saati
-            gorusme_sayisi: Görüşme sayısı (None ise otomatik hesaplanır)
+            gorusme_sayisi: Görüşme sayısı (öğrenci kayıtlarında otomatik hesaplanır)
             gorusulen_kisi: Görüşülen kişi adı
             kisi_rolu: Kişinin rolü (Öğrenci, Veli, vb.)
             yakinlik_derecesi: Yakınlık derecesi (Anne, Baba, vb.)
@@ -170,12 +297,8 @@ class GorusmeService:
             if tarih is None:
                 tarih = datetime.now().date()
             
-            # Öğrenci kaçıncı görüşmesinde hesapla (eğer bir öğrenci için kayıt yapılıyorsa)
-            if ogrenci_id is not None and gorusme_sayisi is None:
-                # O ana kadar olan görüşme sayısını alıp 1 ekle (bu yeni kaydın kaçıncı görüşme olduğunu belirler)
-                gorusme_sayisi = GorusmeService.get_meeting_count_for_student(ogrenci_id, tarih) + 1
-            elif gorusme_sayisi is None:
-                # Öğrenci ID yoksa görüşme sayısı 1 olarak varsayılan değeri ata
+            # Öğrenci kayıtlarında sıra numarası kayıt eklendikten sonra artımlı olarak belirlenir
+            if gorusme_sayisi is None:
                 gorusme_sayisi = 1
                 
             # Yeni kayıt oluştur
@@ -201,6 +324,7 @@ class GorusmeService:
             )
             
             db.session.add(yeni_kayit)
+            GorusmeService.renumber_student_meetings(ogrenci_id, tarih)
             db.session.commit()
             
             return {
@@ -243,6 +367,9 @@ class GorusmeService:
                     "message": f"ID: {kayit_id} numaralı görüşme kaydı bulunamadı."
                 }
             
+            eski_ogrenci_id = kayit.ogrenci_id
+            eski_tarih = kayit.tarih
+            
             # None olmayan değerleri güncelle
             if ogrenci_id is not None:
                 kayit.ogrenci_id = ogrenci_id
@@ -280,6 +407,14 @@ class GorusmeService:
                 kayit.calisma_yontemi = calisma_yontemi
             if ozet is not None:
                 kayit.ozet = ozet
+            
+            # Tarih, öğrenci veya sıra değiştiyse yalnızca etkilenen öğrencilerin
+            # değişiklik tarihinden sonraki kayıtları yeniden numaralandırılır
+            if kayit.ogrenci_id != eski_ogrenci_id:
+                GorusmeService.renumber_student_meetings(eski_ogrenci_id, eski_tarih)
+                GorusmeService.renumber_student_meetings(kayit.ogrenci_id, kayit.tarih)
+            elif kayit.tarih != eski_tarih or gorusme_sayisi is not None:
+                GorusmeService.renumber_student_meetings(kayit.ogrenci_id, min(kayit.tarih, eski_tarih))
                 
             db.session.commit()
             
@@ -316,7 +451,9 @@ class GorusmeService:
                     "message": f"ID: {kayit_id} numaralı görüşme kaydı bulunamadı."
                 }
             
+            ogrenci_id, tarih = kayit.ogrenci_id, kayit.tarih
             db.session.delete(kayit)
+            GorusmeService.renumber_student_meetings(ogrenci_id, tarih)
             db.session.commit()
             
             return {
@@ -342,26 +479,15 @@ class GorusmeService:
             Dict: İşlem sonucunu içeren sözlük
         """
         try:
-            # Tüm görüşme kayıtlarını al ve kronolojik sırala (eski->yeni)
-            kayitlar = GorusmeKaydi.query.order_by(GorusmeKaydi.tarih, GorusmeKaydi.id).all()
-            
-            # Öğrenci ID'lere göre görüşme sayılarını takip et
-            ogrenci_gorusme_sayilari = {}
-            
-            # Her kayıt için kaçıncı görüşme olduğunu hesapla
-            guncellenen_kayit_sayisi = 0
-            
-            for kayit in kayitlar:
-                if kayit.ogrenci_id:
-                    if kayit.ogrenci_id not in ogrenci_gorusme_sayilari:
-                        ogrenci_gorusme_sayilari[kayit.ogrenci_id] = 0
-                    
-                    ogrenci_gorusme_sayilari[kayit.ogrenci_id] += 1
-                    
-                    # Kayıttaki görüşme sayısını güncelle
-                    if kayit.gorusme_sayisi != ogrenci_gorusme_sayilari[kayit.ogrenci_id]:
-                        kayit.gorusme_sayisi = ogrenci_gorusme_sayilari[kayit.ogrenci_id]
-                        guncellenen_kayit_sayisi += 1
+            # Yalnızca numarası tutarsız olan kayıtlar pencere fonksiyonu ile bulunur
+            tutarsizlar = GorusmeService.get_meeting_sequence_audit()
+            guncellenen_kayit_sayisi = len(tutarsizlar)
+            
+            if tutarsizlar:
+                db.session.execute(update(GorusmeKaydi), [
+                    {'id': satir['id'], 'gorusme_sayisi': satir['hesaplanan']}
+                    for satir in tutarsizlar
+                ])
             
             # Değişiklikleri kaydet
             db.session.commit()
@@ -383,39 +509,38 @@ class GorusmeService:
     def sync_mebbis():
         """
         MEBBİS sistemine görüşme kayıtlarını aktar
-        Bu fonksiyon, MEBBİS'e aktarılmamış tüm görüşme kayıtlarını gönderir.
+        Aktarım arka planda paketler halinde yürütülür; bu fonksiyon beklemeden
+        aktarım durumunu döndürür (durum için get_mebbis_aktarim_durumu).
         
         Returns:
-            Dict: İşlem sonucunu ve aktarılan kayıt sayısını içeren sözlük
+            Dict: İşlem sonucunu ve aktarım durumunu içeren sözlük
         """
+        from app.blueprints.gorusme_defteri.mebbis import MebbisAktarimService
+        
         try:
-            # Aktarılmamış görüşme kayıtlarını bul
-            aktarilmamis_kayitlar = GorusmeKaydi.query.filter_by(mebbis_aktarildi=False).all()
-            
-            if not aktarilmamis_kayitlar:
-                return {
-                    "success": True,
-                    "message": "Aktarılacak görüşme kaydı bulunamadı.",
-                    "aktarilan_kayit_sayisi": 0
-                }
-            
-            # Gerçek bir sistem entegrasyonu yerine, sadece kayıtları "aktarıldı" olarak işaretle
-            for kayit in aktarilmamis_kayitlar:
-                kayit.mebbis_aktarildi = True
-                kayit.mebbis_aktarim_tarihi = datetime.now()
-                
-            db.session.commit()
-            
-            return {
-                "success": True,
-                "message": f"{len(aktarilmamis_kayitlar)} adet görüşme kaydı MEBBİS'e aktarıldı.",
-                "aktarilan_kayit_sayisi": len(aktarilmamis_kayitlar)
-            }
-            
+            return MebbisAktarimService.arka_planda_baslat()
         except Exception as e:
             db.session.rollback()
             current_app.logger.error(f"MEBBİS senkronizasyon hatası: {str(e)}")
             return {
                 "success": False,
                 "message": f"MEBBİS senkronizasyonu sırasında bir hata oluştu: {str(e)}"
-            }
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def get_mebbis_aktarim_durumu(aktarim_id):
+        """
+        MEBBİS aktarımının durumunu getir
+        
+        Args:
+            aktarim_id: Aktarım ID
+            
+        Returns:
+            Dict: Aktarım durumu veya None
+        """
+        from app.blueprints.gorusme_defteri.mebbis import MebbisAktarimService
+        
+        aktarim = MebbisAktarimService.get_aktarim(aktarim_id)
+        if not aktarim:
+            return None
+        return MebbisAktarimService.aktarim_durumu(aktarim)
@@ -0,0 +1,204 @@
+"""
+Öğrenci arşivleme modülü
+Mezun olan sınıfların kayıtlarını ayrı bir SQLite arşiv dosyasına taşır ve
+öğrenci silme işlemlerini satır satır yükleme yapmadan küme tabanlı yürütür.
+"""
+
+import os
+
+from sqlalchemy import MetaData, create_engine, delete, insert, select
+
+from app.extensions import db
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc
+from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+from app.blueprints.anket_yonetimi.models import (
+    OgrenciAnket, AnketCevap, PaketliCevap, AnketCevapDagilimi, OgrenciOlcekPuani
+)
+from app.blueprints.ders_konu_yonetimi.konu_analizi import _ozetleri_gecersiz_kil
+from app.blueprints.yapay_zeka_asistan.gelismis_analiz import onbellegi_gecersiz_kil, onbellegi_temizle
+from app.blueprints.yapay_zeka_asistan.models import OgrenciAnaliz, OgrenciOneri, DuyguAnalizi, OgrenciSegmenti, KonuOnerisi
+
+
+def ogrenci_tablo_kosullari(ogrenci_ids):
+    """
+    Öğrenciye bağlı tüm tabloları ve satır seçim koşullarını döndür
+
+    Liste üst tablodan alt tabloya doğru sıralıdır; kopyalama bu sırayla,
+    silme ise ters sırayla yapılmalıdır.
+
+    Args:
+        ogrenci_ids: Öğrenci ID'lerini döndüren SELECT ifadesi
+
+    Returns:
+        List: (tablo, koşul) ikilileri
+    """
+    anket_ids = select(OgrenciAnket.id).where(OgrenciAnket.ogrenci_id.in_(ogrenci_ids))
+    analiz_ids = select(OgrenciAnaliz.id).where(OgrenciAnaliz.ogrenci_id.in_(ogrenci_ids))
+
+    return [
+        (Ogrenci.__table__, Ogrenci.id.in_(ogrenci_ids)),
+        (DersProgrami.__table__, DersProgrami.ogrenci_id.in_(ogrenci_ids)),
+        (DersIlerleme.__table__, DersIlerleme.ogrenci_id.in_(ogrenci_ids)),
+        (KonuTakip.__table__, KonuTakip.ogrenci_id.in_(ogrenci_ids)),
+        (DenemeSonuc.__table__, DenemeSonuc.ogrenci_id.in_(ogrenci_ids)),
+        (GorusmeKaydi.__table__, GorusmeKaydi.ogrenci_id.in_(ogrenci_ids)),
+        (OgrenciAnket.__table__, OgrenciAnket.ogrenci_id.in_(ogrenci_ids)),
+        (AnketCevap.__table__, AnketCevap.ogrenci_anket_id.in_(anket_ids)),
+        (PaketliCevap.__table__, PaketliCevap.ogrenci_anket_id.in_(anket_ids)),
+        (OgrenciOlcekPuani.__table__, OgrenciOlcekPuani.ogrenci_id.in_(ogrenci_ids)),
+        (OgrenciAnaliz.__table__, OgrenciAnaliz.ogrenci_id.in_(ogrenci_ids)),
+        (OgrenciOneri.__table__, OgrenciOneri.analiz_id.in_(analiz_ids)),
+        (DuyguAnalizi.__table__, DuyguAnalizi.ogrenci_id.in_(ogrenci_ids)),
+    ]
+
+
+def ogrenci_kayitlarini_sil(connection, ogrenci_ids):
+    """
+    Öğrencileri ve bağlı kayıtlarını tablo başına tek DELETE ile sil
+
+    Veritabanında ON DELETE CASCADE tanımlı olmayan eski şemalarda da
+    çalışması için alt tablolar açıkça ve alttan üste doğru silinir.
+    Etkilenen anketlerin cevap dağılımı özetleri de silinir; sonuç sayfası
+    ilk açılışta özetleri yeniden hesaplar; konu zorluk özetleri için de aynısı
+    geçerlidir. Core DELETE ifadeleri mapper olaylarını tetiklemediğinden
+    gelişmiş analiz önbelleği açıkça geçersiz kılınır. Öğrencilerin segment
+    atamaları ve konu önerileri türetilmiş veri olduğundan arşive taşınmaz,
+    yalnızca silinir.
+
+    Args:
+        connection: Session veya Connection nesnesi
+        ogrenci_ids: Öğrenci ID'lerini döndüren SELECT ifadesi
+
+    Returns:
+        Dict: Tablo adına göre silinen satır sayıları
+    """
+    silinen = {}
+    anket_ids = select(OgrenciAnket.anket_id).where(OgrenciAnket.ogrenci_id.in_(ogrenci_ids))
+    sonuc = connection.execute(delete(AnketCevapDagilimi).where(AnketCevapDagilimi.anket_id.in_(anket_ids)))
+    silinen[AnketCevapDagilimi.__tablename__] = sonuc.rowcount
+    sonuc = connection.execute(delete(OgrenciSegmenti).where(OgrenciSegmenti.ogrenci_id.in_(ogrenci_ids)))
+    silinen[OgrenciSegmenti.__tablename__] = sonuc.rowcount
+    sonuc = connection.execute(delete(KonuOnerisi).where(KonuOnerisi.ogrenci_id.in_(ogrenci_ids)))
+    silinen[KonuOnerisi.__tablename__] = sonuc.rowcount
+    _ozetleri_gecersiz_kil(connection, kosul=KonuTakip.ogrenci_id.in_(ogrenci_ids))
+    onbellegi_gecersiz_kil(connection)
+
+    for tablo, kosul in reversed(ogrenci_tablo_kosullari(ogrenci_ids)):
+        sonuc = connection.execute(delete(tablo).where(kosul))
+        silinen[tablo.name] = sonuc.rowcount
+    return silinen
+
+
+class ArsivService:
+    """Mezun sınıfların arşivlenmesini yöneten servis sınıfı"""
+
+    @staticmethod
+    def _arsiv_semasini_olustur(arsiv_yolu, tablolar):
+        """Arşiv dosyasında eksik tabloları ana şemayla aynı yapıda oluştur"""
+        klasor = os.path.dirname(os.path.abspath(arsiv_yolu))
+        os.makedirs(klasor, exist_ok=True)
+
+        arsiv_engine = create_engine(f"sqlite:///{arsiv_yolu}")
+        try:
+            db.metadata.create_all(arsiv_engine, tables=tablolar)
+        finally:
+            arsiv_engine.dispose()
+
+    @staticmethod
+    def sinif_arsivle(sinif, arsiv_yolu):
+        """
+        Bir sınıfın tüm öğrencilerini ve bağlı kayıtlarını arşiv dosyasına taşı
+
+        Kopyalama tablo başına tek INSERT ... SELECT, silme tablo başına tek
+        DELETE ile yapılır; tüm işlem tek bir transaction içinde yürür.
+
+        Args:
+            sinif: Arşivlenecek sınıf (örn: "12A")
+            arsiv_yolu: Arşiv SQLite dosyasının yolu
+
+        Returns:
+            Dict: İşlem sonucunu ve tablo başına taşınan satır sayılarını içeren sözlük
+        """
+        ogrenci_sayisi = Ogrenci.query.filter_by(sinif=sinif).count()
+        if ogrenci_sayisi == 0:
+            return {
+                'success': False,
+                'message': f"'{sinif}' sınıfında arşivlenecek öğrenci bulunamadı."
+            }
+
+        ogrenci_ids = select(Ogrenci.id).where(Ogrenci.sinif == sinif)
+        kosullar = ogrenci_tablo_kosullari(ogrenci_ids)
+        ArsivService._arsiv_semasini_olustur(arsiv_yolu, [tablo for tablo, _ in kosullar])
+
+        try:
+            if db.engine.dialect.name == 'sqlite':
+                tasinan = ArsivService._sqlite_tasi(kosullar, ogrenci_ids, arsiv_yolu)
+            else:
+                tasinan = ArsivService._kopyala_ve_sil(kosullar, ogrenci_ids, arsiv_yolu)
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Arşivleme sırasında hata oluştu: {str(e)}'
+            }
+        # Silme commit edilmeden önce hesaplanıp önbelleğe giren sonuçları da bırak
+        onbellegi_temizle()
+
+        return {
+            'success': True,
+            'message': f"'{sinif}' sınıfından {ogrenci_sayisi} öğrenci arşive taşındı.",
+            'tasinan': tasinan
+        }
+
+    @staticmethod
+    def _sqlite_tasi(kosullar, ogrenci_ids, arsiv_yolu):
+        """Arşiv dosyasını ATTACH ederek kopyalamayı tamamen veritabanı içinde yap"""
+        arsiv_meta = MetaData(schema='arsiv')
+        tasinan = {}
+
+        with db.engine.connect() as conn:
+            # Arşiv şemasında referans verilen katalog tabloları (dersler, anketler vb.)
+            # bulunmadığından bu bağlantıda yabancı anahtar denetimi kapatılır
+            conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            conn.exec_driver_sql("ATTACH DATABASE ? AS arsiv", (os.path.abspath(arsiv_yolu),))
+            conn.commit()
+            try:
+                with conn.begin():
+                    for tablo, kosul in kosullar:
+                        hedef = tablo.to_metadata(arsiv_meta)
+                        sutunlar = [tablo.c[sutun.name] for sutun in hedef.columns]
+                        sorgu = insert(hedef).prefix_with('OR REPLACE').from_select(
+                            [sutun.name for sutun in hedef.columns],
+                            select(*sutunlar).where(kosul)
+                        )
+                        tasinan[tablo.name] = conn.execute(sorgu).rowcount
+
+                    ogrenci_kayitlarini_sil(conn, ogrenci_ids)
+            finally:
+                conn.exec_driver_sql("DETACH DATABASE arsiv")
+                conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+                conn.commit()
+
+        return tasinan
+
+    @staticmethod
+    def _kopyala_ve_sil(kosullar, ogrenci_ids, arsiv_yolu):
+        """SQLite dışı veritabanlarında tablo başına tek SELECT ve toplu INSERT ile kopyala"""
+        arsiv_engine = create_engine(f"sqlite:///{arsiv_yolu}")
+        tasinan = {}
+
+        try:
+            with db.engine.begin() as conn, arsiv_engine.begin() as arsiv_conn:
+                arsiv_conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+                for tablo, kosul in kosullar:
+                    satirlar = [dict(satir) for satir in conn.execute(select(tablo).where(kosul)).mappings()]
+                    if satirlar:
+                        arsiv_conn.execute(insert(tablo).prefix_with('OR REPLACE'), satirlar)
+                    tasinan[tablo.name] = len(satirlar)
+
+                ogrenci_kayitlarini_sil(conn, ogrenci_ids)
+        finally:
+            arsiv_engine.dispose()
+
+        return tasinan
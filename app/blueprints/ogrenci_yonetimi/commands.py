@@ -0,0 +1,27 @@
+"""
+Öğrenci yönetimi için komut satırı işlemleri
+Örnek: flask ogrenci_yonetimi arsivle 12A 12B
+"""
+
+import os
+from datetime import datetime
+
+import click
+from flask import current_app
+
+from app.blueprints.ogrenci_yonetimi import ogrenci_yonetimi_bp
+from app.blueprints.ogrenci_yonetimi.arsiv import ArsivService
+
+@ogrenci_yonetimi_bp.cli.command('arsivle')
+@click.argument('siniflar', nargs=-1, required=True)
+@click.option('--hedef', default=None, help='Arşiv SQLite dosyası (varsayılan: instance/arsiv/arsiv_<yıl>.db)')
+def arsivle(siniflar, hedef):
+    """Mezun olan sınıfları ve tüm bağlı kayıtlarını arşiv dosyasına taşı"""
+    if not hedef:
+        hedef = os.path.join(current_app.config["ARCHIVE_FOLDER"], f"arsiv_{datetime.now().year}.db")
+    
+    for sinif in siniflar:
+        sonuc = ArsivService.sinif_arsivle(sinif, hedef)
+        click.echo(sonuc['message'])
+        for tablo, adet in sonuc.get('tasinan', {}).items():
+            click.echo(f"  {tablo}: {adet}")
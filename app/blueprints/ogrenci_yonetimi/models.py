@@ -16,11 +16,11 @@ class Ogrenci(db.Model):
     eposta = db.Column(db.String(100), nullable=True)
     
     # Relationships - öğrencinin ilişkili kayıtlarını tanımlıyoruz
-    ders_programlari = relationship("DersProgrami", back_populates="ogrenci", cascade="all, delete-orphan")
-    ders_ilerlemeleri = relationship("DersIlerleme", back_populates="ogrenci", cascade="all, delete-orphan")
-    konu_takipleri = relationship("KonuTakip", back_populates="ogrenci", cascade="all, delete-orphan")
-    deneme_sonuclari = relationship("DenemeSonuc", back_populates="ogrenci", cascade="all, delete-orphan")
-    anketleri = relationship("OgrenciAnket", back_populates="ogrenci", cascade="all, delete-orphan")
+    ders_programlari = relationship("DersProgrami", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
+    ders_ilerlemeleri = relationship("DersIlerleme", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
+    konu_takipleri = relationship("KonuTakip", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
+    deneme_sonuclari = relationship("DenemeSonuc", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
+    anketleri = relationship("OgrenciAnket", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Ogrenci {self.numara} - {self.ad} {self.soyad}>"
@@ -47,5 +47,5 @@ class Ogrenci(db.Model):
         
 # GorusmeKaydi ilişkisini Ogrenci sınıfının sonunda tanımla - döngüsel import problemini önlemek için
 from app.blueprints.gorusme_defteri.models import GorusmeKaydi
-Ogrenci.gorusme_kayitlari = relationship("GorusmeKaydi", back_populates="ogrenci", cascade="all, delete-orphan")
+Ogrenci.gorusme_kayitlari = relationship("GorusmeKaydi", back_populates="ogrenci", cascade="all, delete-orphan", passive_deletes=True)
 GorusmeKaydi.ogrenci = relationship("Ogrenci", back_populates="gorusme_kayitlari")
\ No newline at end of file
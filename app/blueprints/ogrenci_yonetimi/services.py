@@ -5,6 +5,7 @@ Bu modül, öğrenci işlemleri ile ilgili iş mantığı işlemlerini gerçekle
 
 from datetime import datetime
 import pandas as pd
+from sqlalchemy import select
 
 from app.extensions import db
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
@@ -240,23 +241,17 @@ class OgrenciService:
         Returns:
             Dict: İşlem sonucunu içeren sözlük
         """
-        ogrenci = Ogrenci.query.get(ogrenci_id)
-        if not ogrenci:
+        from app.blueprints.ogrenci_yonetimi.arsiv import ogrenci_kayitlarini_sil
+        
+        if not db.session.query(Ogrenci.id).filter_by(id=ogrenci_id).first():
             return {
                 'success': False,
                 'message': 'Öğrenci bulunamadı.'
             }
         
         try:
-            # İlişkili anket atamalarını silme
-            # Not: Anket modülü geçici olarak devre dışı bırakıldı
-            # from app.blueprints.rehberlik_anketleri.models import AnketAtama
-            # anket_atamalari = AnketAtama.query.filter_by(ogrenci_id=ogrenci_id).all()
-            # for atama in anket_atamalari:
-            #     db.session.delete(atama)
-            
-            # Öğrenciyi silme
-            db.session.delete(ogrenci)
+            # İlişkili kayıtlar belleğe yüklenmeden tablo başına tek DELETE ile silinir
+            ogrenci_kayitlarini_sil(db.session, select(Ogrenci.id).where(Ogrenci.id == ogrenci_id))
             db.session.commit()
             return {
                 'success': True,
@@ -7,6 +7,7 @@ from datetime import datetime, time
 from app.extensions import db
 from app.blueprints.parametre_yonetimi.models import OkulBilgi, DersSaati, GorusmeKonusu, OgleArasi
 from sqlalchemy import or_, and_
+from app.blueprints.gorusme_defteri.helpers import invalidate_categories
 
 class SabitlerService:
     """Sabit verileri yöneten servis sınıfı"""
@@ -216,6 +217,7 @@ class SabitlerService:
                     hatali_konular.append(f"{satir} ({str(e)})")
             
             db.session.commit()
+            invalidate_categories()
             
             message = f"{konu_sayisi} görüşme konusu başarıyla kaydedildi."
             if hatali_konular:
@@ -257,6 +259,7 @@ class SabitlerService:
             baslik = konu.baslik
             db.session.delete(konu)
             db.session.commit()
+            invalidate_categories()
             
             return {
                 "success": True,
@@ -19,6 +19,7 @@ from openpyxl.chart import BarChart, PieChart, LineChart, Reference
 from app.extensions import db
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
 from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
 from app.blueprints.calisma_programi.models import DersProgrami, DersIlerleme, KonuTakip
 from app.blueprints.calisma_programi.services import ProgramService
 from app.blueprints.deneme_sinavlari.models import DenemeSonuc
@@ -857,7 +858,7 @@ class RaporService:
             }
         
         # Ders kontrolü
-        ders = Ders.query.get(ders_id)
+        ders = KatalogOnbellegi.ders(ders_id)
         if not ders:
             return {
                 'success': False, 
@@ -865,7 +866,7 @@ class RaporService:
             }
         
         # Ders konuları
-        konular = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira).all()
+        konular = ders.konular
         
         # Konu takip bilgileri
         konu_takip_map = {}
@@ -942,10 +943,10 @@ class RaporService:
         # İlerleme verileri
         ilerleme_verileri = []
         for ilerleme in ilerlemeler:
-            ders = Ders.query.get(ilerleme.ders_id)
+            ders = KatalogOnbellegi.ders(ilerleme.ders_id)
             
             # Konuları al
-            konular = Konu.query.filter_by(ders_id=ders.id).all()
+            konular = ders.konular
             konu_sayisi = len(konular)
             
             # Tamamlanan konuları say
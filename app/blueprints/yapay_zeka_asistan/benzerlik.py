@@ -0,0 +1,328 @@
+"""
+Benzer öğrenci indeksi
+Her öğrencinin deneme geçmişini sabit uzunlukta bir vektöre çevirir (TYT net
+yörüngesi + ders bazlı ortalamalar), vektörleri ölçekleyip BallTree tabanlı
+bir NearestNeighbors indeksine koyar ve indeksi model dosyalarının yanına
+kaydeder. Sorgular önbellekteki indeksten milisaniyeler içinde yanıtlanır.
+
+İndeks, öğrenci başına deneme damgası (kayıt sayısı, son kayıt, net toplamı,
+deneme sürümü) karşılaştırılarak arka planda artımlı güncellenir: yalnızca damgası değişen
+veya yeni öğrencilerin vektörleri yeniden hesaplanır.
+"""
+
+import os
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.neighbors import NearestNeighbors
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.blueprints.yapay_zeka_asistan.model_onbellegi import ModelOnbellegi, MODEL_DIR
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc, DenemeSurumu
+
+INDEKS_YOLU = os.path.join(MODEL_DIR, 'benzer_ogrenci_indeksi.joblib')
+
+TYT_NETLERI = [
+    DenemeSonuc.net_tyt_turkce, DenemeSonuc.net_tyt_sosyal,
+    DenemeSonuc.net_tyt_matematik, DenemeSonuc.net_tyt_fen,
+]
+AYT_NETLERI = [
+    DenemeSonuc.net_ayt_matematik, DenemeSonuc.net_ayt_fizik, DenemeSonuc.net_ayt_kimya,
+    DenemeSonuc.net_ayt_biyoloji, DenemeSonuc.net_ayt_edebiyat, DenemeSonuc.net_ayt_tarih,
+    DenemeSonuc.net_ayt_cografya, DenemeSonuc.net_ayt_felsefe,
+]
+
+# Deneme geçmişi bu kadar noktaya doğrusal enterpolasyonla örneklenir
+YORUNGE_NOKTASI = 5
+OZELLIKLER = [f'yorunge_{i + 1}' for i in range(YORUNGE_NOKTASI)] + [s.key for s in TYT_NETLERI] + ['ayt_net']
+
+VARSAYILAN_KOMSU_SAYISI = 5
+# IN (...) filtrelerinde tek seferde işlenen öğrenci sayısı
+PARCA_BOYUTU = 5000
+
+# Aynı anda tek bir indeks güncellemesi çalışır; sorgular beklemez
+_guncelleme_kilidi = threading.Lock()
+
+
+def _oku(sorgu, sutun=None, ogrenci_idleri=None):
+    baglanti = db.session.connection()
+    if ogrenci_idleri is None:
+        return pd.read_sql(sorgu, baglanti)
+    parcalar = [
+        pd.read_sql(sorgu.where(sutun.in_(ogrenci_idleri[i:i + PARCA_BOYUTU])), baglanti)
+        for i in range(0, len(ogrenci_idleri), PARCA_BOYUTU)
+    ]
+    return pd.concat(parcalar, ignore_index=True) if parcalar else pd.read_sql(sorgu.where(sutun.in_([])), baglanti)
+
+
+def _damga_sorgusu():
+    return select(
+        DenemeSonuc.ogrenci_id,
+        func.count(DenemeSonuc.id).label('sayi'),
+        func.max(DenemeSonuc.id).label('son_id'),
+        func.sum(sum(func.coalesce(s, 0) for s in TYT_NETLERI + AYT_NETLERI)).label('toplam'),
+        # Toplamı değiştirmeyen düzenlemeler (net takası, yalnızca tarih) sürümle yakalanır
+        func.coalesce(func.max(DenemeSurumu.surum), 0).label('surum'),
+    ).outerjoin(
+        DenemeSurumu, DenemeSurumu.ogrenci_id == DenemeSonuc.ogrenci_id
+    ).group_by(DenemeSonuc.ogrenci_id)
+
+
+def _ayni_damga(a_sayi, a_son, a_toplam, a_surum, b_sayi, b_son, b_toplam, b_surum):
+    return (a_sayi == b_sayi) & (a_son == b_son) & np.isclose(a_toplam, b_toplam) & (a_surum == b_surum)
+
+
+class BenzerOgrenciService:
+    """Benzer öğrenci indeksini yöneten servis sınıfı"""
+
+    @staticmethod
+    def get_vektorler(ogrenci_idleri=None):
+        """
+        Öğrencilerin deneme geçmişi vektörlerini hesapla
+
+        Yörünge, TYT toplam netlerinin tarih sırasıyla YORUNGE_NOKTASI noktaya
+        örneklenmiş halidir; öğrenci başına döngü kurulmadan tek dizide hesaplanır.
+
+        Args:
+            ogrenci_idleri: Hesaplanacak öğrenciler (None ise tümü)
+
+        Returns:
+            DataFrame: ogrenci_id indeksli OZELLIKLER tablosu (denemesi olmayan öğrenciler hariç)
+        """
+        deneme = _oku(
+            select(DenemeSonuc.id, DenemeSonuc.ogrenci_id, DenemeSonuc.tarih, *TYT_NETLERI, *AYT_NETLERI),
+            DenemeSonuc.ogrenci_id, ogrenci_idleri
+        )
+        if deneme.empty:
+            return pd.DataFrame(columns=OZELLIKLER, index=pd.Index([], name='ogrenci_id'), dtype=float)
+
+        tyt_sutunlari = [s.key for s in TYT_NETLERI]
+        deneme[tyt_sutunlari] = deneme[tyt_sutunlari].fillna(0)
+        deneme['tyt_net'] = deneme[tyt_sutunlari].sum(axis=1)
+        deneme['ayt_net'] = deneme[[s.key for s in AYT_NETLERI]].fillna(0).sum(axis=1)
+        deneme = deneme.sort_values(['ogrenci_id', 'tarih', 'id'])
+
+        gruplar = deneme.groupby('ogrenci_id', sort=True)
+        sayilar = gruplar.size().to_numpy()
+        baslangiclar = np.r_[0, np.cumsum(sayilar)[:-1]]
+
+        # Her öğrenci için 0..n-1 aralığında eşit aralıklı konumlar ve komşu iki deneme arasında enterpolasyon
+        konum = (sayilar - 1)[:, None] * np.linspace(0, 1, YORUNGE_NOKTASI)[None, :]
+        alt = np.floor(konum).astype(int)
+        ust = np.minimum(alt + 1, (sayilar - 1)[:, None])
+        oran = konum - alt
+        netler = deneme['tyt_net'].to_numpy()
+        yorunge = (netler[baslangiclar[:, None] + alt] * (1 - oran)
+                   + netler[baslangiclar[:, None] + ust] * oran)
+
+        vektorler = pd.DataFrame(yorunge, index=gruplar.size().index, columns=OZELLIKLER[:YORUNGE_NOKTASI])
+        vektorler = vektorler.join(gruplar[tyt_sutunlari + ['ayt_net']].mean())
+        return vektorler[OZELLIKLER].astype(float)
+
+    @staticmethod
+    def _kaydet(paket):
+        # Önbellekte dosyayı eşlemiş okuyucular olabilir; dosya yerinde kesilmez, atomik olarak değiştirilir
+        gecici_yol = f"{INDEKS_YOLU}.tmp"
+        joblib.dump(paket, gecici_yol)
+        os.replace(gecici_yol, INDEKS_YOLU)
+
+    @staticmethod
+    def indeksi_guncelle(tam=False):
+        """
+        İndeksi veritabanıyla eşitle
+
+        Damgası değişen, yeni eklenen ve silinen öğrenciler işlenir; indeks yoksa,
+        tam=True ise veya öğrencilerin yarısından fazlası değiştiyse ölçekleyici
+        dahil baştan kurulur.
+
+        Args:
+            tam: True ise artımlı güncelleme yerine baştan kur
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        damgalar = _oku(_damga_sorgusu()).set_index('ogrenci_id').sort_index()
+        eski = None if tam or not os.path.exists(INDEKS_YOLU) else joblib.load(INDEKS_YOLU)
+        if eski is not None and 'surumler' not in eski:
+            # Sürüm tutmayan eski indeks dosyası baştan kurulur
+            eski = None
+
+        if eski is not None:
+            eski_damga = pd.DataFrame(
+                {'sayi': eski['sayilar'], 'son_id': eski['son_idler'], 'toplam': eski['toplamlar'],
+                 'surum': eski['surumler']},
+                index=pd.Index(eski['ogrenci_idleri'], name='ogrenci_id')
+            )
+            ortak = damgalar.index.intersection(eski_damga.index)
+            a, b = damgalar.loc[ortak], eski_damga.loc[ortak]
+            ayni = _ayni_damga(a['sayi'].to_numpy(), a['son_id'].to_numpy(), a['toplam'].to_numpy(), a['surum'].to_numpy(),
+                               b['sayi'].to_numpy(), b['son_id'].to_numpy(), b['toplam'].to_numpy(), b['surum'].to_numpy())
+            yenilenecek = ortak[~ayni].union(damgalar.index.difference(eski_damga.index))
+            silinen = eski_damga.index.difference(damgalar.index)
+
+            if not len(yenilenecek) and not len(silinen):
+                return {'success': True, 'message': "Benzerlik indeksi güncel.", 'guncellenen': 0}
+            if len(yenilenecek) > len(damgalar) // 2:
+                eski = None
+
+        if eski is None:
+            vektorler = BenzerOgrenciService.get_vektorler()
+            scaler = StandardScaler().fit(vektorler.to_numpy())
+            ogrenci_idleri = vektorler.index.to_numpy()
+            X = scaler.transform(vektorler.to_numpy())
+            guncellenen = len(ogrenci_idleri)
+        else:
+            scaler = eski['scaler']
+            korunan = ~np.isin(eski['ogrenci_idleri'], yenilenecek.union(silinen))
+            yeni = BenzerOgrenciService.get_vektorler([int(i) for i in yenilenecek])
+            ogrenci_idleri = np.concatenate([eski['ogrenci_idleri'][korunan], yeni.index.to_numpy()])
+            X = np.vstack([eski['X'][korunan], scaler.transform(yeni.to_numpy())]) if len(yeni) else eski['X'][korunan]
+            sira = np.argsort(ogrenci_idleri, kind='stable')
+            ogrenci_idleri, X = ogrenci_idleri[sira], X[sira]
+            guncellenen = len(yenilenecek) + len(silinen)
+
+        if len(ogrenci_idleri) < 2:
+            return {'success': False, 'message': "Benzerlik indeksi için yeterli deneme verisi yok."}
+
+        damgalar = damgalar.reindex(ogrenci_idleri)
+        indeks = NearestNeighbors(algorithm='ball_tree').fit(X)
+        BenzerOgrenciService._kaydet({
+            'scaler': scaler,
+            'indeks': indeks,
+            'X': np.ascontiguousarray(X),
+            'ogrenci_idleri': ogrenci_idleri.astype(np.int64),
+            'sayilar': damgalar['sayi'].to_numpy(),
+            'son_idler': damgalar['son_id'].to_numpy(),
+            'toplamlar': damgalar['toplam'].to_numpy(dtype=float),
+            'surumler': damgalar['surum'].to_numpy(),
+        })
+
+        return {
+            'success': True,
+            'message': f"Benzerlik indeksi güncellendi ({guncellenen} öğrenci işlendi, toplam {len(ogrenci_idleri)}).",
+            'guncellenen': guncellenen
+        }
+
+    @staticmethod
+    def arka_planda_guncelle(app=None, tam=False):
+        """
+        İndeks güncellemesini arka planda başlat; zaten çalışıyorsa yenisini başlatmaz
+
+        Args:
+            app: Flask uygulama nesnesi (None ise geçerli uygulama)
+            tam: True ise indeks baştan kurulur
+
+        Returns:
+            bool: Yeni güncelleme başlatıldıysa True
+        """
+        if not _guncelleme_kilidi.acquire(blocking=False):
+            return False
+
+        from flask import current_app
+        app = app or current_app._get_current_object()
+
+        def calistir():
+            with app.app_context():
+                try:
+                    sonuc = BenzerOgrenciService.indeksi_guncelle(tam)
+                    logging.info(sonuc['message'])
+                except Exception as e:
+                    logging.error(f"Benzerlik indeksi güncellenemedi: {str(e)}")
+                finally:
+                    db.session.remove()
+                    _guncelleme_kilidi.release()
+
+        threading.Thread(target=calistir, name='benzerlik-indeksi', daemon=True).start()
+        return True
+
+    @staticmethod
+    def benzer_ogrenciler(ogrenci_id, k=VARSAYILAN_KOMSU_SAYISI):
+        """
+        Deneme geçmişi en çok benzeyen k öğrenciyi ve son durumlarını getir
+
+        Öğrencinin indeksteki damgası güncel değilse vektörü anında hesaplanır
+        ve indeks arka planda güncellenir.
+
+        Args:
+            ogrenci_id: Öğrenci ID
+            k: Döndürülecek öğrenci sayısı
+
+        Returns:
+            Dict: {'success', 'message', 'benzerler': [{'ogrenci_id', 'ad_soyad', 'sinif', 'benzerlik', ...}]}
+        """
+        if not os.path.exists(INDEKS_YOLU):
+            BenzerOgrenciService.arka_planda_guncelle()
+            return {'success': False, 'message': "Benzerlik indeksi hazırlanıyor, lütfen biraz sonra tekrar deneyin.", 'benzerler': []}
+
+        paket = ModelOnbellegi.yukle(INDEKS_YOLU)
+        ogrenci_idleri = paket['ogrenci_idleri']
+
+        damga = db.session.execute(_damga_sorgusu().where(DenemeSonuc.ogrenci_id == ogrenci_id)).first()
+        if damga is None:
+            return {'success': False, 'message': "Öğrencinin deneme sonucu bulunmuyor.", 'benzerler': []}
+
+        sira = int(np.searchsorted(ogrenci_idleri, ogrenci_id))
+        indekste = sira < len(ogrenci_idleri) and ogrenci_idleri[sira] == ogrenci_id
+        if indekste and 'surumler' in paket and _ayni_damga(
+                paket['sayilar'][sira], paket['son_idler'][sira], paket['toplamlar'][sira], paket['surumler'][sira],
+                damga.sayi, damga.son_id, float(damga.toplam or 0), damga.surum):
+            vektor = paket['X'][sira:sira + 1]
+        else:
+            vektor = paket['scaler'].transform(BenzerOgrenciService.get_vektorler([ogrenci_id]).to_numpy())
+            BenzerOgrenciService.arka_planda_guncelle()
+
+        k = max(1, min(int(k), len(ogrenci_idleri) - 1))
+        uzakliklar, komsular = paket['indeks'].kneighbors(vektor, n_neighbors=k + 1)
+        adaylar = [(int(ogrenci_idleri[i]), float(u)) for i, u in zip(komsular[0], uzakliklar[0])
+                   if ogrenci_idleri[i] != ogrenci_id][:k]
+        benzer_idler = [i for i, _ in adaylar]
+
+        ogrenciler = {o.id: o for o in Ogrenci.query.filter(Ogrenci.id.in_(benzer_idler))}
+        tyt_net = sum(func.coalesce(s, 0) for s in TYT_NETLERI)
+        son_deneme = (
+            select(DenemeSonuc.ogrenci_id, func.max(DenemeSonuc.tarih).label('tarih'))
+            .where(DenemeSonuc.ogrenci_id.in_(benzer_idler))
+            .group_by(DenemeSonuc.ogrenci_id)
+            .subquery()
+        )
+        son_netler = dict(db.session.execute(
+            select(DenemeSonuc.ogrenci_id, func.max(tyt_net))
+            .join(son_deneme, (son_deneme.c.ogrenci_id == DenemeSonuc.ogrenci_id) & (son_deneme.c.tarih == DenemeSonuc.tarih))
+            .group_by(DenemeSonuc.ogrenci_id)
+        ).all())
+        ozetler = {
+            satir.ogrenci_id: satir for satir in db.session.execute(
+                select(DenemeSonuc.ogrenci_id,
+                       func.count(DenemeSonuc.id).label('deneme_sayisi'),
+                       func.max(tyt_net).label('en_iyi_tyt_net'),
+                       func.max(DenemeSonuc.puan_tyt).label('en_iyi_puan'))
+                .where(DenemeSonuc.ogrenci_id.in_(benzer_idler))
+                .group_by(DenemeSonuc.ogrenci_id)
+            )
+        }
+
+        benzerler = []
+        for benzer_id, uzaklik in adaylar:
+            ogrenci = ogrenciler.get(benzer_id)
+            ozet = ozetler.get(benzer_id)
+            if not ogrenci or not ozet:
+                continue  # İndeks oluşturulduktan sonra silinmiş öğrenci
+            benzerler.append({
+                'ogrenci_id': benzer_id,
+                'numara': ogrenci.numara,
+                'ad_soyad': f"{ogrenci.ad} {ogrenci.soyad}",
+                'sinif': ogrenci.sinif,
+                'benzerlik': round(1 / (1 + uzaklik), 3),
+                'deneme_sayisi': ozet.deneme_sayisi,
+                'son_tyt_net': round(float(son_netler.get(benzer_id) or 0), 2),
+                'en_iyi_tyt_net': round(float(ozet.en_iyi_tyt_net or 0), 2),
+                'en_iyi_puan': round(float(ozet.en_iyi_puan or 0), 2),
+            })
+
+        return {'success': True, 'message': f"{len(benzerler)} benzer öğrenci bulundu.", 'benzerler': benzerler}
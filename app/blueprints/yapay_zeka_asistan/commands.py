@@ -0,0 +1,21 @@
+"""
+Yapay zeka asistanı için komut satırı işlemleri
+Örnek: flask yapay_zeka_asistan konu-onerileri --oneri-sayisi 5
+"""
+
+import click
+
+from app.blueprints.yapay_zeka_asistan import yapay_zeka_asistan_bp
+from app.blueprints.yapay_zeka_asistan.konu_onerici import KonuOneriService, VARSAYILAN_ONERI_SAYISI, BILESEN_SAYISI
+
+@yapay_zeka_asistan_bp.cli.command('konu-onerileri')
+@click.option('--oneri-sayisi', type=int, default=VARSAYILAN_ONERI_SAYISI, help='Öğrenci başına öneri sayısı')
+@click.option('--bilesen-sayisi', type=int, default=BILESEN_SAYISI, help='Matris ayrıştırma boyut sayısı')
+def konu_onerileri(oneri_sayisi, bilesen_sayisi):
+    """Tüm öğrencilerin konu önerilerini yeniden hesapla (gece çalıştırılması önerilir)"""
+    sonuc = KonuOneriService.onerileri_guncelle(oneri_sayisi=oneri_sayisi, bilesen_sayisi=bilesen_sayisi)
+    click.echo(sonuc['message'])
+    if sonuc['success']:
+        click.echo(f"  {sonuc['ogrenci_sayisi']} öğrenci × {sonuc['konu_sayisi']} konu, "
+                   f"{sonuc['gozlem_sayisi']} gözlem, {sonuc['bilesen_sayisi']} bileşen "
+                   f"(açıklanan varyans %{sonuc['aciklanan_varyans'] * 100:.1f}), {sonuc['sure']:.2f} sn")
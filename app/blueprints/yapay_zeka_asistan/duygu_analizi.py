@@ -0,0 +1,318 @@
+"""
+Duygu analizi motoru
+Türkçe duygu sözlüklerini ve bunlardan eğitilen TF-IDF / n-gram
+vektörleştiricilerini bir kez hazırlayıp model_files klasörüne kaydeder;
+sonraki çağrılarda model önbelleğinden yükler. Analiz fonksiyonları metin
+listeleri üzerinde çalışır: bir grup metin tek transform çağrısıyla seyrek
+matrise çevrilir ve skorlar matris işlemleriyle hesaplanır.
+"""
+
+import os
+import hashlib
+import threading
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from app.blueprints.yapay_zeka_asistan.model_onbellegi import ModelOnbellegi, MODEL_DIR
+
+ANALIZ_TIPLERI = ('basit', 'gelismis', 'kapsamli')
+
+# Geniş Türkçe duygu sözlükleri
+OLUMLU_KELIMELER = [
+    'güzel', 'harika', 'mükemmel', 'iyi', 'başarılı', 'mutlu', 'seviyorum', 'teşekkür', 'olumlu',
+    'kolay', 'başardım', 'anladım', 'sevindim', 'memnun', 'keyifli', 'hoş', 'güven', 'tatmin',
+    'sakin', 'rahat', 'huzurlu', 'neşeli', 'coşkulu', 'heyecanlı', 'umutlu', 'motivasyon',
+    'azim', 'kararlı', 'istekli', 'sevgi', 'beğeni', 'takdir', 'gurur', 'memnuniyet', 'tatmin',
+    'zevkli', 'eğlenceli', 'ödül', 'başarı', 'zafer', 'faydalı', 'yararlı', 'değerli', 'önemli',
+    'anlamlı', 'gelişim', 'ilerleme', 'öğrenme', 'anlama', 'kavrama', 'çözme', 'keşfetme'
+]
+
+OLUMSUZ_KELIMELER = [
+    'kötü', 'zor', 'yapamadım', 'anlamadım', 'üzgün', 'mutsuz', 'problem', 'sorun', 'sıkıntı',
+    'başarısız', 'hata', 'zayıf', 'yetersiz', 'kaygı', 'korku', 'endişe', 'stres', 'gergin',
+    'tedirgin', 'karamsarlık', 'umutsuz', 'bezgin', 'bıkkın', 'yorgun', 'tükenmişlik', 'çaresiz',
+    'güçsüz', 'kayıp', 'başarısızlık', 'yenilgi', 'karmaşık', 'zorluk', 'engel', 'baskı', 'gerilim',
+    'kızgın', 'öfkeli', 'sinirli', 'hayal kırıklığı', 'üzüntü', 'hüzün', 'keder', 'ağır', 'yetersiz',
+    'eksik', 'anlamsız', 'faydasız', 'boşuna', 'beyhude', 'imkansız', 'karışık', 'anlaşılmaz',
+    'çözülmez', 'başedemiyorum', 'yetişemiyorum', 'yapamıyorum', 'zorlanıyorum', 'sıkılıyorum'
+]
+
+# Motivasyon ile ilgili kelimeler
+MOTIVASYON_KELIMELERI = [
+    'istek', 'arzu', 'motivasyon', 'azim', 'kararlılık', 'hedef', 'amaç', 'başarma',
+    'çabalamak', 'gayret', 'emek', 'istikrar', 'çalışmak', 'odaklanmak', 'disiplin',
+    'adanmak', 'sebat', 'ısrar', 'süreklilik', 'düzenli', 'planlı', 'programlı'
+]
+
+# Akademik kaygı ile ilgili kelimeler
+KAYGI_KELIMELERI = [
+    'sınav', 'sonuç', 'korku', 'endişe', 'stres', 'baskı', 'kaygı', 'gerginlik',
+    'tedirginlik', 'panik', 'başarısızlık', 'yetersizlik', 'karşılaştırma', 'rakip',
+    'rekabet', 'yarış', 'derece', 'sıralama', 'puan', 'yüksek', 'düşük', 'geçme', 'kalma'
+]
+
+SOZLUKLER = {
+    'olumlu': OLUMLU_KELIMELER,
+    'olumsuz': OLUMSUZ_KELIMELER,
+    'motivasyon': MOTIVASYON_KELIMELERI,
+    'kaygi': KAYGI_KELIMELERI,
+}
+
+# Sözlüklerin özeti; sözlük değiştiğinde kayıtlı vektörleştiriciler yeniden eğitilir
+SOZLUK_IMZASI = hashlib.sha1(
+    repr(sorted((ad, kelimeler) for ad, kelimeler in SOZLUKLER.items())).encode('utf-8')
+).hexdigest()[:12]
+
+DUYGU_MODELI_YOLU = os.path.join(MODEL_DIR, f"duygu_analizi_{SOZLUK_IMZASI}.joblib")
+
+_hazirlama_kilidi = threading.Lock()
+
+
+def metin_temizle(text):
+    """Metni küçük harfe çevirip noktalama işaretlerini temizle (Türkçe karakterler korunur)"""
+    text = (text or '').lower()
+    # Noktalama işaretlerini boşluklarla değiştir
+    for p in '.,;:?!-()[]{}':
+        text = text.replace(p, ' ')
+    # Fazla boşlukları temizle
+    return ' '.join(text.split())
+
+
+def _duygu_modeli_olustur():
+    """Vektörleştiricileri sözlüklerden eğit ve sözlük matrisleriyle birlikte döndür"""
+    egitim_metinleri = [' '.join(OLUMLU_KELIMELER), ' '.join(OLUMSUZ_KELIMELER)]
+
+    # TF-IDF: kelimelerin önem derecesini frekans ve ters doküman frekansıyla ağırlıklandırır
+    tfidf = TfidfVectorizer(max_features=1000, stop_words=None)  # Türkçe için stop words yok
+    tfidf_sozluk = tfidf.fit_transform(egitim_metinleri)
+
+    # N-gramlar tek kelimelerin ötesinde kelime gruplarıyla bağlam bilgisi verir
+    ngram = CountVectorizer(ngram_range=(2, 3), max_features=500)
+    ngram_sozluk = normalize(ngram.fit_transform(egitim_metinleri).astype(float))
+
+    # Sözlük eşleştirmesi için tek kelimelik sayaç; her sözlük bir gösterge vektörüdür
+    kelimeler = sorted({k for liste in SOZLUKLER.values() for k in liste})
+    sayac = CountVectorizer(vocabulary=kelimeler, token_pattern=r'(?u)\S+', lowercase=False)
+    sira = {k: i for i, k in enumerate(kelimeler)}
+    gostergeler = np.zeros((len(kelimeler), len(SOZLUKLER)))
+    for j, liste in enumerate(SOZLUKLER.values()):
+        gostergeler[[sira[k] for k in set(liste)], j] = 1
+
+    return {
+        'sozluk_imzasi': SOZLUK_IMZASI,
+        'tfidf': tfidf,
+        # TF-IDF satırları birim uzunlukta olduğundan kosinüs benzerliği doğrudan iç çarpımdır
+        'tfidf_sozluk': tfidf_sozluk.toarray().T,
+        'ngram': ngram,
+        'ngram_sozluk': ngram_sozluk.toarray().T,
+        'sayac': sayac,
+        'gostergeler': gostergeler,
+    }
+
+
+class DuyguAnalizMotoru:
+    """Önceden eğitilmiş duygu analizi bileşenlerini kullanan toplu analiz sınıfı"""
+
+    @staticmethod
+    def get_model():
+        """
+        Duygu analizi bileşenlerini getir; dosya yoksa sözlüklerden eğitip kaydet
+
+        Returns:
+            Dict: Vektörleştiriciler, sözlük matrisleri ve sözlük göstergeleri
+        """
+        if not os.path.exists(DUYGU_MODELI_YOLU):
+            with _hazirlama_kilidi:
+                if not os.path.exists(DUYGU_MODELI_YOLU):
+                    gecici_yol = f"{DUYGU_MODELI_YOLU}.{os.getpid()}.tmp"
+                    joblib.dump(_duygu_modeli_olustur(), gecici_yol)
+                    os.replace(gecici_yol, DUYGU_MODELI_YOLU)
+        return ModelOnbellegi.yukle(DUYGU_MODELI_YOLU)
+
+    @staticmethod
+    def _sozluk_sayilari(temiz_metinler, model):
+        """Her metin için (olumlu, olumsuz, motivasyon, kaygı) sözlük eşleşme sayıları"""
+        return np.asarray(model['sayac'].transform(temiz_metinler) @ model['gostergeler'])
+
+    @staticmethod
+    def _baskin_duygu(olumlu, olumsuz, notr):
+        """Skor dizilerinden baskın duygu etiketlerini üret"""
+        return np.where(
+            (olumlu > olumsuz) & (olumlu > notr), 'olumlu',
+            np.where((olumsuz > olumlu) & (olumsuz > notr), 'olumsuz', 'notr')
+        )
+
+    @staticmethod
+    def basit_analiz(metinler, model=None):
+        """
+        Basit duygu analizi - kelime eşleştirmesine dayalı
+
+        Args:
+            metinler: Metin listesi
+            model: get_model() çıktısı (None ise yüklenir)
+
+        Returns:
+            List: Her metin için {baskin_duygu, olumlu_skor, olumsuz_skor, notr_skor}
+        """
+        if not metinler:
+            return []
+        model = model or DuyguAnalizMotoru.get_model()
+        sayilar = DuyguAnalizMotoru._sozluk_sayilari([metin_temizle(m) for m in metinler], model)
+
+        olumlu_sayisi, olumsuz_sayisi = sayilar[:, 0], sayilar[:, 1]
+        toplam = olumlu_sayisi + olumsuz_sayisi
+        bolen = np.where(toplam > 0, toplam * 2, 1)  # * 2 ile en fazla 0.5 yapıyoruz
+
+        olumlu_skor = np.where(toplam > 0, olumlu_sayisi / bolen, 0.33)
+        olumsuz_skor = np.where(toplam > 0, olumsuz_sayisi / bolen, 0.33)
+        notr_skor = np.where(toplam > 0, 1 - (olumlu_skor + olumsuz_skor), 0.34)
+        baskin = DuyguAnalizMotoru._baskin_duygu(olumlu_skor, olumsuz_skor, notr_skor)
+
+        return [
+            {
+                'baskin_duygu': str(baskin[i]),
+                'olumlu_skor': float(olumlu_skor[i]),
+                'olumsuz_skor': float(olumsuz_skor[i]),
+                'notr_skor': float(notr_skor[i])
+            }
+            for i in range(len(metinler))
+        ]
+
+    @staticmethod
+    def gelismis_analiz(metinler, model=None):
+        """
+        Gelişmiş duygu analizi - TF-IDF ve n-gram benzerliği
+
+        Args:
+            metinler: Metin listesi
+            model: get_model() çıktısı (None ise yüklenir)
+
+        Returns:
+            List: Her metin için skorlar, baskın duygu ve en etkili 10 kelime
+        """
+        if not metinler:
+            return []
+        model = model or DuyguAnalizMotoru.get_model()
+        temiz_metinler = [metin_temizle(m) for m in metinler]
+
+        # Kosinüs benzerlikleri: (metin sayısı x 2) olumlu / olumsuz sütunları
+        tfidf_vektorleri = model['tfidf'].transform(temiz_metinler)
+        kelime_benzerlik = np.clip(np.asarray(tfidf_vektorleri @ model['tfidf_sozluk']), 0, None)
+        ngram_benzerlik = np.clip(
+            np.asarray(normalize(model['ngram'].transform(temiz_metinler).astype(float)) @ model['ngram_sozluk']),
+            0, None
+        )
+
+        # Ağırlıklı ortalama (kelime bazlı ve n-gram bazlı)
+        skorlar = 0.7 * kelime_benzerlik + 0.3 * ngram_benzerlik
+
+        # Toplam skoru normalize et
+        toplam = skorlar.sum(axis=1, keepdims=True)
+        skorlar = np.where(toplam > 0, skorlar / np.where(toplam > 0, toplam, 1) * 0.8, 0.4)
+        olumlu_skor, olumsuz_skor = skorlar[:, 0], skorlar[:, 1]
+        notr_skor = 1 - (olumlu_skor + olumsuz_skor)
+        baskin = DuyguAnalizMotoru._baskin_duygu(olumlu_skor, olumsuz_skor, notr_skor)
+
+        # Tek kelimelik TF-IDF vektörü birim vektör olduğundan kelimenin sözlüklerle
+        # benzerliği, sözlük matrisindeki kendi satırıdır
+        sozluk_dizini = model['tfidf'].vocabulary_
+        kelime_sozluk = model['tfidf_sozluk']
+
+        sonuclar = []
+        for i, temiz_metin in enumerate(temiz_metinler):
+            kelime_onem = {}
+            for kelime in temiz_metin.split():
+                j = sozluk_dizini.get(kelime)
+                if j is None or kelime in kelime_onem:
+                    continue
+                olumlu_b, olumsuz_b = kelime_sozluk[j]
+                # Kelimenin duygusal yükünü belirle
+                kelime_onem[kelime] = {
+                    'duygu': 'olumlu' if olumlu_b > olumsuz_b else 'olumsuz',
+                    'skor': float(abs(olumlu_b - olumsuz_b))
+                }
+
+            sonuclar.append({
+                'baskin_duygu': str(baskin[i]),
+                'olumlu_skor': float(olumlu_skor[i]),
+                'olumsuz_skor': float(olumsuz_skor[i]),
+                'notr_skor': float(notr_skor[i]),
+                'onemli_kelimeler': dict(sorted(
+                    kelime_onem.items(), key=lambda item: item[1]['skor'], reverse=True
+                )[:10])  # En etkili 10 kelime
+            })
+
+        return sonuclar
+
+    @staticmethod
+    def kapsamli_analiz(metinler, model=None):
+        """
+        Kapsamlı duygu analizi - gelişmiş analize ek olarak motivasyon/kaygı ve cümle analizi
+
+        Args:
+            metinler: Metin listesi
+            model: get_model() çıktısı (None ise yüklenir)
+
+        Returns:
+            List: Her metin için gelişmiş analiz sonuçları ve ek kategoriler
+        """
+        if not metinler:
+            return []
+        model = model or DuyguAnalizMotoru.get_model()
+        sonuclar = DuyguAnalizMotoru.gelismis_analiz(metinler, model)
+
+        temiz_metinler = [metin_temizle(m) for m in metinler]
+        sayilar = DuyguAnalizMotoru._sozluk_sayilari(temiz_metinler, model)
+        kelime_sayilari = np.array([max(len(t.split()), 1) for t in temiz_metinler])
+        motivasyon_skorlari = sayilar[:, 2] / kelime_sayilari
+        kaygi_skorlari = sayilar[:, 3] / kelime_sayilari
+
+        # Tüm metinlerin anlamlı uzunluktaki cümleleri tek seferde analiz edilir
+        cumleler = [
+            (i, cumle.strip())
+            for i, metin in enumerate(metinler)
+            for cumle in (metin or '').split('.')
+            if len(cumle.strip()) > 5
+        ]
+        cumle_sonuclari = DuyguAnalizMotoru.basit_analiz([c for _, c in cumleler], model)
+        cumle_analizleri = [[] for _ in metinler]
+        for (i, cumle), cumle_analiz in zip(cumleler, cumle_sonuclari):
+            cumle_analizleri[i].append({
+                'cumle': cumle,
+                'duygu': cumle_analiz['baskin_duygu'],
+                'skor': max(cumle_analiz['olumlu_skor'], cumle_analiz['olumsuz_skor'])
+            })
+
+        for i, sonuc in enumerate(sonuclar):
+            sonuc.update({
+                'duygu_kategorileri': {
+                    'motivasyon': float(motivasyon_skorlari[i]),
+                    'kaygi': float(kaygi_skorlari[i])
+                },
+                'motivasyon_kaygi_dengesi': float(motivasyon_skorlari[i] - kaygi_skorlari[i]),
+                'cumle_analizleri': cumle_analizleri[i],
+                'duygu_yogunlugu': max(sonuc['olumlu_skor'], sonuc['olumsuz_skor'])
+            })
+
+        return sonuclar
+
+    @staticmethod
+    def analiz_et(metinler, analiz_tipi='gelismis'):
+        """
+        Metin listesini seçilen analiz tipine göre analiz et
+
+        Args:
+            metinler: Metin listesi
+            analiz_tipi: 'basit', 'gelismis' veya 'kapsamli'
+
+        Returns:
+            List: Metinlerle aynı sırada analiz sonuçları
+        """
+        if analiz_tipi == 'basit':
+            return DuyguAnalizMotoru.basit_analiz(metinler)
+        elif analiz_tipi == 'gelismis':
+            return DuyguAnalizMotoru.gelismis_analiz(metinler)
+        return DuyguAnalizMotoru.kapsamli_analiz(metinler)
@@ -0,0 +1,169 @@
+"""
+Model eğitim işleri modülü
+Akademik risk modeli eğitimini web isteğinden ayırarak arka plan iş
+parçacığında çalıştırır. Her iş ModelEgitimIsi tablosunda tutulur; eğitim
+aşamaları ilerledikçe yüzde ve aşama bilgisi güncellenir ve durum API'si
+üzerinden izlenebilir.
+"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.blueprints.yapay_zeka_asistan.models import ModelEgitimIsi
+
+logger = logging.getLogger(__name__)
+
+MODEL_TIPLERI = ('temel', 'gelismis', 'kapsamli')
+
+# Bu süre boyunca ilerleme kaydetmeyen işler yarıda kalmış sayılır (ör. worker yeniden başlamış)
+ASILI_IS_SURESI = timedelta(minutes=30)
+
+
+class ModelEgitimService:
+    """Arka plan model eğitim işlerini yöneten servis sınıfı"""
+
+    _is_parcaciklari = {}
+    _kilit = threading.Lock()
+
+    @staticmethod
+    def is_durumu(egitim_isi):
+        """Eğitim işi kaydını API yanıtı için sözlüğe çevir"""
+        return {
+            'is_id': egitim_isi.id,
+            'model_tipi': egitim_isi.model_tipi,
+            'sinif': egitim_isi.sinif,
+            'durum': egitim_isi.durum,
+            'ilerleme': egitim_isi.ilerleme or 0,
+            'asama': egitim_isi.asama,
+            'mesaj': egitim_isi.mesaj,
+            'model_id': egitim_isi.model_id,
+            'baslangic_zamani': egitim_isi.baslangic_zamani.isoformat() if egitim_isi.baslangic_zamani else None,
+            'bitis_zamani': egitim_isi.bitis_zamani.isoformat() if egitim_isi.bitis_zamani else None,
+        }
+
+    @staticmethod
+    def get_is(is_id):
+        """
+        ID'ye göre eğitim işini getir; uzun süredir ilerlemeyen işleri hatalı olarak işaretle
+
+        Args:
+            is_id: ModelEgitimIsi ID
+
+        Returns:
+            ModelEgitimIsi: İş kaydı veya None
+        """
+        egitim_isi = ModelEgitimIsi.query.get(is_id)
+        if (egitim_isi and egitim_isi.durum in ('bekliyor', 'calisiyor')
+                and egitim_isi.son_guncelleme
+                and datetime.now() - egitim_isi.son_guncelleme > ASILI_IS_SURESI):
+            egitim_isi.durum = 'hata'
+            egitim_isi.mesaj = "Eğitim işi yarıda kesildi. Lütfen yeniden başlatın."
+            egitim_isi.bitis_zamani = datetime.now()
+            db.session.commit()
+        return egitim_isi
+
+    @staticmethod
+    def get_son_isler(limit=10):
+        """Son eğitim işlerini yeniden eskiye getir"""
+        return ModelEgitimIsi.query.order_by(ModelEgitimIsi.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def arka_planda_baslat(sinif=None, model_tipi='gelismis', optimize=False):
+        """
+        Akademik risk modeli eğitimini web isteğini bekletmeden arka planda başlat
+
+        Args:
+            sinif: Sınıf filtresi (örn: '12' veya None)
+            model_tipi: Model tipi ('temel', 'gelismis' veya 'kapsamli')
+            optimize: True ise eğitimden önce hiperparametre araması yapılır
+
+        Returns:
+            Dict: İşlem sonucunu ve iş durumunu içeren sözlük
+        """
+        if model_tipi not in MODEL_TIPLERI:
+            return {
+                "success": False,
+                "message": f"Geçersiz model tipi: {model_tipi}"
+            }
+
+        egitim_isi = ModelEgitimIsi(
+            model_tipi=model_tipi,
+            sinif=sinif,
+            durum='bekliyor',
+            ilerleme=0,
+            asama="Sırada bekliyor"
+        )
+        db.session.add(egitim_isi)
+        db.session.commit()
+
+        app = current_app._get_current_object()
+        with ModelEgitimService._kilit:
+            is_parcacigi = threading.Thread(
+                target=ModelEgitimService._arka_plan_calistir,
+                args=(app, egitim_isi.id, optimize),
+                name=f"model-egitimi-{egitim_isi.id}",
+                daemon=True
+            )
+            ModelEgitimService._is_parcaciklari[egitim_isi.id] = is_parcacigi
+            is_parcacigi.start()
+
+        return {
+            "success": True,
+            "message": "Model eğitimi arka planda başlatıldı.",
+            **ModelEgitimService.is_durumu(egitim_isi)
+        }
+
+    @staticmethod
+    def _arka_plan_calistir(app, is_id, optimize=False):
+        with app.app_context():
+            try:
+                ModelEgitimService.calistir(is_id, optimize)
+            finally:
+                db.session.remove()
+                ModelEgitimService._is_parcaciklari.pop(is_id, None)
+
+    @staticmethod
+    def calistir(is_id, optimize=False):
+        """
+        Eğitim işini çalıştır ve ilerlemesini iş kaydına yaz
+
+        Args:
+            is_id: ModelEgitimIsi ID
+            optimize: True ise eğitimden önce hiperparametre araması yapılır
+
+        Returns:
+            Dict: İş durumu
+        """
+        from app.blueprints.yapay_zeka_asistan.services import YapayZekaService
+
+        egitim_isi = ModelEgitimIsi.query.get(is_id)
+        egitim_isi.durum = 'calisiyor'
+        db.session.commit()
+
+        def ilerleme(yuzde, asama):
+            egitim_isi.ilerleme = yuzde
+            egitim_isi.asama = asama
+            db.session.commit()
+
+        try:
+            sonuc = YapayZekaService.olustur_akademik_risk_modeli(
+                egitim_isi.sinif, egitim_isi.model_tipi, ilerleme=ilerleme, optimize=optimize
+            )
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Model eğitim işi hatası (iş {is_id}): {str(e)}")
+            sonuc = {'success': False, 'message': str(e)}
+
+        egitim_isi.durum = 'tamamlandi' if sonuc['success'] else 'hata'
+        egitim_isi.ilerleme = 100 if sonuc['success'] else egitim_isi.ilerleme
+        egitim_isi.asama = "Tamamlandı" if sonuc['success'] else "Hata"
+        egitim_isi.mesaj = sonuc['message']
+        egitim_isi.model_id = sonuc.get('model_id')
+        egitim_isi.bitis_zamani = datetime.now()
+        db.session.commit()
+
+        return ModelEgitimService.is_durumu(egitim_isi)
@@ -0,0 +1,318 @@
+"""
+Gelişmiş veri analizi modülü
+Sınıflar arası karşılaştırma, zaman serisi ve sınıf bazlı net tahminlerini
+SQL tarafında (sınıf, tarih) düzeyine indirgenmiş toplamlar üzerinden pandas
+ile vektörel olarak hesaplar. Sonuçlar süreç içinde TTL'li bir önbellekte
+tutulur; Ogrenci, DenemeSonuc veya DersIlerleme tablosuna yazan her commit
+önbelleği geçersiz kılar. Core ifadeleriyle silme yapan yollar (arşivleme)
+onbellegi_gecersiz_kil ile bildirir. TTL yalnızca diğer süreçlerdeki yazmalar
+için üst sınırdır.
+"""
+
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc
+from app.blueprints.calisma_programi.models import DersIlerleme
+
+TYT_NETLERI = [
+    DenemeSonuc.net_tyt_turkce, DenemeSonuc.net_tyt_sosyal,
+    DenemeSonuc.net_tyt_matematik, DenemeSonuc.net_tyt_fen,
+]
+AYT_NETLERI = [
+    DenemeSonuc.net_ayt_matematik, DenemeSonuc.net_ayt_fizik, DenemeSonuc.net_ayt_kimya,
+    DenemeSonuc.net_ayt_biyoloji, DenemeSonuc.net_ayt_edebiyat, DenemeSonuc.net_ayt_tarih,
+    DenemeSonuc.net_ayt_cografya, DenemeSonuc.net_ayt_felsefe,
+]
+
+# Uygulama ayarı (ANALIZ_ONBELLEK_SURESI) yoksa önbellek ömrü (saniye)
+VARSAYILAN_SURE = 300
+
+# Tahminde kullanılan ileri gün sayısı ve "sabit" sayılan aylık net değişimi
+TAHMIN_UFKU_GUN = 30
+SABIT_EGIM_ESIGI = 0.5
+TYT_AZAMI_NET = 120
+
+# Önbelleği geçersiz kılan tablolar (öğrencinin sınıfı analizlerin gruplama anahtarıdır)
+IZLENEN_MODELLER = (Ogrenci, DenemeSonuc, DersIlerleme)
+
+# anahtar -> (hesaplanma zamanı, sonuç)
+_onbellek = {}
+# Her geçersiz kılmada artar; hesap sürerken yazma olduysa sonuç önbelleğe alınmaz
+_surum = [0]
+_kilit = threading.Lock()
+
+
+def _sure():
+    if has_app_context():
+        return current_app.config.get('ANALIZ_ONBELLEK_SURESI', VARSAYILAN_SURE)
+    return VARSAYILAN_SURE
+
+
+def onbellegi_temizle():
+    """Tüm gelişmiş analiz sonuçlarını geçersiz kıl"""
+    with _kilit:
+        _surum[0] += 1
+        _onbellek.clear()
+
+
+def onbellegi_gecersiz_kil(connection):
+    """
+    Mapper olaylarını tetiklemeyen yazmalar için önbelleği geçersiz kıl
+
+    Args:
+        connection: Session ise önbellek commit sonrasında, Connection ise
+            hemen temizlenir (çağıran commit sonrasında tekrar temizlemelidir)
+    """
+    if isinstance(connection, Session):
+        connection.info['gelismis_analiz_degisti'] = True
+    else:
+        onbellegi_temizle()
+
+
+def _izlenen_mi(nesneler):
+    return any(isinstance(nesne, IZLENEN_MODELLER) for nesne in nesneler)
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    if _izlenen_mi(session.new) or _izlenen_mi(session.dirty) or _izlenen_mi(session.deleted):
+        session.info['gelismis_analiz_degisti'] = True
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # insert(Model) / update() / delete() ifadeleri flush olaylarını tetiklemez
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, IZLENEN_MODELLER):
+        orm_execute_state.session.info['gelismis_analiz_degisti'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _commit_sonrasi(session):
+    if session.info.pop('gelismis_analiz_degisti', False):
+        onbellegi_temizle()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _rollback_sonrasi(session):
+    session.info.pop('gelismis_analiz_degisti', None)
+
+
+def _onbellekten(anahtar, hesapla):
+    """Sonucu önbellekten getir; yoksa veya süresi dolduysa hesaplayıp sakla"""
+    with _kilit:
+        kayit = _onbellek.get(anahtar)
+        if kayit and time.monotonic() - kayit[0] < _sure():
+            return kayit[1]
+        surum = _surum[0]
+
+    sonuc = hesapla()
+
+    with _kilit:
+        if surum == _surum[0]:
+            _onbellek[anahtar] = (time.monotonic(), sonuc)
+    return sonuc
+
+
+def _oku(sorgu):
+    return pd.read_sql(sorgu, db.session.connection())
+
+
+def _sinif_tarih_ozeti():
+    """
+    Deneme sonuçlarının (sınıf, tarih) bazında toplamları
+
+    Üç analizin ortak girdisidir; okul genelindeki tüm satırlar yerine sınıf
+    sayısı x deneme tarihi kadar satır döner.
+    """
+    def hesapla():
+        ozet = _oku(
+            select(
+                Ogrenci.sinif,
+                DenemeSonuc.tarih,
+                func.count(DenemeSonuc.id).label('sayi'),
+                func.count(func.distinct(DenemeSonuc.ogrenci_id)).label('ogrenci'),
+                func.sum(sum(func.coalesce(s, 0) for s in TYT_NETLERI)).label('tyt_toplam'),
+                func.sum(sum(func.coalesce(s, 0) for s in AYT_NETLERI)).label('ayt_toplam'),
+                *[func.sum(func.coalesce(s, 0)).label(s.key) for s in TYT_NETLERI],
+            )
+            .join(Ogrenci, Ogrenci.id == DenemeSonuc.ogrenci_id)
+            .group_by(Ogrenci.sinif, DenemeSonuc.tarih)
+        )
+        ozet['sinif'] = ozet['sinif'].fillna('Belirtilmemiş')
+        ozet['tarih'] = pd.to_datetime(ozet['tarih'])
+        return ozet
+
+    return _onbellekten('sinif_tarih_ozeti', hesapla)
+
+
+def _yuvarla(df, basamak=2):
+    """DataFrame'i şablon/JSON için sözlük listesine çevir (NaN -> None)"""
+    df = df.round(basamak).astype(object)
+    return df.where(df.notna(), None).to_dict('records')
+
+
+class GelismisAnaliz:
+    """Gelişmiş veri analizi hesaplarını yöneten sınıf"""
+
+    @staticmethod
+    def sinif_karsilastirmasi():
+        """
+        Sınıfların deneme ortalamalarını, konu ilerlemesini ve okul ortalamasına farkını hesapla
+
+        Returns:
+            Dict: {'okul': {...}, 'siniflar': [{'sinif', 'ogrenci_sayisi', 'ort_tyt_net', ...}]}
+        """
+        def hesapla():
+            ozet = _sinif_tarih_ozeti()
+            ogrenciler = _oku(
+                select(Ogrenci.sinif, func.count(Ogrenci.id).label('ogrenci_sayisi')).group_by(Ogrenci.sinif)
+            )
+            ilerleme = _oku(
+                select(Ogrenci.sinif, func.avg(DersIlerleme.tamamlama_yuzdesi).label('ort_ilerleme'))
+                .join(Ogrenci, Ogrenci.id == DersIlerleme.ogrenci_id)
+                .group_by(Ogrenci.sinif)
+            )
+            for tablo in (ogrenciler, ilerleme):
+                tablo['sinif'] = tablo['sinif'].fillna('Belirtilmemiş')
+
+            ders_sutunlari = [s.key for s in TYT_NETLERI]
+            toplam = ozet.groupby('sinif')[['sayi', 'tyt_toplam', 'ayt_toplam'] + ders_sutunlari].sum()
+
+            siniflar = pd.DataFrame(index=toplam.index)
+            siniflar['deneme_sayisi'] = toplam['sayi']
+            siniflar['ort_tyt_net'] = toplam['tyt_toplam'] / toplam['sayi']
+            siniflar['ort_ayt_net'] = toplam['ayt_toplam'] / toplam['sayi']
+            siniflar[ders_sutunlari] = toplam[ders_sutunlari].div(toplam['sayi'], axis=0)
+
+            siniflar = (ogrenciler.set_index('sinif')
+                        .join(siniflar, how='outer')
+                        .join(ilerleme.set_index('sinif'), how='left'))
+            siniflar['ogrenci_sayisi'] = siniflar['ogrenci_sayisi'].fillna(0).astype(int)
+            siniflar['deneme_sayisi'] = siniflar['deneme_sayisi'].fillna(0).astype(int)
+
+            deneme_toplam = int(toplam['sayi'].sum())
+            okul_tyt = float(toplam['tyt_toplam'].sum() / deneme_toplam) if deneme_toplam else None
+            okul_ayt = float(toplam['ayt_toplam'].sum() / deneme_toplam) if deneme_toplam else None
+
+            siniflar['okul_farki'] = siniflar['ort_tyt_net'] - okul_tyt if okul_tyt is not None else np.nan
+            siniflar['sira'] = siniflar['ort_tyt_net'].rank(ascending=False, method='min')
+            siniflar = siniflar.sort_values(['ort_tyt_net'], ascending=False, na_position='last')
+
+            return {
+                'okul': {
+                    'ogrenci_sayisi': int(siniflar['ogrenci_sayisi'].sum()),
+                    'deneme_sayisi': deneme_toplam,
+                    'ort_tyt_net': round(okul_tyt, 2) if okul_tyt is not None else None,
+                    'ort_ayt_net': round(okul_ayt, 2) if okul_ayt is not None else None,
+                },
+                'siniflar': _yuvarla(siniflar.reset_index().rename(columns={'index': 'sinif'}))
+            }
+
+        return _onbellekten('sinif_karsilastirmasi', hesapla)
+
+    @staticmethod
+    def zaman_serisi():
+        """
+        Okul geneli ve sınıf seviyesi bazında aylık ortalama netleri hesapla
+
+        Returns:
+            Dict: 'aylar' etiketleri ve bunlarla hizalı değer listeleri; 'seviyeler'
+            her sınıf seviyesi (9-12) için aylık ortalama TYT neti (veri yoksa None)
+        """
+        def hesapla():
+            ozet = _sinif_tarih_ozeti()
+            if ozet.empty:
+                return {'aylar': [], 'ort_tyt_net': [], 'ort_ayt_net': [], 'hareketli_ortalama': [],
+                        'degisim': [], 'deneme_sayisi': [], 'seviyeler': {}}
+
+            ay = ozet['tarih'].dt.to_period('M').rename('ay')
+            aylik = ozet.groupby(ay)[['sayi', 'tyt_toplam', 'ayt_toplam']].sum()
+            # Deneme yapılmayan aylar boş görünsün diye aralık tamamlanır
+            aylik = aylik.reindex(pd.period_range(aylik.index.min(), aylik.index.max(), freq='M'))
+
+            ort_tyt = aylik['tyt_toplam'] / aylik['sayi']
+            ort_ayt = aylik['ayt_toplam'] / aylik['sayi']
+
+            seviye = ozet['sinif'].str.extract(r'^(\d+)', expand=False).rename('seviye')
+            seviye_toplam = ozet.groupby([seviye, ay])[['sayi', 'tyt_toplam']].sum()
+            seviye_ort = (seviye_toplam['tyt_toplam'] / seviye_toplam['sayi']).unstack('seviye').reindex(aylik.index)
+            seviye_ort = seviye_ort[sorted(seviye_ort.columns, key=int)]
+
+            def liste(seri):
+                seri = seri.round(2).astype(object)
+                return seri.where(seri.notna(), None).tolist()
+
+            return {
+                'aylar': [str(p) for p in aylik.index],
+                'ort_tyt_net': liste(ort_tyt),
+                'ort_ayt_net': liste(ort_ayt),
+                'hareketli_ortalama': liste(ort_tyt.rolling(3, min_periods=1).mean()),
+                'degisim': liste(ort_tyt.diff()),
+                'deneme_sayisi': aylik['sayi'].fillna(0).astype(int).tolist(),
+                'seviyeler': {s: liste(seviye_ort[s]) for s in seviye_ort.columns},
+            }
+
+        return _onbellekten('zaman_serisi', hesapla)
+
+    @staticmethod
+    def sinif_tahminleri():
+        """
+        Her sınıf için ağırlıklı doğrusal eğilimle bir sonraki ayın TYT net ortalamasını tahmin et
+
+        Eğim, deneme sayısıyla ağırlıklandırılmış en küçük kareler
+        toplamlarından sınıf bazında tek bir groupby ile hesaplanır.
+
+        Returns:
+            List: [{'sinif', 'veri_noktasi', 'son_ortalama', 'aylik_egim', 'tahmin', 'yon'}]
+        """
+        def hesapla():
+            ozet = _sinif_tarih_ozeti()
+            if ozet.empty:
+                return []
+
+            x = (ozet['tarih'] - ozet['tarih'].min()).dt.days.astype(float)
+            w = ozet['sayi'].astype(float)
+            wy = ozet['tyt_toplam'].astype(float)  # w * ortalama = toplam
+            toplamlar = pd.DataFrame({
+                'sinif': ozet['sinif'], 'w': w, 'wx': w * x, 'wy': wy,
+                'wxx': w * x * x, 'wxy': x * wy, 'x': x, 'n': 1,
+            }).groupby('sinif').agg({'w': 'sum', 'wx': 'sum', 'wy': 'sum', 'wxx': 'sum', 'wxy': 'sum',
+                                     'x': 'max', 'n': 'sum'})
+
+            payda = toplamlar['w'] * toplamlar['wxx'] - toplamlar['wx'] ** 2
+            egim = (toplamlar['w'] * toplamlar['wxy'] - toplamlar['wx'] * toplamlar['wy']) / payda.where(payda > 0)
+            egim = egim.where(toplamlar['n'] >= 2).fillna(0.0)
+            kesisim = (toplamlar['wy'] - egim * toplamlar['wx']) / toplamlar['w']
+
+            son = ozet.loc[ozet.groupby('sinif')['tarih'].idxmax()].set_index('sinif')
+            son_ortalama = son['tyt_toplam'] / son['sayi']
+
+            tahmin = (kesisim + egim * (toplamlar['x'] + TAHMIN_UFKU_GUN)).clip(0, TYT_AZAMI_NET)
+            aylik_egim = egim * 30
+
+            sonuc = pd.DataFrame({
+                'veri_noktasi': toplamlar['n'].astype(int),
+                'son_ortalama': son_ortalama,
+                'aylik_egim': aylik_egim,
+                'tahmin': tahmin,
+                'yon': np.select(
+                    [aylik_egim > SABIT_EGIM_ESIGI, aylik_egim < -SABIT_EGIM_ESIGI],
+                    ['yukseliyor', 'dusuyor'], 'sabit'
+                ),
+            })
+            sonuc.index.name = 'sinif'
+            return _yuvarla(sonuc.sort_index().reset_index())
+
+        return _onbellekten('sinif_tahminleri', hesapla)
@@ -0,0 +1,185 @@
+"""
+Hiperparametre arama modülü
+Akademik risk modelinin tahmincileri için HalvingRandomSearchCV ile
+ardışık yarılamalı rastgele arama yapar: adaylar önce küçük örneklemlerde
+denenir, yalnızca iyi olanlar daha fazla veriyle yeniden değerlendirilir.
+Çapraz doğrulama tüm çekirdeklerde paralel çalışır.
+
+Arama ve değerlendirme sonuçları joblib.Memory ile diske önbelleklenir; veri
+değişmeden yapılan yeniden aramalar hesaplama yapmaz. Veri değiştiğinde aynı
+model tipi ve sınıf için bulunan önceki en iyi ayar da yeni en iyi adayla
+birlikte değerlendirilir ve daha iyi olan korunur.
+"""
+
+import os
+import json
+import time
+
+import numpy as np
+from joblib import Memory
+from scipy.stats import loguniform, randint, uniform
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold, cross_val_score
+
+from app.blueprints.yapay_zeka_asistan.models import ModelAyarAramasi
+from app.blueprints.yapay_zeka_asistan.model_onbellegi import MODEL_DIR
+
+# Ara sonuçların saklandığı klasör ve üst boyut sınırı
+AYAR_ONBELLEK_DIR = os.path.join(MODEL_DIR, 'ayar_onbellegi')
+ONBELLEK_SINIRI = '200M'
+
+CV_KAT_SAYISI = 5
+ADAY_SAYISI = 48
+YARILAMA_KATSAYISI = 3
+RASTGELE_TOHUM = 42
+
+# Model tipine göre ayarlanan tahminciler; ilk sıradaki ana tahmincidir
+MODEL_TAHMINCILERI = {
+    'temel': ['rf'],
+    'gelismis': ['gb'],
+    'kapsamli': ['gb', 'rf', 'lr'],
+}
+
+_bellek = Memory(AYAR_ONBELLEK_DIR, verbose=0)
+
+
+def _tahminci(ad):
+    # Paralellik arama düzeyinde yapıldığı için tahminciler tek çekirdekte çalışır
+    if ad == 'rf':
+        return RandomForestClassifier(n_estimators=100, random_state=RASTGELE_TOHUM, n_jobs=1)
+    if ad == 'gb':
+        return GradientBoostingClassifier(n_estimators=150, learning_rate=0.1, random_state=RASTGELE_TOHUM)
+    return LogisticRegression(C=1.0, random_state=RASTGELE_TOHUM, max_iter=1000)
+
+
+def _arama_uzayi(ad):
+    if ad == 'rf':
+        return {
+            'n_estimators': [100, 200, 300],
+            'max_depth': [None, 4, 6, 8, 12],
+            'min_samples_leaf': randint(1, 10),
+            'max_features': ['sqrt', 0.5, None],
+        }
+    if ad == 'gb':
+        return {
+            'n_estimators': randint(50, 300),
+            'learning_rate': loguniform(0.01, 0.3),
+            'max_depth': randint(2, 6),
+            'subsample': uniform(0.6, 0.4),
+        }
+    return {'C': loguniform(1e-2, 1e2)}
+
+
+def _cv():
+    return StratifiedKFold(n_splits=CV_KAT_SAYISI, shuffle=True, random_state=RASTGELE_TOHUM)
+
+
+def _duz(deger):
+    """NumPy skalerlerini JSON'a yazılabilir Python tiplerine çevir"""
+    return deger.item() if isinstance(deger, np.generic) else deger
+
+
+@_bellek.cache
+def _ara(ad, X, y):
+    arama = HalvingRandomSearchCV(
+        _tahminci(ad), _arama_uzayi(ad),
+        n_candidates=ADAY_SAYISI,
+        factor=YARILAMA_KATSAYISI,
+        aggressive_elimination=True,
+        cv=_cv(),
+        scoring='accuracy',
+        refit=False,
+        n_jobs=-1,
+        random_state=RASTGELE_TOHUM
+    ).fit(X, y)
+
+    return {
+        'parametreler': {k: _duz(v) for k, v in arama.best_params_.items()},
+        'aday_sayisi': int(sum(arama.n_candidates_)),
+        'iterasyon_sayisi': int(arama.n_iterations_),
+    }
+
+
+@_bellek.cache
+def _degerlendir(ad, parametreler, X, y):
+    skorlar = cross_val_score(_tahminci(ad).set_params(**parametreler), X, y, cv=_cv(), scoring='accuracy', n_jobs=-1)
+    return float(skorlar.mean()), float(skorlar.std())
+
+
+class HiperparametreArama:
+    """Akademik risk modeli hiperparametre aramasını yöneten sınıf"""
+
+    @staticmethod
+    def aranabilir_mi(y):
+        """
+        Her sınıfta çapraz doğrulama katı kadar örnek varsa ve örnek sayısı
+        yarılamalı aramanın ilk turuna (2 x kat sayısı x sınıf sayısı) yetiyorsa True döner
+        """
+        sayilar = np.bincount(np.asarray(y, dtype=int))
+        sayilar = sayilar[sayilar > 0]
+        return (len(sayilar) == 2 and sayilar.min() >= CV_KAT_SAYISI
+                and sayilar.sum() >= 2 * CV_KAT_SAYISI * len(sayilar))
+
+    @staticmethod
+    def onceki_parametreler(model_tipi, sinif=None):
+        """Aynı model tipi ve sınıf için kaydedilmiş son en iyi ayarları getir"""
+        kayit = (ModelAyarAramasi.query
+                 .filter_by(model_tipi=model_tipi, sinif=sinif)
+                 .order_by(ModelAyarAramasi.id.desc())
+                 .first())
+        return json.loads(kayit.en_iyi_parametreler) if kayit and kayit.en_iyi_parametreler else {}
+
+    @staticmethod
+    def ayarla(model_tipi, X, y, sinif=None, bildir=None):
+        """
+        Model tipinin tahmincileri için hiperparametre araması yap
+
+        Args:
+            model_tipi: Model tipi ('temel', 'gelismis' veya 'kapsamli')
+            X: Eğitim özellikleri
+            y: Eğitim etiketleri
+            sinif: Sınıf filtresi (önceki aramayı bulmak için)
+            bildir: İsteğe bağlı ilerleme bildirimi; (yuzde, asama) ile çağrılır
+
+        Returns:
+            Dict: {'parametreler', 'cv_skoru', 'cv_std', 'aday_sayisi', 'sure', 'detay'}
+            veya veri aramaya yetmiyorsa None
+        """
+        if not HiperparametreArama.aranabilir_mi(y):
+            return None
+
+        bildir = bildir or (lambda yuzde, asama: None)
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=int)
+        onceki = HiperparametreArama.onceki_parametreler(model_tipi, sinif)
+        tahminciler = MODEL_TAHMINCILERI[model_tipi]
+
+        baslangic = time.perf_counter()
+        detay = {}
+        for sira, ad in enumerate(tahminciler):
+            bildir(15 + 10 * sira, f"Hiperparametre araması ({ad.upper()})")
+            arama = _ara(ad, X, y)
+            skor, std = _degerlendir(ad, arama['parametreler'], X, y)
+            sonuc = {**arama, 'cv_skoru': skor, 'cv_std': std, 'onceki_korundu': False}
+
+            if onceki.get(ad) and onceki[ad] != arama['parametreler']:
+                onceki_skor, onceki_std = _degerlendir(ad, onceki[ad], X, y)
+                if onceki_skor > skor:
+                    sonuc.update(parametreler=onceki[ad], cv_skoru=onceki_skor, cv_std=onceki_std, onceki_korundu=True)
+
+            detay[ad] = sonuc
+
+        _bellek.reduce_size(bytes_limit=ONBELLEK_SINIRI)
+
+        ana = detay[tahminciler[0]]
+        return {
+            'parametreler': {ad: sonuc['parametreler'] for ad, sonuc in detay.items()},
+            'cv_skoru': ana['cv_skoru'],
+            'cv_std': ana['cv_std'],
+            'cv_kat_sayisi': CV_KAT_SAYISI,
+            'aday_sayisi': sum(sonuc['aday_sayisi'] for sonuc in detay.values()),
+            'sure': time.perf_counter() - baslangic,
+            'detay': detay,
+        }
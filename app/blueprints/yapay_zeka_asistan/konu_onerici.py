@@ -0,0 +1,243 @@
+"""
+Konu önerisi modülü
+Öğrenci × konu doğru oranı matrisini KonuTakip kayıtlarından seyrek (CSR)
+matris olarak kurar ve TruncatedSVD ile ayrıştırır. Gözlenmeyen hücreler için
+tahmin; genel ortalama, konu ve öğrenci sapmaları ile düşük ranklı etkileşim
+teriminin toplamıdır. Tüm öğrenciler için tahminler tek seferde, parça parça
+matris çarpımıyla hesaplanır ve her öğrencinin tahmini en düşük başarılı
+(tamamlanmamış) konuları KonuOnerisi tablosuna yazılır.
+
+Hesaplama gece çalışan `flask yapay_zeka_asistan konu-onerileri` komutuyla
+yenilenir; konu takip sayfası yalnızca kayıtlı önerileri okur.
+"""
+
+import time
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import contains_eager
+
+from app.extensions import db
+from app.blueprints.yapay_zeka_asistan.models import KonuOnerisi
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.ders_konu_yonetimi.models import Konu
+from app.blueprints.calisma_programi.models import KonuTakip, DersProgrami
+
+VARSAYILAN_ONERI_SAYISI = 5
+# Ayrıştırmada kullanılan gizil boyut sayısı (üst sınır)
+BILESEN_SAYISI = 20
+# Az soru çözülmüş konu ve öğrenci sapmalarını ortalamaya çeken düzenlileştirme
+SAPMA_DUZENLEYICI = 5.0
+# Tahmin matrisinin tek seferde yoğun hesaplanan satır sayısı
+TAHMIN_PARCASI = 1000
+YAZMA_PARCASI = 5000
+RASTGELE_TOHUM = 42
+
+
+def _parcalar(dizi, boyut=YAZMA_PARCASI):
+    for i in range(0, len(dizi), boyut):
+        yield dizi[i:i + boyut]
+
+
+def _indeksle(degerler, sozluk):
+    return pd.Index(sozluk).get_indexer(degerler)
+
+
+class KonuOneriService:
+    """Öğrencilere zayıf oldukları tahmin edilen konuları öneren servis sınıfı"""
+
+    @staticmethod
+    def _verileri_oku():
+        """Öğrenci, konu, takip ve ders programı verilerini toplu oku"""
+        baglanti = db.session.connection()
+        ogrenciler = pd.read_sql(select(Ogrenci.id), baglanti)['id'].to_numpy()
+        konular = pd.read_sql(select(Konu.id, Konu.ders_id).order_by(Konu.id), baglanti)
+        takipler = pd.read_sql(
+            select(KonuTakip.ogrenci_id, KonuTakip.konu_id, KonuTakip.tamamlandi,
+                   KonuTakip.cozulen_soru, KonuTakip.dogru_soru),
+            baglanti
+        )
+        programlar = pd.read_sql(select(DersProgrami.ogrenci_id, DersProgrami.ders_id).distinct(), baglanti)
+        return ogrenciler, konular, takipler, programlar
+
+    @staticmethod
+    def _matris(satir, sutun, deger, sekil):
+        return sparse.csr_matrix((deger, (satir, sutun)), shape=sekil)
+
+    @staticmethod
+    def onerileri_guncelle(oneri_sayisi=VARSAYILAN_ONERI_SAYISI, bilesen_sayisi=BILESEN_SAYISI):
+        """
+        Tüm öğrenciler için konu önerilerini yeniden hesapla ve kaydet
+
+        Args:
+            oneri_sayisi: Öğrenci başına kaydedilecek öneri sayısı
+            bilesen_sayisi: TruncatedSVD gizil boyut sayısı
+
+        Returns:
+            Dict: İşlem sonucu ve istatistikler
+        """
+        try:
+            baslangic = time.perf_counter()
+            ogrenciler, konular, takipler, programlar = KonuOneriService._verileri_oku()
+            if len(ogrenciler) == 0 or konular.empty:
+                return {'success': False, 'message': 'Öneri üretmek için öğrenci ve konu kaydı gerekli.'}
+
+            konu_idleri = konular['id'].to_numpy()
+            sekil = (len(ogrenciler), len(konu_idleri))
+
+            takipler = takipler.assign(
+                satir=_indeksle(takipler['ogrenci_id'], ogrenciler),
+                sutun=_indeksle(takipler['konu_id'], konu_idleri)
+            )
+            takipler = takipler[(takipler['satir'] >= 0) & (takipler['sutun'] >= 0)]
+            # Aynı öğrenci-konu çifti için birden fazla takip kaydı varsa birleştir
+            takipler = (takipler
+                        .assign(tamamlandi=takipler['tamamlandi'].fillna(False).astype(bool))
+                        .groupby(['satir', 'sutun'], as_index=False)
+                        .agg(tamamlandi=('tamamlandi', 'max'),
+                             cozulen_soru=('cozulen_soru', 'sum'),
+                             dogru_soru=('dogru_soru', 'sum')))
+
+            # Gözlenen doğru oranları (yalnızca soru çözülmüş konular)
+            cozulen = takipler['cozulen_soru'].fillna(0).to_numpy(dtype=float)
+            gozlem = takipler[cozulen > 0]
+            satir = gozlem['satir'].to_numpy()
+            sutun = gozlem['sutun'].to_numpy()
+            oran = np.clip(gozlem['dogru_soru'].fillna(0).to_numpy(dtype=float)
+                           / gozlem['cozulen_soru'].to_numpy(dtype=float), 0.0, 1.0)
+
+            # Temel tahmin: genel ortalama + düzenlileştirilmiş konu ve öğrenci sapmaları
+            genel = oran.mean() if len(oran) else 0.5
+            konu_sapma = (np.bincount(sutun, weights=oran - genel, minlength=sekil[1])
+                          / (np.bincount(sutun, minlength=sekil[1]) + SAPMA_DUZENLEYICI))
+            kalan = oran - genel - konu_sapma[sutun]
+            ogrenci_sapma = (np.bincount(satir, weights=kalan, minlength=sekil[0])
+                             / (np.bincount(satir, minlength=sekil[0]) + SAPMA_DUZENLEYICI))
+            kalan = kalan - ogrenci_sapma[satir]
+
+            # Temel tahminden sapmaların düşük ranklı ayrıştırması
+            bilesen = min(bilesen_sayisi, min(sekil) - 1, len(oran))
+            if bilesen >= 1:
+                svd = TruncatedSVD(n_components=bilesen, algorithm='randomized', random_state=RASTGELE_TOHUM)
+                ogrenci_faktor = svd.fit_transform(KonuOneriService._matris(satir, sutun, kalan, sekil)).astype(np.float32)
+                konu_faktor = svd.components_.astype(np.float32)
+                aciklanan = float(svd.explained_variance_ratio_.sum())
+            else:
+                ogrenci_faktor = np.zeros((sekil[0], 0), dtype=np.float32)
+                konu_faktor = np.zeros((0, sekil[1]), dtype=np.float32)
+                aciklanan = 0.0
+
+            gozlenen = KonuOneriService._matris(satir, sutun, oran, sekil)
+            gozlendi = KonuOneriService._matris(satir, sutun, np.ones(len(satir), dtype=bool), sekil)
+
+            # Tamamlanan konular öneri dışı; öğrencinin programı varsa yalnızca programdaki dersler
+            tamam = takipler[takipler['tamamlandi']]
+            tamamlandi = KonuOneriService._matris(
+                tamam['satir'].to_numpy(), tamam['sutun'].to_numpy(), np.ones(len(tamam), dtype=bool), sekil)
+
+            ders_idleri = np.unique(konular['ders_id'].to_numpy())
+            programlar = programlar.assign(
+                satir=_indeksle(programlar['ogrenci_id'], ogrenciler),
+                sutun=_indeksle(programlar['ders_id'], ders_idleri)
+            )
+            programlar = programlar[(programlar['satir'] >= 0) & (programlar['sutun'] >= 0)]
+            ogrenci_ders = KonuOneriService._matris(
+                programlar['satir'].to_numpy(), programlar['sutun'].to_numpy(),
+                np.ones(len(programlar), dtype=np.int8), (sekil[0], len(ders_idleri)))
+            ders_konu = KonuOneriService._matris(
+                _indeksle(konular['ders_id'], ders_idleri), np.arange(sekil[1]),
+                np.ones(sekil[1], dtype=np.int8), (len(ders_idleri), sekil[1]))
+            programda = (ogrenci_ders @ ders_konu).astype(bool).tocsr()
+            programi_var = np.diff(ogrenci_ders.indptr) > 0
+
+            temel = (genel + konu_sapma).astype(np.float32)
+            n = min(oneri_sayisi, sekil[1])
+            olusturma = datetime.now()
+            kayitlar = []
+
+            for bas in range(0, sekil[0], TAHMIN_PARCASI):
+                son = min(bas + TAHMIN_PARCASI, sekil[0])
+                tahmin = ogrenci_faktor[bas:son] @ konu_faktor
+                tahmin += temel
+                tahmin += ogrenci_sapma[bas:son, None].astype(np.float32)
+                np.clip(tahmin, 0.0, 1.0, out=tahmin)
+
+                aday = ~tamamlandi[bas:son].toarray()
+                aday &= programda[bas:son].toarray() | ~programi_var[bas:son, None]
+                skor = np.where(aday, tahmin, np.inf)
+
+                secilen = np.argpartition(skor, n - 1, axis=1)[:, :n]
+                secilen_skor = np.take_along_axis(skor, secilen, axis=1)
+                sira = np.argsort(secilen_skor, axis=1)
+                secilen = np.take_along_axis(secilen, sira, axis=1)
+                secilen_skor = np.take_along_axis(secilen_skor, sira, axis=1)
+
+                yerel, derece = np.nonzero(np.isfinite(secilen_skor))
+                konu_sutun = secilen[yerel, derece]
+                global_satir = yerel + bas
+                gercek = np.asarray(gozlenen[global_satir, konu_sutun]).ravel()
+                var = np.asarray(gozlendi[global_satir, konu_sutun]).ravel()
+
+                kayitlar.extend(
+                    {
+                        'ogrenci_id': int(o),
+                        'konu_id': int(k),
+                        'sira': int(s) + 1,
+                        'tahmini_basari': round(float(t), 4),
+                        'gozlenen_basari': round(float(g), 4) if v else None,
+                        'olusturma_tarihi': olusturma,
+                    }
+                    for o, k, s, t, g, v in zip(
+                        ogrenciler[global_satir], konu_idleri[konu_sutun], derece,
+                        secilen_skor[yerel, derece], gercek, var)
+                )
+
+            db.session.execute(delete(KonuOnerisi))
+            for parca in _parcalar(kayitlar):
+                db.session.execute(insert(KonuOnerisi), parca)
+            db.session.commit()
+
+            sure = time.perf_counter() - baslangic
+            logging.info(f"Konu önerileri güncellendi: {sekil[0]} öğrenci × {sekil[1]} konu, "
+                         f"{len(kayitlar)} öneri, {sure:.2f} sn")
+            return {
+                'success': True,
+                'message': f'{sekil[0]} öğrenci için {len(kayitlar)} konu önerisi oluşturuldu.',
+                'ogrenci_sayisi': sekil[0],
+                'konu_sayisi': sekil[1],
+                'gozlem_sayisi': int(len(oran)),
+                'bilesen_sayisi': int(bilesen) if bilesen >= 1 else 0,
+                'aciklanan_varyans': aciklanan,
+                'oneri_sayisi': len(kayitlar),
+                'sure': sure,
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Konu önerileri güncellenirken hata: {str(e)}")
+            return {'success': False, 'message': f'Konu önerileri güncellenirken hata oluştu: {str(e)}'}
+
+    @staticmethod
+    def get_ogrenci_onerileri(ogrenci_id, ders_idleri=None):
+        """
+        Öğrencinin kayıtlı konu önerilerini getir
+
+        Args:
+            ogrenci_id: Öğrenci ID
+            ders_idleri: Verilirse yalnızca bu derslerin konuları
+
+        Returns:
+            List: Sıraya göre KonuOnerisi nesneleri
+        """
+        sorgu = (KonuOnerisi.query
+                 .join(Konu, Konu.id == KonuOnerisi.konu_id)
+                 .options(contains_eager(KonuOnerisi.konu).joinedload(Konu.ders))
+                 .filter(KonuOnerisi.ogrenci_id == ogrenci_id))
+        if ders_idleri is not None:
+            sorgu = sorgu.filter(Konu.ders_id.in_(ders_idleri))
+        return sorgu.order_by(KonuOnerisi.sira).all()
@@ -0,0 +1,146 @@
+"""
+Yapay zeka model önbelleği
+Diskteki joblib model dosyalarını süreç içinde LRU önbellekte tutar.
+Anahtar (dosya yolu, değişiklik zamanı) çiftidir; dosya yeniden yazıldığında
+eski kopya kendiliğinden geçersiz olur. Modeller mmap_mode ile yüklenir:
+sıkıştırılmadan kaydedilmiş büyük NumPy dizileri (ağaç düğümleri, katsayılar)
+kopyalanmadan doğrudan dosyadan eşlenir.
+"""
+
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+import joblib
+from flask import current_app, has_app_context
+
+from app.extensions import db
+from app.blueprints.yapay_zeka_asistan.models import YapayZekaModel
+
+# Model dosyalarının kaydedildiği klasör
+MODEL_DIR = os.path.join('app', 'blueprints', 'yapay_zeka_asistan', 'model_files')
+os.makedirs(MODEL_DIR, exist_ok=True)
+
+# Uygulama ayarı (MODEL_ONBELLEK_BOYUTU) yoksa tutulacak en fazla model sayısı
+VARSAYILAN_KAPASITE = 8
+
+# (mutlak yol, mtime) -> yüklenmiş model nesnesi; en son kullanılan sonda
+_modeller = OrderedDict()
+_kilit = threading.Lock()
+
+
+def _kapasite():
+    if has_app_context():
+        return max(int(current_app.config.get("MODEL_ONBELLEK_BOYUTU", VARSAYILAN_KAPASITE)), 1)
+    return VARSAYILAN_KAPASITE
+
+
+class ModelOnbellegi:
+    """Yüklenmiş modelleri süreç içinde tutan önbellek sınıfı"""
+
+    @staticmethod
+    def yukle(dosya_yolu):
+        """
+        Modeli önbellekten getir, yoksa diskten yükleyip önbelleğe ekle
+
+        Args:
+            dosya_yolu: joblib model dosyasının yolu
+
+        Returns:
+            object: Yüklenmiş model nesnesi
+
+        Raises:
+            FileNotFoundError: Dosya yoksa
+        """
+        yol = os.path.abspath(dosya_yolu)
+        anahtar = (yol, os.path.getmtime(yol))
+
+        with _kilit:
+            if anahtar in _modeller:
+                _modeller.move_to_end(anahtar)
+                return _modeller[anahtar]
+
+            model = joblib.load(yol, mmap_mode='r')
+
+            # Aynı dosyanın eski sürümleri bellekte tutulmaz
+            for eski in [k for k in _modeller if k[0] == yol]:
+                del _modeller[eski]
+
+            _modeller[anahtar] = model
+            while len(_modeller) > _kapasite():
+                _modeller.popitem(last=False)
+
+            return model
+
+    @staticmethod
+    def cikar(dosya_yolu):
+        """Bir model dosyasının tüm sürümlerini önbellekten çıkar"""
+        yol = os.path.abspath(dosya_yolu)
+        with _kilit:
+            for eski in [k for k in _modeller if k[0] == yol]:
+                del _modeller[eski]
+
+    @staticmethod
+    def temizle():
+        """Önbelleği tamamen boşalt"""
+        with _kilit:
+            _modeller.clear()
+
+    @staticmethod
+    def durum():
+        """
+        Önbellekteki modelleri listele
+
+        Returns:
+            Dict: {'kapasite': int, 'modeller': [dosya yolu, ...]} (en eski kullanılan başta)
+        """
+        with _kilit:
+            return {'kapasite': _kapasite(), 'modeller': [yol for yol, _ in _modeller]}
+
+    @staticmethod
+    def isit():
+        """
+        Aktif modellerin dosyalarını önbelleğe yükle
+
+        Returns:
+            int: Yüklenen model sayısı
+        """
+        yollar = [
+            yol for (yol,) in db.session.query(YapayZekaModel.model_dosya_yolu)
+            .filter(YapayZekaModel.aktif.is_(True), YapayZekaModel.model_dosya_yolu.isnot(None))
+            .order_by(YapayZekaModel.son_guncelleme.desc())
+            .limit(_kapasite())
+        ]
+
+        yuklenen = 0
+        # En yeni model en son yüklenir ki LRU sırasında en sona kalsın
+        for yol in reversed(yollar):
+            if not os.path.exists(yol):
+                continue
+            try:
+                ModelOnbellegi.yukle(yol)
+                yuklenen += 1
+            except Exception as e:
+                logging.warning(f"Model önbelleğe alınamadı ({yol}): {str(e)}")
+        return yuklenen
+
+    @staticmethod
+    def arka_planda_isit(app):
+        """
+        Aktif modelleri süreç başlarken istekleri bekletmeden arka planda yükle
+
+        Args:
+            app: Flask uygulama nesnesi
+        """
+        def calistir():
+            with app.app_context():
+                try:
+                    sayi = ModelOnbellegi.isit()
+                    logging.info(f"{sayi} yapay zeka modeli önbelleğe alındı.")
+                except Exception as e:
+                    logging.warning(f"Model önbelleği ısıtılamadı: {str(e)}")
+                finally:
+                    db.session.remove()
+
+        threading.Thread(target=calistir, name='model-onbellegi-isitma', daemon=True).start()
@@ -3,9 +3,10 @@ Yapay Zeka Asistanı modülü için veritabanı modelleri.
 Bu modül, yapay zeka modelleri, analizler ve öneriler için gerekli veritabanı modellerini içerir.
 """
 
+import json
 from datetime import datetime
 from sqlalchemy import Column, Integer, String, Float, Text, Boolean, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, backref
 
 from app.extensions import db
 
@@ -59,7 +60,7 @@ class OgrenciAnaliz(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     analiz_id = db.Column(db.Integer, db.ForeignKey('yapay_zeka_analizleri.id'), nullable=False)
     analiz_tarihi = db.Column(db.DateTime, default=datetime.now)
     
@@ -70,9 +71,9 @@ class OgrenciAnaliz(db.Model):
     # ham_sonuclar = db.Column(db.Text)  # JSON formatında saklanacak veriler
     
     # İlişkiler
-    ogrenci = relationship("Ogrenci", backref="yapay_zeka_analizleri")
+    ogrenci = relationship("Ogrenci", backref=backref("yapay_zeka_analizleri", passive_deletes=True))
     analiz = relationship("YapayZekaAnaliz", back_populates="ogrenci_analizleri")
-    oneriler = relationship("OgrenciOneri", back_populates="analiz", cascade="all, delete-orphan")
+    oneriler = relationship("OgrenciOneri", back_populates="analiz", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<OgrenciAnaliz {self.id} - Öğrenci: {self.ogrenci_id}>"
@@ -83,7 +84,7 @@ class OgrenciOneri(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    analiz_id = db.Column(db.Integer, db.ForeignKey('ogrenci_analizleri.id'), nullable=False)
+    analiz_id = db.Column(db.Integer, db.ForeignKey('ogrenci_analizleri.id', ondelete='CASCADE'), nullable=False)
     oneri_metni = db.Column(db.Text, nullable=False)
     oneri_turu = db.Column(db.String(50), nullable=False)  # mudahale, kaynak, aktivite, vb.
     oncelik = db.Column(db.Integer, default=0)  # 0: Düşük, 1: Orta, 2: Yüksek
@@ -105,7 +106,7 @@ class DuyguAnalizi(db.Model):
     __table_args__ = {'extend_existing': True}
     
     id = db.Column(db.Integer, primary_key=True)
-    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id'), nullable=False)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False)
     metin = db.Column(db.Text, nullable=False)
     metin_kaynagi = db.Column(db.String(50))  # kompozisyon, anket_cevabi, refleksiyon, gorusme_notu, vb.
     analiz_tarihi = db.Column(db.DateTime, default=datetime.now)
@@ -118,7 +119,96 @@ class DuyguAnalizi(db.Model):
     sonuc_detay = db.Column(db.Text)  # JSON formatında saklanacak detaylı analiz sonuçları
     
     # İlişkiler
-    ogrenci = relationship("Ogrenci", backref="duygu_analizleri")
+    ogrenci = relationship("Ogrenci", backref=backref("duygu_analizleri", passive_deletes=True))
     
     def __repr__(self):
-        return f"<DuyguAnalizi {self.id} - Öğrenci: {self.ogrenci_id}>"
\ No newline at end of file
+        return f"<DuyguAnalizi {self.id} - Öğrenci: {self.ogrenci_id}>"
+
+class ModelEgitimIsi(db.Model):
+    """Arka planda çalışan model eğitim işlerini ve ilerleme durumlarını temsil eden model sınıfı"""
+    __tablename__ = 'model_egitim_isleri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model_turu = db.Column(db.String(50), nullable=False, default='akademik_risk')
+    model_tipi = db.Column(db.String(20), nullable=False)  # temel, gelismis, kapsamli
+    sinif = db.Column(db.String(20))
+    durum = db.Column(db.String(20), nullable=False, default='bekliyor')  # bekliyor, calisiyor, tamamlandi, hata
+    ilerleme = db.Column(db.Integer, default=0)  # 0-100 arası yüzde
+    asama = db.Column(db.String(150))
+    mesaj = db.Column(db.Text)  # Tamamlandığında sonuç, hata durumunda hata mesajı
+    model_id = db.Column(db.Integer, db.ForeignKey('yapay_zeka_modelleri.id', ondelete='SET NULL'))
+    baslangic_zamani = db.Column(db.DateTime, default=datetime.now)
+    son_guncelleme = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    bitis_zamani = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f"<ModelEgitimIsi id={self.id} durum={self.durum} ilerleme={self.ilerleme}>"
+
+class ModelAyarAramasi(db.Model):
+    """Model eğitiminde yapılan hiperparametre aramasının sonucunu ve çapraz doğrulama metriklerini temsil eden model sınıfı"""
+    __tablename__ = 'model_ayar_aramalari'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    model_id = db.Column(db.Integer, db.ForeignKey('yapay_zeka_modelleri.id', ondelete='CASCADE'), nullable=False, unique=True)
+    model_tipi = db.Column(db.String(20), nullable=False)  # temel, gelismis, kapsamli
+    sinif = db.Column(db.String(20))
+    yontem = db.Column(db.String(50), default='halving_random_search')
+    en_iyi_parametreler = db.Column(db.Text)  # JSON: {tahminci: {parametre: değer}}
+    cv_skoru = db.Column(db.Float, default=0.0)  # Ana tahmincinin tüm eğitim verisindeki ortalama CV doğruluğu
+    cv_std = db.Column(db.Float, default=0.0)
+    cv_kat_sayisi = db.Column(db.Integer)
+    aday_sayisi = db.Column(db.Integer)  # Tüm turlarda denenen aday sayısı
+    sure = db.Column(db.Float)  # Saniye
+    detay = db.Column(db.Text)  # JSON: tahminci bazında arama sonuçları
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.now)
+    
+    # İlişkiler
+    model = relationship("YapayZekaModel", backref=backref("ayar_aramasi", uselist=False, cascade="all, delete-orphan"))
+    
+    @property
+    def en_iyi_parametreler_dict(self):
+        """JSON'dan dict'e dönüştür"""
+        return json.loads(self.en_iyi_parametreler) if self.en_iyi_parametreler else {}
+    
+    def __repr__(self):
+        return f"<ModelAyarAramasi Model: {self.model_id} - CV: {self.cv_skoru}>"
+
+class OgrenciSegmenti(db.Model):
+    """Öğrenci kümeleme (segmentasyon) modelinin öğrenci bazlı atamalarını temsil eden model sınıfı"""
+    __tablename__ = 'ogrenci_segmentleri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False, unique=True)
+    model_id = db.Column(db.Integer, db.ForeignKey('yapay_zeka_modelleri.id', ondelete='CASCADE'), nullable=False, index=True)
+    segment_no = db.Column(db.Integer, nullable=False, index=True)
+    uzaklik = db.Column(db.Float, default=0.0)  # Küme merkezine (ölçeklenmiş) uzaklık
+    son_deneme_id = db.Column(db.Integer, default=0)  # Atama yapılırken görülen son deneme sonucu
+    guncelleme_tarihi = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    # İlişkiler
+    ogrenci = relationship("Ogrenci", backref=backref("segment", uselist=False, passive_deletes=True))
+    
+    def __repr__(self):
+        return f"<OgrenciSegmenti Öğrenci: {self.ogrenci_id} - Segment: {self.segment_no}>"
+
+class KonuOnerisi(db.Model):
+    """Matris ayrıştırma modelinin öğrenci için tahmin ettiği zayıf konuları (çalışma önerilerini) temsil eden model sınıfı"""
+    __tablename__ = 'konu_onerileri'
+    __table_args__ = {'extend_existing': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ogrenci_id = db.Column(db.Integer, db.ForeignKey('ogrenciler.id', ondelete='CASCADE'), nullable=False, index=True)
+    konu_id = db.Column(db.Integer, db.ForeignKey('konular.id', ondelete='CASCADE'), nullable=False)
+    sira = db.Column(db.Integer, nullable=False)  # 1 en zayıf konu
+    tahmini_basari = db.Column(db.Float, nullable=False)  # 0-1 arası tahmini doğru oranı
+    gozlenen_basari = db.Column(db.Float)  # Öğrencinin bu konuda soru çözdüyse gerçek doğru oranı
+    olusturma_tarihi = db.Column(db.DateTime, default=datetime.now)
+    
+    # İlişkiler
+    konu = relationship("Konu")
+    
+    def __repr__(self):
+        return f"<KonuOnerisi Öğrenci: {self.ogrenci_id} - Konu: {self.konu_id} - Sıra: {self.sira}>"
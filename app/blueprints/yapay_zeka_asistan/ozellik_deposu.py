@@ -0,0 +1,241 @@
+"""
+Akademik risk özellik deposu
+Risk modelinin eğitiminde ve tahmininde kullanılan öğrenci özellik matrisini
+birkaç toplu read_sql sorgusu ve pandas groupby işlemleriyle üretir.
+Matris bellekte tutulur; her çağrıda öğrenci başına küçük bir veri damgası
+(kayıt sayıları, net toplamları, deneme sürümü, son güncelleme) karşılaştırılarak
+yalnızca verisi değişen öğrencilerin satırları yeniden hesaplanır.
+"""
+
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc, DenemeSurumu
+from app.blueprints.calisma_programi.models import DersIlerleme
+from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+
+TYT_NETLERI = [
+    DenemeSonuc.net_tyt_turkce, DenemeSonuc.net_tyt_sosyal,
+    DenemeSonuc.net_tyt_matematik, DenemeSonuc.net_tyt_fen,
+]
+AYT_NETLERI = [
+    DenemeSonuc.net_ayt_matematik, DenemeSonuc.net_ayt_fizik, DenemeSonuc.net_ayt_kimya,
+    DenemeSonuc.net_ayt_biyoloji, DenemeSonuc.net_ayt_edebiyat, DenemeSonuc.net_ayt_tarih,
+    DenemeSonuc.net_ayt_cografya, DenemeSonuc.net_ayt_felsefe,
+]
+
+# Trend hesabında kullanılan son deneme sayısı
+TREND_PENCERESI = 3
+
+# Model tipine göre kullanılan özellikler
+MODEL_OZELLIKLERI = {
+    'temel': ['ort_net', 'ort_ayt_net', 'ilerleme_yuzdesi', 'deneme_sayisi'],
+    'gelismis': ['ort_net', 'ort_ayt_net', 'ilerleme_yuzdesi', 'deneme_sayisi', 'son_net', 'trend_skoru'],
+    'kapsamli': [
+        'ort_net', 'ort_ayt_net', 'ilerleme_yuzdesi', 'deneme_sayisi', 'son_net', 'trend_skoru',
+        'net_std', 'gorusme_sayisi'
+    ],
+}
+
+OZELLIKLER = MODEL_OZELLIKLERI['kapsamli']
+
+# Önbellek: özellik matrisi ve matrisin üretildiği andaki öğrenci damgaları
+_onbellek = {'matris': None, 'damgalar': None}
+_kilit = threading.Lock()
+
+
+def _oku(sorgu):
+    """Sorguyu oturumun bağlantısı üzerinden DataFrame olarak oku"""
+    return pd.read_sql(sorgu, db.session.connection())
+
+
+def _filtrele(sorgu, sutun, ogrenci_idleri):
+    """Öğrenci listesi verilmişse sorguyu bu öğrencilerle sınırla"""
+    if ogrenci_idleri is not None:
+        sorgu = sorgu.where(sutun.in_(ogrenci_idleri))
+    return sorgu
+
+
+class OzellikDeposu:
+    """Akademik risk özellik matrisini yöneten sınıf"""
+
+    @staticmethod
+    def damgalar():
+        """
+        Öğrenci başına veri damgalarını getir
+
+        Damga, öğrencinin sınıfı ile özellikleri etkileyen tablolardaki kayıt
+        sayısı, net/ilerleme toplamı ve en büyük kayıt kimliğinden oluşur.
+        Toplamı değiştirmeyen deneme düzenlemeleri (netlerin dersler arasında
+        yer değiştirmesi, yalnızca tarih değişikliği) deneme sürümüyle yakalanır.
+
+        Returns:
+            DataFrame: ogrenci_id indeksli, metin sütunlu damga tablosu
+        """
+        ogrenciler = _oku(select(Ogrenci.id.label('ogrenci_id'), Ogrenci.sinif))
+
+        deneme = _oku(
+            select(
+                DenemeSonuc.ogrenci_id,
+                func.count(DenemeSonuc.id).label('d_sayi'),
+                func.max(DenemeSonuc.id).label('d_son'),
+                func.sum(sum(func.coalesce(s, 0) for s in TYT_NETLERI + AYT_NETLERI)).label('d_toplam'),
+                func.max(DenemeSonuc.tarih).label('d_tarih'),
+            ).group_by(DenemeSonuc.ogrenci_id)
+        )
+        deneme_surumu = _oku(select(DenemeSurumu.ogrenci_id, DenemeSurumu.surum.label('d_surum')))
+        ilerleme = _oku(
+            select(
+                DersIlerleme.ogrenci_id,
+                func.count(DersIlerleme.id).label('i_sayi'),
+                func.sum(DersIlerleme.tamamlama_yuzdesi).label('i_toplam'),
+                func.max(DersIlerleme.son_guncelleme).label('i_son'),
+            ).group_by(DersIlerleme.ogrenci_id)
+        )
+        gorusme = _oku(
+            select(
+                GorusmeKaydi.ogrenci_id,
+                func.count(GorusmeKaydi.id).label('g_sayi'),
+                func.max(GorusmeKaydi.id).label('g_son'),
+            ).where(GorusmeKaydi.ogrenci_id.isnot(None)).group_by(GorusmeKaydi.ogrenci_id)
+        )
+
+        damga = ogrenciler
+        for tablo in (deneme, deneme_surumu, ilerleme, gorusme):
+            damga = damga.merge(tablo, on='ogrenci_id', how='left')
+
+        # Eksik değerler boş metne çevrilir; NaN != NaN olduğundan aksi halde
+        # kaydı olmayan her öğrenci her çağrıda değişmiş sayılırdı
+        damga = damga.set_index('ogrenci_id').astype(object)
+        return damga.where(damga.notna(), '').astype(str)
+
+    @staticmethod
+    def hesapla(ogrenci_idleri=None):
+        """
+        Özellik matrisini veritabanından hesapla (önbelleği kullanmaz)
+
+        Args:
+            ogrenci_idleri: Hesaplanacak öğrenciler (None ise tüm öğrenciler)
+
+        Returns:
+            DataFrame: ogrenci_id indeksli; sinif ve OZELLIKLER sütunları
+        """
+        ogrenciler = _oku(_filtrele(
+            select(Ogrenci.id.label('ogrenci_id'), Ogrenci.sinif), Ogrenci.id, ogrenci_idleri
+        )).set_index('ogrenci_id')
+
+        deneme = _oku(_filtrele(
+            select(DenemeSonuc.id, DenemeSonuc.ogrenci_id, DenemeSonuc.tarih, *TYT_NETLERI, *AYT_NETLERI),
+            DenemeSonuc.ogrenci_id, ogrenci_idleri
+        ))
+        tyt_sutunlari = [s.key for s in TYT_NETLERI]
+        ayt_sutunlari = [s.key for s in AYT_NETLERI]
+        deneme['tyt_net'] = deneme[tyt_sutunlari].fillna(0).sum(axis=1)
+        deneme['ayt_net'] = deneme[ayt_sutunlari].fillna(0).sum(axis=1)
+        deneme = deneme.sort_values(['ogrenci_id', 'tarih', 'id'])
+
+        gruplar = deneme.groupby('ogrenci_id')
+        deneme_ozet = pd.DataFrame({
+            'ort_net': gruplar['tyt_net'].mean(),
+            'ort_ayt_net': gruplar['ayt_net'].mean(),
+            'net_std': gruplar['tyt_net'].std(ddof=0),
+            'deneme_sayisi': gruplar.size(),
+        })
+
+        # Son TREND_PENCERESI denemedeki ortalama ve ilk-son değişimi
+        pencere = deneme.groupby('ogrenci_id').tail(TREND_PENCERESI).groupby('ogrenci_id')['tyt_net']
+        ilk, son = pencere.first(), pencere.last()
+        deneme_ozet['son_net'] = pencere.mean()
+        deneme_ozet['trend_skoru'] = np.where(
+            pencere.size() >= 2, ((son - ilk) / (ilk.abs() + 0.1)).clip(-1, 1), 0.0
+        )
+
+        ilerleme = _oku(_filtrele(
+            select(DersIlerleme.ogrenci_id, DersIlerleme.tamamlama_yuzdesi),
+            DersIlerleme.ogrenci_id, ogrenci_idleri
+        ))
+        ilerleme_ozet = ilerleme.groupby('ogrenci_id')['tamamlama_yuzdesi'].mean().rename('ilerleme_yuzdesi')
+
+        gorusme = _oku(_filtrele(
+            select(GorusmeKaydi.ogrenci_id, GorusmeKaydi.id).where(GorusmeKaydi.ogrenci_id.isnot(None)),
+            GorusmeKaydi.ogrenci_id, ogrenci_idleri
+        ))
+        gorusme_ozet = gorusme.groupby('ogrenci_id').size().rename('gorusme_sayisi')
+
+        matris = ogrenciler.join(deneme_ozet).join(ilerleme_ozet).join(gorusme_ozet)
+        matris[OZELLIKLER] = matris[OZELLIKLER].astype(float).fillna(0.0)
+        return matris[['sinif'] + OZELLIKLER]
+
+    @staticmethod
+    def get_matris(ogrenci_idleri=None, sinif=None):
+        """
+        Güncel özellik matrisini getir
+
+        Önbellekteki matris, damgası değişen, yeni eklenen ve silinen
+        öğrenciler için yerinde güncellenir; değişiklik yoksa veritabanından
+        yalnızca damga sorguları okunur.
+
+        Args:
+            ogrenci_idleri: Döndürülecek öğrenciler (None ise tümü)
+            sinif: Sınıf ön eki filtresi (örn: '12')
+
+        Returns:
+            DataFrame: ogrenci_id indeksli; sinif ve OZELLIKLER sütunları
+        """
+        with _kilit:
+            damgalar = OzellikDeposu.damgalar()
+            matris, eski = _onbellek['matris'], _onbellek['damgalar']
+
+            if matris is None or eski is None:
+                matris = OzellikDeposu.hesapla()
+            else:
+                ortak = damgalar.index.intersection(eski.index)
+                degisen = ortak[(damgalar.loc[ortak] != eski.loc[ortak]).any(axis=1).to_numpy()]
+                yeni = damgalar.index.difference(eski.index)
+                silinen = eski.index.difference(damgalar.index)
+
+                yenilenecek = degisen.union(yeni)
+                logging.debug(f"Özellik matrisi: {len(yenilenecek)} öğrenci yenilenecek, {len(silinen)} öğrenci silinecek")
+                if len(yenilenecek) > len(damgalar) // 2:
+                    matris = OzellikDeposu.hesapla()
+                elif len(yenilenecek) or len(silinen):
+                    matris = matris.drop(index=yenilenecek.union(silinen), errors='ignore')
+                    if len(yenilenecek):
+                        matris = pd.concat([matris, OzellikDeposu.hesapla([int(i) for i in yenilenecek])])
+                    matris = matris.sort_index()
+
+            _onbellek['matris'], _onbellek['damgalar'] = matris, damgalar
+
+        if ogrenci_idleri is not None:
+            matris = matris.reindex([i for i in ogrenci_idleri if i in matris.index])
+        if sinif:
+            matris = matris[matris['sinif'].fillna('').str.startswith(sinif)]
+        return matris.copy()
+
+    @staticmethod
+    def get_ogrenci_ozellikleri(ogrenci_id):
+        """
+        Tek öğrencinin özellik satırını getir
+
+        Args:
+            ogrenci_id: Öğrenci ID
+
+        Returns:
+            Series: Özellik değerleri veya öğrenci yoksa None
+        """
+        matris = OzellikDeposu.get_matris([ogrenci_id])
+        if matris.empty:
+            return None
+        return matris.iloc[0]
+
+    @staticmethod
+    def temizle():
+        """Önbelleği boşalt; sonraki çağrıda matris baştan hesaplanır"""
+        with _kilit:
+            _onbellek['matris'], _onbellek['damgalar'] = None, None
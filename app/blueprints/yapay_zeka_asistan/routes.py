@@ -4,10 +4,14 @@ Yapay Zeka Destekli Danışmanlık Asistanı blueprint'i için route tanımlamal
 
 from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify
 from flask import current_app as app
+from datetime import datetime
 
 from app.utils.auth import session_required, ogrenci_required, admin_required
 from app.blueprints.yapay_zeka_asistan import yapay_zeka_asistan_bp
 from app.blueprints.yapay_zeka_asistan.services import YapayZekaService
+from app.blueprints.yapay_zeka_asistan.egitim_isleri import ModelEgitimService
+from app.blueprints.yapay_zeka_asistan.benzerlik import BenzerOgrenciService, VARSAYILAN_KOMSU_SAYISI
+from app.blueprints.yapay_zeka_asistan.segmentasyon import SegmentasyonService, OZELLIK_ADLARI, VARSAYILAN_KUME_SAYISI
 from app.blueprints.ogrenci_yonetimi.services import OgrenciService
 
 @yapay_zeka_asistan_bp.route('/')
@@ -42,20 +46,44 @@ def akademik_risk_modeli_olustur():
     if request.method == 'POST':
         sinif = request.form.get('sinif')
         model_tipi = request.form.get('model_tipi', 'gelismis')
+        optimize = request.form.get('optimize') == '1'
 
         # 'all' seçeneği için None değeri kullan
         if sinif == 'all':
             sinif = None
 
-        sonuc = YapayZekaService.olustur_akademik_risk_modeli(sinif, model_tipi)
+        # Eğitim web isteğini bekletmemesi için arka plan işi olarak başlatılır
+        sonuc = ModelEgitimService.arka_planda_baslat(sinif, model_tipi, optimize)
 
         if sonuc['success']:
-            flash(sonuc['message'], 'success')
-            return redirect(url_for('yapay_zeka_asistan.model_detay', model_id=sonuc['model_id']))
+            flash(sonuc['message'], 'info')
+            return redirect(url_for('yapay_zeka_asistan.egitim_durumu', is_id=sonuc['is_id']))
         else:
             flash(sonuc['message'], 'danger')
 
-    return render_template('yapay_zeka_asistan/akademik_risk_modeli_olustur.html')
+    return render_template('yapay_zeka_asistan/akademik_risk_modeli_olustur.html',
+                          son_isler=ModelEgitimService.get_son_isler(5))
+
+@yapay_zeka_asistan_bp.route('/egitim/<int:is_id>')
+@admin_required
+def egitim_durumu(is_id):
+    """Arka planda çalışan model eğitim işinin ilerleme sayfası"""
+    egitim_isi = ModelEgitimService.get_is(is_id)
+    if not egitim_isi:
+        flash('Eğitim işi bulunamadı.', 'danger')
+        return redirect(url_for('yapay_zeka_asistan.akademik_risk_modeli_olustur'))
+
+    return render_template('yapay_zeka_asistan/egitim_durumu.html',
+                          egitim_isi=ModelEgitimService.is_durumu(egitim_isi))
+
+@yapay_zeka_asistan_bp.route('/api/egitim/<int:is_id>')
+@admin_required
+def api_egitim_durumu(is_id):
+    """Model eğitim işi durumu endpoint'i"""
+    egitim_isi = ModelEgitimService.get_is(is_id)
+    if not egitim_isi:
+        return jsonify({"success": False, "message": "Eğitim işi bulunamadı."}), 404
+    return jsonify({"success": True, **ModelEgitimService.is_durumu(egitim_isi)})
 
 @yapay_zeka_asistan_bp.route('/ogrenci/<int:ogrenci_id>/analizler')
 @ogrenci_required
@@ -84,6 +112,22 @@ def ogrenci_analizler(ogrenci_id, ogrenci=None):
                           duygu_analizleri=duygu_analizleri,
                           urls=urls)
 
+@yapay_zeka_asistan_bp.route('/api/ogrenci/<int:ogrenci_id>/benzer-ogrenciler')
+@session_required
+def api_benzer_ogrenciler(ogrenci_id):
+    """Deneme geçmişi en çok benzeyen öğrenciler (JSON)"""
+    k = min(request.args.get('k', VARSAYILAN_KOMSU_SAYISI, type=int), 50)
+    return jsonify(BenzerOgrenciService.benzer_ogrenciler(ogrenci_id, k))
+
+@yapay_zeka_asistan_bp.route('/api/benzerlik-indeksi/guncelle', methods=['POST'])
+@admin_required
+def api_benzerlik_indeksi_guncelle():
+    """Benzerlik indeksi güncellemesini arka planda başlat (JSON)"""
+    tam = request.args.get('tam') == '1'
+    if BenzerOgrenciService.arka_planda_guncelle(tam=tam):
+        return jsonify({"success": True, "message": "Benzerlik indeksi güncellemesi başlatıldı."})
+    return jsonify({"success": False, "message": "Benzerlik indeksi zaten güncelleniyor."}), 409
+
 @yapay_zeka_asistan_bp.route('/ogrenci/<int:ogrenci_id>/analiz-yap', methods=['GET', 'POST'])
 @ogrenci_required
 def ogrenci_analiz_yap(ogrenci_id, ogrenci=None):
@@ -95,7 +139,7 @@ def ogrenci_analiz_yap(ogrenci_id, ogrenci=None):
             flash('Öğrenci bulunamadı.', 'danger')
             return redirect(url_for('ogrenci_yonetimi.liste'))
 
-    modeller = YapayZekaService.get_modeller(aktif_mi=True)
+    modeller = [m for m in YapayZekaService.get_modeller(aktif_mi=True) if m.model_turu == 'akademik_risk']
 
     if request.method == 'POST':
         model_id = request.form.get('model_id')
@@ -119,6 +163,61 @@ def ogrenci_analiz_yap(ogrenci_id, ogrenci=None):
                           modeller=modeller,
                           urls=urls)
 
+@yapay_zeka_asistan_bp.route('/toplu-analiz', methods=['GET', 'POST'])
+@admin_required
+def toplu_analiz():
+    """Bir sınıfın veya tüm okulun akademik risk analizini tek seferde yapma"""
+    modeller = [m for m in YapayZekaService.get_modeller(aktif_mi=True) if m.model_turu == 'akademik_risk']
+    siniflar = YapayZekaService.get_siniflar()
+    sonuc = None
+
+    if request.method == 'POST':
+        model_id = request.form.get('model_id', type=int)
+        sinif = request.form.get('sinif') or None
+
+        sonuc = YapayZekaService.toplu_risk_analizi(model_id, sinif)
+
+        if request.args.get('format') == 'json':
+            return jsonify(sonuc)
+
+        flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+
+    return render_template('yapay_zeka_asistan/toplu_analiz.html',
+                          modeller=modeller,
+                          siniflar=siniflar,
+                          sonuc=sonuc)
+
+@yapay_zeka_asistan_bp.route('/segmentler', methods=['GET', 'POST'])
+@admin_required
+def segmentler():
+    """Öğrenci segmentasyonu sayfası"""
+    if request.method == 'POST':
+        if request.form.get('islem') == 'guncelle':
+            sonuc = SegmentasyonService.yeni_sonuclari_isle()
+        else:
+            sonuc = SegmentasyonService.modeli_egit(
+                request.form.get('kume_sayisi', VARSAYILAN_KUME_SAYISI, type=int)
+            )
+        flash(sonuc['message'], 'success' if sonuc['success'] else 'danger')
+        return redirect(url_for('yapay_zeka_asistan.segmentler'))
+
+    return render_template('yapay_zeka_asistan/segmentler.html',
+                          ozet=SegmentasyonService.get_segment_ozeti(),
+                          ozellik_adlari=OZELLIK_ADLARI,
+                          varsayilan_kume_sayisi=VARSAYILAN_KUME_SAYISI)
+
+@yapay_zeka_asistan_bp.route('/api/segmentler')
+@admin_required
+def api_segmentler():
+    """Segment profilleri ve öğrenci sayıları (JSON)"""
+    return jsonify(SegmentasyonService.get_segment_ozeti())
+
+@yapay_zeka_asistan_bp.route('/api/segmentler/guncelle', methods=['POST'])
+@admin_required
+def api_segmentleri_guncelle():
+    """Yeni deneme sonuçlarını segmentasyon modeline artımlı olarak işle (JSON)"""
+    return jsonify(SegmentasyonService.yeni_sonuclari_isle())
+
 @yapay_zeka_asistan_bp.route('/analiz/<int:analiz_id>/oneriler')
 @session_required
 def analiz_oneriler(analiz_id, ogrenci_id=None):
@@ -182,6 +281,30 @@ def duygu_analizi_yap(ogrenci_id, ogrenci=None):
                           ogrenci=ogrenci,
                           urls=urls)
 
+@yapay_zeka_asistan_bp.route('/api/duygu-analizi/toplu', methods=['POST'])
+@admin_required
+def api_toplu_duygu_analizi():
+    """Birden çok metin için toplu duygu analizi endpoint'i"""
+    veri = request.get_json(silent=True) or {}
+    sonuc = YapayZekaService.toplu_duygu_analizi(veri.get('metinler'), veri.get('analiz_tipi', 'gelismis'))
+    return jsonify(sonuc), 200 if sonuc['success'] else 400
+
+@yapay_zeka_asistan_bp.route('/api/duygu-analizi/gorusmeler', methods=['POST'])
+@admin_required
+def api_gorusme_duygu_analizi():
+    """Bir dönemdeki görüşme özetleri için toplu duygu analizi endpoint'i"""
+    veri = request.get_json(silent=True) or {}
+    try:
+        baslangic = datetime.strptime(veri['baslangic'], '%Y-%m-%d').date() if veri.get('baslangic') else None
+        bitis = datetime.strptime(veri['bitis'], '%Y-%m-%d').date() if veri.get('bitis') else None
+    except ValueError:
+        return jsonify({"success": False, "message": "Tarihler YYYY-AA-GG biçiminde olmalıdır."}), 400
+
+    sonuc = YapayZekaService.gorusme_duygu_analizi(
+        baslangic, bitis, veri.get('analiz_tipi', 'gelismis'), bool(veri.get('kaydet'))
+    )
+    return jsonify(sonuc), 200 if sonuc['success'] else 400
+
 @yapay_zeka_asistan_bp.route('/ogrenci/<int:ogrenci_id>/duygu-analizi/<int:analiz_id>')
 @ogrenci_required
 def duygu_analizi_sonuc(ogrenci_id, analiz_id, ogrenci=None):
@@ -302,7 +425,9 @@ def dashboard():
     # Tüm öğrenciler için yapılan analizlerin özeti
     ogrenci_sayisi = OgrenciService.get_ogrenci_sayisi()
     analiz_sayisi = len(YapayZekaService.get_modeller())
+    segment_ozeti = SegmentasyonService.get_segment_ozeti()
 
     return render_template('yapay_zeka_asistan/dashboard.html', 
                           ogrenci_sayisi=ogrenci_sayisi,
-                          analiz_sayisi=analiz_sayisi)
\ No newline at end of file
+                          analiz_sayisi=analiz_sayisi,
+                          segment_ozeti=segment_ozeti)
\ No newline at end of file
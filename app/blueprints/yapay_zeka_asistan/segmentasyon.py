@@ -0,0 +1,388 @@
+"""
+Öğrenci segmentasyonu modülü
+Öğrencileri deneme net profili, konu tamamlama oranı ve görüşme sıklığına göre
+MiniBatchKMeans ile kümeler. Özellikler öğrenci başına tek satır dönen toplu
+SQL sorgularıyla okunur; küme atamaları OgrenciSegmenti tablosunda saklanır.
+Yeni deneme sonuçları geldiğinde model baştan eğitilmez: yalnızca yeni
+sonucu olan (veya henüz atanmamış) öğrenciler partial_fit ile modele verilir
+ve bu öğrencilerin atamaları güncellenir. Deneme sonucu düzenlenen veya
+silinen öğrencilerin atamaları aynı işlem içinde bayat işaretlenir ve bir
+sonraki artımlı güncellemede yeniden işlenir.
+"""
+
+import os
+import logging
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import case, delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.blueprints.yapay_zeka_asistan.models import YapayZekaModel, OgrenciSegmenti
+from app.blueprints.yapay_zeka_asistan.model_onbellegi import ModelOnbellegi, MODEL_DIR
+from app.blueprints.ogrenci_yonetimi.models import Ogrenci
+from app.blueprints.deneme_sinavlari.models import DenemeSonuc
+from app.blueprints.deneme_sinavlari.surum import etkilenen_ogrenciler
+from app.blueprints.calisma_programi.models import KonuTakip
+from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+
+MODEL_TURU = 'segmentasyon'
+
+TYT_NETLERI = {
+    'tyt_turkce': DenemeSonuc.net_tyt_turkce,
+    'tyt_sosyal': DenemeSonuc.net_tyt_sosyal,
+    'tyt_matematik': DenemeSonuc.net_tyt_matematik,
+    'tyt_fen': DenemeSonuc.net_tyt_fen,
+}
+AYT_NETLERI = [
+    DenemeSonuc.net_ayt_matematik, DenemeSonuc.net_ayt_fizik, DenemeSonuc.net_ayt_kimya,
+    DenemeSonuc.net_ayt_biyoloji, DenemeSonuc.net_ayt_edebiyat, DenemeSonuc.net_ayt_tarih,
+    DenemeSonuc.net_ayt_cografya, DenemeSonuc.net_ayt_felsefe,
+]
+
+OZELLIKLER = list(TYT_NETLERI) + ['ayt_net', 'konu_tamamlama', 'gorusme_sayisi']
+
+OZELLIK_ADLARI = {
+    'tyt_turkce': 'TYT Türkçe',
+    'tyt_sosyal': 'TYT Sosyal',
+    'tyt_matematik': 'TYT Matematik',
+    'tyt_fen': 'TYT Fen',
+    'ayt_net': 'AYT Net',
+    'konu_tamamlama': 'Konu Tamamlama',
+    'gorusme_sayisi': 'Görüşme Sayısı',
+}
+
+VARSAYILAN_KUME_SAYISI = 4
+# MiniBatchKMeans mini-batch boyutu
+PARCA_BOYUTU = 4096
+# IN (...) filtrelerinde ve toplu yazmada tek seferde işlenen öğrenci sayısı
+YAZMA_PARCASI = 5000
+
+# Deneme sonucu değişen öğrencinin ataması son_deneme_id bu değere çekilerek bayat işaretlenir;
+# her son deneme kimliğinden (ve sonucu olmayanların 0 değerinden) küçük olduğu için yeniden işlenir
+BAYAT_DENEME_ID = -1
+
+# Eğitim ve artımlı güncelleme aynı model dosyasını değiştirdiği için sıraya alınır
+_kilit = threading.Lock()
+
+
+def _parcalar(dizi, boyut=YAZMA_PARCASI):
+    for i in range(0, len(dizi), boyut):
+        yield dizi[i:i + boyut]
+
+
+def _bayat_isaretle(baglanti, ogrenci_idleri=None):
+    """Öğrencilerin (None ise tüm öğrencilerin) segment atamalarını bayat işaretle"""
+    sorgu = update(OgrenciSegmenti).values(son_deneme_id=BAYAT_DENEME_ID)
+    if ogrenci_idleri is None:
+        baglanti.execute(sorgu)
+        return
+    for parca in _parcalar(sorted(ogrenci_idleri)):
+        baglanti.execute(sorgu.where(OgrenciSegmenti.ogrenci_id.in_(parca)))
+
+
+@event.listens_for(Session, 'after_flush')
+def _flush_sonrasi(session, flush_context):
+    # Yeni sonuçlar son deneme kimliğinden de anlaşılır; düzenleme ve silme yalnızca buradan görülür
+    idler = etkilenen_ogrenciler(session)
+    if idler:
+        _bayat_isaretle(session.connection(), idler)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _toplu_yazma(orm_execute_state):
+    # update() / delete() ifadelerinde etkilenen öğrenciler bilinmediğinden tüm atamalar bayat sayılır
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, DenemeSonuc):
+        _bayat_isaretle(orm_execute_state.session.connection())
+
+
+def _oku(sorgu, sutun, ogrenci_idleri):
+    """Sorguyu DataFrame olarak oku; öğrenci listesi verilmişse parça parça filtrele"""
+    baglanti = db.session.connection()
+    if ogrenci_idleri is None:
+        return pd.read_sql(sorgu, baglanti)
+    return pd.concat(
+        [pd.read_sql(sorgu.where(sutun.in_(parca)), baglanti) for parca in _parcalar(ogrenci_idleri)],
+        ignore_index=True
+    )
+
+
+def _aktif_model():
+    return (YapayZekaModel.query
+            .filter_by(model_turu=MODEL_TURU, aktif=True)
+            .order_by(YapayZekaModel.id.desc())
+            .first())
+
+
+class SegmentasyonService:
+    """Öğrenci segmentasyonu işlemlerini yöneten servis sınıfı"""
+
+    @staticmethod
+    def get_ozellikler(ogrenci_idleri=None):
+        """
+        Segmentasyon özellik matrisini toplu sorgularla hesapla
+
+        Args:
+            ogrenci_idleri: Hesaplanacak öğrenciler (None ise tüm öğrenciler)
+
+        Returns:
+            DataFrame: ogrenci_id indeksli; OZELLIKLER ve son_deneme_id sütunları
+        """
+        ogrenciler = _oku(select(Ogrenci.id.label('ogrenci_id')), Ogrenci.id, ogrenci_idleri)
+
+        deneme = _oku(
+            select(
+                DenemeSonuc.ogrenci_id,
+                *[func.avg(func.coalesce(sutun, 0)).label(ad) for ad, sutun in TYT_NETLERI.items()],
+                func.avg(sum(func.coalesce(s, 0) for s in AYT_NETLERI)).label('ayt_net'),
+                func.max(DenemeSonuc.id).label('son_deneme_id'),
+            ).group_by(DenemeSonuc.ogrenci_id),
+            DenemeSonuc.ogrenci_id, ogrenci_idleri
+        )
+        konu = _oku(
+            select(
+                KonuTakip.ogrenci_id,
+                func.avg(case((KonuTakip.tamamlandi.is_(True), 1.0), else_=0.0)).label('konu_tamamlama'),
+            ).group_by(KonuTakip.ogrenci_id),
+            KonuTakip.ogrenci_id, ogrenci_idleri
+        )
+        gorusme = _oku(
+            select(
+                GorusmeKaydi.ogrenci_id,
+                func.count(GorusmeKaydi.id).label('gorusme_sayisi'),
+            ).where(GorusmeKaydi.ogrenci_id.isnot(None)).group_by(GorusmeKaydi.ogrenci_id),
+            GorusmeKaydi.ogrenci_id, ogrenci_idleri
+        )
+
+        matris = ogrenciler
+        for tablo in (deneme, konu, gorusme):
+            matris = matris.merge(tablo, on='ogrenci_id', how='left')
+        matris = matris.set_index('ogrenci_id').sort_index()
+        matris[OZELLIKLER] = matris[OZELLIKLER].astype(float).fillna(0.0)
+        matris['son_deneme_id'] = matris['son_deneme_id'].fillna(0).astype(int)
+        return matris[OZELLIKLER + ['son_deneme_id']]
+
+    @staticmethod
+    def _atamalari_yaz(model_id, matris, scaler, kmeans):
+        """Matristeki öğrencilerin küme atamalarını hesaplayıp toplu olarak yaz"""
+        X = scaler.transform(matris[OZELLIKLER].to_numpy())
+        uzakliklar = kmeans.transform(X)
+        etiketler = uzakliklar.argmin(axis=1)
+        simdi = datetime.now()
+
+        kayitlar = [
+            {
+                'ogrenci_id': int(ogrenci_id),
+                'model_id': model_id,
+                'segment_no': int(etiket),
+                'uzaklik': float(uzaklik),
+                'son_deneme_id': int(son_deneme_id),
+                'guncelleme_tarihi': simdi,
+            }
+            for ogrenci_id, etiket, uzaklik, son_deneme_id in zip(
+                matris.index, etiketler, uzakliklar[np.arange(len(etiketler)), etiketler],
+                matris['son_deneme_id']
+            )
+        ]
+
+        ogrenci_idleri = [k['ogrenci_id'] for k in kayitlar]
+        for parca in _parcalar(ogrenci_idleri):
+            db.session.execute(delete(OgrenciSegmenti).where(OgrenciSegmenti.ogrenci_id.in_(parca)))
+        for parca in _parcalar(kayitlar):
+            db.session.execute(insert(OgrenciSegmenti), parca)
+
+    @staticmethod
+    def modeli_egit(kume_sayisi=VARSAYILAN_KUME_SAYISI):
+        """
+        Segmentasyon modelini tüm öğrencilerle eğit ve atamaları yeniden yaz
+
+        Args:
+            kume_sayisi: Segment (küme) sayısı
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        try:
+            kume_sayisi = int(kume_sayisi)
+            if not 2 <= kume_sayisi <= 12:
+                return {'success': False, 'message': "Segment sayısı 2 ile 12 arasında olmalıdır."}
+
+            with _kilit:
+                matris = SegmentasyonService.get_ozellikler()
+                if len(matris) < kume_sayisi * 5:
+                    return {
+                        'success': False,
+                        'message': f"Segmentasyon için yeterli öğrenci yok. En az {kume_sayisi * 5} öğrenci gerekli."
+                    }
+
+                X = matris[OZELLIKLER].to_numpy()
+                scaler = StandardScaler().fit(X)
+                kmeans = MiniBatchKMeans(
+                    n_clusters=kume_sayisi, batch_size=PARCA_BOYUTU, n_init=3, random_state=42
+                ).fit(scaler.transform(X))
+
+                model_path = os.path.join(
+                    MODEL_DIR, f"ogrenci_segmentasyon_{datetime.now().strftime('%Y%m%d%H%M%S')}.joblib"
+                )
+                joblib.dump({'scaler': scaler, 'kmeans': kmeans, 'ozellikler': OZELLIKLER}, model_path)
+
+                YapayZekaModel.query.filter_by(model_turu=MODEL_TURU, aktif=True).update({'aktif': False})
+                yeni_model = YapayZekaModel(
+                    model_adi=f"Öğrenci Segmentasyonu ({kume_sayisi} segment) - {datetime.now().strftime('%d.%m.%Y')}",
+                    model_turu=MODEL_TURU,
+                    aciklama="Bu model, öğrencileri deneme netleri, konu tamamlama oranı ve görüşme sıklığına göre gruplar.",
+                    model_dosya_yolu=model_path,
+                    aktif=True
+                )
+                db.session.add(yeni_model)
+                db.session.flush()
+
+                db.session.execute(delete(OgrenciSegmenti))
+                SegmentasyonService._atamalari_yaz(yeni_model.id, matris, scaler, kmeans)
+                db.session.commit()
+
+            return {
+                'success': True,
+                'message': f"{len(matris)} öğrenci {kume_sayisi} segmente ayrıldı.",
+                'model_id': yeni_model.id,
+                'ogrenci_sayisi': len(matris)
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Segmentasyon modeli eğitim hatası: {str(e)}")
+            return {'success': False, 'message': f"Segmentasyon modeli eğitilirken bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def yeni_sonuclari_isle():
+        """
+        Son atamadan sonra deneme sonucu eklenen, düzenlenen veya silinen öğrencileri
+        modele artımlı olarak işle
+
+        Ölçekleyici sabit tutulur; yeni satırlar partial_fit ile küme
+        merkezlerini günceller ve yalnızca bu öğrencilerin atamaları yeniden
+        yazılır. Merkezlerdeki kayma diğer öğrencilere bir sonraki tam
+        eğitimde yansır.
+
+        Returns:
+            Dict: İşlem sonucunu içeren sözlük
+        """
+        try:
+            with _kilit:
+                model_kayit = _aktif_model()
+                if not model_kayit or not model_kayit.model_dosya_yolu or not os.path.exists(model_kayit.model_dosya_yolu):
+                    return {'success': False, 'message': "Aktif segmentasyon modeli bulunamadı. Lütfen önce modeli eğitin."}
+
+                son_deneme = (
+                    select(DenemeSonuc.ogrenci_id, func.max(DenemeSonuc.id).label('son_id'))
+                    .group_by(DenemeSonuc.ogrenci_id)
+                    .subquery()
+                )
+                sorgu = (
+                    select(Ogrenci.id)
+                    .outerjoin(son_deneme, son_deneme.c.ogrenci_id == Ogrenci.id)
+                    .outerjoin(OgrenciSegmenti, OgrenciSegmenti.ogrenci_id == Ogrenci.id)
+                    .where(
+                        (OgrenciSegmenti.id.is_(None))
+                        | (func.coalesce(son_deneme.c.son_id, 0) > func.coalesce(OgrenciSegmenti.son_deneme_id, 0))
+                    )
+                    .order_by(Ogrenci.id)
+                )
+                ogrenci_idleri = db.session.execute(sorgu).scalars().all()
+                if not ogrenci_idleri:
+                    return {'success': True, 'message': "Güncellenecek öğrenci yok.", 'ogrenci_sayisi': 0}
+
+                # partial_fit diziler üzerinde yerinde değişiklik yaptığı için salt okunur önbellek kopyası kullanılmaz
+                paket = joblib.load(model_kayit.model_dosya_yolu)
+                scaler, kmeans = paket['scaler'], paket['kmeans']
+
+                matris = SegmentasyonService.get_ozellikler(ogrenci_idleri)
+                X = scaler.transform(matris[OZELLIKLER].to_numpy())
+                for parca in _parcalar(X, PARCA_BOYUTU):
+                    kmeans.partial_fit(parca)
+
+                # Önbellekte dosyayı eşlemiş okuyucular olabilir; dosya yerinde kesilmez, atomik olarak değiştirilir
+                gecici_yol = f"{model_kayit.model_dosya_yolu}.tmp"
+                joblib.dump(paket, gecici_yol)
+                os.replace(gecici_yol, model_kayit.model_dosya_yolu)
+                SegmentasyonService._atamalari_yaz(model_kayit.id, matris, scaler, kmeans)
+                model_kayit.son_guncelleme = datetime.now()
+                db.session.commit()
+
+            return {
+                'success': True,
+                'message': f"{len(matris)} öğrencinin segmenti güncellendi.",
+                'ogrenci_sayisi': len(matris)
+            }
+
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Segment güncelleme hatası: {str(e)}")
+            return {'success': False, 'message': f"Segmentler güncellenirken bir hata oluştu: {str(e)}"}
+
+    @staticmethod
+    def get_segment_ozeti():
+        """
+        Aktif segmentasyon modelinin segment profillerini ve öğrenci sayılarını getir
+
+        Segmentler ortalama TYT netine göre yüksekten düşüğe sıralanır.
+
+        Returns:
+            Dict: {'success', 'model', 'segmentler': [{'segment_no', 'ogrenci_sayisi', 'profil'}]}
+        """
+        model_kayit = _aktif_model()
+        if not model_kayit or not model_kayit.model_dosya_yolu or not os.path.exists(model_kayit.model_dosya_yolu):
+            return {'success': False, 'message': "Aktif segmentasyon modeli bulunamadı.", 'segmentler': []}
+
+        paket = ModelOnbellegi.yukle(model_kayit.model_dosya_yolu)
+        merkezler = paket['scaler'].inverse_transform(paket['kmeans'].cluster_centers_)
+
+        sayilar = dict(
+            db.session.query(OgrenciSegmenti.segment_no, func.count(OgrenciSegmenti.id))
+            .filter(OgrenciSegmenti.model_id == model_kayit.id)
+            .group_by(OgrenciSegmenti.segment_no)
+            .all()
+        )
+
+        segmentler = [
+            {
+                'segment_no': segment_no,
+                'ogrenci_sayisi': sayilar.get(segment_no, 0),
+                'profil': {ad: round(float(deger), 2) for ad, deger in zip(paket['ozellikler'], merkez)},
+            }
+            for segment_no, merkez in enumerate(merkezler)
+        ]
+        segmentler.sort(key=lambda s: -sum(s['profil'][ad] for ad in TYT_NETLERI))
+
+        return {
+            'success': True,
+            'model': {
+                'id': model_kayit.id,
+                'model_adi': model_kayit.model_adi,
+                'son_guncelleme': model_kayit.son_guncelleme.isoformat() if model_kayit.son_guncelleme else None,
+            },
+            'ogrenci_sayisi': sum(sayilar.values()),
+            'segmentler': segmentler
+        }
+
+    @staticmethod
+    def get_ogrenci_segmenti(ogrenci_id):
+        """
+        Öğrencinin güncel segment atamasını getir
+
+        Args:
+            ogrenci_id: Öğrenci ID
+
+        Returns:
+            OgrenciSegmenti: Atama kaydı veya None
+        """
+        return OgrenciSegmenti.query.filter_by(ogrenci_id=ogrenci_id).first()
@@ -15,20 +15,73 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.cluster import KMeans
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
 import joblib
+from joblib import Parallel, delayed
+from sqlalchemy import insert
 
 from app.extensions import db
 from app.blueprints.yapay_zeka_asistan.models import (
-    YapayZekaModel, YapayZekaAnaliz, OgrenciAnaliz, OgrenciOneri, DuyguAnalizi
+    YapayZekaModel, YapayZekaAnaliz, OgrenciAnaliz, OgrenciOneri, DuyguAnalizi, ModelAyarAramasi
 )
+from app.blueprints.yapay_zeka_asistan.model_onbellegi import ModelOnbellegi, MODEL_DIR
+from app.blueprints.yapay_zeka_asistan.duygu_analizi import DuyguAnalizMotoru, ANALIZ_TIPLERI
+from app.blueprints.yapay_zeka_asistan.ozellik_deposu import OzellikDeposu, MODEL_OZELLIKLERI
+from app.blueprints.yapay_zeka_asistan.gelismis_analiz import GelismisAnaliz
+from app.blueprints.yapay_zeka_asistan.hiperparametre import HiperparametreArama
 from app.blueprints.ogrenci_yonetimi.models import Ogrenci
-from app.blueprints.deneme_sinavlari.models import DenemeSonuc
-from app.blueprints.calisma_programi.models import DersIlerleme
 
-# Model dosyalarının kaydedileceği klasör
-MODEL_DIR = os.path.join('app', 'blueprints', 'yapay_zeka_asistan', 'model_files')
-os.makedirs(MODEL_DIR, exist_ok=True)
+# Risk tahminine göre oluşturulan öneriler (1: yüksek risk, 0: düşük risk)
+RISK_ONERILERI = {
+    1: [
+        # Müdahale önerileri
+        {
+            'oneri_metni': "Öğrencinin akademik durumunu iyileştirmek için birebir çalışma programı hazırlanmalı.",
+            'oneri_turu': "mudahale",
+            'oncelik': 2  # Yüksek öncelik
+        },
+        {
+            'oneri_metni': "Haftalık ilerleme değerlendirmeleri yapılarak öğrencinin motivasyonu artırılmalı.",
+            'oneri_turu': "mudahale",
+            'oncelik': 1  # Orta öncelik
+        },
+        # Kaynak önerileri
+        {
+            'oneri_metni': "Öğrencinin eksik olduğu konular için ek kaynak ve çalışma materyalleri sağlanmalı.",
+            'oneri_turu': "kaynak",
+            'oncelik': 1  # Orta öncelik
+        },
+        # Aktivite önerileri
+        {
+            'oneri_metni': "Akran çalışma grubu oluşturarak işbirlikli öğrenme ortamı sağlanmalı.",
+            'oneri_turu': "aktivite",
+            'oncelik': 0  # Düşük öncelik
+        },
+    ],
+    0: [
+        # Müdahale önerileri
+        {
+            'oneri_metni': "Mevcut çalışma programı devam ettirilerek öğrencinin motivasyonu korunmalı.",
+            'oneri_turu': "mudahale",
+            'oncelik': 0  # Düşük öncelik
+        },
+        # Kaynak önerileri
+        {
+            'oneri_metni': "Öğrencinin ilgi alanlarına yönelik ek okuma kaynakları önerilebilir.",
+            'oneri_turu': "kaynak",
+            'oncelik': 0  # Düşük öncelik
+        },
+        # Aktivite önerileri
+        {
+            'oneri_metni': "Üst düzey düşünme becerilerini geliştirmek için proje tabanlı aktiviteler planlanabilir.",
+            'oneri_turu': "aktivite",
+            'oncelik': 1  # Orta öncelik
+        },
+    ],
+}
+
+def _tahminci_egit(tahminci, X, y):
+    """Tahminciyi eğitip döndür (paralel eğitimde işçi süreçlerde çalışır)"""
+    return tahminci.fit(X, y)
 
 class YapayZekaService:
     """Yapay zeka işlemlerini yöneten servis sınıfı"""
@@ -65,132 +118,44 @@ class YapayZekaService:
         return YapayZekaModel.query.get(model_id)
     
     @staticmethod
-    def olustur_akademik_risk_modeli(sinif=None, model_tipi='gelismis'):
+    def get_siniflar():
+        """
+        Öğrencilerin kayıtlı olduğu sınıfları getir
+        
+        Returns:
+            List: Sıralı sınıf adları
+        """
+        return [sinif for (sinif,) in db.session.query(Ogrenci.sinif).distinct().order_by(Ogrenci.sinif) if sinif]
+    
+    @staticmethod
+    def olustur_akademik_risk_modeli(sinif=None, model_tipi='gelismis', ilerleme=None, optimize=False):
         """
         Akademik risk modeli oluştur - Geliştirilmiş versiyon
         
+        Web isteklerinden doğrudan değil, ModelEgitimService üzerinden arka
+        plan işi olarak çalıştırılması önerilir.
+        
         Args:
             sinif: Sınıf filtresi (örn: '9', '10', '11', '12' veya None)
             model_tipi: Model tipi ('temel', 'gelismis' veya 'kapsamli')
+            ilerleme: İsteğe bağlı ilerleme bildirimi; (yuzde, asama) ile çağrılır
+            optimize: True ise sabit ayarlar yerine hiperparametre araması yapılır
             
         Returns:
             Dict: İşlem sonucunu içeren sözlük
         """
+        bildir = ilerleme or (lambda yuzde, asama: None)
+        
         try:
-            # Öğrenci verilerini al
-            ogrenciler = Ogrenci.query.all()
-            if not ogrenciler:
+            # Özellik matrisini özellik deposundan al
+            bildir(10, "Özellik matrisi hazırlanıyor")
+            df = OzellikDeposu.get_matris(sinif=sinif)
+            if df.empty:
                 return {
                     'success': False,
                     'message': 'Sistem içerisinde yeterli sayıda öğrenci verisi bulunmuyor.'
                 }
             
-            # Veri hazırlama
-            veri = []
-            for ogrenci in ogrenciler:
-                # Sınıf filtrelemesi
-                if sinif and ogrenci.sinif.startswith(sinif):
-                    continue
-                
-                # Deneme sınavı sonuçları
-                sonuclar = DenemeSonuc.query.filter_by(ogrenci_id=ogrenci.id).all()
-                
-                # İlerleme durumları
-                ilerlemeler = DersIlerleme.query.filter_by(ogrenci_id=ogrenci.id).all()
-                
-                # Temel özellikler hesaplama (Deneme sınavı ortalaması)
-                if sonuclar:
-                    ort_net = sum(s.toplam_net for s in sonuclar) / len(sonuclar)
-                    ort_dogru = sum(s.toplam_dogru for s in sonuclar) / len(sonuclar)
-                    ort_yanlis = sum(s.toplam_yanlis for s in sonuclar) / len(sonuclar)
-                    
-                    # Gelişmiş model için zaman içindeki trend hesaplamaları
-                    if len(sonuclar) >= 2 and model_tipi in ['gelismis', 'kapsamli']:
-                        # Sonuçları tarihe göre sırala
-                        sirali_sonuclar = sorted(sonuclar, key=lambda s: s.sinav_tarihi if s.sinav_tarihi else datetime.now())
-                        
-                        # Son 3 sınavdaki değişim trendini hesapla
-                        son_sonuclar = sirali_sonuclar[-3:] if len(sirali_sonuclar) >= 3 else sirali_sonuclar
-                        net_degisim = son_sonuclar[-1].toplam_net - son_sonuclar[0].toplam_net
-                        
-                        # Trend skorunu -1 ile 1 arasında normalize et
-                        trend_skoru = min(max(net_degisim / (son_sonuclar[0].toplam_net + 0.1), -1), 1)
-                    else:
-                        trend_skoru = 0
-                else:
-                    ort_net = 0
-                    ort_dogru = 0
-                    ort_yanlis = 0
-                    trend_skoru = 0
-                
-                # İlerleme durumu
-                ilerleme_yuzdesi = ogrenci.genel_ilerleme()
-                
-                # Devamsızlık (varsayılan olarak sıfır, gerçek veri geldiğinde güncellenecek)
-                devamsizlik = 0  # İleride eklenecek
-                
-                # Kapsamlı model için ek özellikler
-                if model_tipi == 'kapsamli':
-                    # Düzenli çalışma süreleri (haftalık ortalama)
-                    haftalik_calisma_saati = 0  # İleride ders programı verilerinden hesaplanacak
-                    
-                    # Anket sonuçlarından motivasyon skoru
-                    motivasyon_skoru = 0  # İleride anket verilerinden hesaplanacak
-                    
-                    # Hedeflerin belirlenme oranı
-                    hedef_belirleme_orani = 0  # İleride hedef listesinden hesaplanacak
-                else:
-                    haftalik_calisma_saati = 0
-                    motivasyon_skoru = 0
-                    hedef_belirleme_orani = 0
-                
-                # Risk durumu (manuel etiketleme)
-                # Not: Gerçek modelde bu veri önceden etiketlenmiş olmalı
-                # Burada örnek bir kuralla otomatik etiketleme yapıyoruz
-                if model_tipi == 'temel':
-                    risk = 1 if (ort_net < 20 or ilerleme_yuzdesi < 30 or devamsizlik > 10) else 0
-                elif model_tipi == 'gelismis':
-                    # Trend faktörünü de dahil et
-                    risk = 1 if (ort_net < 20 or ilerleme_yuzdesi < 30 or trend_skoru < -0.3 or devamsizlik > 10) else 0
-                else:  # kapsamlı
-                    # Daha kapsamlı risk hesaplama
-                    risk_puani = 0
-                    risk_puani += 1 if ort_net < 20 else 0
-                    risk_puani += 1 if ilerleme_yuzdesi < 30 else 0
-                    risk_puani += 1 if trend_skoru < -0.3 else 0
-                    risk_puani += 1 if devamsizlik > 10 else 0
-                    risk_puani += 1 if haftalik_calisma_saati < 10 else 0
-                    risk_puani += 1 if motivasyon_skoru < 3 else 0
-                    risk_puani += 1 if hedef_belirleme_orani < 0.5 else 0
-                    
-                    risk = 1 if risk_puani >= 3 else 0
-                
-                # Veri sözlüğü
-                ogrenci_veri = {
-                    'ogrenci_id': ogrenci.id,
-                    'ort_net': ort_net,
-                    'ort_dogru': ort_dogru,
-                    'ort_yanlis': ort_yanlis,
-                    'ilerleme_yuzdesi': ilerleme_yuzdesi,
-                    'devamsizlik': devamsizlik,
-                    'risk': risk
-                }
-                
-                # Gelişmiş model için ek özellikler
-                if model_tipi in ['gelismis', 'kapsamli']:
-                    ogrenci_veri['trend_skoru'] = trend_skoru
-                
-                # Kapsamlı model için ek özellikler
-                if model_tipi == 'kapsamli':
-                    ogrenci_veri['haftalik_calisma_saati'] = haftalik_calisma_saati
-                    ogrenci_veri['motivasyon_skoru'] = motivasyon_skoru
-                    ogrenci_veri['hedef_belirleme_orani'] = hedef_belirleme_orani
-                
-                veri.append(ogrenci_veri)
-            
-            # DataFrame oluştur
-            df = pd.DataFrame(veri)
-            
             # En az 10 öğrenci verisi gerekli
             if len(df) < 10:
                 return {
@@ -198,16 +163,28 @@ class YapayZekaService:
                     'message': 'Model eğitimi için yeterli sayıda öğrenci verisi bulunmuyor (en az 10 gerekli).'
                 }
             
-            # Özellik seçimi modele göre
+            # Risk durumu (manuel etiketleme)
+            # Not: Gerçek modelde bu veri önceden etiketlenmiş olmalı
+            # Burada örnek bir kuralla otomatik etiketleme yapıyoruz
+            dusuk_net = df['ort_net'] < 20
+            dusuk_ilerleme = df['ilerleme_yuzdesi'] < 30
+            dusus_trendi = df['trend_skoru'] < -0.3
             if model_tipi == 'temel':
-                features = ['ort_net', 'ort_dogru', 'ort_yanlis', 'ilerleme_yuzdesi', 'devamsizlik']
+                df['risk'] = (dusuk_net | dusuk_ilerleme).astype(int)
             elif model_tipi == 'gelismis':
-                features = ['ort_net', 'ort_dogru', 'ort_yanlis', 'ilerleme_yuzdesi', 'devamsizlik', 'trend_skoru']
+                # Trend faktörünü de dahil et
+                df['risk'] = (dusuk_net | dusuk_ilerleme | dusus_trendi).astype(int)
             else:  # kapsamlı
-                features = [
-                    'ort_net', 'ort_dogru', 'ort_yanlis', 'ilerleme_yuzdesi', 'devamsizlik', 
-                    'trend_skoru', 'haftalik_calisma_saati', 'motivasyon_skoru', 'hedef_belirleme_orani'
-                ]
+                # Daha kapsamlı risk hesaplama
+                risk_puani = (
+                    dusuk_net.astype(int) + dusuk_ilerleme.astype(int) + dusus_trendi.astype(int)
+                    + (df['deneme_sayisi'] < 2).astype(int)
+                    + (df['net_std'] > 10).astype(int)
+                )
+                df['risk'] = (risk_puani >= 2).astype(int)
+            
+            # Özellik seçimi modele göre
+            features = MODEL_OZELLIKLERI.get(model_tipi, MODEL_OZELLIKLERI['kapsamli'])
             
             # Veriyi eğitim ve test olarak ayır
             X = df[features]
@@ -215,26 +192,40 @@ class YapayZekaService:
             
             X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
             
+            # İstenirse hiperparametreler yalnızca eğitim verisi üzerinde çapraz doğrulamayla aranır
+            ayar_aramasi = None
+            if optimize:
+                try:
+                    ayar_aramasi = HiperparametreArama.ayarla(model_tipi, X_train, y_train, sinif=sinif, bildir=bildir)
+                except ValueError as e:
+                    # Arama veriye uymazsa eğitim varsayılan ayarlarla sürer
+                    logging.warning(f"Hiperparametre araması yapılamadı, varsayılan ayarlar kullanılıyor: {str(e)}")
+            ayarlar = ayar_aramasi['parametreler'] if ayar_aramasi else {}
+            
+            bildir(50 if ayar_aramasi else 25, "Model eğitiliyor")
+            
             # Model seçimi ve eğitimi
             if model_tipi == 'temel':
-                model = RandomForestClassifier(n_estimators=100, random_state=42)
+                model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1).set_params(**ayarlar.get('rf', {}))
             elif model_tipi == 'gelismis':
                 model = GradientBoostingClassifier(
                     n_estimators=150, 
                     learning_rate=0.1, 
                     max_depth=5,
                     random_state=42
-                )
+                ).set_params(**ayarlar.get('gb', {}))
             else:  # kapsamlı
                 # Çoklu model yaklaşımı (Model Ensemble)
-                rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
-                gb_model = GradientBoostingClassifier(n_estimators=150, learning_rate=0.1, random_state=42)
-                lr_model = LogisticRegression(C=1.0, random_state=42, max_iter=1000)
-                
-                # Her modeli ayrı ayrı eğit
-                rf_model.fit(X_train, y_train)
-                gb_model.fit(X_train, y_train)
-                lr_model.fit(X_train, y_train)
+                # Paralellik modeller düzeyinde yapıldığı için RandomForest tek çekirdekte çalışır
+                rf_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=1).set_params(**ayarlar.get('rf', {}))
+                gb_model = GradientBoostingClassifier(n_estimators=150, learning_rate=0.1, random_state=42).set_params(**ayarlar.get('gb', {}))
+                lr_model = LogisticRegression(C=1.0, random_state=42, max_iter=1000).set_params(**ayarlar.get('lr', {}))
+                
+                # Birbirinden bağımsız modeller ayrı süreçlerde paralel eğitilir
+                rf_model, gb_model, lr_model = Parallel(n_jobs=min(3, os.cpu_count() or 1))(
+                    delayed(_tahminci_egit)(m, X_train, y_train) for m in (rf_model, gb_model, lr_model)
+                )
+                bildir(70, "Model başarımı ölçülüyor")
                 
                 # Tahminleri al
                 rf_pred_train = rf_model.predict_proba(X_train)[:, 1]
@@ -281,6 +272,8 @@ class YapayZekaService:
             train_acc = accuracy_score(y_train, y_pred_train)
             test_acc = accuracy_score(y_test, y_pred_test)
             
+            bildir(85, "Model kaydediliyor")
+            
             # Modeli kaydet
             model_filename = f"akademik_risk_model_{model_tipi}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.joblib"
             model_path = os.path.join(MODEL_DIR, model_filename)
@@ -308,6 +301,20 @@ class YapayZekaService:
             db.session.add(yeni_model)
             db.session.commit()
             
+            if ayar_aramasi:
+                db.session.add(ModelAyarAramasi(
+                    model_id=yeni_model.id,
+                    model_tipi=model_tipi,
+                    sinif=sinif,
+                    en_iyi_parametreler=json.dumps(ayar_aramasi['parametreler']),
+                    cv_skoru=ayar_aramasi['cv_skoru'],
+                    cv_std=ayar_aramasi['cv_std'],
+                    cv_kat_sayisi=ayar_aramasi['cv_kat_sayisi'],
+                    aday_sayisi=ayar_aramasi['aday_sayisi'],
+                    sure=ayar_aramasi['sure'],
+                    detay=json.dumps(ayar_aramasi['detay'])
+                ))
+            
             # Analiz sonuçlarını hazırla
             analiz_sonuclari = {
                 'train_accuracy': train_acc,
@@ -315,6 +322,9 @@ class YapayZekaService:
                 'model_tipi': model_tipi,
                 'ozellikler': features
             }
+            if ayar_aramasi:
+                analiz_sonuclari['hiperparametreler'] = ayar_aramasi['parametreler']
+                analiz_sonuclari['cv_accuracy'] = ayar_aramasi['cv_skoru']
             
             # Özellik önemlerini ekle
             if model_tipi != 'kapsamli':
@@ -346,9 +356,15 @@ class YapayZekaService:
             db.session.add(analiz)
             db.session.commit()
             
+            mesaj = f"Akademik Risk Modeli ({model_tipi.capitalize()}) başarıyla oluşturuldu. Eğitim doğruluğu: {train_acc:.2%}, Test doğruluğu: {test_acc:.2%}"
+            if ayar_aramasi:
+                mesaj += f", CV doğruluğu: {ayar_aramasi['cv_skoru']:.2%} (±{ayar_aramasi['cv_std']:.2%})"
+            elif optimize:
+                mesaj += ". Veri hiperparametre araması için yetersiz olduğundan varsayılan ayarlar kullanıldı."
+            
             return {
                 'success': True,
-                'message': f"Akademik Risk Modeli ({model_tipi.capitalize()}) başarıyla oluşturuldu. Eğitim doğruluğu: {train_acc:.2%}, Test doğruluğu: {test_acc:.2%}",
+                'message': mesaj,
                 'model_id': yeni_model.id
             }
             
@@ -431,54 +447,47 @@ class YapayZekaService:
         Returns:
             Dict: İşlem sonucunu içeren sözlük
         """
-        # Öğrencinin verilerini al
-        ogrenci = Ogrenci.query.get(ogrenci_id)
-        sonuclar = DenemeSonuc.query.filter_by(ogrenci_id=ogrenci_id).all()
-        ilerlemeler = DersIlerleme.query.filter_by(ogrenci_id=ogrenci_id).all()
+        # İlgili analiz nesnesi; modelin eğitildiği özellik listesi analiz sonuçlarında tutulur
+        analiz_kayit = YapayZekaAnaliz.query.filter_by(model_id=model_kayit.id).first()
+        if not analiz_kayit:
+            return {
+                'success': False,
+                'message': 'Bu model için tanımlı analiz bulunamadı.'
+            }
         
-        # Deneme sınavı ortalaması
-        if sonuclar:
-            ort_net = sum(s.toplam_net for s in sonuclar) / len(sonuclar)
-            ort_dogru = sum(s.toplam_dogru for s in sonuclar) / len(sonuclar)
-            ort_yanlis = sum(s.toplam_yanlis for s in sonuclar) / len(sonuclar)
-        else:
-            ort_net = 0
-            ort_dogru = 0
-            ort_yanlis = 0
+        features = json.loads(analiz_kayit.sonuclar or '{}').get('ozellikler') or MODEL_OZELLIKLERI['temel']
         
-        # İlerleme durumu
-        ilerleme_yuzdesi = ogrenci.genel_ilerleme()
+        # Öğrencinin özelliklerini özellik deposundan al
+        ozellik_satiri = OzellikDeposu.get_ogrenci_ozellikleri(ogrenci_id)
+        if ozellik_satiri is None:
+            return {
+                'success': False,
+                'message': 'Öğrenci bulunamadı.'
+            }
         
-        # Devamsızlık (varsayılan olarak sıfır, gerçek veri geldiğinde güncellenecek)
-        devamsizlik = 0  # İleride eklenecek
+        eksik = [f for f in features if f not in ozellik_satiri.index]
+        if eksik:
+            return {
+                'success': False,
+                'message': f"Model, artık üretilmeyen özelliklerle eğitilmiş ({', '.join(eksik)}). Lütfen modeli yeniden eğitin."
+            }
+        
+        ort_net = float(ozellik_satiri['ort_net'])
+        ilerleme_yuzdesi = float(ozellik_satiri['ilerleme_yuzdesi'])
         
-        # Özellikleri numpy dizisine dönüştür
-        ozellikler = np.array([[ort_net, ort_dogru, ort_yanlis, ilerleme_yuzdesi, devamsizlik]])
+        # Özellikleri eğitimdeki sütun sırasıyla DataFrame'e dönüştür
+        ozellikler = ozellik_satiri[features].astype(float).to_frame().T
         
-        # Modeli yükle ve tahmin yap
-        model = joblib.load(model_kayit.model_dosya_yolu)
+        # Modeli önbellekten al ve tahmin yap
+        model = ModelOnbellegi.yukle(model_kayit.model_dosya_yolu)
         risk_tahmini = model.predict(ozellikler)[0]
         risk_olasiligi = model.predict_proba(ozellikler)[0][1]  # Sınıf 1 (risk) olasılığı
         
         # Analiz sonuçlarını değerlendir
-        if risk_tahmini == 1:
-            risk_metni = "Yüksek Risk"
-            yorumlar = f"Öğrenci akademik risk altında görünüyor. Ortalama net: {ort_net:.1f}, İlerleme: {ilerleme_yuzdesi:.1f}%. Öğrencinin akademik durumunu iyileştirmek için acil müdahale gerekebilir."
-        else:
-            risk_metni = "Düşük Risk"
-            yorumlar = f"Öğrenci akademik olarak iyi durumda görünüyor. Ortalama net: {ort_net:.1f}, İlerleme: {ilerleme_yuzdesi:.1f}%. Mevcut performansını korumak için destekleyici önlemler alınabilir."
+        risk_metni, yorumlar = YapayZekaService._risk_yorumu(risk_tahmini, ort_net, ilerleme_yuzdesi)
         
         # Analiz kaydını oluştur
         try:
-            # İlgili analiz nesnesi
-            analiz_kayit = YapayZekaAnaliz.query.filter_by(model_id=model_kayit.id).first()
-            
-            if not analiz_kayit:
-                return {
-                    'success': False,
-                    'message': 'Bu model için tanımlı analiz bulunamadı.'
-                }
-            
             # Öğrenci analizini kaydet
             ogrenci_analiz = OgrenciAnaliz(
                 ogrenci_id=ogrenci_id,
@@ -487,11 +496,7 @@ class YapayZekaService:
                 yorumlar=yorumlar
                 # ham_sonuclar alanı veritabanında olmadığı için kaldırıldı
                 # ham_sonuclar=json.dumps({
-                #     'ort_net': float(ort_net),
-                #     'ort_dogru': float(ort_dogru),
-                #     'ort_yanlis': float(ort_yanlis),
-                #     'ilerleme_yuzdesi': float(ilerleme_yuzdesi),
-                #     'devamsizlik': float(devamsizlik),
+                #     **{f: float(ozellik_satiri[f]) for f in features},
                 #     'risk_tahmini': int(risk_tahmini),
                 #     'risk_olasiligi': float(risk_olasiligi)
                 # })
@@ -517,6 +522,143 @@ class YapayZekaService:
                 'message': f"Analiz sonuçları kaydedilirken bir hata oluştu: {str(e)}"
             }
     
+    @staticmethod
+    def _risk_yorumu(risk_tahmini, ort_net, ilerleme_yuzdesi):
+        """
+        Risk tahmini için kısa sonuç metni ve yorum üret
+        
+        Returns:
+            Tuple: (risk_metni, yorumlar)
+        """
+        if risk_tahmini == 1:
+            return "Yüksek Risk", f"Öğrenci akademik risk altında görünüyor. Ortalama net: {ort_net:.1f}, İlerleme: {ilerleme_yuzdesi:.1f}%. Öğrencinin akademik durumunu iyileştirmek için acil müdahale gerekebilir."
+        return "Düşük Risk", f"Öğrenci akademik olarak iyi durumda görünüyor. Ortalama net: {ort_net:.1f}, İlerleme: {ilerleme_yuzdesi:.1f}%. Mevcut performansını korumak için destekleyici önlemler alınabilir."
+    
+    @staticmethod
+    def toplu_risk_analizi(model_id, sinif=None):
+        """
+        Bir sınıfın (veya tüm okulun) akademik risk analizini tek seferde yap
+        
+        Özellik matrisi özellik deposundan tek parça alınır, model bir kez
+        predict_proba ile çalıştırılır; OgrenciAnaliz ve OgrenciOneri satırları
+        toplu INSERT ile tek transaction içinde yazılır.
+        
+        Args:
+            model_id: Model ID
+            sinif: Sınıf ön eki filtresi (örn: '12' veya '12A'; None ise tüm öğrenciler)
+            
+        Returns:
+            Dict: İşlem sonucunu ve öğrenci bazlı risk listesini içeren sözlük
+        """
+        try:
+            model_kayit = YapayZekaModel.query.get(model_id)
+            if not model_kayit:
+                return {'success': False, 'message': 'Model bulunamadı.'}
+            
+            if not model_kayit.aktif:
+                return {'success': False, 'message': 'Bu model pasif durumda, analiz yapılamaz.'}
+            
+            if model_kayit.model_turu != "akademik_risk":
+                return {'success': False, 'message': f"Desteklenmeyen model türü: {model_kayit.model_turu}"}
+            
+            if not model_kayit.model_dosya_yolu or not os.path.exists(model_kayit.model_dosya_yolu):
+                return {'success': False, 'message': 'Model dosyası bulunamadı.'}
+            
+            analiz_kayit = YapayZekaAnaliz.query.filter_by(model_id=model_kayit.id).first()
+            if not analiz_kayit:
+                return {'success': False, 'message': 'Bu model için tanımlı analiz bulunamadı.'}
+            
+            features = json.loads(analiz_kayit.sonuclar or '{}').get('ozellikler') or MODEL_OZELLIKLERI['temel']
+            
+            matris = OzellikDeposu.get_matris(sinif=sinif)
+            if matris.empty:
+                return {'success': False, 'message': 'Seçilen sınıfta öğrenci bulunamadı.'}
+            
+            eksik = [f for f in features if f not in matris.columns]
+            if eksik:
+                return {
+                    'success': False,
+                    'message': f"Model, artık üretilmeyen özelliklerle eğitilmiş ({', '.join(eksik)}). Lütfen modeli yeniden eğitin."
+                }
+            
+            # Tüm öğrenciler için tek tahmin çağrısı
+            model = ModelOnbellegi.yukle(model_kayit.model_dosya_yolu)
+            olasiliklar = model.predict_proba(matris[features].astype(float))
+            siniflar = list(model.classes_)
+            risk_olasiliklari = olasiliklar[:, siniflar.index(1)] if 1 in siniflar else np.zeros(len(matris))
+            risk_tahminleri = np.asarray(siniflar)[olasiliklar.argmax(axis=1)]
+            
+            ogrenci_idleri = [int(i) for i in matris.index]
+            ort_netler = matris['ort_net'].to_numpy(dtype=float)
+            ilerlemeler = matris['ilerleme_yuzdesi'].to_numpy(dtype=float)
+            simdi = datetime.now()
+            
+            analiz_satirlari = []
+            for i, ogrenci_id in enumerate(ogrenci_idleri):
+                _, yorumlar = YapayZekaService._risk_yorumu(risk_tahminleri[i], ort_netler[i], ilerlemeler[i])
+                analiz_satirlari.append({
+                    'ogrenci_id': ogrenci_id,
+                    'analiz_id': analiz_kayit.id,
+                    'analiz_tarihi': simdi,
+                    'risk_seviyesi': float(risk_olasiliklari[i]),
+                    'yorumlar': yorumlar
+                })
+            
+            # Eklenen analiz ID'leri parametre sırasıyla geri alınır
+            analiz_idleri = db.session.scalars(
+                insert(OgrenciAnaliz).returning(OgrenciAnaliz.id, sort_by_parameter_order=True),
+                analiz_satirlari
+            ).all()
+            
+            oneri_satirlari = [
+                {'analiz_id': analiz_id, **oneri}
+                for analiz_id, tahmin in zip(analiz_idleri, risk_tahminleri)
+                for oneri in RISK_ONERILERI[1 if tahmin == 1 else 0]
+            ]
+            if oneri_satirlari:
+                db.session.execute(insert(OgrenciOneri), oneri_satirlari)
+            
+            db.session.commit()
+            
+            adlar = dict(
+                (ogrenci_id, (numara, f"{ad} {soyad}"))
+                for ogrenci_id, numara, ad, soyad in db.session.query(
+                    Ogrenci.id, Ogrenci.numara, Ogrenci.ad, Ogrenci.soyad
+                ).filter(Ogrenci.id.in_(ogrenci_idleri))
+            )
+            sonuclar = sorted(
+                (
+                    {
+                        'ogrenci_id': ogrenci_id,
+                        'analiz_id': analiz_id,
+                        'numara': adlar.get(ogrenci_id, ('', ''))[0],
+                        'ad_soyad': adlar.get(ogrenci_id, ('', ''))[1],
+                        'sinif': matris.at[ogrenci_id, 'sinif'],
+                        'risk_seviyesi': float(risk_olasiliklari[i]),
+                        'yuksek_risk': bool(risk_tahminleri[i] == 1)
+                    }
+                    for i, (ogrenci_id, analiz_id) in enumerate(zip(ogrenci_idleri, analiz_idleri))
+                ),
+                key=lambda s: s['risk_seviyesi'], reverse=True
+            )
+            yuksek_riskli = sum(1 for s in sonuclar if s['yuksek_risk'])
+            
+            return {
+                'success': True,
+                'message': f"{len(sonuclar)} öğrenci analiz edildi. Yüksek riskli öğrenci sayısı: {yuksek_riskli}",
+                'analiz_sayisi': len(sonuclar),
+                'yuksek_riskli': yuksek_riskli,
+                'sonuclar': sonuclar
+            }
+            
+        except Exception as e:
+            logging.error(f"Toplu risk analizi hatası: {str(e)}")
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f"Toplu analiz yapılırken bir hata oluştu: {str(e)}"
+            }
+    
     @staticmethod
     def _oneriler_olustur(analiz_id, risk_tahmini):
         """
@@ -530,60 +672,8 @@ class YapayZekaService:
         if not ogrenci_analiz:
             return
         
-        # Öğrenci ve analiz bilgileri
-        ogrenci = Ogrenci.query.get(ogrenci_analiz.ogrenci_id)
-        
         # Risk seviyesine göre öneriler
-        oneriler = []
-        
-        if risk_tahmini == 1:  # Yüksek risk
-            # Müdahale önerileri
-            oneriler.append({
-                'oneri_metni': "Öğrencinin akademik durumunu iyileştirmek için birebir çalışma programı hazırlanmalı.",
-                'oneri_turu': "mudahale",
-                'oncelik': 2  # Yüksek öncelik
-            })
-            
-            oneriler.append({
-                'oneri_metni': "Haftalık ilerleme değerlendirmeleri yapılarak öğrencinin motivasyonu artırılmalı.",
-                'oneri_turu': "mudahale",
-                'oncelik': 1  # Orta öncelik
-            })
-            
-            # Kaynak önerileri
-            oneriler.append({
-                'oneri_metni': "Öğrencinin eksik olduğu konular için ek kaynak ve çalışma materyalleri sağlanmalı.",
-                'oneri_turu': "kaynak",
-                'oncelik': 1  # Orta öncelik
-            })
-            
-            # Aktivite önerileri
-            oneriler.append({
-                'oneri_metni': "Akran çalışma grubu oluşturarak işbirlikli öğrenme ortamı sağlanmalı.",
-                'oneri_turu': "aktivite",
-                'oncelik': 0  # Düşük öncelik
-            })
-        else:  # Düşük risk
-            # Müdahale önerileri
-            oneriler.append({
-                'oneri_metni': "Mevcut çalışma programı devam ettirilerek öğrencinin motivasyonu korunmalı.",
-                'oneri_turu': "mudahale",
-                'oncelik': 0  # Düşük öncelik
-            })
-            
-            # Kaynak önerileri
-            oneriler.append({
-                'oneri_metni': "Öğrencinin ilgi alanlarına yönelik ek okuma kaynakları önerilebilir.",
-                'oneri_turu': "kaynak",
-                'oncelik': 0  # Düşük öncelik
-            })
-            
-            # Aktivite önerileri
-            oneriler.append({
-                'oneri_metni': "Üst düzey düşünme becerilerini geliştirmek için proje tabanlı aktiviteler planlanabilir.",
-                'oneri_turu': "aktivite",
-                'oncelik': 1  # Orta öncelik
-            })
+        oneriler = RISK_ONERILERI[1 if risk_tahmini == 1 else 0]
         
         # Önerileri veritabanına kaydet
         for oneri in oneriler:
@@ -665,6 +755,41 @@ class YapayZekaService:
                 'message': f"Öneri güncellenirken bir hata oluştu: {str(e)}"
             }
     
+    @staticmethod
+    def _duygu_analizi_alanlari(ogrenci_id, metin, metin_kaynagi, analiz_tipi, analiz_sonucu):
+        """
+        Analiz sonucundan DuyguAnalizi kaydının alanlarını hazırla
+        
+        Returns:
+            Dict: DuyguAnalizi sütun adı -> değer
+        """
+        # Detaylı analiz sonuçlarını JSON formatında sakla
+        sonuc_detay = {
+            'analiz_tipi': analiz_tipi,
+            'duygu_yogunlugu': max(analiz_sonucu['olumlu_skor'], analiz_sonucu['olumsuz_skor'])
+        }
+        
+        # Gelişmiş ve kapsamlı analizler için ek özellikleri ekle
+        if analiz_tipi in ['gelismis', 'kapsamli'] and 'onemli_kelimeler' in analiz_sonucu:
+            sonuc_detay['onemli_kelimeler'] = analiz_sonucu['onemli_kelimeler']
+        
+        # Kapsamlı analiz için duygu kategorileri ve diğer detaylar
+        if analiz_tipi == 'kapsamli':
+            for alan in ('duygu_kategorileri', 'motivasyon_kaygi_dengesi', 'cumle_analizleri'):
+                if alan in analiz_sonucu:
+                    sonuc_detay[alan] = analiz_sonucu[alan]
+        
+        return {
+            'ogrenci_id': ogrenci_id,
+            'metin': metin,
+            'metin_kaynagi': metin_kaynagi,
+            'baskın_duygu': analiz_sonucu['baskin_duygu'],
+            'olumlu_skor': analiz_sonucu['olumlu_skor'],
+            'olumsuz_skor': analiz_sonucu['olumsuz_skor'],
+            'notr_skor': analiz_sonucu['notr_skor'],
+            'sonuc_detay': json.dumps(sonuc_detay)
+        }
+    
     @staticmethod
     def metin_duygu_analizi_yap(ogrenci_id, metin, metin_kaynagi, analiz_tipi='gelismis'):
         """
@@ -688,295 +813,14 @@ class YapayZekaService:
                     'message': 'Öğrenci bulunamadı.'
                 }
             
-            # Geniş Türkçe duygu sözlükleri
-            olumlu_kelimeler = [
-                'güzel', 'harika', 'mükemmel', 'iyi', 'başarılı', 'mutlu', 'seviyorum', 'teşekkür', 'olumlu', 
-                'kolay', 'başardım', 'anladım', 'sevindim', 'memnun', 'keyifli', 'hoş', 'güven', 'tatmin', 
-                'sakin', 'rahat', 'huzurlu', 'neşeli', 'coşkulu', 'heyecanlı', 'umutlu', 'motivasyon', 
-                'azim', 'kararlı', 'istekli', 'sevgi', 'beğeni', 'takdir', 'gurur', 'memnuniyet', 'tatmin',
-                'zevkli', 'eğlenceli', 'ödül', 'başarı', 'zafer', 'faydalı', 'yararlı', 'değerli', 'önemli',
-                'anlamlı', 'gelişim', 'ilerleme', 'öğrenme', 'anlama', 'kavrama', 'çözme', 'keşfetme'
-            ]
-            
-            olumsuz_kelimeler = [
-                'kötü', 'zor', 'yapamadım', 'anlamadım', 'üzgün', 'mutsuz', 'problem', 'sorun', 'sıkıntı', 
-                'başarısız', 'hata', 'zayıf', 'yetersiz', 'kaygı', 'korku', 'endişe', 'stres', 'gergin', 
-                'tedirgin', 'karamsarlık', 'umutsuz', 'bezgin', 'bıkkın', 'yorgun', 'tükenmişlik', 'çaresiz', 
-                'güçsüz', 'kayıp', 'başarısızlık', 'yenilgi', 'karmaşık', 'zorluk', 'engel', 'baskı', 'gerilim',
-                'kızgın', 'öfkeli', 'sinirli', 'hayal kırıklığı', 'üzüntü', 'hüzün', 'keder', 'ağır', 'yetersiz',
-                'eksik', 'anlamsız', 'faydasız', 'boşuna', 'beyhude', 'imkansız', 'karışık', 'anlaşılmaz',
-                'çözülmez', 'başedemiyorum', 'yetişemiyorum', 'yapamıyorum', 'zorlanıyorum', 'sıkılıyorum'
-            ]
-            
-            # Motivasyon ile ilgili kelimeler
-            motivasyon_kelimeleri = [
-                'istek', 'arzu', 'motivasyon', 'azim', 'kararlılık', 'hedef', 'amaç', 'başarma', 
-                'çabalamak', 'gayret', 'emek', 'istikrar', 'çalışmak', 'odaklanmak', 'disiplin', 
-                'adanmak', 'sebat', 'ısrar', 'süreklilik', 'düzenli', 'planlı', 'programlı'
-            ]
-            
-            # Akademik kaygı ile ilgili kelimeler
-            kaygi_kelimeleri = [
-                'sınav', 'sonuç', 'korku', 'endişe', 'stres', 'baskı', 'kaygı', 'gerginlik', 
-                'tedirginlik', 'panik', 'başarısızlık', 'yetersizlik', 'karşılaştırma', 'rakip', 
-                'rekabet', 'yarış', 'derece', 'sıralama', 'puan', 'yüksek', 'düşük', 'geçme', 'kalma'
-            ]
-            
-            # Metni temizleme (Türkçe karakterler korunarak)
-            def metin_temizle(text):
-                text = text.lower()
-                # Noktalama işaretlerini boşluklarla değiştir
-                for p in '.,;:?!-()[]{}':
-                    text = text.replace(p, ' ')
-                # Fazla boşlukları temizle
-                return ' '.join(text.split())
-            
-            # Basit duygu analizi - kelime eşleştirmesine dayalı
-            def basit_duygu_analizi(text):
-                # Metni temizle
-                temiz_metin = metin_temizle(text)
-                kelimeler = temiz_metin.split()
-                
-                # Kelime eşleştirme
-                olumlu_sayisi = sum(1 for k in kelimeler if k in olumlu_kelimeler)
-                olumsuz_sayisi = sum(1 for k in kelimeler if k in olumsuz_kelimeler)
-                
-                # Skorlar (0-1 arası)
-                toplam = olumlu_sayisi + olumsuz_sayisi
-                if toplam == 0:
-                    olumlu_skor = 0.33
-                    olumsuz_skor = 0.33
-                    notr_skor = 0.34
-                else:
-                    olumlu_skor = olumlu_sayisi / (toplam * 2)  # * 2 ile en fazla 0.5 yapıyoruz
-                    olumsuz_skor = olumsuz_sayisi / (toplam * 2)
-                    notr_skor = 1 - (olumlu_skor + olumsuz_skor)
-                
-                # Baskın duygu
-                if olumlu_skor > olumsuz_skor and olumlu_skor > notr_skor:
-                    baskin_duygu = 'olumlu'
-                elif olumsuz_skor > olumlu_skor and olumsuz_skor > notr_skor:
-                    baskin_duygu = 'olumsuz'
-                else:
-                    baskin_duygu = 'notr'
-                
-                return {
-                    'baskin_duygu': baskin_duygu,
-                    'olumlu_skor': olumlu_skor,
-                    'olumsuz_skor': olumsuz_skor,
-                    'notr_skor': notr_skor
-                }
-            
-            # Gelişmiş duygu analizi - TF-IDF ve bağlam analizi
-            def gelismis_duygu_analizi(text):
-                # Metni temizle
-                temiz_metin = metin_temizle(text)
-                
-                # TF-IDF vektörleştirici oluştur
-                # Bu vektörleştirici kelime frekansı ve ters doküman frekansına dayalı
-                # bir ağırlıklandırma yaparak kelimelerin önem derecesini hesaplar
-                vectorizer = TfidfVectorizer(
-                    max_features=1000,
-                    stop_words=None  # Türkçe için stop words yok
-                )
-                
-                # Vektörleştirme için eğitim metinleri oluştur
-                # (gerçek bir uygulamada önceden eğitilmiş bir model kullanılmalı)
-                egitim_metinleri = [
-                    ' '.join(olumlu_kelimeler),  # Olumlu örnek
-                    ' '.join(olumsuz_kelimeler)  # Olumsuz örnek
-                ]
-                egitim_metinleri.append(temiz_metin)  # Analiz edilecek metin
-                
-                # Vektörleştiriciyi eğit ve metin vektörlerini oluştur
-                tfidf_matrix = vectorizer.fit_transform(egitim_metinleri)
-                
-                # Benzerlik hesaplama (kosinüs benzerliği)
-                from sklearn.metrics.pairwise import cosine_similarity
-                benzerlik_skoru = cosine_similarity(
-                    tfidf_matrix[2:3],  # Analiz metni vektörü
-                    tfidf_matrix[0:2]   # Olumlu ve olumsuz örnek vektörleri
-                )[0]
-                
-                # Skorları normalize et
-                olumlu_benzerlik = max(0, benzerlik_skoru[0])
-                olumsuz_benzerlik = max(0, benzerlik_skoru[1])
-                
-                # Bağlam analizi için n-gramlar kullan
-                # Bu, sadece tek kelimelere değil, kelime gruplarına da bakarak
-                # daha fazla bağlam analizi yapar
-                bigram_vectorizer = CountVectorizer(
-                    ngram_range=(2, 3),  # 2-gram ve 3-gram kullan
-                    max_features=500
-                )
-                
-                # Bigram analizi yap
-                try:
-                    bigram_matrix = bigram_vectorizer.fit_transform(egitim_metinleri)
-                    bigram_benzerlik = cosine_similarity(
-                        bigram_matrix[2:3], 
-                        bigram_matrix[0:2]
-                    )[0]
-                    
-                    # Bigram benzerlik skorlarını ana skorlarla birleştir
-                    olumlu_bigram = max(0, bigram_benzerlik[0])
-                    olumsuz_bigram = max(0, bigram_benzerlik[1])
-                    
-                    # Ağırlıklı ortalama (kelime bazlı ve bigram bazlı)
-                    olumlu_skor = 0.7 * olumlu_benzerlik + 0.3 * olumlu_bigram
-                    olumsuz_skor = 0.7 * olumsuz_benzerlik + 0.3 * olumsuz_bigram
-                except:
-                    # Bigram analizi yapılamazsa (metin çok kısaysa)
-                    olumlu_skor = olumlu_benzerlik
-                    olumsuz_skor = olumsuz_benzerlik
-                
-                # Toplam skoru normalize et
-                toplam_skor = olumlu_skor + olumsuz_skor
-                if toplam_skor > 0:
-                    olumlu_skor = olumlu_skor / toplam_skor * 0.8
-                    olumsuz_skor = olumsuz_skor / toplam_skor * 0.8
-                else:
-                    olumlu_skor = 0.4
-                    olumsuz_skor = 0.4
-                
-                notr_skor = 1 - (olumlu_skor + olumsuz_skor)
-                
-                # Baskın duygu
-                if olumlu_skor > olumsuz_skor and olumlu_skor > notr_skor:
-                    baskin_duygu = 'olumlu'
-                elif olumsuz_skor > olumlu_skor and olumsuz_skor > notr_skor:
-                    baskin_duygu = 'olumsuz'
-                else:
-                    baskin_duygu = 'notr'
-                
-                # Kelime bazlı analiz sonuçlarını da ekle
-                kelimeler = temiz_metin.split()
-                onemli_kelimeler = vectorizer.get_feature_names_out()
-                
-                # En önemli kelimeleri belirle
-                kelime_onem = {}
-                for kelime in kelimeler:
-                    if kelime in onemli_kelimeler:
-                        kelime_vektoru = vectorizer.transform([kelime])
-                        kelime_benzerlik = cosine_similarity(
-                            kelime_vektoru,
-                            tfidf_matrix[0:2]
-                        )[0]
-                        
-                        # Kelimenin duygusal yükünü belirle
-                        kelime_duygusal_yuk = 'olumlu' if kelime_benzerlik[0] > kelime_benzerlik[1] else 'olumsuz'
-                        kelime_onem[kelime] = {
-                            'duygu': kelime_duygusal_yuk,
-                            'skor': abs(kelime_benzerlik[0] - kelime_benzerlik[1])
-                        }
-                
-                # Sonuç sözlüğü
-                return {
-                    'baskin_duygu': baskin_duygu,
-                    'olumlu_skor': olumlu_skor,
-                    'olumsuz_skor': olumsuz_skor,
-                    'notr_skor': notr_skor,
-                    'onemli_kelimeler': {k: v for k, v in sorted(
-                        kelime_onem.items(), 
-                        key=lambda item: item[1]['skor'], 
-                        reverse=True
-                    )[:10]}  # En etkili 10 kelime
-                }
-            
-            # Kapsamlı duygu analizi - Duygu kategorileri ve motivasyon analizi
-            def kapsamli_duygu_analizi(text):
-                # Önce gelişmiş analizi yap
-                temel_sonuc = gelismis_duygu_analizi(text)
-                
-                # Metni temizle
-                temiz_metin = metin_temizle(text)
-                kelimeler = temiz_metin.split()
-                
-                # Motivasyon ve kaygı skorları
-                motivasyon_skoru = sum(1 for k in kelimeler if k in motivasyon_kelimeleri) / max(len(kelimeler), 1)
-                kaygi_skoru = sum(1 for k in kelimeler if k in kaygi_kelimeleri) / max(len(kelimeler), 1)
-                
-                # Duygu kategorileri
-                duygu_kategorileri = {
-                    'motivasyon': motivasyon_skoru,
-                    'kaygi': kaygi_skoru
-                }
-                
-                # Motivasyon-kaygı dengesi
-                motivasyon_kaygi_dengesi = motivasyon_skoru - kaygi_skoru
-                
-                # Cümle analizi
-                cumleler = text.split('.')
-                cumle_analizleri = []
-                
-                for cumle in cumleler:
-                    if len(cumle.strip()) > 5:  # Anlamlı uzunluktaki cümleler
-                        cumle_analiz = basit_duygu_analizi(cumle)
-                        cumle_analizleri.append({
-                            'cumle': cumle.strip(),
-                            'duygu': cumle_analiz['baskin_duygu'],
-                            'skor': max(cumle_analiz['olumlu_skor'], cumle_analiz['olumsuz_skor'])
-                        })
-                
-                # Duygu yoğunluğu ve değişimi
-                duygu_yogunlugu = max(temel_sonuc['olumlu_skor'], temel_sonuc['olumsuz_skor'])
-                
-                # Sonuçları birleştir
-                kapsamli_sonuc = temel_sonuc.copy()
-                kapsamli_sonuc.update({
-                    'duygu_kategorileri': duygu_kategorileri,
-                    'motivasyon_kaygi_dengesi': motivasyon_kaygi_dengesi,
-                    'cumle_analizleri': cumle_analizleri,
-                    'duygu_yogunlugu': duygu_yogunlugu
-                })
-                
-                return kapsamli_sonuc
-            
-            # Analiz tipine göre uygun analiz fonksiyonunu çağır
-            if analiz_tipi == 'basit':
-                analiz_sonucu = basit_duygu_analizi(metin)
-            elif analiz_tipi == 'gelismis':
-                analiz_sonucu = gelismis_duygu_analizi(metin)
-            else:  # kapsamlı
-                analiz_sonucu = kapsamli_duygu_analizi(metin)
-            
-            # Sonuçtan sadece veritabanı alanlarına kaydedilecek bilgileri çıkart
-            db_kaydi = {
-                'baskin_duygu': analiz_sonucu['baskin_duygu'],
-                'olumlu_skor': analiz_sonucu['olumlu_skor'],
-                'olumsuz_skor': analiz_sonucu['olumsuz_skor'],
-                'notr_skor': analiz_sonucu['notr_skor']
-            }
-            
-            # Detaylı analiz sonuçlarını JSON formatında sakla
-            sonuc_detay = {
-                'analiz_tipi': analiz_tipi,
-                'duygu_yogunlugu': max(db_kaydi['olumlu_skor'], db_kaydi['olumsuz_skor'])
-            }
-            
-            # Gelişmiş ve kapsamlı analizler için ek özellikleri ekle
-            if analiz_tipi in ['gelismis', 'kapsamli'] and 'onemli_kelimeler' in analiz_sonucu:
-                sonuc_detay['onemli_kelimeler'] = analiz_sonucu['onemli_kelimeler']
-            
-            # Kapsamlı analiz için duygu kategorileri ve diğer detaylar
-            if analiz_tipi == 'kapsamli':
-                if 'duygu_kategorileri' in analiz_sonucu:
-                    sonuc_detay['duygu_kategorileri'] = analiz_sonucu['duygu_kategorileri']
-                if 'motivasyon_kaygi_dengesi' in analiz_sonucu:
-                    sonuc_detay['motivasyon_kaygi_dengesi'] = analiz_sonucu['motivasyon_kaygi_dengesi']
-                if 'cumle_analizleri' in analiz_sonucu:
-                    sonuc_detay['cumle_analizleri'] = analiz_sonucu['cumle_analizleri']
+            # Önceden eğitilmiş vektörleştiriciler ve sözlüklerle analiz et
+            if analiz_tipi not in ANALIZ_TIPLERI:
+                analiz_tipi = 'kapsamli'
+            analiz_sonucu = DuyguAnalizMotoru.analiz_et([metin], analiz_tipi)[0]
             
             # Duygu analizi kaydı oluştur
             duygu_analizi = DuyguAnalizi(
-                ogrenci_id=ogrenci_id,
-                metin=metin,
-                metin_kaynagi=metin_kaynagi,
-                baskın_duygu=db_kaydi['baskin_duygu'],
-                olumlu_skor=db_kaydi['olumlu_skor'],
-                olumsuz_skor=db_kaydi['olumsuz_skor'],
-                notr_skor=db_kaydi['notr_skor'],
-                sonuc_detay=json.dumps(sonuc_detay)
+                **YapayZekaService._duygu_analizi_alanlari(ogrenci_id, metin, metin_kaynagi, analiz_tipi, analiz_sonucu)
             )
             
             db.session.add(duygu_analizi)
@@ -999,6 +843,104 @@ class YapayZekaService:
                 'message': f"Duygu analizi yapılırken bir hata oluştu: {str(e)}"
             }
     
+    @staticmethod
+    def toplu_duygu_analizi(metinler, analiz_tipi='gelismis'):
+        """
+        Birden çok metni tek seferde analiz et (sonuçlar kaydedilmez)
+        
+        Args:
+            metinler: Metin listesi
+            analiz_tipi: Analiz tipi ('basit', 'gelismis' veya 'kapsamli')
+            
+        Returns:
+            Dict: İşlem sonucunu ve metinlerle aynı sırada analiz sonuçlarını içeren sözlük
+        """
+        if analiz_tipi not in ANALIZ_TIPLERI:
+            return {'success': False, 'message': f"Geçersiz analiz tipi: {analiz_tipi}"}
+        
+        if not isinstance(metinler, list) or not all(isinstance(m, str) for m in metinler):
+            return {'success': False, 'message': 'Metinler bir metin listesi olarak gönderilmelidir.'}
+        
+        try:
+            sonuclar = DuyguAnalizMotoru.analiz_et(metinler, analiz_tipi)
+            return {
+                'success': True,
+                'message': f"{len(sonuclar)} metin analiz edildi.",
+                'sonuclar': sonuclar
+            }
+        except Exception as e:
+            logging.error(f"Toplu duygu analizi hatası: {str(e)}")
+            return {
+                'success': False,
+                'message': f"Duygu analizi yapılırken bir hata oluştu: {str(e)}"
+            }
+    
+    @staticmethod
+    def gorusme_duygu_analizi(baslangic=None, bitis=None, analiz_tipi='gelismis', kaydet=False):
+        """
+        Bir dönemdeki tüm görüşme özetlerini tek seferde duygu analizinden geçir
+        
+        Args:
+            baslangic: Başlangıç tarihi (date, dahil; None ise sınırsız)
+            bitis: Bitiş tarihi (date, dahil; None ise sınırsız)
+            analiz_tipi: Analiz tipi ('basit', 'gelismis' veya 'kapsamli')
+            kaydet: True ise öğrenciye bağlı görüşmeler için DuyguAnalizi kayıtları toplu eklenir
+            
+        Returns:
+            Dict: İşlem sonucunu, duygu dağılımını ve görüşme bazlı sonuçları içeren sözlük
+        """
+        from app.blueprints.gorusme_defteri.models import GorusmeKaydi
+        
+        if analiz_tipi not in ANALIZ_TIPLERI:
+            return {'success': False, 'message': f"Geçersiz analiz tipi: {analiz_tipi}"}
+        
+        try:
+            sorgu = db.session.query(
+                GorusmeKaydi.id, GorusmeKaydi.ogrenci_id, GorusmeKaydi.tarih, GorusmeKaydi.ozet
+            ).filter(GorusmeKaydi.ozet.isnot(None), GorusmeKaydi.ozet != '')
+            if baslangic:
+                sorgu = sorgu.filter(GorusmeKaydi.tarih >= baslangic)
+            if bitis:
+                sorgu = sorgu.filter(GorusmeKaydi.tarih <= bitis)
+            kayitlar = sorgu.order_by(GorusmeKaydi.tarih, GorusmeKaydi.id).all()
+            
+            analizler = DuyguAnalizMotoru.analiz_et([k.ozet for k in kayitlar], analiz_tipi)
+            
+            kaydedilen = 0
+            if kaydet:
+                satirlar = [
+                    YapayZekaService._duygu_analizi_alanlari(k.ogrenci_id, k.ozet, 'gorusme_notu', analiz_tipi, analiz)
+                    for k, analiz in zip(kayitlar, analizler)
+                    if k.ogrenci_id
+                ]
+                if satirlar:
+                    db.session.execute(insert(DuyguAnalizi), satirlar)
+                    db.session.commit()
+                kaydedilen = len(satirlar)
+            
+            dagilim = {'olumlu': 0, 'olumsuz': 0, 'notr': 0}
+            for analiz in analizler:
+                dagilim[analiz['baskin_duygu']] += 1
+            
+            return {
+                'success': True,
+                'message': f"{len(kayitlar)} görüşme özeti analiz edildi." + (f" {kaydedilen} analiz kaydedildi." if kaydet else ""),
+                'analiz_sayisi': len(kayitlar),
+                'kaydedilen': kaydedilen,
+                'dagilim': dagilim,
+                'sonuclar': [
+                    {'gorusme_id': k.id, 'ogrenci_id': k.ogrenci_id, 'tarih': k.tarih.isoformat(), **analiz}
+                    for k, analiz in zip(kayitlar, analizler)
+                ]
+            }
+        except Exception as e:
+            logging.error(f"Görüşme duygu analizi hatası: {str(e)}")
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f"Duygu analizi yapılırken bir hata oluştu: {str(e)}"
+            }
+    
     @staticmethod
     def get_duygu_analizi(analiz_id):
         """
@@ -1023,4 +965,34 @@ class YapayZekaService:
         Returns:
             List: Duygu analizi listesi
         """
-        return DuyguAnalizi.query.filter_by(ogrenci_id=ogrenci_id).order_by(DuyguAnalizi.analiz_tarihi.desc()).all()
\ No newline at end of file
+        return DuyguAnalizi.query.filter_by(ogrenci_id=ogrenci_id).order_by(DuyguAnalizi.analiz_tarihi.desc()).all()
+    
+    @staticmethod
+    def get_comparative_class_analysis():
+        """
+        Sınıflar arası karşılaştırmalı analiz (önbellekli)
+        
+        Returns:
+            Dict: Okul geneli özet ve sınıf bazlı ortalamalar
+        """
+        return GelismisAnaliz.sinif_karsilastirmasi()
+    
+    @staticmethod
+    def get_time_series_analysis():
+        """
+        Aylık ortalama net zaman serisi (önbellekli)
+        
+        Returns:
+            Dict: Ay etiketleri ve bunlarla hizalı okul/sınıf seviyesi ortalamaları
+        """
+        return GelismisAnaliz.zaman_serisi()
+    
+    @staticmethod
+    def get_predictive_models():
+        """
+        Sınıf bazlı bir sonraki ay TYT net tahminleri (önbellekli)
+        
+        Returns:
+            List: Sınıf başına eğilim ve tahmin sözlükleri
+        """
+        return GelismisAnaliz.sinif_tahminleri()
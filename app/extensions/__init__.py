@@ -1,4 +1,8 @@
+from sqlite3 import Connection as SQLite3Connection
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import relationship
 
@@ -9,5 +13,13 @@ class Base(DeclarativeBase):
 # Initialize SQLAlchemy
 db = SQLAlchemy(model_class=Base)
 
+@event.listens_for(Engine, "connect")
+def _sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite'ta ON DELETE CASCADE kısıtlarının çalışması için yabancı anahtarları aç"""
+    if isinstance(dbapi_connection, SQLite3Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 # Export relationship for model definitions
-__all__ = ['db', 'Base', 'relationship']
\ No newline at end of file
+__all__ = ['db', 'Base', 'relationship']
@@ -6,14 +6,14 @@ def generate_weekly_schedule(ogrenci_id):
     """Öğrenci için haftalık ders programı veri yapısı oluştur"""
     # Modelleri yükle - uygulamanın başlatılmış olması gerekiyor
     from app.blueprints.calisma_programi.models import DersProgrami
-    from app.blueprints.ders_konu_yonetimi.models import Ders
+    from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
     
     # Öğrencinin ders programını al
     ders_programi = DersProgrami.query.filter_by(ogrenci_id=ogrenci_id).order_by(
         DersProgrami.gun, DersProgrami.baslangic_saat).all()
     
-    # Tüm dersleri al ve sözlüğe koy
-    dersler = {d.id: d.ad for d in Ders.query.all()}
+    # Ders adlarını katalog önbelleğinden al
+    dersler = KatalogOnbellegi.ders_adlari()
     
     # Programı günlere göre grupla
     program = {str(gun): [] for gun in range(7)}
@@ -40,7 +40,7 @@ def calculate_topic_schedule(ogrenci_id):
     """Öğrenci için konu bazlı çalışma planı hesapla"""
     # Modelleri yükle - uygulamanın başlatılmış olması gerekiyor
     from app.blueprints.calisma_programi.models import DersProgrami, KonuTakip
-    from app.blueprints.ders_konu_yonetimi.models import Ders, Konu
+    from app.blueprints.ders_konu_yonetimi.katalog import KatalogOnbellegi
     
     # Öğrencinin haftalık ders programını al
     haftalik_program = generate_weekly_schedule(ogrenci_id)
@@ -53,7 +53,7 @@ def calculate_topic_schedule(ogrenci_id):
     
     for ders_id in tum_dersler:
         # Dersin tüm konularını sırayla al
-        konular = Konu.query.filter_by(ders_id=ders_id).order_by(Konu.sira).all()
+        konular = KatalogOnbellegi.konular(ders_id)
         
         if not konular:
             continue
@@ -101,7 +101,7 @@ def calculate_topic_schedule(ogrenci_id):
         
         for ders_bilgi in gun_programi:
             ders_id = ders_bilgi['ders_id']
-            ders = Ders.query.get(ders_id)
+            ders = KatalogOnbellegi.ders(ders_id)
             
             # Saat string'lerini parçala
             baslangic_str = ders_bilgi['baslangic']